@@ -129,9 +129,9 @@ class BudgetAnalysisEngine:
             price_differences = []
             for pkg in budget.packages:
                 if pkg.id in market_prices:
-                    diff = (
-                        (pkg.price - market_prices[pkg.id]) / market_prices[pkg.id]
-                    ) * 100
+                    # El servicio de memoria devuelve precios Decimal
+                    market_price = float(market_prices[pkg.id])
+                    diff = ((float(pkg.price) - market_price) / market_price) * 100
                     price_differences.append(diff)
 
             # Calcular márgenes
@@ -227,9 +227,9 @@ class BudgetAnalysisEngine:
 
             for pkg in budget.packages:
                 if pkg.id in market_prices:
-                    diff = (
-                        (pkg.price - market_prices[pkg.id]) / market_prices[pkg.id]
-                    ) * 100
+                    # El servicio de memoria devuelve precios Decimal
+                    market_price = float(market_prices[pkg.id])
+                    diff = ((float(pkg.price) - market_price) / market_price) * 100
                     if abs(diff) > self.thresholds["price_variance"] * 100:
                         opportunities.append(
                             {
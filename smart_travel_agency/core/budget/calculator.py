@@ -6,6 +6,7 @@ Este módulo implementa:
 2. Gestión de costos y precios
 3. Manejo de impuestos y cargos
 4. Control de márgenes
+5. Cotización en lote de catálogos
 """
 
 from typing import Dict, Any, Optional, List
@@ -15,7 +16,6 @@ from decimal import Decimal
 from prometheus_client import Counter, Histogram
 
 from ..schemas import (
-    Budget,
     TravelPackage,
     PriceComponent,
     MarginStrategy,
@@ -24,6 +24,7 @@ from ..schemas import (
 )
 from ..metrics import get_metrics_collector
 from ..memory import get_memory_manager
+from .pricing import PricingBatch, price_batch
 
 # Métricas
 CALCULATION_OPERATIONS = Counter(
@@ -53,7 +54,7 @@ class BudgetCalculator:
         """Inicializar calculador."""
         self.logger = logging.getLogger(__name__)
         self.memory = get_memory_manager()
-        self.metrics = get_metrics_collector()
+        self.metrics = get_metrics_collector("budget_calculator")
 
         # Configuración de cálculos
         self.config = {
@@ -132,7 +133,7 @@ class BudgetCalculator:
                 totals=totals,
                 metadata={
                     "margin_strategy": margin_strategy.value,
-                    "tax_config": tax_config.dict() if tax_config else None,
+                    "tax_config": tax_config.to_dict() if tax_config else None,
                     "calculation_time": duration,
                 },
             )
@@ -141,6 +142,94 @@ class BudgetCalculator:
             self.logger.error(f"Error en cálculo: {e}")
             return CalculationResult(success=False, error=str(e))
 
+    async def calculate_quotes(
+        self,
+        packages: List[TravelPackage],
+        margin_strategy: Optional[MarginStrategy] = None,
+        tax_config: Optional[TaxConfig] = None,
+    ) -> PricingBatch:
+        """
+        Cotizar un catálogo de paquetes en lote.
+
+        Los costos y márgenes se obtienen con una llamada por lote y el
+        margen, los impuestos y el redondeo se aplican sobre arreglos.
+        Los paquetes sin costos no se cotizan y quedan en `missing`.
+
+        Args:
+            packages: Paquetes a cotizar
+            margin_strategy: Estrategia de margen
+            tax_config: Configuración de impuestos
+
+        Returns:
+            Precios exactos por paquete y totales
+        """
+        start_time = datetime.now()
+        requested = [package.id for package in packages]
+        margin_strategy = margin_strategy or MarginStrategy.FIXED
+        tax_rate = tax_config.rate if tax_config else self.config["tax_rate"]
+
+        costs = await self.memory.get_package_costs_bulk(requested)
+        ids = [package_id for package_id in requested if package_id in costs]
+        missing = [package_id for package_id in requested if package_id not in costs]
+        if missing:
+            self.logger.warning(f"Paquetes sin costos, no cotizados: {missing}")
+        margins = await self._bulk_margins(ids, margin_strategy)
+
+        batch = price_batch(
+            ids,
+            [self._total_cost(costs[package_id]) for package_id in ids],
+            [margins[package_id] for package_id in ids],
+            Decimal(str(tax_rate)),
+            self.config["round_decimals"],
+        )
+        batch.missing = missing
+
+        duration = (datetime.now() - start_time).total_seconds()
+        CALCULATION_LATENCY.labels(operation_type="bulk_quotes").observe(duration)
+        CALCULATION_OPERATIONS.labels(operation_type="bulk_quotes").inc()
+        return batch
+
+    async def _bulk_margins(
+        self, ids: List[str], margin_strategy: MarginStrategy
+    ) -> Dict[str, Decimal]:
+        """Margen por paquete según estrategia, con una llamada por lote."""
+        if margin_strategy == MarginStrategy.VARIABLE:
+            recommended = await self.memory.get_recommended_margins(ids)
+            margins = {
+                package_id: self._clamp_margin(recommended.get(package_id))
+                for package_id in ids
+            }
+        elif margin_strategy == MarginStrategy.DYNAMIC:
+            market_data = await self.memory.get_market_data(ids)
+            margins = {}
+            for package_id in ids:
+                data = market_data.get(package_id)
+                if not data or data["avg_margin"] is None:
+                    margins[package_id] = self._clamp_margin(None)
+                elif data.get("high_demand"):
+                    margins[package_id] = self._clamp_margin(data["avg_margin"] * 1.2)
+                else:
+                    margins[package_id] = self._clamp_margin(data["avg_margin"] * 0.9)
+        else:
+            margins = {package_id: self._clamp_margin(None) for package_id in ids}
+        return margins
+
+    def _clamp_margin(self, margin: Optional[float]) -> Decimal:
+        """Margen dentro de los límites (el por defecto si falta)."""
+        if margin is None:
+            margin = self.config["default_margin"]
+        margin = max(self.config["min_margin"], min(margin, self.config["max_margin"]))
+        return Decimal(str(margin))
+
+    @staticmethod
+    def _total_cost(costs: Dict[str, Any]) -> Decimal:
+        """Costo base más costos adicionales."""
+        additional = costs.get("additional_costs", {})
+        return Decimal(str(costs["base_cost"])) + sum(
+            (Decimal(str(value)) for value in additional.values()),
+            Decimal("0"),
+        )
+
     async def _calculate_base_components(
         self, packages: List[TravelPackage]
     ) -> List[PriceComponent]:
@@ -148,9 +237,18 @@ class BudgetCalculator:
         try:
             components = []
 
+            # Obtener costos actualizados en una sola llamada
+            costs_by_package = await self.memory.get_package_costs_bulk(
+                [package.id for package in packages]
+            )
+            missing = [
+                package.id for package in packages if package.id not in costs_by_package
+            ]
+            if missing:
+                raise ValueError(f"Paquetes sin costos: {', '.join(missing)}")
+
             for package in packages:
-                # Obtener costos actualizados
-                costs = await self.memory.get_package_costs(package.id)
+                costs = costs_by_package[package.id]
 
                 # Crear componente base
                 component = PriceComponent(
@@ -175,7 +273,7 @@ class BudgetCalculator:
     ) -> List[PriceComponent]:
         """Aplicar margen fijo a componentes."""
         try:
-            margin = self.config["default_margin"]
+            margin = Decimal(str(self.config["default_margin"]))
 
             for component in components:
                 # Aplicar margen fijo
@@ -198,15 +296,14 @@ class BudgetCalculator:
     ) -> List[PriceComponent]:
         """Aplicar margen variable según componente."""
         try:
-            for component in components:
-                # Obtener margen recomendado
-                recommended = await self.memory.get_recommended_margin(component.id)
+            # Obtener márgenes recomendados en una sola llamada
+            recommended_margins = await self.memory.get_recommended_margins(
+                [component.id for component in components]
+            )
 
-                # Validar límites
-                margin = max(
-                    self.config["min_margin"],
-                    min(recommended, self.config["max_margin"]),
-                )
+            for component in components:
+                # Validar límites (el por defecto si no hay recomendado)
+                margin = self._clamp_margin(recommended_margins.get(component.id))
 
                 # Aplicar margen
                 component.margin = margin
@@ -228,12 +325,18 @@ class BudgetCalculator:
     ) -> List[PriceComponent]:
         """Aplicar margen dinámico basado en mercado."""
         try:
+            # Obtener datos de mercado en una sola llamada
+            market_by_package = await self.memory.get_market_data(
+                [component.id for component in components]
+            )
+
             for component in components:
-                # Obtener datos de mercado
-                market_data = await self.memory.get_market_data(component.id)
+                market_data = market_by_package.get(component.id)
 
                 # Calcular margen dinámico
-                if market_data.get("high_demand"):
+                if not market_data or market_data["avg_margin"] is None:
+                    margin = self.config["default_margin"]
+                elif market_data.get("high_demand"):
                     margin = min(
                         market_data["avg_margin"] * 1.2, self.config["max_margin"]
                     )
@@ -243,8 +346,10 @@ class BudgetCalculator:
                     )
 
                 # Aplicar margen
-                component.margin = margin
-                component.price_before_tax = component.total_cost / (1 - margin)
+                component.margin = Decimal(str(margin))
+                component.price_before_tax = component.total_cost / (
+                    1 - component.margin
+                )
 
                 # Redondear
                 component.price_before_tax = round(
@@ -264,11 +369,11 @@ class BudgetCalculator:
         try:
             # Usar configuración por defecto si no se especifica
             if not tax_config:
-                tax_config = TaxConfig(rate=self.config["tax_rate"])
+                tax_config = TaxConfig(rate=Decimal(str(self.config["tax_rate"])))
 
             for component in components:
                 # Calcular impuestos
-                component.tax_rate = tax_config.rate
+                component.tax_rate = Decimal(str(tax_config.rate))
                 component.tax_amount = component.price_before_tax * component.tax_rate
 
                 # Calcular precio final
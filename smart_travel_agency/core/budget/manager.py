@@ -8,7 +8,7 @@ Este módulo implementa:
 4. Registro de decisiones
 """
 
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Tuple
 from decimal import Decimal
 from datetime import datetime
 import asyncio
@@ -17,6 +17,8 @@ from dataclasses import dataclass
 
 from prometheus_client import Counter, Histogram, Gauge
 
+from .registry import BudgetRegistry
+
 # Métricas
 BUDGET_OPERATIONS = Counter(
     "budget_operations_total", "Number of budget operations", ["operation_type"]
@@ -33,6 +35,27 @@ ACTIVE_OPTIMIZATIONS = Gauge(
     "active_optimizations_total", "Number of currently running optimization processes"
 )
 
+CANDIDATES_EVALUATED = Counter(
+    "optimization_candidates_evaluated_total",
+    "Candidate packages evaluated by the optimization beam search",
+)
+
+# Componentes que pueden reemplazarse por alternativas de proveedores
+SWAPPABLE_COMPONENTS = ("vuelo", "hotel", "actividad")
+
+# Reemplazos de un candidato: índice del componente -> alternativa
+Swaps = Dict[int, Dict[str, Any]]
+
+# Busca alternativas para varios componentes en una sola llamada
+AlternativeSource = Callable[
+    [List[Dict[str, Any]]], Awaitable[List[List[Dict[str, Any]]]]
+]
+
+# Evalúa candidatos en lote: precio de cada uno o None si no es válido
+CandidateEvaluator = Callable[
+    [Dict[str, Any], List[Swaps]], Awaitable[List[Optional[Decimal]]]
+]
+
 
 @dataclass
 class OptimizationResult:
@@ -46,6 +69,14 @@ class OptimizationResult:
     timestamp: datetime
 
 
+@dataclass
+class _Candidate:
+    """Solución parcial del beam search."""
+
+    price: Decimal
+    swaps: Swaps
+
+
 @dataclass
 class Budget:
     """Presupuesto con historial de optimización."""
@@ -68,10 +99,22 @@ class BudgetManager:
 
     def __init__(self):
         """Inicializar gestor."""
-        self.active_budgets: Dict[str, Budget] = {}
+        self.registry = BudgetRegistry(on_release=self._unwatch_items)
         self.logger = logging.getLogger(__name__)
         self.optimization_threshold = Decimal("1.0")  # 1% mínimo de mejora
 
+        # Motor de optimización
+        self.beam_width = 8  # Soluciones parciales retenidas por pasada
+        self.max_swaps_per_pass = 2  # Reemplazos nuevos por pasada
+        self.pass_time_budget = 2.0  # Segundos por pasada
+        self.alternative_source: Optional[AlternativeSource] = None
+        self.candidate_evaluator: CandidateEvaluator = self._evaluate_candidates
+
+        # Marca los ítems de proveedor de los presupuestos abiertos para
+        # refrescarlos con prioridad (watch_items/unwatch_items, p. ej.
+        # ProviderService)
+        self.item_watcher: Optional[Any] = None
+
     async def create_budget(
         self, customer_id: str, vendor_id: str, package: Dict[str, Any]
     ) -> str:
@@ -98,7 +141,8 @@ class BudgetManager:
             optimization_history=[],
         )
 
-        self.active_budgets[budget_id] = budget
+        self.registry.register(budget_id, budget)
+        self._watch_items(budget_id, budget)
         BUDGET_OPERATIONS.labels(operation_type="create").inc()
 
         self.logger.info(f"Created budget {budget_id} for customer {customer_id}")
@@ -114,7 +158,7 @@ class BudgetManager:
         Returns:
             Presupuesto o None si no existe
         """
-        return self.active_budgets.get(budget_id)
+        return self.registry.get(budget_id)
 
     async def optimize_budget(
         self, budget_id: str, max_passes: int = 3
@@ -129,7 +173,7 @@ class BudgetManager:
         Returns:
             Tuple con éxito y lista de resultados
         """
-        budget = self.active_budgets.get(budget_id)
+        budget = self.registry.get(budget_id)
         if not budget or budget.locked:
             return False, []
 
@@ -173,6 +217,7 @@ class BudgetManager:
                     current_price = new_price
                     budget.current_price = new_price
                     budget.base_package = optimized_data
+                    self._watch_items(budget.id, budget)
                     self.logger.info(
                         f"Found improvement of {improvement:.2f}% in pass {pass_num}"
                     )
@@ -191,11 +236,173 @@ class BudgetManager:
         self, package: Dict[str, Any], pass_number: int
     ) -> Dict[str, Any]:
         """
-        Implementar lógica específica de optimización aquí.
-        Esta es una versión básica que debe ser extendida.
+        Buscar reemplazos de vuelo, hotel o actividad que abaraten el paquete.
+
+        Beam search sobre los componentes: para cada uno se expanden las
+        mejores soluciones parciales con sus alternativas, se evalúan los
+        candidatos en lote y se retienen los `beam_width` más baratos. Cada
+        pasada aplica como máximo `max_swaps_per_pass` reemplazos nuevos y
+        corta al agotar `pass_time_budget`, devolviendo lo mejor encontrado.
+
+        Args:
+            package: Paquete con `precio`, `componentes` (dicts con `tipo`,
+                `precio` e `id`) y opcionalmente `alternativas` por id de
+                componente
+            pass_number: Número de pasada
+
+        Returns:
+            Paquete optimizado (copia)
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.pass_time_budget
+
+        components = package.get("componentes") or []
+        slots = [
+            index
+            for index, component in enumerate(components)
+            if component.get("tipo") in SWAPPABLE_COMPONENTS
+        ]
+        if not slots:
+            return package.copy()
+
+        alternatives = await self._fetch_alternatives(package, slots, deadline)
+
+        # Primero los componentes con mayor ahorro posible
+        def potential(slot: int) -> Decimal:
+            current = Decimal(str(components[slot].get("precio", 0)))
+            prices = [Decimal(str(alt.get("precio", 0))) for alt in alternatives[slot]]
+            return current - min(prices, default=current)
+
+        base_price = Decimal(str(package["precio"]))
+        beam = [_Candidate(price=base_price, swaps={})]
+        for slot in sorted(slots, key=potential, reverse=True):
+            if loop.time() >= deadline:
+                self.logger.info(
+                    f"Pass {pass_number}: time budget exhausted, keeping best so far"
+                )
+                break
+            if not alternatives[slot]:
+                continue
+
+            expansions = [
+                {**candidate.swaps, slot: alternative}
+                for candidate in beam
+                if len(candidate.swaps) < self.max_swaps_per_pass
+                for alternative in alternatives[slot]
+            ]
+            if not expansions:
+                break
+
+            prices = await self.candidate_evaluator(package, expansions)
+            CANDIDATES_EVALUATED.inc(len(expansions))
+            beam.extend(
+                _Candidate(price=price, swaps=swaps)
+                for swaps, price in zip(expansions, prices)
+                if price is not None
+            )
+            beam = sorted(beam, key=lambda c: c.price)[: self.beam_width]
+
+        best = beam[0]
+        if not best.swaps:
+            return package.copy()
+        return self._apply_swaps(package, best)
+
+    async def _fetch_alternatives(
+        self, package: Dict[str, Any], slots: List[int], deadline: float
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Alternativas por componente.
+
+        Usa las registradas en el paquete (p. ej. ofertas duplicadas de
+        otros proveedores) y, si hay `alternative_source`, las pide para
+        todos los componentes en una sola llamada acotada al deadline.
+        """
+        components = package["componentes"]
+        known = package.get("alternativas") or {}
+        found = {
+            slot: list(known.get(self._component_key(components[slot], slot), []))
+            for slot in slots
+        }
+
+        if self.alternative_source is not None:
+            remaining = deadline - asyncio.get_running_loop().time()
+            try:
+                extra = await asyncio.wait_for(
+                    self.alternative_source([components[slot] for slot in slots]),
+                    max(remaining, 0),
+                )
+                for slot, alternatives in zip(slots, extra):
+                    found[slot].extend(alternatives)
+            except asyncio.TimeoutError:
+                self.logger.warning("Alternative search exceeded the pass time budget")
+            except Exception as e:
+                self.logger.error(f"Error searching alternatives: {e}")
+
+        for slot in slots:
+            current = components[slot]
+            current_key = self._component_key(current, slot)
+            found[slot] = [
+                alternative
+                for alternative in found[slot]
+                if alternative.get("tipo", current.get("tipo")) == current.get("tipo")
+                and alternative.get("disponible", True)
+                and self._component_key(alternative, slot) != current_key
+            ]
+        return found
+
+    async def _evaluate_candidates(
+        self, package: Dict[str, Any], candidates: List[Swaps]
+    ) -> List[Optional[Decimal]]:
         """
-        # TODO: Implementar lógica real de optimización
-        return package.copy()
+        Evaluador por defecto: precio del paquete con los reemplazos.
+
+        Puede sustituirse (`candidate_evaluator`) por uno que considere
+        descuentos combinados o validaciones entre componentes.
+        """
+        components = package["componentes"]
+        base_price = Decimal(str(package["precio"]))
+        prices = []
+        for swaps in candidates:
+            price = base_price
+            for slot, alternative in swaps.items():
+                price += Decimal(str(alternative.get("precio", 0))) - Decimal(
+                    str(components[slot].get("precio", 0))
+                )
+            prices.append(price)
+        return prices
+
+    def _apply_swaps(self, package: Dict[str, Any], best: _Candidate) -> Dict[str, Any]:
+        """Paquete con los reemplazos; los componentes salientes quedan
+        como alternativas."""
+        optimized = package.copy()
+        components = list(package["componentes"])
+        alternatives = {
+            key: list(values)
+            for key, values in (package.get("alternativas") or {}).items()
+        }
+
+        for slot, replacement in best.swaps.items():
+            previous = components[slot]
+            key = self._component_key(previous, slot)
+            replacement_key = self._component_key(replacement, slot)
+            pool = [
+                alt
+                for alt in alternatives.pop(key, [])
+                if self._component_key(alt, slot) != replacement_key
+            ]
+            pool.append(previous)
+            components[slot] = replacement
+            alternatives[replacement_key] = pool
+
+        optimized["componentes"] = components
+        optimized["alternativas"] = alternatives
+        optimized["precio"] = best.price
+        return optimized
+
+    @staticmethod
+    def _component_key(component: Dict[str, Any], slot: int) -> str:
+        """Identificador de un componente."""
+        return str(component.get("id", slot))
 
     def _get_changes(
         self, old_data: Dict[str, Any], new_data: Dict[str, Any]
@@ -208,7 +415,17 @@ class BudgetManager:
                 f"Cambio de precio: {old_data['precio']} -> {new_data['precio']}"
             )
 
-        # Agregar más comparaciones según sea necesario
+        old_components = old_data.get("componentes") or []
+        new_components = new_data.get("componentes") or []
+        for slot, (old, new) in enumerate(zip(old_components, new_components)):
+            if self._component_key(old, slot) != self._component_key(new, slot):
+                changes.append(
+                    f"Cambio de {old.get('tipo', 'componente')}: "
+                    f"{old.get('nombre', self._component_key(old, slot))} "
+                    f"({old.get('precio')}) -> "
+                    f"{new.get('nombre', self._component_key(new, slot))} "
+                    f"({new.get('precio')})"
+                )
 
         return changes
 
@@ -222,7 +439,7 @@ class BudgetManager:
         Returns:
             True si se bloqueó correctamente
         """
-        budget = self.active_budgets.get(budget_id)
+        budget = self.registry.get(budget_id)
         if not budget:
             return False
 
@@ -232,7 +449,7 @@ class BudgetManager:
 
     async def unlock_budget(self, budget_id: str) -> bool:
         """Desbloquear presupuesto."""
-        budget = self.active_budgets.get(budget_id)
+        budget = self.registry.get(budget_id)
         if not budget:
             return False
 
@@ -240,13 +457,87 @@ class BudgetManager:
         BUDGET_OPERATIONS.labels(operation_type="unlock").inc()
         return True
 
+    async def list_budgets(
+        self,
+        vendor_id: Optional[str] = None,
+        customer_id: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Budget]:
+        """
+        Listar presupuestos por vendedor, cliente y/o estado.
+
+        Args:
+            vendor_id: ID del vendedor
+            customer_id: ID del cliente
+            status: Estado
+
+        Returns:
+            Presupuestos que cumplen los filtros
+        """
+        return self.registry.find(
+            vendor_id=vendor_id, customer_id=customer_id, status=status
+        )
+
+    async def set_status(self, budget_id: str, status: str) -> bool:
+        """Cambiar el estado de un presupuesto manteniendo los índices."""
+        budget = self.registry.get(budget_id)
+        if not budget:
+            return False
+
+        budget.status = status
+        self.registry.reindex(budget_id)
+        if status == "active":
+            self._watch_items(budget_id, budget)
+        else:
+            self._unwatch_items(budget_id)
+        return True
+
+    def _watch_items(self, budget_id: str, budget: Any) -> None:
+        """Marcar los componentes del presupuesto (con `provider_id` e `id`)."""
+        if self.item_watcher is None:
+            return
+        items = [
+            (str(component["provider_id"]), str(component["id"]))
+            for component in self._components(budget)
+            if component.get("provider_id") and component.get("id") is not None
+        ]
+        # Reemplaza los ítems anteriores (p. ej. tras una optimización)
+        self.item_watcher.unwatch_items(budget_id)
+        self.item_watcher.watch_items(budget_id, items)
+
+    @staticmethod
+    def _components(budget: Any) -> List[Dict[str, Any]]:
+        """Componentes de un presupuesto del gestor o de `models.Budget`.
+
+        El registro guarda ambos tipos: los del gestor traen los
+        componentes en `base_package`; los de `models.Budget`, en la
+        metadata de cada item.
+        """
+        package = getattr(budget, "base_package", None)
+        if package is not None:
+            return package.get("componentes") or []
+        return [item.metadata for item in getattr(budget, "items", None) or []]
+
+    def _unwatch_items(self, budget_id: str) -> None:
+        """Liberar los ítems de un presupuesto cerrado o liberado."""
+        if self.item_watcher is not None:
+            self.item_watcher.unwatch_items(budget_id)
+
     def register_budget(self, budget: Budget) -> None:
-        """Registrar un presupuesto.
+        """Registrar un presupuesto confirmado.
+
+        Args:
+            budget: Presupuesto a registrar
+        """
+        self.registry.register(str(budget.budget_id), budget)
+
+    def register_preview(self, budget: Budget) -> None:
+        """Registrar un borrador sin retenerlo (referencia débil).
 
         Args:
             budget: Presupuesto a registrar
         """
-        self.active_budgets[str(budget.budget_id)] = budget
+        self.registry.register_preview(str(budget.budget_id), budget)
 
 # Instancia global del gestor
 budget_manager = BudgetManager()
@@ -3,24 +3,100 @@ Módulo de modelos para el sistema de presupuestos.
 
 Este módulo implementa:
 1. Modelo de presupuesto y sus componentes
-2. Versionado de presupuestos
+2. Versionado de presupuestos con estructura compartida
 3. Reconstrucción de presupuestos
+4. Totales incrementales (monto, costo, margen y subtotales)
 """
 
+from copy import deepcopy
 from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Mapping, Optional, Any, Tuple
 from uuid import UUID, uuid4
+import weakref
 
 from ..schemas import TravelPackage
 from .manager import get_budget_manager
 from .reconstruction import get_reconstruction_manager, ReconstructionStrategy
 
 
+class FrozenMetadata(dict):
+    """Copia de solo lectura de la metadata de un item.
+
+    A diferencia de MappingProxyType se puede copiar y serializar con
+    pickle (y por lo tanto con copy.deepcopy).
+    """
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("La metadata de una versión es de solo lectura")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (type(self), (dict(self),))
+
+    def __copy__(self) -> "FrozenMetadata":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "FrozenMetadata":
+        return type(self)(deepcopy(dict(self), memo))
+
+
+@dataclass(frozen=True)
+class ItemRecord:
+    """Estado inmutable de un item dentro de una versión.
+
+    Las versiones comparten los registros de los items que no cambiaron,
+    así que cada versión solo agrega los registros que modifica.
+    """
+
+    item_id: UUID
+    description: str
+    amount: Decimal
+    quantity: int
+    currency: str
+    metadata: Mapping[str, Any]
+
+    @classmethod
+    def from_item(cls, item: "BudgetItem") -> "ItemRecord":
+        """Congelar el estado actual de un item."""
+        return cls(
+            item_id=item.item_id,
+            description=item.description,
+            amount=item.amount,
+            quantity=item.quantity,
+            currency=item.currency,
+            metadata=FrozenMetadata(item.metadata),
+        )
+
+    def to_item(self, version_id: Optional[UUID] = None) -> "BudgetItem":
+        """Crear un item editable con este estado."""
+        return BudgetItem(
+            description=self.description,
+            amount=self.amount,
+            quantity=self.quantity,
+            currency=self.currency,
+            metadata=dict(self.metadata),
+            item_id=self.item_id,
+            version_id=version_id,
+        )
+
+
+# Estado completo de una versión: item_id -> registro
+ItemState = Dict[UUID, ItemRecord]
+
+
 @dataclass
 class BudgetVersion:
-    """Versión de un presupuesto."""
+    """Versión de un presupuesto.
+
+    Guarda solo la diferencia con su versión padre (`changed`/`removed`);
+    cada `Budget.checkpoint_interval` versiones guarda además el estado
+    completo (`checkpoint`) para acotar la reconstrucción.
+    """
 
     version_id: UUID = field(default_factory=uuid4)
     timestamp: datetime = field(default_factory=datetime.now)
@@ -28,6 +104,11 @@ class BudgetVersion:
     reason: str = ""
     user_id: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    parent_id: Optional[UUID] = None
+    depth: int = 0
+    changed: ItemState = field(default_factory=dict, repr=False)
+    removed: Tuple[UUID, ...] = ()
+    checkpoint: Optional[ItemState] = field(default=None, repr=False)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convertir a diccionario.
@@ -42,9 +123,77 @@ class BudgetVersion:
             "reason": self.reason,
             "user_id": self.user_id,
             "metadata": self.metadata,
+            "parent_id": str(self.parent_id) if self.parent_id else None,
+            "changed_items": [str(item_id) for item_id in self.changed],
+            "removed_items": [str(item_id) for item_id in self.removed],
+            "checkpoint": self.checkpoint is not None,
         }
 
 
+class ItemMetadata(dict):
+    """Metadata de un item que informa sus cambios a los totales.
+
+    Puede compartirse entre items; cada uno se registra como dueño. Al
+    copiarse o serializarse se convierte en un dict común (el item lo
+    vuelve a envolver).
+    """
+
+    def __init__(self, data: Any = ()):
+        super().__init__(data)
+        self._items: List["weakref.ref[BudgetItem]"] = []
+
+    def _attach(self, item: "BudgetItem") -> None:
+        if not any(ref() is item for ref in self._items):
+            self._items.append(weakref.ref(item))
+
+    def _changed(self) -> None:
+        for ref in list(self._items):
+            item = ref()
+            if item is None:
+                self._items.remove(ref)
+            else:
+                item._refresh_totals()
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key: Any) -> None:
+        super().__delitem__(key)
+        self._changed()
+
+    def __ior__(self, other: Any) -> "ItemMetadata":
+        self.update(other)
+        return self
+
+    def clear(self) -> None:
+        super().clear()
+        self._changed()
+
+    def pop(self, *args: Any) -> Any:
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self) -> Tuple[Any, Any]:
+        pair = super().popitem()
+        self._changed()
+        return pair
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (dict, (dict(self),))
+
+
 @dataclass
 class BudgetItem:
     """Item de presupuesto."""
@@ -73,11 +222,233 @@ class BudgetItem:
             "version_id": str(self.version_id) if self.version_id else None,
         }
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "metadata":
+            if not isinstance(value, ItemMetadata):
+                value = ItemMetadata(value)
+            value._attach(self)
+        object.__setattr__(self, name, value)
+        if name in _TRACKED_FIELDS:
+            self._refresh_totals()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Los totales a los que aporta no viajan con la copia
+        state = dict(self.__dict__)
+        state.pop("_owners", None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.metadata = self.metadata
+
+    def _refresh_totals(self) -> None:
+        for totals in self.__dict__.get("_owners", ()):
+            totals.refresh(self)
+
     @property
     def total_amount(self) -> Decimal:
         """Calcula el monto total del item."""
         return self.amount * self.quantity
 
+    @property
+    def total_cost(self) -> Decimal:
+        """Costo total del item (`metadata["cost"]` unitario o el monto)."""
+        cost = self.metadata.get("cost")
+        unit_cost = self.amount if cost is None else Decimal(str(cost))
+        return unit_cost * self.quantity
+
+    def _contribution(self) -> Tuple[Decimal, Decimal, str, str, bool]:
+        """Aporte del item a los totales del presupuesto."""
+        return (
+            self.total_amount,
+            self.total_cost,
+            self.metadata.get("type", "other"),
+            self.currency,
+            self.metadata.get("cost") is not None,
+        )
+
+
+# Campos de BudgetItem que afectan los totales
+_TRACKED_FIELDS = frozenset({"amount", "quantity", "currency", "metadata"})
+
+
+class BudgetTotals:
+    """Totales de un presupuesto mantenidos por diferencias.
+
+    Cada alta, baja o edición de un item (incluida su metadata) suma y
+    resta solo su aporte, así que leer los totales es O(1).
+    """
+
+    def __init__(self, items: Iterable[BudgetItem] = ()):
+        self._reset()
+        for item in items:
+            self.add(item)
+
+    @property
+    def costs_known(self) -> bool:
+        """Si todos los items informan su costo (`metadata["cost"]`)."""
+        return self.uncosted == 0
+
+    @property
+    def margin(self) -> Decimal:
+        """Margen absoluto."""
+        return self.total - self.cost
+
+    @property
+    def margin_ratio(self) -> Decimal:
+        """Margen sobre el monto total."""
+        if not self.total:
+            return Decimal("0")
+        return self.margin / self.total
+
+    def add(self, item: BudgetItem) -> None:
+        """Sumar un item."""
+        entry = self._contributions.get(id(item))
+        if entry is None:
+            entry = self._contributions[id(item)] = [item._contribution(), 0]
+            owners = item.__dict__.setdefault("_owners", [])
+            owners.append(self)
+        entry[1] += 1
+        self._apply(entry[0], 1)
+
+    def remove(self, item: BudgetItem) -> None:
+        """Restar un item."""
+        entry = self._contributions.get(id(item))
+        if entry is None:
+            return
+        self._apply(entry[0], -1)
+        entry[1] -= 1
+        if not entry[1]:
+            del self._contributions[id(item)]
+            owners = item.__dict__.get("_owners", [])
+            if self in owners:
+                owners.remove(self)
+        if not self._contributions:
+            self._reset()
+
+    def refresh(self, item: BudgetItem) -> None:
+        """Actualizar el aporte de un item editado."""
+        entry = self._contributions.get(id(item))
+        if entry is None:
+            return
+        contribution = item._contribution()
+        if contribution == entry[0]:
+            return
+        self._apply(entry[0], -entry[1])
+        entry[0] = contribution
+        self._apply(contribution, entry[1])
+
+    def clear(self, items: Iterable[BudgetItem]) -> None:
+        """Soltar todos los items."""
+        for item in items:
+            owners = item.__dict__.get("_owners", [])
+            if self in owners:
+                owners.remove(self)
+        self._reset()
+
+    def _reset(self) -> None:
+        self.total = Decimal("0")
+        self.cost = Decimal("0")
+        self.by_type: Dict[str, Decimal] = {}
+        self.by_currency: Dict[str, Decimal] = {}
+        self.uncosted = 0  # items sin costo informado
+        # id(item) -> [aporte registrado, veces que aparece]
+        self._contributions: Dict[int, List[Any]] = {}
+
+    def _apply(
+        self, contribution: Tuple[Decimal, Decimal, str, str, bool], sign: int
+    ) -> None:
+        amount, cost, item_type, currency, costed = contribution
+        self.total += sign * amount
+        self.cost += sign * cost
+        if not costed:
+            self.uncosted += sign
+        self.by_type[item_type] = (
+            self.by_type.get(item_type, Decimal("0")) + sign * amount
+        )
+        self.by_currency[currency] = (
+            self.by_currency.get(currency, Decimal("0")) + sign * amount
+        )
+
+
+class ItemList(list):
+    """Lista de items que informa altas y bajas a los totales."""
+
+    def __init__(
+        self, items: Iterable[BudgetItem] = (), totals: Optional[BudgetTotals] = None
+    ):
+        super().__init__(items)
+        self._totals = totals
+        if totals is not None:
+            for item in self:
+                totals.add(item)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Las copias no quedan enlazadas a los totales del original
+        return (ItemList, (list(self),))
+
+    def detach(self) -> None:
+        """Dejar de informar a los totales."""
+        if self._totals is not None:
+            self._totals.clear(self)
+            self._totals = None
+
+    def _added(self, items: Iterable[BudgetItem]) -> None:
+        if self._totals is not None:
+            for item in items:
+                self._totals.add(item)
+
+    def _removed(self, items: Iterable[BudgetItem]) -> None:
+        if self._totals is not None:
+            for item in items:
+                self._totals.remove(item)
+
+    def append(self, item: BudgetItem) -> None:
+        super().append(item)
+        self._added((item,))
+
+    def extend(self, items: Iterable[BudgetItem]) -> None:
+        items = list(items)
+        super().extend(items)
+        self._added(items)
+
+    def __iadd__(self, items: Iterable[BudgetItem]) -> "ItemList":
+        self.extend(items)
+        return self
+
+    def insert(self, index: int, item: BudgetItem) -> None:
+        super().insert(index, item)
+        self._added((item,))
+
+    def remove(self, item: BudgetItem) -> None:
+        index = self.index(item)
+        removed = self[index]
+        super().__delitem__(index)
+        self._removed((removed,))
+
+    def pop(self, index: int = -1) -> BudgetItem:
+        item = super().pop(index)
+        self._removed((item,))
+        return item
+
+    def clear(self) -> None:
+        items = list(self)
+        super().clear()
+        self._removed(items)
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        old = self[index]
+        old = old if isinstance(index, slice) else [old]
+        new = list(value) if isinstance(index, slice) else [value]
+        super().__setitem__(index, new if isinstance(index, slice) else value)
+        self._removed(old)
+        self._added(new)
+
+    def __delitem__(self, index: Any) -> None:
+        old = self[index]
+        super().__delitem__(index)
+        self._removed(old if isinstance(index, slice) else [old])
+
 
 @dataclass
 class Budget:
@@ -92,33 +463,214 @@ class Budget:
     versions: List[BudgetVersion] = field(default_factory=list)
     current_version: Optional[UUID] = None
 
+    # Cada cuántas versiones se guarda el estado completo
+    checkpoint_interval = 16
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "items":
+            previous = self.__dict__.get("items")
+            if isinstance(previous, ItemList):
+                previous.detach()
+            totals = self.__dict__.get("_totals")
+            if totals is None:
+                totals = BudgetTotals()
+                object.__setattr__(self, "_totals", totals)
+            value = ItemList(value, totals)
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Los totales se reconstruyen a partir de los items al restaurar
+        state = dict(self.__dict__)
+        state.pop("_totals", None)
+        state["items"] = list(state["items"])
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        state = dict(state)
+        items = state.pop("items")
+        self.__dict__.update(state)
+        self.items = items
+
     def __post_init__(self):
         """Inicializar presupuesto."""
+        self._version_index: Dict[UUID, BudgetVersion] = {
+            version.version_id: version for version in self.versions
+        }
+        self._head_state: ItemState = (
+            self.state_at(self.current_version)
+            if self.current_version in self._version_index
+            else {}
+        )
+
         # Si no hay versión inicial, crearla
         if not self.versions:
-            version = BudgetVersion(
+            self._record_version(
                 changes={
                     "type": "creation",
                     "source": "direct",
                 },
                 reason="Creación directa de presupuesto",
-                metadata={"items": [item.to_dict() for item in self.items]},
             )
-            self.versions.append(version)
-            self.current_version = version.version_id
 
-            # Asignar version_id a los items
-            for item in self.items:
-                item.version_id = version.version_id
+        # Borrador: visible en el gestor solo mientras esté en uso; se
+        # registra de forma permanente al confirmar una versión
+        get_budget_manager().register_preview(self)
+
+    def commit_version(
+        self,
+        changes: Dict[str, Any],
+        reason: str,
+        user_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        register: bool = True,
+    ) -> BudgetVersion:
+        """Registrar el estado actual de los items como nueva versión.
+
+        Solo se guardan los items que cambiaron respecto de la versión
+        actual; los demás registros se comparten. Confirma el presupuesto
+        en el gestor.
+
+        Args:
+            changes: Cambios aplicados
+            reason: Razón del cambio
+            user_id: ID del usuario que realiza el cambio
+            metadata: Metadata de la versión
+            register: Si se confirma el presupuesto en el gestor (False
+                para versiones internas, p. ej. snapshots de sesión)
+
+        Returns:
+            Versión creada
+        """
+        version = self._record_version(changes, reason, user_id, metadata)
+        if register:
+            get_budget_manager().register_budget(self)
+        return version
 
-        # Registrar en el gestor de presupuestos
-        manager = get_budget_manager()
-        manager.register_budget(self)
+    def _record_version(
+        self,
+        changes: Dict[str, Any],
+        reason: str,
+        user_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> BudgetVersion:
+        """Crear la versión sin registrar el presupuesto."""
+        parent = self._version_index.get(self.current_version)
+        state: ItemState = {}
+        changed: ItemState = {}
+        for item in self.items:
+            record = ItemRecord.from_item(item)
+            previous = self._head_state.get(item.item_id)
+            if previous is not None and previous == record:
+                record = previous
+            else:
+                changed[item.item_id] = record
+            state[item.item_id] = record
+
+        depth = parent.depth + 1 if parent else 0
+        version = BudgetVersion(
+            changes=changes,
+            reason=reason,
+            user_id=user_id,
+            metadata=metadata or {},
+            parent_id=parent.version_id if parent else None,
+            depth=depth,
+            changed=changed,
+            removed=tuple(
+                item_id for item_id in self._head_state if item_id not in state
+            ),
+            checkpoint=state if depth % self.checkpoint_interval == 0 else None,
+        )
+        self.versions.append(version)
+        self._version_index[version.version_id] = version
+        self._set_head(version, state)
+        return version
+
+    def state_at(self, version_id: UUID) -> ItemState:
+        """Estado de los items en una versión.
+
+        Se parte del checkpoint más cercano y se aplican las diferencias,
+        como máximo `checkpoint_interval` versiones.
+        """
+        chain = []
+        version = self._version_index.get(version_id)
+        if version is None:
+            raise KeyError(f"Versión {version_id} no encontrada")
+        while version is not None and version.checkpoint is None:
+            chain.append(version)
+            version = self._version_index.get(version.parent_id)
+
+        state: ItemState = dict(version.checkpoint) if version else {}
+        for version in reversed(chain):
+            for item_id in version.removed:
+                state.pop(item_id, None)
+            state.update(version.changed)
+        return state
+
+    def diff(
+        self, from_version: UUID, to_version: Optional[UUID] = None
+    ) -> Dict[str, List[Any]]:
+        """Diferencias de items entre dos versiones.
+
+        Args:
+            from_version: Versión de origen
+            to_version: Versión de destino (por defecto la actual)
+
+        Returns:
+            Items agregados, eliminados y modificados (antes, después)
+        """
+        before = self.state_at(from_version)
+        after = self.state_at(to_version or self.current_version)
+        return {
+            "added": [after[item_id] for item_id in after if item_id not in before],
+            "removed": [before[item_id] for item_id in before if item_id not in after],
+            "modified": [
+                (before[item_id], record)
+                for item_id, record in after.items()
+                if item_id in before
+                and before[item_id] is not record
+                and before[item_id] != record
+            ],
+        }
+
+    def restore(self, version_id: UUID) -> None:
+        """Volver los items al estado de una versión.
+
+        La versión restaurada pasa a ser la actual; la próxima versión
+        registrada cuelga de ella y el historial no se pierde.
+        """
+        state = self.state_at(version_id)
+        self.items = [record.to_item(version_id) for record in state.values()]
+        self._set_head(self._version_index[version_id], state)
+        self.last_modified = datetime.now()
+
+    def undo(self) -> Optional[BudgetVersion]:
+        """Volver a la versión padre de la actual.
+
+        Returns:
+            Versión restaurada o None si no hay versión anterior
+        """
+        current = self._version_index.get(self.current_version)
+        if current is None or current.parent_id is None:
+            return None
+        self.restore(current.parent_id)
+        return self._version_index[current.parent_id]
+
+    def _set_head(self, version: BudgetVersion, state: ItemState) -> None:
+        """Marcar una versión como actual."""
+        self._head_state = state
+        self.current_version = version.version_id
+        for item in self.items:
+            item.version_id = version.version_id
+
+    @property
+    def totals(self) -> BudgetTotals:
+        """Totales incrementales: monto, costo, margen y subtotales."""
+        return self._totals
 
     @property
     def total_amount(self) -> Decimal:
-        """Calcula el monto total del presupuesto."""
-        return sum(item.total_amount for item in self.items)
+        """Monto total del presupuesto (O(1))."""
+        return self._totals.total
 
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el presupuesto a diccionario."""
@@ -130,6 +682,15 @@ class Budget:
             "created_at": self.created_at.isoformat(),
             "last_modified": self.last_modified.isoformat(),
             "total_amount": float(self.total_amount),
+            "total_cost": float(self._totals.cost),
+            "subtotals_by_type": {
+                item_type: float(amount)
+                for item_type, amount in self._totals.by_type.items()
+            },
+            "subtotals_by_currency": {
+                currency: float(amount)
+                for currency, amount in self._totals.by_currency.items()
+            },
             "versions": [version.to_dict() for version in self.versions],
             "current_version": str(self.current_version) if self.current_version else None,
         }
@@ -162,7 +723,7 @@ class Budget:
             self.metadata.update(reconstructed.metadata)
 
         # Registrar nueva versión
-        version = BudgetVersion(
+        self.commit_version(
             changes=changes,
             reason=reason,
             user_id=user_id,
@@ -171,12 +732,6 @@ class Budget:
                 "strategy": strategy,
             },
         )
-        self.versions.append(version)
-        self.current_version = version.version_id
-
-        # Actualizar items con nueva versión
-        for item in self.items:
-            item.version_id = version.version_id
 
         # Actualizar última modificación
         self.last_modified = datetime.now()
@@ -6,6 +6,7 @@ Este módulo implementa:
 2. Balanceo de objetivos comerciales
 3. Adaptación a condiciones de mercado
 4. Mantenimiento de estabilidad
+5. Modo solver: selección óptima de componentes bajo restricciones
 """
 
 from typing import Dict, Any, Optional, List
@@ -24,6 +25,13 @@ from ..schemas import (
 )
 from ..metrics import get_metrics_collector
 from ..memory import get_memory_manager
+from .solver import (
+    BudgetSolver,
+    ComponentOption,
+    SolverConstraints,
+    SolverResult,
+    build_constraints,
+)
 
 # Métricas
 OPTIMIZATION_OPERATIONS = Counter(
@@ -53,7 +61,7 @@ class BudgetOptimizer:
         """Inicializar optimizador."""
         self.logger = logging.getLogger(__name__)
         self.memory = get_memory_manager()
-        self.metrics = get_metrics_collector()
+        self.metrics = get_metrics_collector("budget_optimizer")
 
         # Configuración de optimización
         self.config = {
@@ -62,6 +70,8 @@ class BudgetOptimizer:
             "stability_threshold": 0.8,  # 80% de estabilidad mínima
             "price_flexibility": 0.15,  # 15% de flexibilidad en precios
             "margin_flexibility": 0.1,  # 10% de flexibilidad en márgenes
+            "solver_time_limit": 1.0,  # Segundos máximos del modo solver
+            "solver_max_nodes": 200_000,  # Nodos máximos del modo solver
         }
 
         # Objetivos de optimización
@@ -158,6 +168,50 @@ class BudgetOptimizer:
             self.logger.error(f"Error en optimización: {e}")
             return OptimizationResult(success=False, error=str(e))
 
+    async def solve_budget(
+        self,
+        options: List[ComponentOption],
+        goal: OptimizationGoal,
+        constraints: Optional[List[OptimizationConstraint]] = None,
+    ) -> Optional[SolverResult]:
+        """
+        Elegir la mejor combinación de componentes (modo solver).
+
+        A diferencia de la optimización iterativa, explora las
+        combinaciones de opciones con branch-and-bound y devuelve la
+        óptima bajo las restricciones.
+
+        Args:
+            options: Opciones por componente (vuelos, hoteles, actividades)
+            goal: Objetivo de optimización
+            constraints: Restricciones (precio máximo, márgenes,
+                componentes opcionales, preferencias de vendedor); los
+                componentes de `options` son requeridos salvo que se
+                marquen como opcionales
+
+        Returns:
+            Selección óptima o None si no hay solución factible
+        """
+        start_time = datetime.now()
+        solver = BudgetSolver(
+            max_nodes=self.config["solver_max_nodes"],
+            time_limit=self.config["solver_time_limit"],
+        )
+        result = solver.solve(
+            options, getattr(goal, "value", goal), self._solver_constraints(constraints)
+        )
+
+        duration = (datetime.now() - start_time).total_seconds()
+        OPTIMIZATION_LATENCY.labels(operation_type="solver").observe(duration)
+        OPTIMIZATION_OPERATIONS.labels(operation_type="solver").inc()
+        return result
+
+    def _solver_constraints(
+        self, constraints: Optional[List[OptimizationConstraint]]
+    ) -> SolverConstraints:
+        """Traducir restricciones al formato del solver."""
+        return build_constraints(constraints)
+
     async def _optimize_for_margin(
         self, budget: Budget, constraints: Optional[List[OptimizationConstraint]]
     ) -> Budget:
@@ -176,13 +230,13 @@ class BudgetOptimizer:
 
                     # Calcular margen máximo posible
                     max_price = pkg_data["max_market_price"]
-                    current_cost = package.cost
+                    current_cost = Decimal(str(package.cost))
+                    flexibility = Decimal(str(self.config["margin_flexibility"]))
 
                     # Ajustar precio manteniendo competitividad
-                    new_price = min(
-                        max_price,
-                        current_cost * (1 + self.config["margin_flexibility"]),
-                    )
+                    new_price = current_cost * (1 + flexibility)
+                    if max_price is not None:
+                        new_price = min(max_price, new_price)
 
                     package.price = new_price
 
@@ -207,15 +261,16 @@ class BudgetOptimizer:
             for package in optimized.packages:
                 if package.id in market_prices:
                     market_price = market_prices[package.id]
+                    flexibility = Decimal(str(self.config["price_flexibility"]))
 
                     # Ajustar precio para ser competitivo
                     new_price = min(
-                        package.price,
-                        market_price * (1 + self.config["price_flexibility"]),
+                        Decimal(str(package.price)),
+                        market_price * (1 + flexibility),
                     )
 
-                    # Verificar margen mínimo
-                    min_price = package.cost * (1.1)  # 10% margen mínimo
+                    # Verificar margen mínimo (10%)
+                    min_price = Decimal(str(package.cost)) * Decimal("1.1")
                     package.price = max(new_price, min_price)
 
             return optimized
@@ -244,21 +299,20 @@ class BudgetOptimizer:
                 if package.id in quality_data and package.id in market_data:
                     quality_score = quality_data[package.id]["score"]
                     market_price = market_data[package.id]["avg_price"]
+                    if market_price is None:
+                        continue
+                    flexibility = Decimal(str(self.config["price_flexibility"]))
 
                     # Ajustar precio según calidad
                     if quality_score > 0.8:  # Alta calidad
-                        new_price = market_price * (
-                            1 + self.config["price_flexibility"]
-                        )
+                        new_price = market_price * (1 + flexibility)
                     elif quality_score < 0.4:  # Baja calidad
-                        new_price = market_price * (
-                            1 - self.config["price_flexibility"]
-                        )
+                        new_price = market_price * (1 - flexibility)
                     else:  # Calidad media
                         new_price = market_price
 
-                    # Verificar margen mínimo
-                    min_price = package.cost * (1.1)  # 10% margen mínimo
+                    # Verificar margen mínimo (10%)
+                    min_price = Decimal(str(package.cost)) * Decimal("1.1")
                     package.price = max(new_price, min_price)
 
             return optimized
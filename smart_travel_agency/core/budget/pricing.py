@@ -0,0 +1,205 @@
+"""
+Cálculo de precios en lote.
+
+Este módulo implementa:
+1. Aplicación de margen, impuestos y redondeo sobre arreglos
+2. Aritmética entera en unidades mínimas (exacta, sin floats)
+3. Redondeo bancario (ROUND_HALF_EVEN), igual que round() sobre Decimal
+4. Resultados Decimal exactos y camino Decimal de respaldo
+"""
+
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_EVEN, Decimal, localcontext
+from typing import Dict, List, Optional, Sequence
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Decimales con que se representan costos y tasas en enteros
+COST_DECIMALS = 4
+RATE_DECIMALS = 6
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+@dataclass
+class PricingBatch:
+    """Precios de un lote de paquetes."""
+
+    ids: List[str]
+    cost: List[Decimal]
+    margin: List[Decimal]
+    price_before_tax: List[Decimal]
+    tax_amount: List[Decimal]
+    final_price: List[Decimal]
+    totals: Dict[str, Decimal] = field(default_factory=dict)
+    vectorized: bool = True
+    missing: List[str] = field(default_factory=list)  # IDs sin costos
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def quote(self, index: int) -> Dict[str, Decimal]:
+        """Cotización de un paquete."""
+        return {
+            "cost": self.cost[index],
+            "margin": self.margin[index],
+            "price_before_tax": self.price_before_tax[index],
+            "tax_amount": self.tax_amount[index],
+            "final_price": self.final_price[index],
+        }
+
+
+def price_batch(
+    ids: Sequence[str],
+    costs: Sequence[Decimal],
+    margins: Sequence[Decimal],
+    tax_rate: Decimal,
+    decimals: int = 2,
+) -> PricingBatch:
+    """
+    Aplicar margen e impuestos a un lote.
+
+    precio = costo / (1 - margen), impuesto = precio * tasa y
+    final = precio + impuesto, redondeados a `decimals` con redondeo
+    bancario. Si algún valor no entra en enteros de 64 bits (o tiene más
+    decimales de los representables) se usa el camino Decimal.
+
+    Args:
+        ids: IDs de los paquetes
+        costs: Costos totales
+        margins: Margen por paquete (fracción del precio)
+        tax_rate: Tasa de impuesto
+        decimals: Decimales del resultado
+
+    Returns:
+        Precios exactos del lote
+    """
+    costs = [Decimal(str(c)) for c in costs]
+    margins = [Decimal(str(m)) for m in margins]
+    tax_rate = Decimal(str(tax_rate))
+
+    arrays = _to_units(costs, margins, tax_rate, decimals)
+    if arrays is None:
+        logger.debug("Lote fuera de rango para enteros; usando Decimal")
+        return _price_decimal(list(ids), costs, margins, tax_rate, decimals)
+
+    cost_units, margin_units, rate_units = arrays
+    rate_scale = 10 ** RATE_DECIMALS
+
+    # precio * 10^d = costo * 10^(d - COST_DECIMALS) * 10^RATE / (10^RATE - margen)
+    scale = 10 ** (decimals - COST_DECIMALS + RATE_DECIMALS)
+    price = _div_half_even(cost_units * scale, rate_scale - margin_units)
+    tax = _div_half_even(price * rate_units, np.int64(rate_scale))
+    final = price + tax
+
+    return PricingBatch(
+        ids=list(ids),
+        cost=costs,
+        margin=margins,
+        price_before_tax=_to_decimals(price, decimals),
+        tax_amount=_to_decimals(tax, decimals),
+        final_price=_to_decimals(final, decimals),
+        totals={
+            "total_cost": sum(costs, Decimal("0")).quantize(
+                Decimal(1).scaleb(-decimals), rounding=ROUND_HALF_EVEN
+            ),
+            "total_before_tax": Decimal(int(price.sum())).scaleb(-decimals),
+            "total_tax": Decimal(int(tax.sum())).scaleb(-decimals),
+            "final_total": Decimal(int(final.sum())).scaleb(-decimals),
+        },
+    )
+
+
+def _to_units(
+    costs: List[Decimal], margins: List[Decimal], tax_rate: Decimal, decimals: int
+) -> Optional[tuple]:
+    """Convertir a enteros exactos, o None si no es posible."""
+    if decimals > COST_DECIMALS + RATE_DECIMALS:
+        return None
+    try:
+        cost_units = [_exact_int(c, COST_DECIMALS) for c in costs]
+        margin_units = [_exact_int(m, RATE_DECIMALS) for m in margins]
+        rate_units = _exact_int(tax_rate, RATE_DECIMALS)
+    except ValueError:
+        return None
+
+    rate_scale = 10 ** RATE_DECIMALS
+    if any(m >= rate_scale for m in margin_units):
+        raise ValueError("El margen debe ser menor a 1")
+
+    # Cotas para que ningún producto intermedio desborde int64
+    scale = 10 ** (decimals - COST_DECIMALS + RATE_DECIMALS)
+    max_cost = max((abs(c) for c in cost_units), default=0)
+    min_divisor = max(rate_scale - max(margin_units, default=0), 1)
+    max_price = max_cost * scale // min_divisor + 1
+    if max_cost * scale > _INT64_MAX or max_price * max(rate_units, 1) > _INT64_MAX:
+        return None
+    if max_price * len(costs) * 2 > _INT64_MAX:
+        return None
+
+    return (
+        np.array(cost_units, dtype=np.int64),
+        np.array(margin_units, dtype=np.int64),
+        np.int64(rate_units),
+    )
+
+
+def _exact_int(value: Decimal, places: int) -> int:
+    """Valor * 10^places como entero; ValueError si no es exacto."""
+    scaled = value.scaleb(places)
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"{value} tiene más de {places} decimales")
+    return int(scaled)
+
+
+def _div_half_even(numerator: np.ndarray, denominator) -> np.ndarray:
+    """División entera con redondeo bancario (denominador positivo)."""
+    quotient, remainder = np.divmod(numerator, denominator)
+    twice = remainder * 2
+    round_up = (twice > denominator) | ((twice == denominator) & (quotient % 2 == 1))
+    return quotient + round_up
+
+
+def _to_decimals(units: np.ndarray, decimals: int) -> List[Decimal]:
+    return [Decimal(value).scaleb(-decimals) for value in units.tolist()]
+
+
+def _price_decimal(
+    ids: List[str],
+    costs: List[Decimal],
+    margins: List[Decimal],
+    tax_rate: Decimal,
+    decimals: int,
+) -> PricingBatch:
+    """Mismo cálculo elemento a elemento con Decimal."""
+    quantum = Decimal(1).scaleb(-decimals)
+    prices, taxes, finals = [], [], []
+    with localcontext() as context:
+        context.prec = 50
+        for cost, margin in zip(costs, margins):
+            price = (cost / (1 - margin)).quantize(quantum, rounding=ROUND_HALF_EVEN)
+            tax = (price * tax_rate).quantize(quantum, rounding=ROUND_HALF_EVEN)
+            prices.append(price)
+            taxes.append(tax)
+            finals.append(price + tax)
+
+    return PricingBatch(
+        ids=ids,
+        cost=costs,
+        margin=margins,
+        price_before_tax=prices,
+        tax_amount=taxes,
+        final_price=finals,
+        totals={
+            "total_cost": sum(costs, Decimal("0")).quantize(
+                quantum, rounding=ROUND_HALF_EVEN
+            ),
+            "total_before_tax": sum(prices, Decimal("0")),
+            "total_tax": sum(taxes, Decimal("0")),
+            "final_total": sum(finals, Decimal("0")),
+        },
+        vectorized=False,
+    )
@@ -6,14 +6,16 @@ Este módulo implementa:
 2. Reconstrucción inteligente
 3. Preservación de estabilidad
 4. Sugerencias de alternativas
+5. Evaluación simultánea de estrategias (what-if) con ranking
 """
 
 from typing import Dict, List, Optional, Any, Tuple
+from collections import ChainMap
 from datetime import datetime, timedelta
 from decimal import Decimal
 import asyncio
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from prometheus_client import Counter, Histogram, Gauge
 
 # Métricas
@@ -82,6 +84,123 @@ class AnalysisResult:
         }
 
 
+class ItemDraft:
+    """
+    Vista copy-on-write de un ítem de presupuesto.
+
+    Las lecturas se delegan al ítem original y las escrituras quedan en la
+    vista, así que el original nunca se modifica.
+    """
+
+    __slots__ = ("_base", "_overrides")
+
+    def __init__(self, base: Any):
+        object.__setattr__(self, "_base", base)
+        object.__setattr__(self, "_overrides", {})
+
+    def __getattr__(self, name: str) -> Any:
+        overrides = object.__getattribute__(self, "_overrides")
+        if name in overrides:
+            return overrides[name]
+        return getattr(object.__getattribute__(self, "_base"), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self._overrides[name] = value
+
+    @property
+    def overrides(self) -> Dict[str, Any]:
+        """Atributos modificados en la vista."""
+        return dict(self._overrides)
+
+    @property
+    def total_amount(self) -> Decimal:
+        """Monto total del ítem con los valores de la vista."""
+        return self.amount * self.quantity
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertir a diccionario con los valores de la vista."""
+        data = self._base.to_dict()
+        for name, value in self._overrides.items():
+            data[name] = float(value) if isinstance(value, Decimal) else value
+        return data
+
+
+class BudgetDraft:
+    """
+    Vista copy-on-write de un presupuesto.
+
+    Cada ítem es un ItemDraft y la metadata un ChainMap sobre la original:
+    crear la vista no copia los ítems y las estrategias pueden
+    modificarla libremente.
+    """
+
+    __slots__ = ("base", "items", "metadata")
+
+    def __init__(self, base: Any):
+        self.base = base
+        self.items = [ItemDraft(item) for item in base.items]
+        self.metadata = ChainMap({}, base.metadata)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.base, name)
+
+    @property
+    def total_amount(self) -> Decimal:
+        """Monto total con los valores de la vista."""
+        return sum((item.total_amount for item in self.items), Decimal("0"))
+
+    def changed_items(self) -> Dict[str, Dict[str, Any]]:
+        """Ítems modificados por la estrategia."""
+        return {
+            str(item.item_id): item.to_dict() for item in self.items if item.overrides
+        }
+
+
+@dataclass
+class StrategyEvaluation:
+    """Resultado de una estrategia evaluada en modo what-if."""
+
+    strategy: str
+    budget: Optional[BudgetDraft] = None
+    original_total: Decimal = Decimal("0")
+    total: Decimal = Decimal("0")
+    margin: Decimal = Decimal("0")
+    stability: float = 0.0
+    score: float = 0.0
+    rank: int = 0
+    error: Optional[str] = None
+    scores: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def price_delta(self) -> Decimal:
+        """Diferencia de precio respecto del presupuesto actual."""
+        return self.total - self.original_total
+
+    @property
+    def price_delta_percentage(self) -> float:
+        """Diferencia de precio relativa."""
+        if not self.original_total:
+            return 0.0
+        return float(self.price_delta / self.original_total)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertir a diccionario."""
+        return {
+            "strategy": self.strategy,
+            "rank": self.rank,
+            "score": self.score,
+            "scores": self.scores,
+            "total": float(self.total),
+            "price_delta": float(self.price_delta),
+            "price_delta_percentage": self.price_delta_percentage,
+            "margin": float(self.margin),
+            "stability": self.stability,
+            "changed_items": self.budget.changed_items() if self.budget else {},
+            "metadata": dict(self.budget.metadata.maps[0]) if self.budget else {},
+            "error": self.error,
+        }
+
+
 class BudgetReconstructionManager:
     """
     Gestor avanzado de reconstrucción de presupuestos.
@@ -96,6 +215,8 @@ class BudgetReconstructionManager:
         self.impact_threshold = 0.7  # Umbral para impacto alto
         self.similarity_threshold = 0.7  # Umbral para alternativas
         self.price_change_threshold = Decimal("0.05")  # 5% cambio significativo
+        self.default_margin = Decimal("0.15")  # Margen si el presupuesto no lo indica
+        self.what_if_weights = {"margin": 0.4, "price": 0.4, "stability": 0.2}
 
         # Obtener instancia del gestor de presupuestos
         from .manager import get_budget_manager
@@ -195,6 +316,156 @@ class BudgetReconstructionManager:
             )
             ACTIVE_RECONSTRUCTIONS.dec()
 
+    async def evaluate_strategies(
+        self,
+        budget_id: str,
+        changes: Dict[str, Any],
+        strategies: Optional[List[str]] = None,
+    ) -> List[StrategyEvaluation]:
+        """
+        Evaluar estrategias de reconstrucción sin modificar el presupuesto.
+
+        Cada estrategia corre en paralelo sobre su propia vista copy-on-write
+        y el resultado se puntúa por margen, diferencia de precio y
+        estabilidad de los ítems.
+
+        Args:
+            budget_id: ID del presupuesto
+            changes: Cambios detectados
+            strategies: Estrategias a evaluar (por defecto todas)
+
+        Returns:
+            Evaluaciones ordenadas de mejor a peor
+        """
+        start_time = datetime.now()
+        ACTIVE_RECONSTRUCTIONS.inc()
+
+        try:
+            budget = await self.budget_manager.get_budget(budget_id)
+            if not budget:
+                raise ValueError(f"Presupuesto {budget_id} no encontrado")
+
+            impact = await self.analyze_impact(budget_id, changes)
+            strategies = strategies or [
+                ReconstructionStrategy.PRESERVE_MARGIN,
+                ReconstructionStrategy.PRESERVE_PRICE,
+                ReconstructionStrategy.ADJUST_PROPORTIONALLY,
+                ReconstructionStrategy.BEST_ALTERNATIVE,
+            ]
+
+            evaluations = await asyncio.gather(
+                *(
+                    self._evaluate_strategy(
+                        strategy, budget, changes, impact.impact_level
+                    )
+                    for strategy in strategies
+                )
+            )
+
+            ranked = sorted(
+                evaluations, key=lambda e: (e.error is not None, -e.score)
+            )
+            for rank, evaluation in enumerate(ranked, 1):
+                evaluation.rank = rank
+
+            return ranked
+
+        finally:
+            duration = (datetime.now() - start_time).total_seconds()
+            RECONSTRUCTION_LATENCY.labels(operation_type="what_if").observe(duration)
+            ACTIVE_RECONSTRUCTIONS.dec()
+
+    async def _evaluate_strategy(
+        self, strategy: str, budget: Any, changes: Dict[str, Any], impact_level: float
+    ) -> StrategyEvaluation:
+        """Aplicar una estrategia sobre una vista y puntuarla."""
+        draft = BudgetDraft(budget)
+        evaluation = StrategyEvaluation(
+            strategy=strategy, budget=draft, original_total=budget.total_amount
+        )
+        try:
+            method = self._get_reconstruction_method(strategy)
+            await method(str(budget.budget_id), changes, impact_level, budget=draft)
+        except Exception as e:
+            evaluation.error = str(e)
+            return evaluation
+
+        self._score_evaluation(evaluation, budget)
+        RECONSTRUCTION_OPERATIONS.labels(
+            operation_type="what_if", strategy=strategy
+        ).inc()
+        return evaluation
+
+    def _score_evaluation(self, evaluation: StrategyEvaluation, budget: Any) -> None:
+        """
+        Puntuar una evaluación entre 0 y 1.
+
+        - margen: margen resultante respecto del actual
+        - precio: penaliza la diferencia relativa de precio
+        - estabilidad: 1 menos el cambio relativo medio por ítem
+
+        El margen es el que fija la estrategia en la metadata de la vista o,
+        si no lo fija, el que resulta de costos y precios de los ítems.
+        """
+        draft = evaluation.budget
+        budget_margin = Decimal(
+            str(budget.metadata.get("margin", self.default_margin))
+        )
+        original_margin = self._items_margin(budget.items, budget_margin)
+        declared = draft.metadata.maps[0].get("margin")
+        evaluation.margin = (
+            Decimal(str(declared))
+            if declared is not None
+            else self._items_margin(draft.items, budget_margin)
+        )
+        evaluation.total = draft.total_amount
+
+        changes = [
+            abs(float((item.amount - item._base.amount) / item._base.amount))
+            for item in draft.items
+            if item._base.amount
+        ]
+        evaluation.stability = (
+            max(0.0, 1.0 - sum(changes) / len(changes)) if changes else 1.0
+        )
+
+        evaluation.scores = {
+            "margin": (
+                min(max(float(evaluation.margin / original_margin), 0.0), 1.0)
+                if original_margin
+                else 1.0
+            ),
+            "price": max(0.0, 1.0 - abs(evaluation.price_delta_percentage)),
+            "stability": evaluation.stability,
+        }
+        evaluation.score = sum(
+            weight * evaluation.scores[name]
+            for name, weight in self.what_if_weights.items()
+        )
+
+    def _items_margin(self, items: List[Any], budget_margin: Decimal) -> Decimal:
+        """
+        Margen ponderado por precio: 1 - costo / precio (ver pricing.py).
+
+        El costo de cada ítem es metadata["cost"] (unitario) o, si no está,
+        el que deja su margen (metadata["margin"] o el del presupuesto)
+        sobre el monto original.
+        """
+        cost = total = Decimal("0")
+        for item in items:
+            metadata = item.metadata
+            if metadata.get("cost") is not None:
+                unit_cost = Decimal(str(metadata["cost"]))
+            else:
+                margin = Decimal(str(metadata.get("margin", budget_margin)))
+                base = getattr(item, "_base", item)
+                unit_cost = base.amount * (Decimal("1") - margin)
+            cost += unit_cost * item.quantity
+            total += item.total_amount
+        if not total:
+            return budget_margin
+        return Decimal("1") - cost / total
+
     async def suggest_alternatives(
         self, budget_id: str, changes: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
@@ -298,7 +569,11 @@ class BudgetReconstructionManager:
         return methods.get(strategy, self._reconstruct_adjust_proportionally)
 
     async def _reconstruct_best_alternative(
-        self, budget_id: str, changes: Dict[str, Any], impact_level: float
+        self,
+        budget_id: str,
+        changes: Dict[str, Any],
+        impact_level: float,
+        budget: Optional[Any] = None,
     ) -> Dict[str, Any]:
         """Reconstruye el presupuesto buscando la mejor alternativa.
 
@@ -306,12 +581,14 @@ class BudgetReconstructionManager:
             budget_id: ID del presupuesto
             changes: Cambios a aplicar
             impact_level: Nivel de impacto
+            budget: Presupuesto (o vista) a modificar; por defecto el
+                registrado con budget_id
 
         Returns:
             Presupuesto reconstruido
         """
         try:
-            budget = await self.budget_manager.get_budget(budget_id)
+            budget = budget or await self.budget_manager.get_budget(budget_id)
             if not budget:
                 raise ValueError(f"Presupuesto {budget_id} no encontrado")
 
@@ -326,11 +603,15 @@ class BudgetReconstructionManager:
             return budget
 
         except Exception as e:
-            logger.error(f"Error en reconstrucción best_alternative: {str(e)}")
+            self.logger.error(f"Error en reconstrucción best_alternative: {str(e)}")
             raise
 
     async def _reconstruct_preserve_margin(
-        self, budget_id: str, changes: Dict[str, Any], impact_level: float
+        self,
+        budget_id: str,
+        changes: Dict[str, Any],
+        impact_level: float,
+        budget: Optional[Any] = None,
     ) -> Dict[str, Any]:
         """
         Reconstruir presupuesto preservando el margen.
@@ -339,13 +620,15 @@ class BudgetReconstructionManager:
             budget_id: ID del presupuesto
             changes: Cambios a aplicar
             impact_level: Nivel de impacto
+            budget: Presupuesto (o vista) a modificar; por defecto el
+                registrado con budget_id
 
         Returns:
             Presupuesto reconstruido
         """
         try:
             # Obtener presupuesto
-            budget = await self.budget_manager.get_budget(budget_id)
+            budget = budget or await self.budget_manager.get_budget(budget_id)
             if not budget:
                 raise ValueError(f"Presupuesto {budget_id} no encontrado")
 
@@ -360,11 +643,15 @@ class BudgetReconstructionManager:
             return budget
 
         except Exception as e:
-            logger.error(f"Error en reconstrucción preserve_margin: {str(e)}")
+            self.logger.error(f"Error en reconstrucción preserve_margin: {str(e)}")
             raise
 
     async def _reconstruct_preserve_price(
-        self, budget_id: str, changes: Dict[str, Any], impact_level: float
+        self,
+        budget_id: str,
+        changes: Dict[str, Any],
+        impact_level: float,
+        budget: Optional[Any] = None,
     ) -> Dict[str, Any]:
         """
         Reconstruir presupuesto preservando los precios.
@@ -373,21 +660,20 @@ class BudgetReconstructionManager:
             budget_id: ID del presupuesto
             changes: Cambios a aplicar
             impact_level: Nivel de impacto
+            budget: Presupuesto (o vista) a modificar; por defecto el
+                registrado con budget_id
 
         Returns:
             Presupuesto reconstruido
         """
         try:
             # Obtener presupuesto
-            budget = await self.budget_manager.get_budget(budget_id)
+            budget = budget or await self.budget_manager.get_budget(budget_id)
             if not budget:
                 raise ValueError(f"Presupuesto {budget_id} no encontrado")
 
-            # Calcular precio final actual
-            original_price = sum(item.amount * item.quantity for item in budget.items)
-
             # Calcular nuevo margen para mantener los precios
-            current_margin = budget.metadata.get("margin", Decimal("0.15"))  # Default 15%
+            current_margin = budget.metadata.get("margin", self.default_margin)
             new_margin = current_margin * (Decimal("1.0") - Decimal(str(impact_level)))
 
             # Actualizar metadata del presupuesto
@@ -396,11 +682,15 @@ class BudgetReconstructionManager:
             return budget
 
         except Exception as e:
-            logger.error(f"Error en reconstrucción preserve_price: {str(e)}")
+            self.logger.error(f"Error en reconstrucción preserve_price: {str(e)}")
             raise
 
     async def _reconstruct_adjust_proportionally(
-        self, budget_id: str, changes: Dict[str, Any], impact_level: float
+        self,
+        budget_id: str,
+        changes: Dict[str, Any],
+        impact_level: float,
+        budget: Optional[Any] = None,
     ) -> Dict[str, Any]:
         """
         Reconstruir ajustando proporcionalmente.
@@ -409,20 +699,17 @@ class BudgetReconstructionManager:
             budget_id: ID del presupuesto
             changes: Cambios a aplicar
             impact_level: Nivel de impacto
+            budget: Presupuesto (o vista) a modificar; por defecto el
+                registrado con budget_id
 
         Returns:
             Presupuesto reconstruido
         """
         try:
-            budget = await self.budget_manager.get_budget(budget_id)
+            budget = budget or await self.budget_manager.get_budget(budget_id)
             if not budget:
                 raise ValueError(f"Presupuesto {budget_id} no encontrado")
 
-            # Calcular costo original y margen
-            original_cost = sum(item.amount * item.quantity for item in budget.items)
-            original_price = budget.total_amount
-            original_margin = original_price - original_cost
-
             # Ajustar proporcionalmente
             adjustment_factor = Decimal(str(1 + impact_level))
             for item in budget.items:
@@ -431,7 +718,9 @@ class BudgetReconstructionManager:
             return budget
 
         except Exception as e:
-            logger.error(f"Error en reconstrucción adjust_proportionally: {str(e)}")
+            self.logger.error(
+                f"Error en reconstrucción adjust_proportionally: {str(e)}"
+            )
             raise
 
     async def _cleanup_task(self):
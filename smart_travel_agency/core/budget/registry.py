@@ -0,0 +1,241 @@
+"""
+Registro de presupuestos.
+
+Este módulo implementa:
+1. Registro explícito de presupuestos confirmados
+2. Referencias débiles para borradores y vistas previas
+3. Expiración (TTL) de presupuestos inactivos
+4. Índices secundarios por vendedor, cliente y estado
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+import time
+import weakref
+
+from prometheus_client import Counter, Gauge
+
+# Métricas
+REGISTERED_BUDGETS = Gauge(
+    "budget_registry_size", "Budgets held by the registry", ["kind"]
+)
+
+BUDGET_EVICTIONS = Counter(
+    "budget_registry_evictions_total", "Budgets evicted after the inactivity TTL"
+)
+
+# Atributos indexados
+INDEXED_FIELDS = ("vendor_id", "customer_id", "status")
+
+
+class BudgetRegistry:
+    """
+    Registro de presupuestos con índices secundarios.
+
+    Responsabilidades:
+    1. Retener solo los presupuestos confirmados
+    2. Resolver vistas previas mientras alguien las use
+    3. Liberar presupuestos sin actividad
+    4. Listar por vendedor, cliente o estado sin recorrer todo
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 86400.0,
+        clock: Callable[[], float] = time.monotonic,
+        on_release: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        Inicializar registro.
+
+        Args:
+            ttl: Segundos sin acceso tras los que se libera un presupuesto
+                (None = nunca)
+            clock: Reloj monotónico
+            on_release: Se llama con el ID de cada presupuesto confirmado
+                que sale del registro (baja o expiración)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.ttl = ttl
+        self._clock = clock
+        self._on_release = on_release
+
+        # Confirmados, ordenados por último acceso
+        self._budgets: "OrderedDict[str, Any]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._previews: "weakref.WeakValueDictionary[str, Any]" = (
+            weakref.WeakValueDictionary()
+        )
+
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {
+            name: {} for name in INDEXED_FIELDS
+        }
+        self._indexed: Dict[str, Tuple[Tuple[str, Any], ...]] = {}
+
+    def register(self, budget_id: str, budget: Any) -> None:
+        """
+        Registrar un presupuesto confirmado.
+
+        Args:
+            budget_id: ID del presupuesto
+            budget: Presupuesto
+        """
+        self.evict_expired()
+        self._previews.pop(budget_id, None)
+        self._budgets[budget_id] = budget
+        self._touch(budget_id)
+        self.reindex(budget_id)
+        self._update_gauges()
+
+    def register_preview(self, budget_id: str, budget: Any) -> None:
+        """
+        Registrar un borrador o vista previa.
+
+        Se guarda una referencia débil: el registro no lo mantiene vivo y
+        desaparece cuando nadie más lo usa.
+        """
+        if budget_id not in self._budgets:
+            self._previews[budget_id] = budget
+
+    def get(self, budget_id: str) -> Optional[Any]:
+        """
+        Obtener presupuesto por ID.
+
+        Args:
+            budget_id: ID del presupuesto
+
+        Returns:
+            Presupuesto o None si no existe o expiró
+        """
+        self.evict_expired()
+        budget = self._budgets.get(budget_id)
+        if budget is not None:
+            self._touch(budget_id)
+            return budget
+        return self._previews.get(budget_id)
+
+    def unregister(self, budget_id: str) -> Optional[Any]:
+        """Quitar un presupuesto del registro."""
+        self._previews.pop(budget_id, None)
+        budget = self._budgets.pop(budget_id, None)
+        self._last_access.pop(budget_id, None)
+        self._unindex(budget_id)
+        self._update_gauges()
+        if budget is not None and self._on_release is not None:
+            self._on_release(budget_id)
+        return budget
+
+    def reindex(self, budget_id: str) -> None:
+        """Actualizar índices tras cambiar vendedor, cliente o estado."""
+        budget = self._budgets.get(budget_id)
+        if budget is None:
+            return
+
+        keys = tuple(
+            (name, value)
+            for name in INDEXED_FIELDS
+            if (value := self._field(budget, name)) is not None
+        )
+        if self._indexed.get(budget_id) == keys:
+            return
+
+        self._unindex(budget_id)
+        for name, value in keys:
+            self._indexes[name].setdefault(value, set()).add(budget_id)
+        self._indexed[budget_id] = keys
+
+    def find(
+        self,
+        vendor_id: Optional[str] = None,
+        customer_id: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Any]:
+        """
+        Listar presupuestos confirmados por vendedor, cliente y/o estado.
+
+        Se intersectan los índices empezando por el más chico.
+
+        Returns:
+            Presupuestos que cumplen todos los filtros
+        """
+        self.evict_expired()
+        filters = {
+            "vendor_id": vendor_id,
+            "customer_id": customer_id,
+            "status": status,
+        }
+        candidates = [
+            self._indexes[name].get(value, set())
+            for name, value in filters.items()
+            if value is not None
+        ]
+        if not candidates:
+            return list(self._budgets.values())
+
+        candidates.sort(key=len)
+        ids = set(candidates[0]).intersection(*candidates[1:])
+        return [self._budgets[budget_id] for budget_id in ids]
+
+    def evict_expired(self) -> List[str]:
+        """
+        Liberar presupuestos sin acceso durante más del TTL.
+
+        Los presupuestos están ordenados por último acceso, así que solo se
+        recorren los vencidos.
+
+        Returns:
+            IDs liberados
+        """
+        if self.ttl is None:
+            return []
+
+        deadline = self._clock() - self.ttl
+        evicted = []
+        while self._budgets:
+            budget_id = next(iter(self._budgets))
+            if self._last_access[budget_id] > deadline:
+                break
+            self.unregister(budget_id)
+            evicted.append(budget_id)
+
+        if evicted:
+            BUDGET_EVICTIONS.inc(len(evicted))
+            self.logger.info(f"Liberados {len(evicted)} presupuestos inactivos")
+        return evicted
+
+    def values(self) -> Iterable[Any]:
+        """Presupuestos confirmados."""
+        return list(self._budgets.values())
+
+    def __contains__(self, budget_id: str) -> bool:
+        return budget_id in self._budgets or budget_id in self._previews
+
+    def __len__(self) -> int:
+        return len(self._budgets)
+
+    def _touch(self, budget_id: str) -> None:
+        self._last_access[budget_id] = self._clock()
+        self._budgets.move_to_end(budget_id)
+
+    def _unindex(self, budget_id: str) -> None:
+        for name, value in self._indexed.pop(budget_id, ()):
+            ids = self._indexes[name].get(value)
+            if ids is not None:
+                ids.discard(budget_id)
+                if not ids:
+                    del self._indexes[name][value]
+
+    def _update_gauges(self) -> None:
+        REGISTERED_BUDGETS.labels(kind="committed").set(len(self._budgets))
+        REGISTERED_BUDGETS.labels(kind="preview").set(len(self._previews))
+
+    @staticmethod
+    def _field(budget: Any, name: str) -> Any:
+        """Valor indexado: atributo o clave de la metadata."""
+        value = getattr(budget, name, None)
+        if value is None:
+            metadata = getattr(budget, "metadata", None)
+            if isinstance(metadata, dict):
+                value = metadata.get(name)
+        return value
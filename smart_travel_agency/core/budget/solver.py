@@ -0,0 +1,340 @@
+"""
+Selección óptima de componentes de presupuesto.
+
+Este módulo implementa:
+1. Formulación de la selección de componentes como problema de mochila
+   con grupos (una opción por componente)
+2. Restricciones de precio máximo, márgenes, componentes requeridos y
+   preferencias de vendedor
+3. Branch-and-bound exacto con cotas por sufijos
+4. Aritmética Decimal exacta para garantizar el óptimo
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+import time
+
+from prometheus_client import Counter, Histogram
+
+# Métricas
+SOLVER_NODES = Counter(
+    "budget_solver_nodes_total", "Branch-and-bound nodes explored by the budget solver"
+)
+
+SOLVER_LATENCY = Histogram(
+    "budget_solver_latency_seconds",
+    "Latency of exact budget solving",
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0],
+)
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0")
+
+# Objetivos soportados (valores de OptimizationGoal)
+MAXIMIZE_MARGIN = "maximize_margin"
+MAXIMIZE_COMPETITIVENESS = "maximize_competitiveness"
+BALANCE_PRICE_QUALITY = "balance_price_quality"
+
+
+@dataclass(frozen=True)
+class ComponentOption:
+    """Opción de un componente (p. ej. un vuelo de un proveedor)."""
+
+    option_id: str
+    component: str
+    vendor: str
+    cost: Decimal
+    price: Decimal
+    data: Any = field(default=None, compare=False)
+
+
+@dataclass
+class SolverConstraints:
+    """Restricciones del problema.
+
+    Todo componente con opciones es requerido (exactamente una opción),
+    salvo los listados en `optional_components`. `required_components`
+    agrega componentes que deben estar aunque no tengan opciones (en ese
+    caso no hay solución).
+    """
+
+    max_price: Optional[Decimal] = None
+    min_margin: Optional[Decimal] = None  # (precio - costo) / precio
+    max_margin: Optional[Decimal] = None
+    required_components: Set[str] = field(default_factory=set)
+    optional_components: Set[str] = field(default_factory=set)
+    excluded_vendors: Set[str] = field(default_factory=set)
+    # Bonificación en la función objetivo por elegir un vendedor
+    preferred_vendors: Dict[str, Decimal] = field(default_factory=dict)
+
+
+@dataclass
+class SolverResult:
+    """Selección encontrada."""
+
+    selection: Dict[str, ComponentOption]
+    total_price: Decimal
+    total_cost: Decimal
+    objective: Decimal
+    optimal: bool
+    nodes: int
+    elapsed: float
+
+    @property
+    def margin(self) -> Decimal:
+        """Margen sobre el precio total."""
+        if not self.total_price:
+            return ZERO
+        return (self.total_price - self.total_cost) / self.total_price
+
+
+@dataclass
+class _Group:
+    """Opciones de un componente, con los datos que usa la búsqueda."""
+
+    component: str
+    required: bool
+    # (valor, precio, costo, holgura margen mín., holgura margen máx., opción)
+    options: List[Tuple[Decimal, Decimal, Decimal, Decimal, Decimal, ComponentOption]]
+
+
+class BudgetSolver:
+    """
+    Solver exacto de selección de componentes.
+
+    Maximiza el objetivo eligiendo una opción por componente (a lo sumo
+    una para los opcionales). Las restricciones de margen se
+    linealizan: margen >= m  <=>  sum((1 - m) * precio - costo) >= 0.
+    """
+
+    def __init__(
+        self,
+        max_nodes: int = 200_000,
+        time_limit: float = 1.0,
+        balance_weight: Decimal = Decimal("0.5"),
+    ):
+        """
+        Inicializar solver.
+
+        Args:
+            max_nodes: Nodos máximos a explorar
+            time_limit: Segundos máximos; al superarse se devuelve la mejor
+                solución encontrada marcada como no óptima
+            balance_weight: Peso del margen en el objetivo balanceado
+        """
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.balance_weight = balance_weight
+
+    def solve(
+        self,
+        options: Iterable[ComponentOption],
+        goal: str = MAXIMIZE_MARGIN,
+        constraints: Optional[SolverConstraints] = None,
+    ) -> Optional[SolverResult]:
+        """
+        Resolver la selección.
+
+        Args:
+            options: Opciones de todos los componentes
+            goal: Objetivo (maximize_margin, maximize_competitiveness o
+                balance_price_quality)
+            constraints: Restricciones
+
+        Returns:
+            Mejor selección o None si no hay solución factible
+        """
+        constraints = constraints or SolverConstraints()
+        start = time.perf_counter()
+        groups = self._build_groups(options, goal, constraints)
+        if groups is None:
+            return None
+
+        count = len(groups)
+        # Cotas por sufijo: lo máximo (o mínimo) que aportan los grupos i..n
+        best_value = [ZERO] * (count + 1)
+        min_price = [ZERO] * (count + 1)
+        best_min_slack = [ZERO] * (count + 1)
+        best_max_slack = [ZERO] * (count + 1)
+        for i in range(count - 1, -1, -1):
+            group = groups[i]
+            values = [o[0] for o in group.options]
+            prices = [o[1] for o in group.options]
+            min_slacks = [o[3] for o in group.options]
+            max_slacks = [o[4] for o in group.options]
+            if not group.required:
+                values.append(ZERO)
+                prices.append(ZERO)
+                min_slacks.append(ZERO)
+                max_slacks.append(ZERO)
+            best_value[i] = best_value[i + 1] + max(values)
+            min_price[i] = min_price[i + 1] + min(prices)
+            best_min_slack[i] = best_min_slack[i + 1] + max(min_slacks)
+            best_max_slack[i] = best_max_slack[i + 1] + max(max_slacks)
+
+        max_price = constraints.max_price
+        check_min = constraints.min_margin is not None
+        check_max = constraints.max_margin is not None
+
+        best: Optional[Tuple[Decimal, List[Optional[tuple]]]] = None
+        chosen: List[Optional[tuple]] = [None] * count
+        nodes = 0
+        exhausted = True
+        deadline = start + self.time_limit
+
+        def search(i: int, value: Decimal, price: Decimal, min_slack: Decimal,
+                   max_slack: Decimal) -> None:
+            nonlocal best, nodes, exhausted
+            nodes += 1
+            timed_out = nodes & 1023 == 0 and time.perf_counter() > deadline
+            if nodes > self.max_nodes or timed_out:
+                exhausted = False
+                return
+
+            # Poda por factibilidad y cota
+            if max_price is not None and price + min_price[i] > max_price:
+                return
+            if i == count:
+                if (check_min and min_slack < 0) or (check_max and max_slack < 0):
+                    return
+                if best is None or value > best[0]:
+                    best = (value, list(chosen))
+                return
+
+            if best is not None and value + best_value[i] <= best[0]:
+                return
+            if check_min and min_slack + best_min_slack[i] < 0:
+                return
+            if check_max and max_slack + best_max_slack[i] < 0:
+                return
+
+            group = groups[i]
+            for option in group.options:  # ordenadas por valor descendente
+                chosen[i] = option
+                search(i + 1, value + option[0], price + option[1],
+                       min_slack + option[3], max_slack + option[4])
+                if not exhausted:
+                    break
+            chosen[i] = None
+            if not group.required and exhausted:
+                search(i + 1, value, price, min_slack, max_slack)
+
+        search(0, ZERO, ZERO, ZERO, ZERO)
+
+        elapsed = time.perf_counter() - start
+        SOLVER_NODES.inc(nodes)
+        SOLVER_LATENCY.observe(elapsed)
+        if not exhausted:
+            logger.warning(
+                f"Solver detenido tras {nodes} nodos; resultado no garantizado"
+            )
+        if best is None:
+            return None
+
+        selection = {option[5].component: option[5] for option in best[1] if option}
+        return SolverResult(
+            selection=selection,
+            total_price=sum((o.price for o in selection.values()), ZERO),
+            total_cost=sum((o.cost for o in selection.values()), ZERO),
+            objective=best[0],
+            optimal=exhausted,
+            nodes=nodes,
+            elapsed=elapsed,
+        )
+
+    def _build_groups(
+        self,
+        options: Iterable[ComponentOption],
+        goal: str,
+        constraints: SolverConstraints,
+    ) -> Optional[List[_Group]]:
+        """Agrupar opciones por componente y precalcular sus aportes."""
+        min_factor = Decimal(1) - (constraints.min_margin or ZERO)
+        max_factor = Decimal(1) - (constraints.max_margin or ZERO)
+
+        by_component: Dict[str, List[tuple]] = {}
+        for option in options:
+            if option.vendor in constraints.excluded_vendors:
+                continue
+            max_price = constraints.max_price
+            if max_price is not None and option.price > max_price:
+                continue
+            value = self._value(option, goal) + constraints.preferred_vendors.get(
+                option.vendor, ZERO
+            )
+            by_component.setdefault(option.component, []).append((
+                value,
+                option.price,
+                option.cost,
+                min_factor * option.price - option.cost,
+                option.cost - max_factor * option.price,
+                option,
+            ))
+
+        missing = constraints.required_components - set(by_component)
+        if missing:
+            logger.info(f"Sin opciones para componentes requeridos: {sorted(missing)}")
+            return None
+
+        groups = []
+        for component, group_options in by_component.items():
+            group_options.sort(key=lambda o: o[0], reverse=True)
+            groups.append(_Group(
+                component=component,
+                required=component not in constraints.optional_components,
+                options=group_options,
+            ))
+        # Requeridos y con pocas opciones primero: podas más tempranas
+        groups.sort(key=lambda g: (not g.required, len(g.options)))
+        return groups
+
+    def _value(self, option: ComponentOption, goal: str) -> Decimal:
+        """Aporte de una opción a la función objetivo."""
+        margin = option.price - option.cost
+        if goal == MAXIMIZE_COMPETITIVENESS:
+            return -option.price
+        if goal == BALANCE_PRICE_QUALITY:
+            weight = self.balance_weight
+            return weight * margin - (Decimal(1) - weight) * option.price
+        return margin
+
+
+def build_constraints(constraints: Optional[Iterable[Any]]) -> SolverConstraints:
+    """
+    Traducir restricciones de optimización al formato del solver.
+
+    Args:
+        constraints: Objetos con `type` (enum o texto: MAX_PRICE,
+            MIN_MARGIN, MAX_MARGIN, REQUIRED_COMPONENTS,
+            OPTIONAL_COMPONENTS, EXCLUDED_VENDORS, PREFERRED_VENDORS) y
+            `value`
+
+    Returns:
+        Restricciones del solver
+    """
+    result = SolverConstraints()
+    for constraint in constraints or []:
+        kind = str(getattr(constraint.type, "name", constraint.type)).upper()
+        value = constraint.value
+        if kind == "MAX_PRICE":
+            result.max_price = Decimal(str(value))
+        elif kind == "MIN_MARGIN":
+            result.min_margin = Decimal(str(value))
+        elif kind == "MAX_MARGIN":
+            result.max_margin = Decimal(str(value))
+        elif kind == "REQUIRED_COMPONENTS":
+            result.required_components.update(value)
+        elif kind == "OPTIONAL_COMPONENTS":
+            result.optional_components.update(value)
+        elif kind == "EXCLUDED_VENDORS":
+            result.excluded_vendors.update(value)
+        elif kind == "PREFERRED_VENDORS":
+            result.preferred_vendors.update(
+                {vendor: Decimal(str(bonus)) for vendor, bonus in value.items()}
+            )
+        else:
+            logger.debug(f"Restricción sin equivalente en el solver: {kind}")
+    return result
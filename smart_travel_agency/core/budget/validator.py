@@ -229,10 +229,10 @@ class BudgetValidator:
         """Validar reglas de negocio."""
         issues = []
         
-        # Validar márgenes
-        total_cost = sum(item.price for item in budget.items)
-        if total_cost > 0:
-            margin = (budget.total_amount() - total_cost) / total_cost
+        # Validar márgenes (solo si se conoce el costo de todos los items)
+        total_cost = budget.totals.cost
+        if budget.totals.costs_known and total_cost > 0:
+            margin = (budget.total_amount - total_cost) / total_cost
             if margin < Decimal("0.05") or margin > Decimal("0.35"):
                 issues.append(
                     ValidationIssue(
@@ -289,7 +289,7 @@ class BudgetValidator:
         
         # Validar límites de precio
         if preferences.base.max_price:
-            total = budget.total_amount()
+            total = budget.total_amount
             if total > preferences.base.max_price:
                 issues.append(
                     ValidationIssue(
@@ -0,0 +1,250 @@
+"""
+Caché compartida de credenciales de autenticación.
+
+Este módulo implementa:
+1. Tokens y cookies por (proveedor, usuario)
+2. Refresco proactivo en segundo plano antes del vencimiento
+3. Login single-flight (un solo login concurrente por clave)
+4. Invalidación explícita ante errores 401
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+import asyncio
+import logging
+from prometheus_client import Counter
+
+# Métricas
+AUTH_OPERATIONS = Counter(
+    "auth_cache_operations_total",
+    "Number of auth cache operations",
+    ["provider", "result"],
+)
+
+
+@dataclass
+class AuthToken:
+    """Credencial obtenida tras un login."""
+
+    token: Optional[str]
+    expires_at: Optional[datetime] = None  # None = no expira
+    cookies: Dict[str, str] = field(default_factory=dict)
+    obtained_at: datetime = field(default_factory=datetime.now)
+
+    def is_valid(self, now: Optional[datetime] = None) -> bool:
+        """Verificar si el token sigue vigente."""
+        if self.expires_at is None:
+            return True
+        return (now or datetime.now()) < self.expires_at
+
+    def needs_refresh(self, margin: timedelta, now: Optional[datetime] = None) -> bool:
+        """Verificar si el token entró en la ventana de refresco."""
+        if self.expires_at is None:
+            return False
+        return (now or datetime.now()) >= self.expires_at - margin
+
+
+LoginFunc = Callable[[], Awaitable[AuthToken]]
+TokenKey = Tuple[str, str]
+
+
+class TokenCache:
+    """
+    Caché de tokens con refresco proactivo.
+
+    Responsabilidades:
+    1. Entregar tokens vigentes sin pasar por el login
+    2. Refrescar tokens antes de que venzan
+    3. Garantizar un único login concurrente por clave
+    """
+
+    def __init__(
+        self,
+        refresh_margin: timedelta = timedelta(minutes=2),
+        retry_interval: float = 10.0,
+    ):
+        """
+        Inicializar caché.
+
+        Args:
+            refresh_margin: Anticipación con la que se refresca un token
+            retry_interval: Segundos entre reintentos de un refresco fallido
+        """
+        self.logger = logging.getLogger(__name__)
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+
+        self._tokens: Dict[TokenKey, AuthToken] = {}
+        self._logins: Dict[TokenKey, LoginFunc] = {}
+        self._inflight: Dict[TokenKey, asyncio.Future] = {}
+        self._refresh_tasks: Dict[TokenKey, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    async def get_token(
+        self, provider: str, username: str, login: LoginFunc
+    ) -> AuthToken:
+        """
+        Obtener token vigente, haciendo login solo si no hay ninguno.
+
+        Args:
+            provider: ID del proveedor
+            username: Usuario
+            login: Corrutina que realiza el login y devuelve el token
+
+        Returns:
+            Token vigente
+        """
+        key = (provider, username)
+        self._logins[key] = login
+
+        token = self._tokens.get(key)
+        if token and token.is_valid():
+            AUTH_OPERATIONS.labels(provider=provider, result="hit").inc()
+
+            # Sin refresco programado (p. ej. se perdió): refrescar ya
+            if (
+                token.needs_refresh(self.refresh_margin)
+                and key not in self._inflight
+                and key not in self._refresh_tasks
+            ):
+                self._spawn(self._login(key))
+
+            return token
+
+        AUTH_OPERATIONS.labels(provider=provider, result="miss").inc()
+        return await self._login(key)
+
+    def prefetch(self, provider: str, username: str, login: LoginFunc) -> None:
+        """
+        Iniciar login en segundo plano (warm-up).
+
+        Args:
+            provider: ID del proveedor
+            username: Usuario
+            login: Corrutina de login
+        """
+        key = (provider, username)
+        self._logins[key] = login
+
+        token = self._tokens.get(key)
+        if (not token or not token.is_valid()) and key not in self._inflight:
+            self._spawn(self._login(key))
+
+    def peek(self, provider: str, username: str) -> Optional[AuthToken]:
+        """Obtener token cacheado sin disparar login."""
+        token = self._tokens.get((provider, username))
+        return token if token and token.is_valid() else None
+
+    def invalidate(self, provider: str, username: str) -> None:
+        """
+        Descartar token (por ejemplo tras un 401).
+
+        Args:
+            provider: ID del proveedor
+            username: Usuario
+        """
+        key = (provider, username)
+        self._tokens.pop(key, None)
+        self._cancel_refresh(key)
+        AUTH_OPERATIONS.labels(provider=provider, result="invalidated").inc()
+
+    async def close(self) -> None:
+        """Cancelar refrescos pendientes."""
+        tasks = list(self._refresh_tasks.values()) + list(self._background)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._refresh_tasks.clear()
+        self._background.clear()
+
+    async def _login(self, key: TokenKey) -> AuthToken:
+        """Ejecutar login single-flight."""
+        inflight = self._inflight.get(key)
+        if inflight:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+
+        try:
+            token = await self._logins[key]()
+            self._store(key, token)
+            AUTH_OPERATIONS.labels(provider=key[0], result="login").inc()
+
+            future.set_result(token)
+            return token
+
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+        except Exception as e:
+            AUTH_OPERATIONS.labels(provider=key[0], result="error").inc()
+            future.set_exception(e)
+            # Marcar como recuperada si nadie más la espera
+            future.exception()
+            raise
+
+        finally:
+            del self._inflight[key]
+
+    def _store(self, key: TokenKey, token: AuthToken) -> None:
+        """Guardar token y programar su refresco."""
+        self._tokens[key] = token
+        self._cancel_refresh(key)
+
+        if token.expires_at is not None:
+            remaining = (token.expires_at - datetime.now()).total_seconds()
+            # Tokens más cortos que el margen se refrescan a mitad de vida
+            delay = max(remaining - self.refresh_margin.total_seconds(), remaining / 2)
+            self._schedule_refresh(key, max(delay, 0.0))
+
+    def _schedule_refresh(self, key: TokenKey, delay: float) -> None:
+        """Programar refresco en segundo plano."""
+        self._refresh_tasks[key] = asyncio.create_task(self._refresh_later(key, delay))
+
+    def _cancel_refresh(self, key: TokenKey) -> None:
+        """Cancelar refresco programado."""
+        task = self._refresh_tasks.pop(key, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _refresh_later(self, key: TokenKey, delay: float) -> None:
+        """Refrescar token cuando entre en la ventana de refresco."""
+        await asyncio.sleep(delay)
+
+        try:
+            await self._login(key)
+
+        except Exception as e:
+            self.logger.warning(f"Error refrescando token de {key[0]}: {e}")
+
+            token = self._tokens.get(key)
+            if token and token.is_valid():
+                self._schedule_refresh(key, self.retry_interval)
+            else:
+                self._tokens.pop(key, None)
+                self._refresh_tasks.pop(key, None)
+
+    def _spawn(self, coro: Awaitable) -> None:
+        """Lanzar tarea en segundo plano conservando la referencia."""
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        """Limpiar tarea finalizada."""
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            self.logger.warning(f"Error en login en segundo plano: {task.exception()}")
+
+
+# Instancia global
+token_cache = TokenCache()
+
+
+def get_token_cache() -> TokenCache:
+    """Obtener instancia única de la caché de tokens."""
+    return token_cache
@@ -8,18 +8,21 @@ Este módulo implementa:
 4. Manejo de errores
 """
 
-from typing import Dict, Any, Optional, List, Type
+from typing import Dict, Any, Optional, List, Tuple, Type
 from datetime import datetime
+from functools import partial
 import logging
 import asyncio
 from abc import ABC, abstractmethod
 from prometheus_client import Counter, Histogram
 import aiohttp
 import jwt
-from ratelimit import limits, sleep_and_retry
 
 from ...schemas import APIConfig, APICredentials, APIResponse, RateLimitConfig
 from ...metrics import get_metrics_collector
+from ...cache.token_cache import AuthToken, get_token_cache
+from ...providers.hedging import IDEMPOTENT_METHODS, get_hedger
+from ..rate_limiter import get_rate_limiter
 
 # Métricas
 API_OPERATIONS = Counter(
@@ -62,12 +65,20 @@ class BaseAPIClient(ABC):
         self.session: Optional[aiohttp.ClientSession] = None
         self.auth_token: Optional[str] = None
         self.token_expiry: Optional[datetime] = None
+        self.token_cache = get_token_cache()
+        self._token_provider = f"api:{config.name}"
 
         # Control de rate limiting
-        self.rate_limiter = RateLimitConfig(
-            calls=config.rate_limit.calls, period=config.rate_limit.period
+        self.rate_limiter = get_rate_limiter(
+            f"api:{config.name}",
+            RateLimitConfig(
+                calls=config.rate_limit.calls, period=config.rate_limit.period
+            ),
         )
 
+        # Hedging de requests idempotentes según la latencia observada
+        self.hedger = get_hedger(f"api:{config.name}")
+
     async def __aenter__(self):
         """Inicializar cliente."""
         self.session = aiohttp.ClientSession(
@@ -85,15 +96,16 @@ class BaseAPIClient(ABC):
         """Autenticar cliente."""
         pass
 
-    @sleep_and_retry
-    @limits(calls=60, period=60)
-    async def request(self, method: str, endpoint: str, **kwargs) -> APIResponse:
+    async def request(
+        self, method: str, endpoint: str, auth_required: bool = True, **kwargs
+    ) -> APIResponse:
         """
         Realizar request a API.
 
         Args:
             method: Método HTTP
             endpoint: Endpoint a llamar
+            auth_required: Si el request necesita autenticación
             **kwargs: Argumentos adicionales
 
         Returns:
@@ -102,42 +114,56 @@ class BaseAPIClient(ABC):
         try:
             start_time = datetime.now()
 
-            # Verificar autenticación
-            if self.needs_auth():
-                await self.authenticate()
+            # Verificar autenticación (token cacheado y refrescado en segundo plano)
+            if auth_required:
+                await self.ensure_authenticated()
 
             # Preparar headers
             headers = kwargs.pop("headers", {})
             if self.auth_token:
                 headers["Authorization"] = f"Bearer {self.auth_token}"
 
-            # Realizar request
-            async with self.session.request(
-                method, endpoint, headers=headers, **kwargs
-            ) as response:
-                # Procesar respuesta
-                data = await response.json()
-
-                # Registrar métricas
-                duration = (datetime.now() - start_time).total_seconds()
-
-                API_OPERATIONS.labels(
-                    api_name=self.config.name,
-                    operation=endpoint,
-                    status=response.status,
-                ).inc()
-
-                API_LATENCY.labels(
-                    api_name=self.config.name, operation=endpoint
-                ).observe(duration)
-
-                return APIResponse(
-                    success=response.status == 200,
-                    status_code=response.status,
-                    data=data,
-                    headers=dict(response.headers),
-                    metadata={"duration": duration, "endpoint": endpoint},
+            # Realizar request (con cobertura si es idempotente)
+            send = partial(self._send, method, endpoint, headers, kwargs)
+
+            async def attempt():
+                async with self.rate_limiter:
+                    return await send()
+
+            if method.upper() in IDEMPOTENT_METHODS:
+                status, data, response_headers = await self.hedger.run(
+                    attempt, send, limiter=self.rate_limiter
                 )
+            else:
+                status, data, response_headers = await attempt()
+
+            # Token rechazado: forzar login en el próximo request
+            if status == 401:
+                self.token_cache.invalidate(
+                    self._token_provider, self.credentials.username
+                )
+                self.auth_token = None
+
+            # Registrar métricas
+            duration = (datetime.now() - start_time).total_seconds()
+
+            API_OPERATIONS.labels(
+                api_name=self.config.name,
+                operation=endpoint,
+                status=status,
+            ).inc()
+
+            API_LATENCY.labels(
+                api_name=self.config.name, operation=endpoint
+            ).observe(duration)
+
+            return APIResponse(
+                success=status == 200,
+                status_code=status,
+                data=data,
+                headers=response_headers,
+                metadata={"duration": duration, "endpoint": endpoint},
+            )
 
         except Exception as e:
             self.logger.error(f"Error en request: {e}")
@@ -148,6 +174,39 @@ class BaseAPIClient(ABC):
 
             return APIResponse(success=False, error=str(e))
 
+    async def _send(
+        self, method: str, endpoint: str, headers: Dict, kwargs: Dict
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        """
+        Enviar un request sin rate limiting (lo aplica quien llama).
+
+        Returns:
+            Tupla (status, datos, headers)
+        """
+        async with self.session.request(
+            method, endpoint, headers=headers, **kwargs
+        ) as response:
+            data = await response.json()
+            return response.status, data, dict(response.headers)
+
+    async def ensure_authenticated(self) -> None:
+        """Aplicar token de la caché compartida, autenticando solo si falta."""
+        token = await self.token_cache.get_token(
+            self._token_provider, self.credentials.username, self._login
+        )
+        self.auth_token = token.token
+        self.token_expiry = token.expires_at or datetime.max
+
+    async def _login(self) -> AuthToken:
+        """Autenticar y empaquetar el resultado para la caché."""
+        await self.authenticate()
+
+        expiry = self.token_expiry
+        return AuthToken(
+            token=self.auth_token,
+            expires_at=None if expiry in (None, datetime.max) else expiry,
+        )
+
     def needs_auth(self) -> bool:
         """Verificar si necesita autenticación."""
         if not self.auth_token:
@@ -218,6 +277,7 @@ class JWTAPIClient(BaseAPIClient):
             response = await self.request(
                 "POST",
                 self.config.auth_endpoint,
+                auth_required=False,
                 json={
                     "username": self.credentials.username,
                     "password": self.credentials.password,
@@ -245,6 +305,14 @@ class JWTAPIClient(BaseAPIClient):
 class BasicAuthAPIClient(BaseAPIClient):
     """Cliente API con autenticación básica."""
 
+    _basic_auth_ready = False
+
+    async def ensure_authenticated(self) -> None:
+        """Configurar la sesión una vez; no hay token que cachear."""
+        if not self._basic_auth_ready:
+            await self.authenticate()
+            self._basic_auth_ready = True
+
     async def authenticate(self) -> None:
         """Autenticar con credenciales básicas."""
         try:
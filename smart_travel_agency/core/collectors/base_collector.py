@@ -3,7 +3,7 @@ Colector base para extracción de datos.
 
 Este módulo implementa:
 1. Funcionalidad base de recolección
-2. Manejo de rate limiting
+2. Manejo de rate limiting (ver rate_limiter)
 3. Sistema de caché
 4. Control de errores
 """
@@ -16,10 +16,10 @@ from abc import ABC, abstractmethod
 from prometheus_client import Counter, Histogram
 import aiohttp
 import cachetools
-from ratelimit import limits, sleep_and_retry
 
 from ..schemas import DataSource, CollectionResult, CacheConfig, RateLimitConfig
 from ..metrics import get_metrics_collector
+from .rate_limiter import get_rate_limiter
 
 # Métricas
 COLLECTION_OPERATIONS = Counter(
@@ -61,7 +61,7 @@ class BaseCollector(ABC):
             rate_limit_config: Configuración de rate limiting
         """
         self.logger = logging.getLogger(__name__)
-        self.metrics = get_metrics_collector()
+        self.metrics = get_metrics_collector("base_collector")
         self.source = source
 
         # Configuración por defecto
@@ -81,8 +81,16 @@ class BaseCollector(ABC):
         # Cliente HTTP
         self.session: Optional[aiohttp.ClientSession] = None
 
-        # Semáforo para rate limiting
-        self.semaphore = asyncio.Semaphore(self.rate_limit_config.calls)
+        # Semáforo para concurrencia de recolecciones
+        self.semaphore = asyncio.Semaphore(
+            self.rate_limit_config.max_concurrent or self.rate_limit_config.calls
+        )
+
+        # Rate limiting por fuente (compartido entre colectores de la misma
+        # fuente; cada fuente respeta su propio RateLimitConfig)
+        self.rate_limiter = get_rate_limiter(
+            f"collector:{self.source.id}", self.rate_limit_config
+        )
 
     async def __aenter__(self):
         """Iniciar sesión HTTP."""
@@ -191,8 +199,6 @@ class BaseCollector(ABC):
             self.logger.error(f"Error generando clave: {e}")
             return str(datetime.now().timestamp())
 
-    @sleep_and_retry
-    @limits(calls=60, period=60)
     async def _rate_limited_request(
         self, url: str, method: str = "GET", **kwargs
     ) -> aiohttp.ClientResponse:
@@ -210,7 +216,8 @@ class BaseCollector(ABC):
         if not self.session:
             raise RuntimeError("Session not initialized")
 
-        return await self.session.request(method, url, **kwargs)
+        async with self.rate_limiter:
+            return await self.session.request(method, url, **kwargs)
 
     async def _handle_response(
         self, response: aiohttp.ClientResponse
@@ -2,22 +2,26 @@
 Gestor de navegadores automatizados.
 
 Este módulo implementa:
-1. Gestión de navegadores
-2. Control de sesiones
-3. Sistema anti-bloqueo
+1. Pool de navegadores (uno de larga vida por proxy)
+2. Préstamo y devolución de contextos aislados con páginas precalentadas
+3. Sistema anti-bloqueo y bloqueo de recursos pesados
 4. Rotación de proxies
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set
+from contextlib import asynccontextmanager
 from datetime import datetime
+from uuid import uuid4
 import logging
 import asyncio
+from urllib.parse import urlparse
 from prometheus_client import Counter, Gauge
-from playwright.async_api import async_playwright, Browser, Page
+from playwright.async_api import async_playwright, Browser, Page, Route
 import aiohttp
 
 from ...schemas import BrowserConfig, ProxyConfig, BrowserSession, AutomationResult
 from ...metrics import get_metrics_collector
+from ...providers.resilience import ResilienceConfig, get_resilience
 
 # Métricas
 BROWSER_SESSIONS = Gauge(
@@ -30,14 +34,22 @@ BROWSER_OPERATIONS = Counter(
     ["operation_type", "status"],
 )
 
+BROWSER_POOL_EVENTS = Counter(
+    "browser_pool_events_total",
+    "Browser pool events (launch, warm_hit, cold_start, recycle, discard)",
+    ["event"],
+)
+
+DIRECT = "direct"  # Clave del navegador sin proxy
+
 
 class BrowserManager:
     """
     Gestor de navegadores.
 
     Responsabilidades:
-    1. Gestionar navegadores
-    2. Controlar sesiones
+    1. Mantener un navegador por proxy durante toda la vida del gestor
+    2. Prestar contextos aislados (con página lista) y recuperarlos
     3. Manejar proxies
     4. Prevenir bloqueos
     """
@@ -55,7 +67,7 @@ class BrowserManager:
             proxy_config: Configuración de proxies
         """
         self.logger = logging.getLogger(__name__)
-        self.metrics = get_metrics_collector()
+        self.metrics = get_metrics_collector("browser_manager")
 
         # Configuración por defecto
         self.browser_config = browser_config or BrowserConfig(
@@ -66,11 +78,19 @@ class BrowserManager:
             enabled=False, rotation_interval=300, max_consecutive_fails=3  # 5 minutos
         )
 
-        # Estado del gestor
+        # Sesiones prestadas
         self.active_sessions: Dict[str, BrowserSession] = {}
         self.available_proxies: List[Dict[str, str]] = []
         self.proxy_fails: Dict[str, int] = {}
 
+        # Pool: un navegador por proxy y contextos calientes por navegador
+        self._playwright = None
+        self._browsers: Dict[str, Browser] = {}
+        self._idle: Dict[str, List[BrowserSession]] = {}
+        self._capacity = asyncio.Semaphore(self.browser_config.max_sessions)
+        self._warming: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()
+
         # Control de sesiones
         self.session_lock = asyncio.Lock()
         self.cleanup_task: Optional[asyncio.Task] = None
@@ -83,57 +103,147 @@ class BrowserManager:
         # Cargar proxies si están habilitados
         if self.proxy_config.enabled:
             await self._load_proxies()
+        else:
+            # Lanzar el navegador y preparar páginas por adelantado
+            self._schedule_warm(None)
 
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Cerrar gestor."""
-        # Cancelar tarea de limpieza
+        await self.close()
+
+    async def close(self) -> None:
+        """Cerrar contextos, navegadores y playwright."""
+        # Cancelar tareas de limpieza y precalentamiento
+        tasks = list(self._background)
         if self.cleanup_task:
-            self.cleanup_task.cancel()
+            tasks.append(self.cleanup_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.cleanup_task = None
 
         # Cerrar sesiones activas
-        for session in self.active_sessions.values():
-            await self._close_session(session.id)
+        for session_id in list(self.active_sessions):
+            await self._close_session(session_id)
+
+        async with self.session_lock:
+            idle = [s for sessions in self._idle.values() for s in sessions]
+            self._idle.clear()
+            browsers = list(self._browsers.values())
+            self._browsers.clear()
+
+        for session in idle:
+            await self._discard(session)
+        for browser in browsers:
+            try:
+                await browser.close()
+            except Exception as e:
+                self.logger.error(f"Error cerrando navegador: {e}")
+
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
 
     async def get_session(self, session_id: Optional[str] = None) -> BrowserSession:
         """
         Obtener sesión de navegador.
 
+        Sin `session_id` se presta un contexto nuevo del pool; si el pool
+        está completo se espera a que se devuelva uno. Devolverlo con
+        `release_session` (o usar `lease`).
+
         Args:
-            session_id: ID de sesión opcional
+            session_id: ID de una sesión prestada (None = prestar una nueva)
 
         Returns:
             Sesión de navegador
+
+        Raises:
+            KeyError: Si `session_id` no es una sesión prestada (devuelta,
+                expirada o inexistente)
         """
+        # Verificar sesión existente
+        if session_id is not None:
+            session = self.active_sessions.get(session_id)
+            if session is None:
+                raise KeyError(f"Sesión de navegador desconocida: {session_id}")
+            session.last_used = datetime.now()
+            return session
+
+        await self._capacity.acquire()
         try:
-            async with self.session_lock:
-                # Verificar sesión existente
-                if session_id and session_id in self.active_sessions:
-                    session = self.active_sessions[session_id]
-                    session.last_used = datetime.now()
-                    return session
-
-                # Verificar límite de sesiones
-                if len(self.active_sessions) >= self.browser_config.max_sessions:
-                    # Cerrar sesión más antigua
-                    oldest_session = min(
-                        self.active_sessions.values(), key=lambda s: s.last_used
-                    )
-                    await self._close_session(oldest_session.id)
-
-                # Crear nueva sesión
-                session = await self._create_session()
-                self.active_sessions[session.id] = session
+            proxy = await self._get_next_proxy() if self.proxy_config.enabled else None
+            session = await self._acquire_context(proxy)
 
-                # Actualizar métricas
-                BROWSER_SESSIONS.labels(browser_type=session.browser_type).inc()
+        except BaseException as e:
+            self._capacity.release()
+            self.logger.error(f"Error obteniendo sesión: {e}")
+            raise
 
-                return session
+        session.uses += 1
+        session.last_used = datetime.now()
+        self.active_sessions[session.id] = session
+
+        # Actualizar métricas
+        BROWSER_SESSIONS.labels(browser_type=session.browser_type).inc()
+
+        # Reponer páginas calientes en segundo plano
+        self._schedule_warm(proxy)
+
+        return session
+
+    async def release_session(self, session_id: str) -> None:
+        """
+        Devolver sesión al pool.
+
+        El contexto se limpia (cookies, permisos, página en blanco) y queda
+        disponible para otro préstamo; tras `max_context_uses` préstamos se
+        descarta para no acumular estado.
+
+        Args:
+            session_id: ID de sesión
+        """
+        session = self.active_sessions.pop(session_id, None)
+        if session is None:
+            return
+
+        BROWSER_SESSIONS.labels(browser_type=session.browser_type).dec()
+
+        try:
+            key = self._proxy_key(session.proxy)
+            idle = self._idle.setdefault(key, [])
+            if (
+                session.uses >= self.browser_config.max_context_uses
+                or len(idle) >= self.browser_config.warm_pages
+                or session.page.is_closed()
+                or self._browsers.get(key) is not session.browser
+            ):
+                await self._discard(session)
+                return
+
+            await session.context.clear_cookies()
+            await session.context.clear_permissions()
+            await session.page.goto("about:blank")
+            idle.append(session)
+            BROWSER_POOL_EVENTS.labels(event="recycle").inc()
 
         except Exception as e:
-            self.logger.error(f"Error obteniendo sesión: {e}")
-            raise
+            self.logger.warning(f"Error reciclando sesión {session_id}: {e}")
+            await self._discard(session)
+
+        finally:
+            self._capacity.release()
+
+    @asynccontextmanager
+    async def lease(self):
+        """Prestar una sesión y devolverla al salir del bloque."""
+        session = await self.get_session()
+        try:
+            yield session
+        finally:
+            await self.release_session(session.id)
 
     async def execute_action(
         self, session_id: str, action: str, params: Dict[str, Any]
@@ -151,34 +261,30 @@ class BrowserManager:
         """
         try:
             session = await self.get_session(session_id)
+            target = urlparse(params.get("url") or session.page.url).netloc or "browser"
+
+            async def recover(attempt: int, error: BaseException) -> None:
+                # Rotar proxy si es necesario
+                if self.proxy_config.enabled:
+                    await self._rotate_proxy(session)
+
+                # Reiniciar página
+                await session.page.reload()
+
+            # Ejecutar con la política de resiliencia del sitio
+            result = await get_resilience(
+                f"browser:{target}",
+                ResilienceConfig(max_attempts=self.browser_config.retry_attempts),
+            ).call(
+                # La página puede cambiar si se rota el proxy
+                lambda: self._execute_browser_action(session.page, action, params),
+                on_retry=recover,
+            )
 
-            # Ejecutar con reintentos
-            for attempt in range(self.browser_config.retry_attempts):
-                try:
-                    # Ejecutar acción
-                    result = await self._execute_browser_action(
-                        session.page, action, params
-                    )
-
-                    # Registrar éxito
-                    BROWSER_OPERATIONS.labels(
-                        operation_type=action, status="success"
-                    ).inc()
-
-                    return result
-
-                except Exception as e:
-                    if attempt == self.browser_config.retry_attempts - 1:
-                        raise
-
-                    # Rotar proxy si es necesario
-                    if self.proxy_config.enabled:
-                        await self._rotate_proxy(session)
-
-                    # Reiniciar página
-                    await session.page.reload()
+            # Registrar éxito
+            BROWSER_OPERATIONS.labels(operation_type=action, status="success").inc()
 
-            raise Exception("Max retry attempts reached")
+            return result
 
         except Exception as e:
             self.logger.error(f"Error ejecutando acción: {e}")
@@ -187,33 +293,49 @@ class BrowserManager:
 
             return AutomationResult(success=False, error=str(e))
 
-    async def _create_session(self) -> BrowserSession:
-        """Crear nueva sesión de navegador."""
-        try:
-            # Iniciar playwright
-            playwright = await async_playwright().start()
+    async def _acquire_context(
+        self, proxy: Optional[Dict[str, str]]
+    ) -> BrowserSession:
+        """Tomar un contexto caliente o crear uno en el navegador del proxy."""
+        key = self._proxy_key(proxy)
+
+        idle = self._idle.get(key)
+        while idle:
+            session = idle.pop()
+            if not session.page.is_closed():
+                BROWSER_POOL_EVENTS.labels(event="warm_hit").inc()
+                return session
+            await self._discard(session)
 
-            # Configurar proxy si está habilitado
-            proxy = await self._get_next_proxy() if self.proxy_config.enabled else None
+        BROWSER_POOL_EVENTS.labels(event="cold_start").inc()
+        return await self._create_session(proxy)
 
-            # Crear navegador
-            browser = await playwright.chromium.launch(proxy=proxy, headless=True)
+    async def _create_session(
+        self, proxy: Optional[Dict[str, str]] = None
+    ) -> BrowserSession:
+        """Crear contexto aislado y su página en el navegador del proxy."""
+        try:
+            browser = await self._get_browser(proxy)
 
             # Crear contexto y página
             context = await browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+                viewport=self.browser_config.viewport,
+                user_agent=self.browser_config.user_agent,
             )
 
+            # Bloquear recursos pesados
+            if self.browser_config.blocked_resources:
+                await context.route("**/*", self._route_request)
+
             page = await context.new_page()
 
             # Crear sesión
             return BrowserSession(
-                id=str(len(self.active_sessions) + 1),
+                id=uuid4().hex,
                 browser=browser,
                 context=context,
                 page=page,
-                browser_type="chromium",
+                browser_type=self.browser_config.browser_type,
                 proxy=proxy,
                 created_at=datetime.now(),
                 last_used=datetime.now(),
@@ -223,26 +345,88 @@ class BrowserManager:
             self.logger.error(f"Error creando sesión: {e}")
             raise
 
+    async def _get_browser(self, proxy: Optional[Dict[str, str]]) -> Browser:
+        """Obtener (o lanzar una única vez) el navegador de un proxy."""
+        key = self._proxy_key(proxy)
+
+        browser = self._browsers.get(key)
+        if browser and browser.is_connected():
+            return browser
+
+        async with self.session_lock:
+            browser = self._browsers.get(key)
+            if browser and browser.is_connected():
+                return browser
+
+            # Iniciar playwright
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+            launcher = getattr(self._playwright, self.browser_config.browser_type)
+            browser = await launcher.launch(
+                proxy=proxy, headless=self.browser_config.headless
+            )
+            self._browsers[key] = browser
+            self._idle[key] = []
+            BROWSER_POOL_EVENTS.labels(event="launch").inc()
+            self.logger.info(f"Navegador lanzado ({key})")
+
+            return browser
+
+    async def _route_request(self, route: Route) -> None:
+        """Abortar requests de recursos bloqueados."""
+        if route.request.resource_type in self.browser_config.blocked_resources:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def _schedule_warm(self, proxy: Optional[Dict[str, str]]) -> None:
+        """Programar reposición de páginas calientes (una por proxy a la vez)."""
+        key = self._proxy_key(proxy)
+        if key not in self._warming:
+            self._warming.add(key)
+            self._spawn(self._warm(key, proxy))
+
+    async def _warm(self, key: str, proxy: Optional[Dict[str, str]]) -> None:
+        """Reponer contextos calientes hasta `warm_pages`."""
+        try:
+            idle = self._idle.setdefault(key, [])
+            while len(idle) < self.browser_config.warm_pages:
+                session = await self._create_session(proxy)
+                if self._idle.get(key) is not idle:
+                    # El navegador se cerró mientras tanto
+                    await self._discard(session)
+                    return
+                idle.append(session)
+        finally:
+            self._warming.discard(key)
+
+    async def _discard(self, session: BrowserSession) -> None:
+        """Cerrar el contexto de una sesión."""
+        try:
+            await session.context.close()
+            BROWSER_POOL_EVENTS.labels(event="discard").inc()
+        except Exception as e:
+            self.logger.error(f"Error cerrando contexto: {e}")
+
     async def _close_session(self, session_id: str) -> None:
         """Cerrar sesión de navegador."""
         try:
             if session_id in self.active_sessions:
-                session = self.active_sessions[session_id]
+                session = self.active_sessions.pop(session_id)
 
-                # Cerrar navegador
-                await session.browser.close()
+                # Cerrar contexto (el navegador sigue en el pool)
+                await self._discard(session)
 
                 # Actualizar métricas
                 BROWSER_SESSIONS.labels(browser_type=session.browser_type).dec()
-
-                # Eliminar sesión
-                del self.active_sessions[session_id]
+                self._capacity.release()
 
         except Exception as e:
             self.logger.error(f"Error cerrando sesión: {e}")
 
     async def _cleanup_sessions(self) -> None:
-        """Limpiar sesiones inactivas."""
+        """Recuperar sesiones prestadas que quedaron sin uso."""
         try:
             while True:
                 await asyncio.sleep(60)  # Verificar cada minuto
@@ -296,7 +480,7 @@ class BrowserManager:
             return None
 
     async def _rotate_proxy(self, session: BrowserSession) -> None:
-        """Rotar proxy de sesión."""
+        """Mover la sesión a un contexto en el navegador del siguiente proxy."""
         try:
             if not self.proxy_config.enabled:
                 return
@@ -320,12 +504,23 @@ class BrowserManager:
             # Obtener nuevo proxy
             new_proxy = await self._get_next_proxy()
 
-            # Recrear sesión con nuevo proxy
-            new_session = await self._create_session()
+            # Transferir la sesión (mismo ID) a un contexto del nuevo proxy
+            replacement = await self._acquire_context(new_proxy)
+            old = BrowserSession(
+                id=session.id,
+                browser=session.browser,
+                context=session.context,
+                page=session.page,
+                proxy=session.proxy,
+            )
+
+            session.browser = replacement.browser
+            session.context = replacement.context
+            session.page = replacement.page
+            session.proxy = new_proxy
+            session.uses = 1
 
-            # Transferir estado
-            await self._close_session(session.id)
-            self.active_sessions[session.id] = new_session
+            await self._discard(old)
 
         except Exception as e:
             self.logger.error(f"Error rotando proxy: {e}")
@@ -346,17 +541,37 @@ class BrowserManager:
                 await page.type(params["selector"], params["text"])
 
             elif action == "extract":
-                data = await page.eval(
+                data = await page.eval_on_selector(
                     params["selector"], params.get("script", "el => el.textContent")
                 )
                 return AutomationResult(success=True, data=data)
 
+            elif action == "evaluate":
+                data = await page.evaluate(params["script"], params.get("arg"))
+                return AutomationResult(success=True, data=data)
+
             return AutomationResult(success=True)
 
         except Exception as e:
             self.logger.error(f"Error ejecutando acción: {e}")
             raise
 
+    def _proxy_key(self, proxy: Optional[Dict[str, str]]) -> str:
+        """Clave del navegador de un proxy."""
+        return proxy["server"] if proxy else DIRECT
+
+    def _spawn(self, coro) -> None:
+        """Lanzar tarea en segundo plano conservando la referencia."""
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        """Limpiar tarea finalizada."""
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            self.logger.warning(f"Error precalentando páginas: {task.exception()}")
+
 
 # Instancia global
 browser_manager = BrowserManager()
@@ -0,0 +1,182 @@
+"""
+Rate limiting asíncrono para colectores.
+
+Este módulo implementa:
+1. Ventana deslizante de llamadas por fuente
+2. Control de concurrencia
+3. Esperas sin bloquear el event loop
+4. Registro compartido de limitadores
+"""
+
+from typing import Deque, Dict, Optional
+from collections import deque
+import logging
+import asyncio
+from prometheus_client import Counter, Histogram
+
+from ..schemas import RateLimitConfig
+
+# Métricas
+RATE_LIMIT_WAITS = Counter(
+    "rate_limit_waits_total",
+    "Number of requests delayed by the rate limiter",
+    ["source"],
+)
+
+RATE_LIMIT_WAIT_TIME = Histogram(
+    "rate_limit_wait_seconds",
+    "Time spent waiting for a rate limit slot",
+    ["source"],
+    buckets=[0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0],
+)
+
+
+class AsyncRateLimiter:
+    """
+    Limitador de tasa nativo de asyncio.
+
+    Responsabilidades:
+    1. Respetar `calls` por `period` segundos
+    2. Limitar requests concurrentes
+    3. Esperar con asyncio.sleep en lugar de time.sleep
+
+    Los slots se cuentan cuando el request realmente se ejecuta (no al
+    crear la corrutina) y la concurrencia se libera al completarse.
+    """
+
+    def __init__(self, config: RateLimitConfig, name: str = "default"):
+        """
+        Inicializar limitador.
+
+        Args:
+            config: Configuración de rate limiting
+            name: Nombre de la fuente (para métricas y logs)
+        """
+        if config.calls <= 0 or config.period <= 0:
+            raise ValueError("calls y period deben ser positivos")
+
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.name = name
+
+        # Instantes (loop.time()) de las llamadas dentro de la ventana
+        self._calls: Deque[float] = deque()
+        self._lock = asyncio.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = (
+            asyncio.Semaphore(config.max_concurrent) if config.max_concurrent else None
+        )
+
+    async def __aenter__(self):
+        """Adquirir slot."""
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Liberar slot."""
+        self.release()
+
+    async def acquire(self) -> float:
+        """
+        Esperar hasta obtener un slot.
+
+        Returns:
+            Segundos esperados
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        if self._semaphore:
+            await self._semaphore.acquire()
+
+        try:
+            # El lock mantiene el orden FIFO entre los que esperan
+            async with self._lock:
+                while True:
+                    now = loop.time()
+                    self._evict(now)
+
+                    if len(self._calls) < self.config.calls:
+                        self._calls.append(now)
+                        break
+
+                    await asyncio.sleep(self._calls[0] + self.config.period - now)
+
+        except BaseException:
+            if self._semaphore:
+                self._semaphore.release()
+            raise
+
+        waited = loop.time() - start
+        if waited > 0.001:
+            RATE_LIMIT_WAITS.labels(source=self.name).inc()
+        RATE_LIMIT_WAIT_TIME.labels(source=self.name).observe(waited)
+
+        return waited
+
+    async def try_acquire(self) -> bool:
+        """
+        Tomar un slot solo si hay uno libre ahora, sin esperar.
+
+        Nunca se adelanta a quienes ya están esperando, de modo que el
+        tráfico opcional (p. ej. requests de cobertura) no quita turnos
+        al tráfico normal.
+
+        Returns:
+            True si se tomó el slot (liberarlo con `release()`)
+        """
+        if self._lock.locked():
+            return False
+        if self._semaphore and self._semaphore.locked():
+            return False
+
+        now = asyncio.get_running_loop().time()
+        self._evict(now)
+        if len(self._calls) >= self.config.calls:
+            return False
+
+        if self._semaphore:
+            # No bloquea: el semáforo tiene lugar y no hay await previo
+            await self._semaphore.acquire()
+        self._calls.append(now)
+        return True
+
+    def release(self) -> None:
+        """Liberar slot de concurrencia."""
+        if self._semaphore:
+            self._semaphore.release()
+
+    @property
+    def in_window(self) -> int:
+        """Número de llamadas dentro de la ventana actual."""
+        try:
+            self._evict(asyncio.get_running_loop().time())
+        except RuntimeError:
+            pass
+        return len(self._calls)
+
+    def _evict(self, now: float) -> None:
+        """Descartar llamadas fuera de la ventana."""
+        while self._calls and now - self._calls[0] >= self.config.period:
+            self._calls.popleft()
+
+
+# Limitadores por fuente
+_limiters: Dict[str, AsyncRateLimiter] = {}
+
+
+def get_rate_limiter(
+    name: str, config: Optional[RateLimitConfig] = None
+) -> AsyncRateLimiter:
+    """
+    Obtener limitador compartido para una fuente.
+
+    Args:
+        name: Nombre de la fuente
+        config: Configuración a usar si el limitador no existe
+
+    Returns:
+        Limitador de la fuente
+    """
+    if name not in _limiters:
+        _limiters[name] = AsyncRateLimiter(config or RateLimitConfig(), name=name)
+    return _limiters[name]
@@ -0,0 +1,140 @@
+"""
+Planes de extracción compilados.
+
+Este módulo implementa:
+1. Compilación de reglas de extracción a un único script JS
+2. Evaluación de todas las reglas en un solo `page.evaluate`
+3. Resultado estructurado (datos y errores por campo)
+4. Caché de planes por conjunto de reglas
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+from ...schemas import ExtractorRule
+
+# Script base: recibe las reglas como argumento y aplica cada extractor
+_PLAN_TEMPLATE = """(rules) => {
+  const extractors = [%s];
+  const data = {};
+  const errors = {};
+  rules.forEach((rule, i) => {
+    try {
+      if (rule.multiple) {
+        data[rule.name] = Array.from(
+          document.querySelectorAll(rule.selector), (el) => extractors[i](el)
+        );
+        return;
+      }
+      const el = document.querySelector(rule.selector);
+      if (el === null) {
+        errors[rule.name] = "selector sin coincidencias: " + rule.selector;
+        return;
+      }
+      data[rule.name] = extractors[i](el);
+    } catch (e) {
+      errors[rule.name] = String(e);
+    }
+  });
+  return { data, errors };
+}"""
+
+
+@dataclass
+class ExtractionOutcome:
+    """Resultado de evaluar un plan."""
+
+    data: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+class ExtractionPlan:
+    """
+    Reglas de extracción compiladas a un script.
+
+    Responsabilidades:
+    1. Validar reglas una sola vez
+    2. Generar el script que evalúa todas las reglas juntas
+    3. Ejecutarlo en una página en un único round trip
+    """
+
+    def __init__(self, rules: Sequence[ExtractorRule]):
+        """
+        Compilar plan.
+
+        Args:
+            rules: Reglas de extracción HTML
+
+        Raises:
+            ValueError: Si una regla no es aplicable a HTML
+        """
+        names = [rule.name for rule in rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Nombres de reglas duplicados")
+
+        for rule in rules:
+            if not rule.selector:
+                raise ValueError(f"Regla {rule.name} sin selector")
+            if not isinstance(rule.extractor, str):
+                raise ValueError(f"Regla {rule.name}: el extractor debe ser JS")
+
+        self.rules = list(rules)
+        self.script = _PLAN_TEMPLATE % ", ".join(
+            f"({rule.extractor})" for rule in self.rules
+        )
+        self.args: List[Dict[str, Any]] = [
+            {"name": rule.name, "selector": rule.selector, "multiple": rule.multiple}
+            for rule in self.rules
+        ]
+
+    async def run(self, page: Any) -> ExtractionOutcome:
+        """
+        Evaluar todas las reglas en la página.
+
+        Args:
+            page: Página de playwright
+
+        Returns:
+            Datos y errores por campo
+        """
+        result = await page.evaluate(self.script, self.args)
+        return self.parse(result)
+
+    @staticmethod
+    def parse(result: Any) -> ExtractionOutcome:
+        """Convertir la respuesta del script en un resultado estructurado."""
+        result = result or {}
+        return ExtractionOutcome(
+            data=result.get("data", {}), errors=result.get("errors", {})
+        )
+
+
+# Caché de planes por conjunto de reglas
+_plans: Dict[Tuple, ExtractionPlan] = {}
+_MAX_PLANS = 256
+
+
+def _plan_key(rules: Sequence[ExtractorRule]) -> Tuple:
+    return tuple(
+        (rule.name, rule.selector, repr(rule.extractor), rule.multiple)
+        for rule in rules
+    )
+
+
+def compile_plan(rules: Sequence[ExtractorRule]) -> ExtractionPlan:
+    """
+    Obtener el plan compilado de un conjunto de reglas.
+
+    Args:
+        rules: Reglas de extracción
+
+    Returns:
+        Plan (compilado una sola vez por conjunto de reglas)
+    """
+    key = _plan_key(rules)
+    plan = _plans.get(key)
+    if plan is None:
+        if len(_plans) >= _MAX_PLANS:
+            _plans.pop(next(iter(_plans)))
+        plan = _plans[key] = ExtractionPlan(rules)
+    return plan
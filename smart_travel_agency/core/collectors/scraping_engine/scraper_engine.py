@@ -19,8 +19,8 @@ from bs4 import BeautifulSoup
 
 from ...schemas import ScrapingConfig, ScrapingResult, DataValidator, ExtractorRule
 from ...metrics import get_metrics_collector
-from ..base_collector import BaseCollector
 from ..browser_automation.browser_manager import get_browser_manager
+from .extraction import compile_plan
 
 # Métricas
 SCRAPING_OPERATIONS = Counter(
@@ -54,7 +54,7 @@ class BaseScraper(ABC):
             config: Configuración de scraping
         """
         self.logger = logging.getLogger(__name__)
-        self.metrics = get_metrics_collector()
+        self.metrics = get_metrics_collector("scraper_engine")
 
         # Configuración por defecto
         self.config = config or ScrapingConfig(
@@ -111,10 +111,11 @@ class ScraperEngine:
     def __init__(self):
         """Inicializar motor."""
         self.logger = logging.getLogger(__name__)
-        self.metrics = get_metrics_collector()
+        self.metrics = get_metrics_collector("scraper_engine")
 
         # Registro de scrapers
         self.scrapers: Dict[str, Type[BaseScraper]] = {}
+        self._instances: Dict[str, BaseScraper] = {}
 
         # Cliente HTTP
         self.session: Optional[aiohttp.ClientSession] = None
@@ -142,6 +143,24 @@ class ScraperEngine:
             scraper_class: Clase del scraper
         """
         self.scrapers[name] = scraper_class
+        self._instances.pop(name, None)
+
+    def get_scraper(self, name: str) -> BaseScraper:
+        """
+        Obtener la instancia (única) de un scraper registrado.
+
+        Args:
+            name: Nombre del scraper
+
+        Returns:
+            Instancia del scraper
+        """
+        scraper = self._instances.get(name)
+        if scraper is None:
+            if name not in self.scrapers:
+                raise ValueError(f"Scraper {name} no encontrado")
+            scraper = self._instances[name] = self.scrapers[name]()
+        return scraper
 
     async def scrape(
         self,
@@ -166,11 +185,7 @@ class ScraperEngine:
             start_time = datetime.now()
 
             # Obtener scraper
-            if scraper_name not in self.scrapers:
-                raise ValueError(f"Scraper {scraper_name} no encontrado")
-
-            scraper_class = self.scrapers[scraper_name]
-            scraper = scraper_class()
+            scraper = self.get_scraper(scraper_name)
 
             # Extraer datos
             data = await scraper.extract_data(url, rules)
@@ -214,30 +229,34 @@ class HTMLScraper(BaseScraper):
                 # Obtener browser manager
                 browser_manager = await get_browser_manager()
 
-                # Crear sesión
-                session = await browser_manager.get_session()
+                # Plan compilado: todas las reglas en una sola evaluación
+                plan = compile_plan(rules)
 
-                # Navegar a URL
-                result = await browser_manager.execute_action(
-                    session.id, "navigate", {"url": url}
-                )
+                # Tomar un contexto del pool (se devuelve al terminar)
+                async with browser_manager.lease() as session:
+                    # Navegar a URL
+                    result = await browser_manager.execute_action(
+                        session.id, "navigate", {"url": url}
+                    )
 
-                if not result.success:
-                    raise Exception(result.error)
+                    if not result.success:
+                        raise Exception(result.error)
 
-                # Extraer datos según reglas
-                data = {}
-                for rule in rules:
+                    # Extraer datos según reglas
                     result = await browser_manager.execute_action(
                         session.id,
-                        "extract",
-                        {"selector": rule.selector, "script": rule.extractor},
+                        "evaluate",
+                        {"script": plan.script, "arg": plan.args},
                     )
 
-                    if result.success:
-                        data[rule.name] = result.data
+                    if not result.success:
+                        raise Exception(result.error)
+
+                    outcome = plan.parse(result.data)
+                    for name, error in outcome.errors.items():
+                        self.logger.warning(f"Regla {name} sin datos en {url}: {error}")
 
-                return data
+                    return outcome.data
 
         except Exception as e:
             self.logger.error(f"Error extrayendo HTML: {e}")
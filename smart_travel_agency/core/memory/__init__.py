@@ -0,0 +1,15 @@
+"""Servicio de costos y precios de mercado del core."""
+
+from .manager import (
+    LRUCache,
+    MemoryManager,
+    configure_memory_manager,
+    get_memory_manager,
+)
+
+__all__ = [
+    "LRUCache",
+    "MemoryManager",
+    "configure_memory_manager",
+    "get_memory_manager",
+]
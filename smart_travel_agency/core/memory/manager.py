@@ -0,0 +1,758 @@
+"""
+Servicio de costos y precios de mercado.
+
+Este módulo implementa:
+1. Lecturas agrupadas: los pedidos concurrentes de una misma tabla se
+   resuelven con una sola consulta IN (...)
+2. Caché LRU en proceso delante de SQLite (incluye IDs inexistentes)
+3. Persistencia en data/ de costos, márgenes recomendados y mercado
+4. Actualización de precios de mercado desde los deltas de proveedores
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Set
+import asyncio
+import json
+import logging
+import sqlite3
+
+from prometheus_client import Counter, Histogram
+
+from ..schemas import MemoryConfig
+from ..storage import ConnectionPool
+
+# Métricas
+MEMORY_LOOKUPS = Counter(
+    "memory_lookups_total", "Memory manager lookups", ["kind", "result"]
+)
+
+MEMORY_BATCH_SIZE = Histogram(
+    "memory_batch_size",
+    "Package IDs loaded per SQLite batch",
+    ["kind"],
+    buckets=[1, 5, 10, 50, 100, 500, 1000, 5000],
+)
+
+MEMORY_PRICE_UPDATES = Counter(
+    "memory_price_updates_total", "Market prices refreshed from provider deltas"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS package_costs (
+    package_id TEXT PRIMARY KEY,
+    base_cost TEXT NOT NULL,
+    additional_costs TEXT,
+    currency TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS package_margins (
+    package_id TEXT PRIMARY KEY,
+    recommended_margin REAL NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS market_prices (
+    package_id TEXT PRIMARY KEY,
+    provider_id TEXT,
+    avg_price TEXT,
+    min_price TEXT,
+    max_price TEXT,
+    last_price TEXT,
+    previous_price TEXT,
+    samples INTEGER NOT NULL DEFAULT 0,
+    avg_margin REAL,
+    demand_score REAL,
+    demand_trend REAL,
+    availability REAL,
+    quality_score REAL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+UPSERT_COSTS = """
+INSERT INTO package_costs
+    (package_id, base_cost, additional_costs, currency, updated_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(package_id) DO UPDATE SET
+    base_cost = excluded.base_cost,
+    additional_costs = excluded.additional_costs,
+    currency = excluded.currency,
+    updated_at = excluded.updated_at
+"""
+
+UPSERT_MARGINS = """
+INSERT INTO package_margins (package_id, recommended_margin, updated_at)
+VALUES (?, ?, ?)
+ON CONFLICT(package_id) DO UPDATE SET
+    recommended_margin = excluded.recommended_margin,
+    updated_at = excluded.updated_at
+"""
+
+# Solo pisa los atributos informados
+UPSERT_MARKET_DATA = """
+INSERT INTO market_prices (
+    package_id, avg_margin, demand_score, demand_trend, availability,
+    quality_score, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(package_id) DO UPDATE SET
+    avg_margin = COALESCE(excluded.avg_margin, avg_margin),
+    demand_score = COALESCE(excluded.demand_score, demand_score),
+    demand_trend = COALESCE(excluded.demand_trend, demand_trend),
+    availability = COALESCE(excluded.availability, availability),
+    quality_score = COALESCE(excluded.quality_score, quality_score),
+    updated_at = excluded.updated_at
+"""
+
+UPSERT_MARKET_PRICES = """
+INSERT INTO market_prices (
+    package_id, provider_id, avg_price, min_price, max_price, last_price,
+    previous_price, samples, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(package_id) DO UPDATE SET
+    provider_id = excluded.provider_id,
+    avg_price = excluded.avg_price,
+    min_price = excluded.min_price,
+    max_price = excluded.max_price,
+    last_price = excluded.last_price,
+    previous_price = excluded.previous_price,
+    samples = excluded.samples,
+    updated_at = excluded.updated_at
+"""
+
+# Tabla de cada tipo de dato
+TABLES = {
+    "cost": "package_costs",
+    "margin": "package_margins",
+    "market": "market_prices",
+}
+
+MARKET_ATTRIBUTES = (
+    "avg_margin",
+    "demand_score",
+    "demand_trend",
+    "availability",
+    "quality_score",
+)
+
+# Precisión con que se guarda el precio promedio (la misma del cálculo en lote)
+PRICE_QUANTUM = Decimal("0.0001")
+
+# IDs consultados sin resultado (se cachean para no volver a buscarlos)
+_MISSING = object()
+_UNCACHED = object()
+
+
+class LRUCache:
+    """Caché LRU acotada por cantidad de entradas."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Valor de `key` (lo marca como usado) o `default`."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Guardar valor, liberando los menos usados si se excede el tamaño."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class MemoryManager:
+    """
+    Servicio de datos de costos y mercado.
+
+    Responsabilidades:
+    1. Servir costos, márgenes recomendados y datos de mercado por lote
+    2. Juntar lecturas concurrentes en una consulta por tabla
+    3. Mantener caliente una LRU en proceso
+    4. Refrescar precios de mercado con los cambios de proveedores
+
+    Los valores devueltos se comparten con la caché: no deben modificarse.
+    """
+
+    def __init__(
+        self,
+        config: Optional[MemoryConfig] = None,
+        pool: Optional[ConnectionPool] = None,
+    ):
+        """
+        Inicializar servicio.
+
+        Args:
+            config: Configuración (None = valores por defecto)
+            pool: Pool SQLite a usar (None = uno propio sobre config.storage)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config = config or MemoryConfig()
+        self.pool = pool or ConnectionPool(self.config.storage)
+
+        self._cache = LRUCache(self.config.cache_size)
+        self._schema_ready = False
+        self._schema_lock = asyncio.Lock()
+
+        # Lote en espera por tipo: IDs y futuro con el resultado del lote
+        self._pending_ids: Dict[str, Set[str]] = {kind: set() for kind in TABLES}
+        self._pending_batch: Dict[str, Optional[asyncio.Future]] = {
+            kind: None for kind in TABLES
+        }
+        # IDs ya consultados cuyo lote todavía no terminó
+        self._inflight: Dict[str, Dict[str, asyncio.Future]] = {
+            kind: {} for kind in TABLES
+        }
+        # Cambia con cada escritura: un lote leído durante una escritura
+        # no se cachea
+        self._generation: Dict[str, int] = {kind: 0 for kind in TABLES}
+        self._flushes: Set[asyncio.Task] = set()
+
+        # Datos aislados por sesión (solo en memoria)
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+
+        # ProviderService cuyos cambios de precios se escuchan
+        self._subscriptions: List[Any] = []
+
+    async def initialize(self) -> None:
+        """Asegurar las tablas del servicio."""
+        if self._schema_ready:
+            return
+        async with self._schema_lock:
+            if not self._schema_ready:
+                await self.pool.run(
+                    lambda conn: conn.executescript(SCHEMA), operation="memory_schema"
+                )
+                self._schema_ready = True
+
+    async def close(self) -> None:
+        """Dejar de escuchar proveedores, esperar lotes y cerrar el pool."""
+        for provider_service in list(self._subscriptions):
+            self.unsubscribe(provider_service)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.pool.close()
+
+    # Lecturas en lote
+
+    async def get_package_costs_bulk(
+        self, package_ids: Iterable[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Costos de varios paquetes.
+
+        Args:
+            package_ids: IDs de los paquetes
+
+        Returns:
+            {package_id: {"base_cost", "additional_costs", "currency"}};
+            los paquetes sin costo registrado se omiten
+        """
+        return await self._load("cost", package_ids)
+
+    async def get_recommended_margins(
+        self, package_ids: Iterable[str]
+    ) -> Dict[str, float]:
+        """Margen recomendado por paquete (se omiten los que no tienen)."""
+        return await self._load("margin", package_ids)
+
+    async def get_market_data(
+        self, package_ids: Iterable[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Datos de mercado de varios paquetes.
+
+        Returns:
+            {package_id: {"avg_price", "min_market_price", "max_market_price",
+            "last_price", "samples", "avg_margin", "demand_score",
+            "high_demand", "availability", "quality_score", "updated_at"}}
+        """
+        records = await self._load("market", package_ids)
+        threshold = self.config.high_demand_threshold
+        return {
+            package_id: {
+                "avg_price": record["avg_price"],
+                "min_market_price": record["min_price"],
+                "max_market_price": record["max_price"],
+                "last_price": record["last_price"],
+                "samples": record["samples"],
+                "avg_margin": record["avg_margin"],
+                "demand_score": record["demand_score"],
+                "high_demand": (record["demand_score"] or 0.0) >= threshold,
+                "availability": record["availability"],
+                "quality_score": record["quality_score"],
+                "updated_at": record["updated_at"],
+            }
+            for package_id, record in records.items()
+        }
+
+    async def get_market_prices(
+        self, package_ids: Iterable[str]
+    ) -> Dict[str, Decimal]:
+        """Precio promedio de mercado por paquete."""
+        records = await self._load("market", package_ids)
+        return {
+            package_id: record["avg_price"]
+            for package_id, record in records.items()
+            if record["avg_price"] is not None
+        }
+
+    async def get_market_trends(
+        self, package_ids: Iterable[str]
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Tendencias por paquete.
+
+        price_trend es el desvío del último precio respecto del promedio
+        (fracción); demand_trend es el informado con update_market_data.
+        """
+        records = await self._load("market", package_ids)
+        trends = {}
+        for package_id, record in records.items():
+            avg_price, last_price = record["avg_price"], record["last_price"]
+            if not avg_price or last_price is None:
+                continue
+            trends[package_id] = {
+                "price_trend": float((last_price - avg_price) / avg_price),
+                "demand_trend": record["demand_trend"] or 0.0,
+            }
+        return trends
+
+    async def get_packages_availability(
+        self, package_ids: Iterable[str]
+    ) -> Dict[str, float]:
+        """Disponibilidad (0 a 1) por paquete."""
+        records = await self._load("market", package_ids)
+        return {
+            package_id: record["availability"]
+            for package_id, record in records.items()
+            if record["availability"] is not None
+        }
+
+    async def get_quality_data(
+        self, package_ids: Iterable[str]
+    ) -> Dict[str, Dict[str, float]]:
+        """Puntaje de calidad por paquete."""
+        records = await self._load("market", package_ids)
+        return {
+            package_id: {"score": record["quality_score"]}
+            for package_id, record in records.items()
+            if record["quality_score"] is not None
+        }
+
+    # Lecturas individuales (se agrupan con las concurrentes)
+
+    async def get_package_costs(self, package_id: str) -> Optional[Dict[str, Any]]:
+        """Costos de un paquete o None."""
+        return (await self._load("cost", [package_id])).get(package_id)
+
+    async def get_recommended_margin(self, package_id: str) -> Optional[float]:
+        """Margen recomendado de un paquete o None."""
+        return (await self._load("margin", [package_id])).get(package_id)
+
+    # Escrituras en lote
+
+    async def set_package_costs(self, costs: Mapping[str, Mapping[str, Any]]) -> int:
+        """
+        Guardar costos.
+
+        Args:
+            costs: {package_id: {"base_cost", "additional_costs"?, "currency"?}}
+
+        Returns:
+            Paquetes guardados
+        """
+        now = datetime.now().isoformat(sep=" ")
+        rows = [
+            (
+                str(package_id),
+                _money(data["base_cost"]),
+                json.dumps({
+                    name: _money(value)
+                    for name, value in (data.get("additional_costs") or {}).items()
+                }),
+                data.get("currency"),
+                now,
+            )
+            for package_id, data in costs.items()
+        ]
+        return await self._write("cost", UPSERT_COSTS, rows)
+
+    async def set_recommended_margins(self, margins: Mapping[str, float]) -> int:
+        """Guardar márgenes recomendados ({package_id: margen})."""
+        now = datetime.now().isoformat(sep=" ")
+        rows = [
+            (str(package_id), float(margin), now)
+            for package_id, margin in margins.items()
+        ]
+        return await self._write("margin", UPSERT_MARGINS, rows)
+
+    async def update_market_data(self, data: Mapping[str, Mapping[str, Any]]) -> int:
+        """
+        Actualizar atributos de mercado.
+
+        Solo se modifican los atributos presentes (avg_margin, demand_score,
+        demand_trend, availability, quality_score); los precios se
+        actualizan con record_market_prices.
+        """
+        now = datetime.now().isoformat(sep=" ")
+        rows = [
+            (
+                str(package_id),
+                *(_ratio(values.get(name)) for name in MARKET_ATTRIBUTES),
+                now,
+            )
+            for package_id, values in data.items()
+        ]
+        return await self._write("market", UPSERT_MARKET_DATA, rows)
+
+    async def record_market_prices(
+        self, prices: Mapping[str, Any], provider_id: Optional[str] = None
+    ) -> int:
+        """
+        Registrar precios observados.
+
+        El promedio es móvil sobre las últimas `market_window` observaciones
+        (aproximado sin guardar la serie); mínimo y máximo son los del
+        histórico observado.
+
+        Args:
+            prices: {package_id: precio}
+            provider_id: Proveedor que informó los precios
+
+        Returns:
+            Paquetes actualizados
+        """
+        observed = {
+            str(package_id): Decimal(str(price))
+            for package_id, price in prices.items()
+        }
+        window = self.config.market_window
+        now = datetime.now().isoformat(sep=" ")
+        chunk_size = self.config.max_batch
+
+        def rows(conn: sqlite3.Connection) -> List[tuple]:
+            ids = list(observed)
+            current = {}
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start:start + chunk_size]
+                for row in _select(conn, "market", chunk):
+                    current[row["package_id"]] = row
+
+            result = []
+            for package_id, price in observed.items():
+                row = current.get(package_id)
+                samples = row["samples"] if row else 0
+                avg = _decimal(row["avg_price"]) if row else None
+                low = _decimal(row["min_price"]) if row else None
+                high = _decimal(row["max_price"]) if row else None
+                if avg is None:
+                    avg = price
+                else:
+                    avg += (price - avg) / min(samples + 1, window)
+                result.append((
+                    package_id,
+                    provider_id,
+                    str(avg.quantize(PRICE_QUANTUM)),
+                    str(price if low is None else min(low, price)),
+                    str(price if high is None else max(high, price)),
+                    str(price),
+                    row["last_price"] if row else None,
+                    samples + 1,
+                    now,
+                ))
+            return result
+
+        count = await self._write("market", UPSERT_MARKET_PRICES, rows)
+        MEMORY_PRICE_UPDATES.inc(count)
+        return count
+
+    # Actualización desde proveedores
+
+    def subscribe(self, provider_service: Any) -> None:
+        """Escuchar los cambios de precios de un ProviderService."""
+        if provider_service in self._subscriptions:
+            return
+        provider_service.add_price_listener(self.on_price_update)
+        self._subscriptions.append(provider_service)
+
+    def unsubscribe(self, provider_service: Any) -> None:
+        """Dejar de escuchar a un ProviderService."""
+        if provider_service in self._subscriptions:
+            provider_service.remove_price_listener(self.on_price_update)
+            self._subscriptions.remove(provider_service)
+
+    async def on_price_update(self, provider_id: str, delta: Any) -> None:
+        """
+        Aplicar un delta de precios (PriceDelta) de un proveedor.
+
+        Los ítems cambiados actualizan el mercado y los eliminados quedan
+        sin disponibilidad.
+        """
+        if delta.changed:
+            await self.record_market_prices(delta.changed, provider_id)
+        if delta.removed:
+            await self.update_market_data(
+                {item_id: {"availability": 0.0} for item_id in delta.removed}
+            )
+
+    # Datos de sesión
+
+    async def get_session_data(self, session_id: str) -> Dict[str, Any]:
+        """Datos aislados de una sesión ({package_id: cambios})."""
+        return dict(self._sessions.get(session_id, {}))
+
+    def set_session_data(self, session_id: str, data: Mapping[str, Any]) -> None:
+        """Reemplazar los datos aislados de una sesión."""
+        self._sessions[session_id] = dict(data)
+
+    def clear_session_data(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    # Carga agrupada
+
+    async def _load(self, kind: str, package_ids: Iterable[str]) -> Dict[str, Any]:
+        """
+        Valores de `package_ids` (primero la LRU, luego SQLite).
+
+        Los IDs que faltan se suman al lote en espera del tipo, que se
+        consulta tras `batch_window`; los que ya están en un lote en curso
+        esperan ese lote. Se omiten los IDs sin datos.
+        """
+        found: Dict[str, Any] = {}
+        batches: Dict[int, asyncio.Future] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        inflight = self._inflight[kind]
+        pending = self._pending_ids[kind]
+
+        for package_id in package_ids:
+            if package_id in found or package_id in waiting:
+                continue
+            value = self._cache.get((kind, package_id), _UNCACHED)
+            if value is _UNCACHED:
+                future = inflight.get(package_id)
+                if future is None:
+                    future = self._pending_future(kind)
+                    pending.add(package_id)
+                waiting[package_id] = future
+                batches[id(future)] = future
+            elif value is not _MISSING:
+                found[package_id] = value
+
+        if found:
+            MEMORY_LOOKUPS.labels(kind=kind, result="hit").inc(len(found))
+        if not waiting:
+            return found
+        MEMORY_LOOKUPS.labels(kind=kind, result="miss").inc(len(waiting))
+
+        # shield: cancelar a un llamador no cancela el lote de los demás
+        results = {
+            key: await asyncio.shield(future) for key, future in batches.items()
+        }
+        for package_id, future in waiting.items():
+            value = results[id(future)].get(package_id, _MISSING)
+            if value is not _MISSING:
+                found[package_id] = value
+        return found
+
+    def _pending_future(self, kind: str) -> asyncio.Future:
+        """Futuro del lote en espera, programando su consulta si es nuevo."""
+        future = self._pending_batch[kind]
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending_batch[kind] = loop.create_future()
+            loop.call_later(self.config.batch_window, self._start_flush, kind)
+        return future
+
+    def _start_flush(self, kind: str) -> None:
+        task = asyncio.ensure_future(self._flush(kind))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, kind: str) -> None:
+        """Consultar el lote en espera de un tipo."""
+        ids = list(self._pending_ids[kind])
+        future = self._pending_batch[kind]
+        self._pending_ids[kind] = set()
+        self._pending_batch[kind] = None
+        if future is None:
+            return
+
+        inflight = self._inflight[kind]
+        for package_id in ids:
+            inflight[package_id] = future
+        generation = self._generation[kind]
+        MEMORY_BATCH_SIZE.labels(kind=kind).observe(len(ids))
+
+        try:
+            await self.initialize()
+            rows = await self.pool.run(
+                _select_chunks, kind, ids, self.config.max_batch,
+                operation=f"memory_{kind}",
+            )
+            values = {row["package_id"]: _decode(kind, row) for row in rows}
+        except Exception as e:
+            self.logger.error(f"Error cargando {kind} de {len(ids)} paquetes: {e}")
+            future.set_exception(e)
+            # Todos los llamadores esperan el lote; evita el aviso de asyncio
+            future.exception()
+        else:
+            if self._generation[kind] == generation:
+                for package_id in ids:
+                    self._cache.put(
+                        (kind, package_id), values.get(package_id, _MISSING)
+                    )
+            future.set_result(values)
+        finally:
+            for package_id in ids:
+                if inflight.get(package_id) is future:
+                    del inflight[package_id]
+
+    async def _write(self, kind: str, sql: str, rows: Any) -> int:
+        """
+        Ejecutar un upsert en bloque y refrescar la LRU con lo guardado.
+
+        Args:
+            kind: Tipo de dato
+            sql: Sentencia para executemany
+            rows: Filas, o función que las calcula dentro de la transacción
+
+        Returns:
+            Filas escritas
+        """
+        if not rows:
+            return 0
+        await self.initialize()
+        chunk_size = self.config.max_batch
+
+        def write(conn: sqlite3.Connection) -> Dict[str, Any]:
+            params = rows(conn) if callable(rows) else rows
+            conn.executemany(sql, params)
+            ids = [row[0] for row in params]
+            return {
+                row["package_id"]: _decode(kind, row)
+                for row in _select_chunks(conn, kind, ids, chunk_size)
+            }
+
+        self._generation[kind] += 1
+        try:
+            saved = await self.pool.run(
+                write, write=True, operation=f"memory_write_{kind}"
+            )
+        finally:
+            self._generation[kind] += 1
+
+        for package_id, value in saved.items():
+            self._cache.put((kind, package_id), value)
+        return len(saved)
+
+
+def _select(conn: sqlite3.Connection, kind: str, ids: List[str]) -> List[sqlite3.Row]:
+    placeholders = ",".join("?" * len(ids))
+    return conn.execute(
+        f"SELECT * FROM {TABLES[kind]} WHERE package_id IN ({placeholders})", ids
+    ).fetchall()
+
+
+def _select_chunks(
+    conn: sqlite3.Connection, kind: str, ids: List[str], chunk_size: int
+) -> List[sqlite3.Row]:
+    """Filas de `ids` en consultas de a `chunk_size` parámetros."""
+    rows: List[sqlite3.Row] = []
+    for start in range(0, len(ids), chunk_size):
+        rows.extend(_select(conn, kind, ids[start:start + chunk_size]))
+    return rows
+
+
+def _decode(kind: str, row: sqlite3.Row) -> Any:
+    """Fila como valor de la caché."""
+    if kind == "cost":
+        additional = json.loads(row["additional_costs"] or "{}")
+        return {
+            "base_cost": Decimal(row["base_cost"]),
+            "additional_costs": {
+                name: Decimal(value) for name, value in additional.items()
+            },
+            "currency": row["currency"],
+        }
+    if kind == "margin":
+        return row["recommended_margin"]
+    return {
+        "provider_id": row["provider_id"],
+        "avg_price": _decimal(row["avg_price"]),
+        "min_price": _decimal(row["min_price"]),
+        "max_price": _decimal(row["max_price"]),
+        "last_price": _decimal(row["last_price"]),
+        "samples": row["samples"],
+        **{name: row[name] for name in MARKET_ATTRIBUTES},
+        "updated_at": row["updated_at"],
+    }
+
+
+def _money(value: Any) -> str:
+    """Importe guardado como texto para no perder precisión."""
+    return str(Decimal(str(value)))
+
+
+def _decimal(value: Optional[str]) -> Optional[Decimal]:
+    return Decimal(value) if value is not None else None
+
+
+def _ratio(value: Any) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+# Instancia global
+_memory_manager: Optional[MemoryManager] = None
+
+
+def configure_memory_manager(
+    config: Optional[MemoryConfig] = None, pool: Optional[ConnectionPool] = None
+) -> MemoryManager:
+    """
+    Reemplazar la instancia compartida.
+
+    Los ProviderService que escuchaba la instancia anterior pasan a
+    notificar a la nueva.
+
+    Args:
+        config: Configuración
+        pool: Pool SQLite
+
+    Returns:
+        Nueva instancia compartida
+    """
+    global _memory_manager
+    previous = _memory_manager
+    _memory_manager = MemoryManager(config, pool)
+    if previous is not None:
+        for provider_service in list(previous._subscriptions):
+            previous.unsubscribe(provider_service)
+            _memory_manager.subscribe(provider_service)
+    return _memory_manager
+
+
+def get_memory_manager() -> MemoryManager:
+    """Obtener la instancia compartida del servicio."""
+    global _memory_manager
+    if _memory_manager is None:
+        _memory_manager = MemoryManager()
+    return _memory_manager
@@ -0,0 +1,233 @@
+"""
+Deduplicación de ofertas entre proveedores.
+
+Este módulo implementa:
+1. Normalización y huella (fingerprint) de vuelos, alojamientos y actividades
+2. Índice hash por huella para agrupar la misma oferta de varios proveedores
+3. Selección de la mejor oferta por huella y registro de alternativas
+4. Fusión de resultados de búsqueda en un conjunto de candidatos limpio
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+import logging
+import re
+import unicodedata
+from prometheus_client import Counter
+
+from ..schemas import Accommodation, Activity, Flight
+
+# Métricas
+DUPLICATE_OFFERS = Counter(
+    "provider_duplicate_offers_total",
+    "Offers merged into an existing fingerprint",
+    ["kind"],
+)
+
+logger = logging.getLogger(__name__)
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+# Prefijo IATA/ICAO opcional (con al menos una letra) + número + sufijo
+_FLIGHT_NUMBER = re.compile(r"^(?:[A-Z]{2,3}|[A-Z]\d|\d[A-Z])?(\d+)([A-Z]?)$")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Minúsculas, sin acentos ni signos."""
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return _NON_ALNUM.sub("", value.casefold())
+
+
+def normalize_flight_number(flight_number: str) -> str:
+    """
+    Número de vuelo sin prefijo de aerolínea ni ceros a la izquierda.
+
+    "AR 1132", "ar1132" y "1132" se normalizan a "1132".
+    """
+    compact = re.sub(r"[\s\-]", "", (flight_number or "").upper())
+    match = _FLIGHT_NUMBER.match(compact)
+    if not match:
+        return compact
+    return f"{int(match.group(1))}{match.group(2)}"
+
+
+def normalize_time(value: datetime) -> datetime:
+    """Instante en UTC truncado al minuto."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(second=0, microsecond=0)
+
+
+def flight_fingerprint(flight: Flight) -> Tuple:
+    """Huella de un vuelo: aerolínea, número y salida."""
+    return (
+        "flight",
+        normalize_text(flight.airline),
+        normalize_flight_number(flight.flight_number),
+        normalize_time(flight.departure_time),
+    )
+
+
+def accommodation_fingerprint(accommodation: Accommodation) -> Tuple:
+    """Huella de un alojamiento: hotel, habitación y fechas."""
+    return (
+        "accommodation",
+        normalize_text(accommodation.name),
+        normalize_text(accommodation.room_type),
+        accommodation.check_in.date(),
+        accommodation.check_out.date(),
+    )
+
+
+def activity_fingerprint(activity: Activity) -> Tuple:
+    """Huella de una actividad: nombre y fecha."""
+    return ("activity", normalize_text(activity.name), normalize_time(activity.date))
+
+
+def offer_price(offer: Any) -> Decimal:
+    """Precio total comparable de una oferta."""
+    if isinstance(offer, Accommodation):
+        return offer.price_per_night * offer.nights
+    return offer.price
+
+
+@dataclass
+class MergedOffer:
+    """Oferta ganadora de una huella y sus alternativas."""
+
+    fingerprint: Tuple
+    best: Any
+    alternatives: List[Any] = field(default_factory=list)
+
+    @property
+    def providers(self) -> List[str]:
+        """Proveedores que ofrecen el ítem (el ganador primero)."""
+        return [self.best.provider] + [alt.provider for alt in self.alternatives]
+
+
+class OfferIndex:
+    """
+    Índice hash de ofertas por huella.
+
+    Responsabilidades:
+    1. Agrupar ofertas equivalentes en O(1) por oferta
+    2. Conservar la mejor (menor precio en la misma moneda)
+    3. Registrar el resto como alternativas
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        fingerprint: Callable[[Any], Hashable],
+        price: Callable[[Any], Decimal] = offer_price,
+    ):
+        """
+        Inicializar índice.
+
+        Args:
+            kind: Tipo de oferta (para métricas)
+            fingerprint: Función de huella
+            price: Precio comparable de una oferta
+        """
+        self.kind = kind
+        self._fingerprint = fingerprint
+        self._price = price
+        self._offers: Dict[Hashable, MergedOffer] = {}
+
+    def add(self, offer: Any) -> MergedOffer:
+        """
+        Agregar una oferta.
+
+        Ofertas en otra moneda que la ganadora no se comparan (no hay
+        conversión aquí) y quedan como alternativas.
+        """
+        key = self._fingerprint(offer)
+        merged = self._offers.get(key)
+        if merged is None:
+            merged = self._offers[key] = MergedOffer(fingerprint=key, best=offer)
+            return merged
+
+        DUPLICATE_OFFERS.labels(kind=self.kind).inc()
+        best = merged.best
+        if offer.currency == best.currency and self._price(offer) < self._price(best):
+            merged.alternatives.append(best)
+            merged.best = offer
+        else:
+            merged.alternatives.append(offer)
+        return merged
+
+    def extend(self, offers: Iterable[Any]) -> None:
+        """Agregar varias ofertas."""
+        for offer in offers:
+            self.add(offer)
+
+    def best(self) -> List[Any]:
+        """Mejor oferta de cada huella, en orden de aparición."""
+        return [merged.best for merged in self._offers.values()]
+
+    def merged(self) -> List[MergedOffer]:
+        """Grupos con más de un proveedor."""
+        return [merged for merged in self._offers.values() if merged.alternatives]
+
+    def __len__(self) -> int:
+        return len(self._offers)
+
+
+@dataclass
+class DedupResult:
+    """Candidatos deduplicados entre proveedores."""
+
+    flights: List[Flight] = field(default_factory=list)
+    accommodations: List[Accommodation] = field(default_factory=list)
+    activities: List[Activity] = field(default_factory=list)
+    merged: List[MergedOffer] = field(default_factory=list)
+    input_count: int = 0
+
+    @property
+    def removed(self) -> int:
+        """Ofertas duplicadas descartadas."""
+        return self.input_count - (
+            len(self.flights) + len(self.accommodations) + len(self.activities)
+        )
+
+
+def deduplicate_results(results: Iterable[Any]) -> DedupResult:
+    """
+    Fusionar resultados de varios proveedores.
+
+    Args:
+        results: Objetos con `flights`, `accommodations` y `activities`
+            (p. ej. SearchResult)
+
+    Returns:
+        Mejor oferta por huella y grupos fusionados
+    """
+    indexes = {
+        "flights": OfferIndex("flight", flight_fingerprint),
+        "accommodations": OfferIndex("accommodation", accommodation_fingerprint),
+        "activities": OfferIndex("activity", activity_fingerprint),
+    }
+
+    input_count = 0
+    for result in results:
+        for attr, index in indexes.items():
+            offers = getattr(result, attr, None) or []
+            input_count += len(offers)
+            index.extend(offers)
+
+    dedup = DedupResult(
+        flights=indexes["flights"].best(),
+        accommodations=indexes["accommodations"].best(),
+        activities=indexes["activities"].best(),
+        merged=[m for index in indexes.values() for m in index.merged()],
+        input_count=input_count,
+    )
+    if dedup.removed:
+        logger.info(
+            f"Deduplicación: {dedup.removed} de {input_count} ofertas repetidas"
+        )
+    return dedup
@@ -0,0 +1,223 @@
+"""
+Requests de cobertura (hedging) para recortar la cola de latencia.
+
+Este módulo implementa:
+1. Histogramas de latencia por proveedor (ventana deslizante)
+2. Demora de cobertura derivada del percentil observado (p95)
+3. Request duplicado solo si el rate limiter tiene cupo libre
+4. Primera respuesta exitosa gana; la otra se cancela
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+import asyncio
+import logging
+import math
+import time
+from prometheus_client import Counter, Histogram
+
+# Métricas
+PROVIDER_LATENCY = Histogram(
+    "provider_request_latency_seconds",
+    "Observed provider request latency",
+    ["provider"],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0],
+)
+
+HEDGED_REQUESTS = Counter(
+    "provider_hedged_requests_total",
+    "Number of hedging decisions",
+    ["provider", "result"],
+)
+
+logger = logging.getLogger(__name__)
+
+# Métodos seguros de duplicar
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@dataclass
+class HedgingConfig:
+    """Configuración de hedging por proveedor."""
+
+    enabled: bool = True
+    percentile: float = 0.95
+    min_samples: int = 20  # sin historial suficiente no se cubre
+    window: int = 256  # muestras recientes consideradas
+    min_delay: float = 0.05
+    max_delay: float = 10.0
+
+
+class LatencyTracker:
+    """Histograma de latencias recientes de un proveedor."""
+
+    def __init__(self, name: str, window: int = 256, recompute_every: int = 16):
+        """
+        Inicializar tracker.
+
+        Args:
+            name: Nombre del proveedor
+            window: Cantidad de muestras recientes a conservar
+            recompute_every: Observaciones entre recálculos de percentiles
+        """
+        self.name = name
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._recompute_every = recompute_every
+        self._since_sort = 0
+        self._sorted: list = []
+
+    def observe(self, seconds: float) -> None:
+        """Registrar una latencia."""
+        self._samples.append(seconds)
+        self._since_sort += 1
+        PROVIDER_LATENCY.labels(provider=self.name).observe(seconds)
+
+    @property
+    def count(self) -> int:
+        """Muestras en la ventana."""
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Percentil de la ventana (None sin muestras).
+
+        Args:
+            q: Percentil entre 0 y 1
+        """
+        if not self._samples:
+            return None
+
+        if self._since_sort >= self._recompute_every or not self._sorted:
+            self._sorted = sorted(self._samples)
+            self._since_sort = 0
+
+        index = min(math.ceil(q * len(self._sorted)) - 1, len(self._sorted) - 1)
+        return self._sorted[max(index, 0)]
+
+
+class Hedger:
+    """
+    Política de hedging de un proveedor.
+
+    Responsabilidades:
+    1. Medir latencias por proveedor
+    2. Lanzar un duplicado cuando el original supera el p95
+    3. Respetar el cupo del rate limiter
+    """
+
+    def __init__(self, name: str, config: Optional[HedgingConfig] = None):
+        """
+        Inicializar política.
+
+        Args:
+            name: Nombre del proveedor
+            config: Configuración
+        """
+        self.name = name
+        self.config = config or HedgingConfig()
+        self.tracker = LatencyTracker(name, self.config.window)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Demora antes de cubrir, o None si no corresponde cubrir."""
+        if not self.config.enabled or self.tracker.count < self.config.min_samples:
+            return None
+
+        delay = self.tracker.percentile(self.config.percentile)
+        return min(max(delay, self.config.min_delay), self.config.max_delay)
+
+    async def run(
+        self,
+        attempt: Callable[[], Awaitable[Any]],
+        hedge: Optional[Callable[[], Awaitable[Any]]] = None,
+        limiter: Any = None,
+    ) -> Any:
+        """
+        Ejecutar un request con cobertura opcional.
+
+        Args:
+            attempt: Request original (toma su propio slot de rate limit)
+            hedge: Request duplicado (corre con el slot ya tomado);
+                por defecto el mismo `attempt`
+            limiter: Objeto con `try_acquire()`/`release()` que acota los
+                duplicados (p. ej. AsyncRateLimiter)
+
+        Returns:
+            Resultado del primer request exitoso
+        """
+        primary = asyncio.ensure_future(self._timed(attempt))
+        backup: Optional[asyncio.Future] = None
+
+        try:
+            delay = self.hedge_delay()
+            if delay is None:
+                return await primary
+
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            if limiter is not None and not await limiter.try_acquire():
+                HEDGED_REQUESTS.labels(provider=self.name, result="no_budget").inc()
+                return await primary
+
+            backup = asyncio.ensure_future(self._timed(hedge or attempt))
+            if limiter is not None:
+                backup.add_done_callback(lambda _: limiter.release())
+            HEDGED_REQUESTS.labels(provider=self.name, result="sent").inc()
+
+            pending = {primary, backup}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Ante empate gana el original
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if task.exception() is None:
+                        if task is backup:
+                            HEDGED_REQUESTS.labels(
+                                provider=self.name, result="won"
+                            ).inc()
+                        return task.result()
+                    error = error or task.exception()
+
+            raise error
+
+        finally:
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _timed(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Ejecutar registrando la latencia de los requests exitosos."""
+        start = time.monotonic()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            # Perdedor cancelado: su demora es una cota inferior de la real
+            self.tracker.observe(time.monotonic() - start)
+            raise
+        self.tracker.observe(time.monotonic() - start)
+        return result
+
+
+# Registro global por proveedor
+_hedgers: Dict[str, Hedger] = {}
+
+
+def get_hedger(name: str, config: Optional[HedgingConfig] = None) -> Hedger:
+    """
+    Obtener la política de hedging compartida de un proveedor.
+
+    Args:
+        name: Nombre del proveedor
+        config: Configuración (solo se usa al crearla)
+
+    Returns:
+        Política del proveedor
+    """
+    hedger = _hedgers.get(name)
+    if hedger is None:
+        hedger = _hedgers[name] = Hedger(name, config)
+    return hedger
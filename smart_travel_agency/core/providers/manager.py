@@ -18,6 +18,7 @@ from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry
 
 from .scrapers import OlaScraper, AeroScraper, ScraperError
 from .scrapers.config import OlaScraperConfig, AeroScraperConfig
+from .session_pool import ProviderSessionPool
 from ..schemas import Flight, Accommodation, Activity
 
 # Crear un registro único para las métricas
@@ -89,6 +90,7 @@ class ProviderIntegrationManager:
         self.initialized = False
         self.scrapers: Dict[str, Union[OlaScraper, AeroScraper]] = {}
         self.scraper_configs: Dict[str, Dict[str, str]] = {}
+        self.session_pool = ProviderSessionPool()
 
     async def initialize(self, scraper_configs: Dict[str, Dict[str, str]]) -> None:
         """Inicializar el gestor con configuraciones de scrapers.
@@ -129,9 +131,32 @@ class ProviderIntegrationManager:
                 config=config
             )
 
+        # Precalentar sesiones y login para que las búsquedas no paguen la
+        # autenticación
+        for provider_id, scraper in self.scrapers.items():
+            scraper.attach_session(
+                await self.session_pool.get_session(provider_id, scraper.config)
+            )
+            scraper.prefetch_authentication()
+
         self.initialized = True
         self.logger.info("ProviderIntegrationManager inicializado")
 
+    async def shutdown(self) -> None:
+        """Cerrar conexiones persistentes de todos los proveedores."""
+        if not self.initialized:
+            return
+
+        self.logger.info("Cerrando ProviderIntegrationManager")
+
+        # Las cookies de login viven en las sesiones que se cierran
+        for scraper in self.scrapers.values():
+            scraper.token_cache.invalidate(scraper.base_url, scraper.username)
+
+        await self.session_pool.close()
+        self.session_pool = ProviderSessionPool()
+        self.initialized = False
+
     async def search_all_providers(
         self, criteria: SearchCriteria
     ) -> Dict[str, SearchResult]:
@@ -190,6 +215,11 @@ class ProviderIntegrationManager:
         result = SearchResult(provider_id=provider_id)
 
         try:
+            # Reutilizar la sesión persistente del proveedor
+            scraper.attach_session(
+                await self.session_pool.get_session(provider_id, scraper.config)
+            )
+
             async with scraper:
                 # Buscar vuelos
                 flights = await scraper.search_flights(
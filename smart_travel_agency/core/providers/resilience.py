@@ -0,0 +1,406 @@
+"""
+Resiliencia compartida para llamadas a proveedores.
+
+Este módulo implementa:
+1. Circuit breaker por proveedor (cerrado / abierto / semiabierto)
+2. Backoff exponencial con jitter
+3. Presupuesto de reintentos acotado a una fracción del tráfico
+4. Respeto de cabeceras Retry-After
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, Type
+import asyncio
+import logging
+import random
+import time
+from prometheus_client import Counter, Gauge
+
+# Métricas
+CIRCUIT_STATE = Gauge(
+    "provider_circuit_state",
+    "Circuit breaker state (0=closed, 1=half-open, 2=open)",
+    ["provider"],
+)
+
+PROVIDER_RETRIES = Counter(
+    "provider_retries_total",
+    "Number of provider retry decisions",
+    ["provider", "result"],
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    """Estados del circuit breaker."""
+
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+@dataclass
+class ResilienceConfig:
+    """Configuración de resiliencia por proveedor."""
+
+    # Circuit breaker
+    failure_threshold: int = 5  # fallos consecutivos para abrir
+    recovery_timeout: float = 30.0  # segundos abierto antes de probar
+    half_open_max_calls: int = 1  # sondas simultáneas en semiabierto
+
+    # Reintentos
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 5.0
+    max_retry_after: float = 10.0  # esperas más largas abren el circuito
+
+    # Presupuesto de reintentos
+    retry_budget_ratio: float = 0.2  # reintentos / peticiones
+    min_retries_per_window: int = 3
+    budget_window: float = 60.0
+
+
+class CircuitOpenError(Exception):
+    """El proveedor está marcado como caído."""
+
+    def __init__(self, provider: str, retry_after: float):
+        self.provider = provider
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuito abierto para {provider} (reintentar en {retry_after:.1f}s)"
+        )
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Interpretar una cabecera Retry-After.
+
+    Args:
+        value: Segundos o fecha HTTP
+
+    Returns:
+        Segundos a esperar, o None si no es válida
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(
+    attempt: int,
+    base: float,
+    cap: float,
+    rng: Callable[[float, float], float] = random.uniform,
+) -> float:
+    """
+    Backoff exponencial con jitter completo.
+
+    Args:
+        attempt: Número de reintento (0 = primero)
+        base: Espera base
+        cap: Espera máxima
+
+    Returns:
+        Segundos a esperar
+    """
+    return rng(0.0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Circuit breaker de un proveedor."""
+
+    def __init__(
+        self,
+        name: str,
+        config: ResilienceConfig,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Inicializar breaker.
+
+        Args:
+            name: Nombre del proveedor
+            config: Configuración
+            clock: Reloj monotónico (inyectable para tests)
+        """
+        self.name = name
+        self.config = config
+        self._clock = clock
+
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._open_for = config.recovery_timeout
+        self._probes = 0
+
+    def allow_request(self) -> bool:
+        """Verificar si se puede enviar tráfico al proveedor."""
+        if self.state is CircuitState.OPEN:
+            if self._clock() - self._opened_at < self._open_for:
+                return False
+            self._set_state(CircuitState.HALF_OPEN)
+            self._probes = 0
+
+        if self.state is CircuitState.HALF_OPEN:
+            if self._probes >= self.config.half_open_max_calls:
+                return False
+            self._probes += 1
+
+        return True
+
+    def record_success(self) -> None:
+        """Registrar llamada exitosa."""
+        self.failures = 0
+        if self.state is not CircuitState.CLOSED:
+            logger.info(f"Circuito cerrado para {self.name}")
+            self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Registrar llamada fallida."""
+        self.failures += 1
+        if (
+            self.state is CircuitState.HALF_OPEN
+            or self.failures >= self.config.failure_threshold
+        ):
+            self.open()
+
+    def release_probe(self) -> None:
+        """Liberar una sonda que terminó sin veredicto (p. ej. cancelada)."""
+        if self.state is CircuitState.HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def open(self, duration: Optional[float] = None) -> None:
+        """
+        Abrir el circuito.
+
+        Args:
+            duration: Segundos abierto (por defecto recovery_timeout)
+        """
+        if self.state is not CircuitState.OPEN:
+            logger.warning(f"Circuito abierto para {self.name}")
+        self._opened_at = self._clock()
+        self._open_for = max(duration or 0.0, self.config.recovery_timeout)
+        self._set_state(CircuitState.OPEN)
+
+    @property
+    def retry_after(self) -> float:
+        """Segundos hasta que el circuito admita una sonda."""
+        if self.state is not CircuitState.OPEN:
+            return 0.0
+        return max(self._open_for - (self._clock() - self._opened_at), 0.0)
+
+    def _set_state(self, state: CircuitState) -> None:
+        self.state = state
+        CIRCUIT_STATE.labels(provider=self.name).set(state.value)
+
+
+class RetryBudget:
+    """Presupuesto de reintentos como fracción del tráfico reciente."""
+
+    def __init__(
+        self,
+        config: ResilienceConfig,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Inicializar presupuesto.
+
+        Args:
+            config: Configuración
+            clock: Reloj monotónico
+        """
+        self.config = config
+        self._clock = clock
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+
+    def record_request(self) -> None:
+        """Registrar una petición original."""
+        self._requests.append(self._clock())
+
+    def try_spend(self) -> bool:
+        """Consumir un reintento si el presupuesto lo permite."""
+        now = self._clock()
+        self._evict(self._requests, now)
+        self._evict(self._retries, now)
+
+        allowed = max(
+            self.config.min_retries_per_window,
+            int(len(self._requests) * self.config.retry_budget_ratio),
+        )
+        if len(self._retries) >= allowed:
+            return False
+
+        self._retries.append(now)
+        return True
+
+    def _evict(self, stamps: Deque[float], now: float) -> None:
+        while stamps and now - stamps[0] > self.config.budget_window:
+            stamps.popleft()
+
+
+class ProviderResilience:
+    """
+    Política de resiliencia de un proveedor.
+
+    Responsabilidades:
+    1. Cortar el tráfico a proveedores caídos (fail fast)
+    2. Reintentar fallos transitorios con backoff y jitter
+    3. Evitar tormentas de reintentos
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: Optional[ResilienceConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Inicializar política.
+
+        Args:
+            name: Nombre del proveedor
+            config: Configuración
+            clock: Reloj monotónico
+        """
+        self.name = name
+        self.config = config or ResilienceConfig()
+        self.breaker = CircuitBreaker(name, self.config, clock)
+        self.budget = RetryBudget(self.config, clock)
+
+    async def call(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+        give_up_on: Tuple[Type[BaseException], ...] = (),
+        on_retry: Optional[Callable[[int, BaseException], Awaitable[None]]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Ejecutar una llamada al proveedor con la política de resiliencia.
+
+        Las excepciones pueden exponer un atributo `retry_after` (segundos)
+        que reemplaza al backoff calculado.
+
+        Args:
+            func: Corrutina a ejecutar
+            *args: Argumentos posicionales
+            retry_on: Excepciones transitorias que se reintentan
+            give_up_on: Excepciones que se propagan sin reintentar ni
+                contar como fallo del proveedor
+            on_retry: Callback antes de cada reintento (intento, error)
+            **kwargs: Argumentos nombrados
+
+        Returns:
+            Resultado de func
+
+        Raises:
+            CircuitOpenError: Si el proveedor está marcado como caído
+        """
+        if not self.breaker.allow_request():
+            PROVIDER_RETRIES.labels(provider=self.name, result="short_circuit").inc()
+            raise CircuitOpenError(self.name, self.breaker.retry_after)
+
+        self.budget.record_request()
+        attempt = 0
+
+        while True:
+            try:
+                result = await func(*args, **kwargs)
+
+            except give_up_on:
+                # El proveedor respondió: el error no es de disponibilidad
+                self.breaker.record_success()
+                raise
+
+            except retry_on as e:
+                self.breaker.record_failure()
+                delay = self._next_delay(attempt, e)
+                if delay is None:
+                    raise
+
+                PROVIDER_RETRIES.labels(provider=self.name, result="retry").inc()
+                logger.debug(
+                    f"Reintentando {self.name} en {delay:.2f}s "
+                    f"(intento {attempt + 1}): {e}"
+                )
+                await asyncio.sleep(delay)
+
+                if not self.breaker.allow_request():
+                    raise
+
+                attempt += 1
+                if on_retry:
+                    await on_retry(attempt, e)
+                continue
+
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+    def _next_delay(self, attempt: int, error: BaseException) -> Optional[float]:
+        """Decidir si se reintenta y cuánto esperar."""
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None and retry_after > self.config.max_retry_after:
+            # El proveedor pidió una pausa larga: fallar rápido hasta entonces
+            self.breaker.open(retry_after)
+            PROVIDER_RETRIES.labels(provider=self.name, result="retry_after").inc()
+            return None
+
+        if attempt + 1 >= self.config.max_attempts:
+            PROVIDER_RETRIES.labels(provider=self.name, result="exhausted").inc()
+            return None
+
+        if self.breaker.state is CircuitState.OPEN:
+            return None
+
+        if not self.budget.try_spend():
+            PROVIDER_RETRIES.labels(provider=self.name, result="budget").inc()
+            return None
+
+        if retry_after is not None:
+            return retry_after
+        return backoff_delay(attempt, self.config.base_delay, self.config.max_delay)
+
+
+# Registro global por proveedor
+_policies: Dict[str, ProviderResilience] = {}
+
+
+def get_resilience(
+    name: str, config: Optional[ResilienceConfig] = None
+) -> ProviderResilience:
+    """
+    Obtener la política de resiliencia compartida de un proveedor.
+
+    Args:
+        name: Nombre del proveedor
+        config: Configuración (solo se usa al crearla)
+
+    Returns:
+        Política del proveedor
+    """
+    policy = _policies.get(name)
+    if policy is None:
+        policy = _policies[name] = ProviderResilience(name, config)
+    return policy
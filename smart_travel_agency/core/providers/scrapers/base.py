@@ -3,16 +3,28 @@
 import asyncio
 import logging
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial
 from typing import Dict, List, Optional
 from urllib.parse import urljoin
 
 import aiohttp
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
+from yarl import URL
 
-from ...schemas import Flight, Accommodation, Activity
+from ...cache.token_cache import AuthToken, get_token_cache
+from ...collectors.rate_limiter import get_rate_limiter
+from ...schemas import Flight, Accommodation, Activity, RateLimitConfig
+from ..hedging import IDEMPOTENT_METHODS, HedgingConfig, get_hedger
+from ..resilience import (
+    CircuitOpenError,
+    ResilienceConfig,
+    get_resilience,
+    parse_retry_after,
+)
 from .config import ScraperConfig
+from .parsing import parse_html, parse_price, selector
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +39,14 @@ class AuthenticationError(ScraperError):
     pass
 
 
+class ProviderUnavailableError(ScraperError):
+    """Raised on 429/503 responses; carries the provider's Retry-After."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class BaseScraper(ABC):
     """Base class for web scrapers."""
 
@@ -50,14 +70,35 @@ class BaseScraper(ABC):
         self.password = password
         self.config = config or ScraperConfig()
         self.session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = False
         self.user_agent = UserAgent()
         self._auth_token: Optional[str] = None
         self._last_auth: Optional[datetime] = None
-        self._request_times: List[float] = []
+        self._applied_token: Optional[AuthToken] = None
+        self.token_cache = get_token_cache()
+        self.resilience = get_resilience(
+            f"scraper:{base_url}",
+            ResilienceConfig(
+                failure_threshold=self.config.circuit_failure_threshold,
+                recovery_timeout=self.config.circuit_recovery_timeout,
+                max_attempts=self.config.max_retries + 1,
+                base_delay=self.config.retry_base_delay,
+                max_delay=self.config.retry_delay,
+                retry_budget_ratio=self.config.retry_budget_ratio,
+            ),
+        )
+        self.rate_limiter = get_rate_limiter(
+            f"scraper:{base_url}",
+            RateLimitConfig(calls=self.config.requests_per_minute, period=60.0),
+        )
+        self.hedger = get_hedger(
+            f"scraper:{base_url}",
+            HedgingConfig(enabled=self.config.hedge_requests),
+        )
 
     async def __aenter__(self):
         """Create session when entering context."""
-        if not self.session:
+        if not self.session or self.session.closed:
             # Configure timeout
             timeout = aiohttp.ClientTimeout(total=self.config.request_timeout)
             
@@ -68,19 +109,80 @@ class BaseScraper(ABC):
                 proxy = None
             
             self.session = aiohttp.ClientSession(timeout=timeout, proxy=proxy)
+            self._owns_session = True
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Close session when exiting context."""
-        if self.session:
+        """Close session when exiting context.
+
+        Borrowed sessions (see `attach_session`) are left open for reuse.
+        """
+        if self.session and self._owns_session:
             await self.session.close()
             self.session = None
+            self._owns_session = False
+
+    def attach_session(self, session: aiohttp.ClientSession) -> None:
+        """Borrow a long-lived session owned by someone else.
+
+        Args:
+            session: Shared session (e.g. from ProviderSessionPool)
+        """
+        if self.session is session:
+            return
+        if self._owns_session and self.session and not self.session.closed:
+            raise ScraperError("Scraper already owns an open session")
+        self.session = session
+        self._owns_session = False
 
     @abstractmethod
     async def authenticate(self) -> None:
         """Authenticate with the provider."""
         pass
 
+    async def ensure_authenticated(self) -> None:
+        """Apply a cached login, authenticating only when none is valid.
+
+        The shared token cache refreshes the login in the background
+        before it expires, so request paths normally skip this round trip.
+        """
+        token = await self.token_cache.get_token(
+            self.base_url, self.username, self._login
+        )
+        if token is self._applied_token:
+            return
+
+        self._auth_token = token.token
+        self._last_auth = token.obtained_at
+        if token.cookies and self.session and not self.session.closed:
+            self.session.cookie_jar.update_cookies(token.cookies, URL(self.base_url))
+        self._applied_token = token
+
+    def prefetch_authentication(self) -> None:
+        """Start logging in in the background (warm-up)."""
+        self.token_cache.prefetch(self.base_url, self.username, self._login)
+
+    async def _login(self) -> AuthToken:
+        """Run `authenticate` and package the result for the token cache."""
+        await self.authenticate()
+
+        cookies = {}
+        if self.session and not self.session.closed:
+            cookies = {
+                name: morsel.value
+                for name, morsel in self.session.cookie_jar.filter_cookies(
+                    self.base_url
+                ).items()
+            }
+
+        now = datetime.now()
+        return AuthToken(
+            token=self._auth_token,
+            expires_at=now + timedelta(seconds=self.config.auth_ttl),
+            cookies=cookies,
+            obtained_at=now,
+        )
+
     @abstractmethod
     async def search_flights(
         self,
@@ -122,8 +224,7 @@ class BaseScraper(ABC):
         params: Optional[Dict] = None,
         data: Optional[Dict] = None,
         headers: Optional[Dict] = None,
-        auth_required: bool = True,
-        retry_count: int = 0
+        auth_required: bool = True
     ) -> BeautifulSoup:
         """Make an HTTP request and return parsed response.
         
@@ -134,19 +235,117 @@ class BaseScraper(ABC):
             data: Request body
             headers: Request headers
             auth_required: Whether authentication is required
-            retry_count: Current retry attempt
             
         Returns:
             Parsed BeautifulSoup object
         """
+        html = await self._fetch(
+            method, url,
+            params=params,
+            data=data,
+            headers=headers,
+            auth_required=auth_required
+        )
+        return parse_html(html, self.config.html_parser)
+
+    async def _fetch(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        auth_required: bool = True
+    ) -> str:
+        """Make an HTTP request and return the raw body.
+
+        Use this instead of `_make_request` when the page is parsed in the
+        parsing executor (see `executor.py`). Transient failures are retried
+        through the provider's resilience policy; while the provider's
+        circuit is open, requests fail immediately.
+
+        Logging in happens before entering the policy: the login requests
+        go through `_fetch` themselves, and nesting them inside a half-open
+        probe would short-circuit them and leave the probe without verdict.
+
+        Args:
+            method: HTTP method
+            url: URL to request
+            params: Query parameters
+            data: Request body
+            headers: Request headers
+            auth_required: Whether authentication is required
+
+        Returns:
+            Response body
+        """
         if not self.session:
             raise ScraperError("Session not initialized. Use context manager.")
 
-        # Check rate limiting
-        await self._check_rate_limit()
+        if auth_required:
+            await self.ensure_authenticated()
+
+        try:
+            return await self.resilience.call(
+                self._fetch_hedged,
+                method, url,
+                params=params,
+                data=data,
+                headers=headers,
+                retry_on=(
+                    aiohttp.ClientError,
+                    asyncio.TimeoutError,
+                    ProviderUnavailableError,
+                ),
+                give_up_on=(AuthenticationError,),
+            )
+
+        except CircuitOpenError as e:
+            raise ScraperError(f"Provider unavailable: {str(e)}")
+
+        except ProviderUnavailableError:
+            raise
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Request failed: {str(e)}")
+            raise ScraperError(f"Request failed: {str(e)}")
 
-        if auth_required and not self._auth_token:
-            await self.authenticate()
+    async def _fetch_hedged(self, method: str, url: str, **kwargs) -> str:
+        """Request attempt, duplicated if it runs past the provider's p95.
+
+        Only idempotent requests are hedged, and the duplicate is sent only
+        when the rate limiter has a free slot right now.
+        """
+        attempt = partial(self._fetch_once, method, url, **kwargs)
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return await attempt()
+
+        return await self.hedger.run(
+            attempt,
+            partial(self._fetch_once, method, url, rate_limited=False, **kwargs),
+            limiter=self.rate_limiter,
+        )
+
+    async def _fetch_once(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        rate_limited: bool = True
+    ) -> str:
+        """Single request attempt (retries and login live in `_fetch`).
+
+        Args:
+            rate_limited: Whether to wait for a rate limit slot (False when
+                the caller already holds one)
+        """
+        # Check rate limiting
+        if rate_limited:
+            await self._check_rate_limit()
 
         # Build headers
         request_headers = {
@@ -161,94 +360,61 @@ class BaseScraper(ABC):
         if self.config.custom_headers:
             request_headers.update(self.config.custom_headers)
 
-        # Make request
-        try:
-            async with self.session.request(
-                method,
-                urljoin(self.base_url, url),
-                params=params,
-                data=data,
-                headers=request_headers,
-                ssl=False  # For development only
-            ) as response:
-                # Record request time for rate limiting
-                self._request_times.append(asyncio.get_event_loop().time())
+        async with self.session.request(
+            method,
+            urljoin(self.base_url, url),
+            params=params,
+            data=data,
+            headers=request_headers,
+            ssl=False  # For development only
+        ) as response:
+            if response.status == 401:
+                # Force a fresh login on the next request
+                self.token_cache.invalidate(self.base_url, self.username)
+                self._auth_token = None
+                self._applied_token = None
+                raise AuthenticationError("Authentication failed")
                 
-                if response.status == 401:
-                    raise AuthenticationError("Authentication failed")
-                    
-                if response.status == 429:  # Too Many Requests
-                    if retry_count < self.config.max_retries:
-                        await asyncio.sleep(self.config.retry_delay)
-                        return await self._make_request(
-                            method, url,
-                            params=params,
-                            data=data,
-                            headers=headers,
-                            auth_required=auth_required,
-                            retry_count=retry_count + 1
-                        )
-                    raise ScraperError("Rate limit exceeded")
-                    
-                response.raise_for_status()
-                html = await response.text()
+            if response.status in (429, 503):  # Too Many Requests / Unavailable
+                raise ProviderUnavailableError(
+                    f"Provider returned {response.status}",
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
                 
-                # Save raw response if debug mode enabled
-                if self.config.debug_mode and self.config.save_raw_responses:
-                    self._save_raw_response(html, url)
+            if 400 <= response.status < 500:
+                # Client errors are not transient: do not retry them
+                raise ScraperError(f"Request rejected: {response.status}")
                 
-                return BeautifulSoup(html, "html.parser")
-
-        except aiohttp.ClientError as e:
-            logger.error(f"Request failed: {str(e)}")
-            if retry_count < self.config.max_retries:
-                await asyncio.sleep(self.config.retry_delay)
-                return await self._make_request(
-                    method, url,
-                    params=params,
-                    data=data,
-                    headers=headers,
-                    auth_required=auth_required,
-                    retry_count=retry_count + 1
-                )
-            raise ScraperError(f"Request failed after {retry_count} retries: {str(e)}")
+            response.raise_for_status()
+            html = await response.text()
+            
+            # Save raw response if debug mode enabled
+            if self.config.debug_mode and self.config.save_raw_responses:
+                self._save_raw_response(html, url)
+            
+            return html
 
     async def _check_rate_limit(self) -> None:
-        """Check and enforce rate limiting."""
-        current_time = asyncio.get_event_loop().time()
-        
-        # Remove old requests from tracking
-        self._request_times = [
-            t for t in self._request_times
-            if current_time - t <= 60  # Keep last minute
-        ]
-        
-        # Check if we're over the limit
-        if len(self._request_times) >= self.config.requests_per_minute:
-            # Calculate wait time
-            wait_time = 60 - (current_time - self._request_times[0])
-            if wait_time > 0:
-                await asyncio.sleep(wait_time)
-
-    async def _extract_price(self, element: BeautifulSoup, selector: str) -> float:
+        """Wait for a slot in the provider's requests-per-minute window."""
+        await self.rate_limiter.acquire()
+
+    async def _extract_price(self, element: BeautifulSoup, css_selector: str) -> float:
         """Extract and normalize price from element.
         
         Args:
             element: BeautifulSoup element
-            selector: CSS selector for price element
+            css_selector: CSS selector for price element
             
         Returns:
             Normalized price as float
         """
         try:
-            price_element = element.select_one(selector)
+            price_element = selector(css_selector).one(element)
             if not price_element:
                 return 0.0
             
             # Remove currency symbol and normalize
-            price_text = price_element.text.strip()
-            price_text = "".join(c for c in price_text if c.isdigit() or c == ".")
-            return float(price_text)
+            return parse_price(price_element.text.strip())
 
         except (ValueError, AttributeError) as e:
             logger.warning(f"Failed to extract price: {str(e)}")
@@ -11,16 +11,35 @@ class ScraperConfig:
     # Timeouts y reintentos
     request_timeout: int = 30
     max_retries: int = 3
-    retry_delay: int = 5
+    retry_delay: int = 5  # Espera máxima entre reintentos (backoff exponencial)
+    retry_base_delay: float = 0.5
+    retry_budget_ratio: float = 0.2  # Reintentos como fracción del tráfico
+    
+    # Hedging: duplicar GETs que superan el p95 observado del proveedor
+    hedge_requests: bool = True
+    
+    # Circuit breaker
+    circuit_failure_threshold: int = 5
+    circuit_recovery_timeout: int = 30
+    
+    # Autenticación
+    auth_ttl: int = 1800  # Validez asumida de la sesión de login (segundos)
     
     # Rate limiting
     requests_per_minute: int = 60
     concurrent_requests: int = 10
     
+    # Pool de conexiones
+    keepalive_timeout: int = 30
+    dns_cache_ttl: int = 300
+    
     # Cache
     cache_enabled: bool = True
     cache_ttl: int = 3600  # 1 hora
     
+    # Parser HTML ("lxml" o "html.parser")
+    html_parser: str = "lxml"
+    
     # Proxy configuration
     use_proxy: bool = False
     proxy_url: Optional[str] = None
@@ -0,0 +1,146 @@
+"""Worker pool for CPU-bound parsing of provider payloads.
+
+Large result pages (HTML and embedded JSON) are parsed off the event loop
+so one big page does not stall every other provider session. Parsing
+functions must be module-level and return plain data (dicts, lists) so
+they can run in a process pool.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+EXECUTOR_KINDS = ("process", "thread")
+
+
+class ParsingExecutor:
+    """Bounded pool that scrapers submit raw payloads to."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        kind: str = "process",
+        max_pending: Optional[int] = None,
+        inline_threshold: int = 64 * 1024,
+    ):
+        """Initialize executor.
+
+        Args:
+            max_workers: Pool size (defaults to the number of CPUs)
+            kind: "process" to scale across cores or "thread"
+            max_pending: Max submitted jobs before callers wait (backpressure)
+            inline_threshold: Payloads smaller than this (chars) are parsed inline
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind: {kind}")
+
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.kind = kind
+        self.max_pending = max_pending or self.max_workers * 2
+        self.inline_threshold = inline_threshold
+
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Jobs submitted and not yet finished."""
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        """Create the pool lazily."""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="parser"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], payload: Any, *args: Any) -> T:
+        """Parse a payload in the pool.
+
+        Waits (without blocking the loop) while `max_pending` jobs are in
+        flight, so a burst of large pages cannot queue unbounded work.
+
+        Args:
+            func: Module-level parsing function
+            payload: Raw payload (HTML/JSON text), passed as first argument
+            *args: Extra arguments for func
+
+        Returns:
+            Whatever func returns
+        """
+        if isinstance(payload, (str, bytes)) and len(payload) < self.inline_threshold:
+            return func(payload, *args)
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        async with self._slots:
+            self._pending += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._get_executor(), func, payload, *args
+                )
+            finally:
+                self._pending -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut the pool down."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# Global instance
+_parsing_executor: Optional[ParsingExecutor] = None
+
+
+def configure_parsing_executor(
+    max_workers: Optional[int] = None,
+    kind: str = "process",
+    max_pending: Optional[int] = None,
+    inline_threshold: int = 64 * 1024,
+) -> ParsingExecutor:
+    """Replace the shared executor with a new configuration.
+
+    Args:
+        max_workers: Pool size
+        kind: "process" or "thread"
+        max_pending: Backpressure limit
+        inline_threshold: Inline parsing threshold (chars)
+
+    Returns:
+        The new shared executor
+    """
+    global _parsing_executor
+
+    if _parsing_executor is not None:
+        _parsing_executor.shutdown(wait=False)
+
+    _parsing_executor = ParsingExecutor(
+        max_workers=max_workers,
+        kind=kind,
+        max_pending=max_pending,
+        inline_threshold=inline_threshold,
+    )
+    return _parsing_executor
+
+
+def get_parsing_executor() -> ParsingExecutor:
+    """Get the shared parsing executor."""
+    global _parsing_executor
+
+    if _parsing_executor is None:
+        _parsing_executor = ParsingExecutor()
+    return _parsing_executor
@@ -13,9 +13,31 @@ from bs4 import BeautifulSoup
 from ...schemas import Flight, Accommodation, Activity
 from .base import BaseScraper, AuthenticationError, ScraperError
 from .config import OlaScraperConfig, DEFAULT_OLA_CONFIG
+from .executor import get_parsing_executor
+from .parsing import parse_html, selector
 
 logger = logging.getLogger(__name__)
 
+SEL_FLIGHT_DATA = selector("script#flight-data")
+
+
+def extract_flight_data(html: str, parser: Optional[str] = None) -> Optional[Dict]:
+    """Extract the embedded flight JSON from a search results page.
+
+    Runs in the parsing executor, so it only takes and returns plain data.
+
+    Args:
+        html: Raw search results page
+        parser: Optional preferred HTML parser backend
+
+    Returns:
+        Decoded flight data, or None if the page has no results
+    """
+    script = SEL_FLIGHT_DATA.one(parse_html(html, parser))
+    if not script or not script.string:
+        return None
+    return json.loads(script.string)
+
 
 class OlaScraper(BaseScraper):
     """Scraper for ola.com."""
@@ -112,17 +134,18 @@ class OlaScraper(BaseScraper):
                 params["return"] = return_date.strftime("%Y-%m-%d")
 
             # Make search request
-            soup = await self._make_request(
+            html = await self._fetch(
                 "GET",
                 f"/flights/search?{urlencode(params)}"
             )
 
-            # Extract flight data from script tag
-            script = soup.find("script", {"id": "flight-data"})
-            if not script:
+            # Extract flight data from script tag off the event loop
+            flight_data = await get_parsing_executor().run(
+                extract_flight_data, html, self.config.html_parser
+            )
+            if not flight_data:
                 return []
 
-            flight_data = json.loads(script.string)
             flights = []
 
             for item in flight_data["flights"]:
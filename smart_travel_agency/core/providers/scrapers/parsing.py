@@ -0,0 +1,138 @@
+"""Fast HTML parsing helpers for scrapers.
+
+Provides a pluggable parser backend (lxml by default, falling back to the
+stdlib ``html.parser`` when lxml is not installed) and precompiled CSS
+selectors that run directly on parsed nodes, so result rows never have to
+be serialized back to HTML and parsed again.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup, FeatureNotFound, Tag
+
+logger = logging.getLogger(__name__)
+
+# Parser backends in order of preference
+PARSER_BACKENDS = ("lxml", "html.parser")
+
+
+@lru_cache(maxsize=None)
+def _backend_available(name: str) -> bool:
+    """Check whether BeautifulSoup can use a tree builder."""
+    try:
+        BeautifulSoup("", name)
+        return True
+    except FeatureNotFound:
+        return False
+
+
+def get_parser(preferred: Optional[str] = None) -> str:
+    """Resolve the parser backend to use.
+
+    Args:
+        preferred: Requested backend (e.g. from ScraperConfig.html_parser)
+
+    Returns:
+        Name of an available backend
+    """
+    if preferred and _backend_available(preferred):
+        return preferred
+    if preferred:
+        logger.warning(f"HTML parser '{preferred}' not available, falling back")
+
+    for name in PARSER_BACKENDS:
+        if _backend_available(name):
+            return name
+    return "html.parser"
+
+
+def parse_html(markup: str, parser: Optional[str] = None) -> BeautifulSoup:
+    """Parse HTML with the fastest available backend.
+
+    Args:
+        markup: Raw HTML
+        parser: Optional preferred backend
+
+    Returns:
+        Parsed document
+    """
+    return BeautifulSoup(markup, get_parser(parser))
+
+
+class Selector:
+    """Precompiled CSS selector evaluated directly on parsed nodes."""
+
+    __slots__ = ("pattern", "_compiled")
+
+    def __init__(self, pattern: str):
+        """Compile selector.
+
+        Args:
+            pattern: CSS selector
+        """
+        self.pattern = pattern
+        self._compiled = soupsieve.compile(pattern)
+
+    def one(self, node: Tag) -> Optional[Tag]:
+        """First matching descendant or None."""
+        return self._compiled.select_one(node)
+
+    def all(self, node: Tag) -> List[Tag]:
+        """All matching descendants."""
+        return self._compiled.select(node)
+
+    def text(self, node: Tag, default: str = "") -> str:
+        """Stripped text of the first match."""
+        element = self._compiled.select_one(node)
+        return element.get_text().strip() if element else default
+
+    def attr(
+        self, node: Tag, name: str, default: Optional[str] = None
+    ) -> Optional[str]:
+        """Attribute of the first match."""
+        element = self._compiled.select_one(node)
+        if element is None:
+            return default
+        return element.get(name, default)
+
+    def __repr__(self) -> str:
+        return f"Selector({self.pattern!r})"
+
+
+_selectors: Dict[str, Selector] = {}
+
+
+def selector(pattern: str) -> Selector:
+    """Get the compiled selector for a pattern (compiled once).
+
+    Args:
+        pattern: CSS selector
+
+    Returns:
+        Compiled selector
+    """
+    compiled = _selectors.get(pattern)
+    if compiled is None:
+        compiled = _selectors[pattern] = Selector(pattern)
+    return compiled
+
+
+def parse_price(text: str) -> float:
+    """Normalize a price string such as ``"$ 12,345.50"``.
+
+    Args:
+        text: Raw price text
+
+    Returns:
+        Price as float
+
+    Raises:
+        ValueError: If the text contains no number
+    """
+    digits = "".join(c for c in text if c.isdigit() or c == ".")
+    if not digits:
+        raise ValueError(f"Invalid price: {text!r}")
+    return float(digits)
@@ -0,0 +1,107 @@
+"""
+Pool de sesiones HTTP persistentes por proveedor.
+
+Este módulo implementa:
+1. Una sesión aiohttp de larga duración por proveedor
+2. Conectores con límites ajustados y keep-alive
+3. Caché de DNS compartida entre búsquedas
+4. Cierre ordenado de conexiones
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+import aiohttp
+
+from .scrapers.config import ScraperConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderSessionPool:
+    """Pool de sesiones HTTP reutilizables por proveedor.
+
+    Cada proveedor obtiene su propio conector, de modo que los límites de
+    conexiones, las cookies de autenticación y las conexiones keep-alive no
+    se mezclan entre proveedores. Los scrapers toman prestada la sesión y
+    nunca la cierran; el dueño del pool la cierra en `close()`.
+    """
+
+    def __init__(self):
+        """Inicializar pool."""
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    async def get_session(
+        self, provider_id: str, config: Optional[ScraperConfig] = None
+    ) -> aiohttp.ClientSession:
+        """Obtener (o crear) la sesión de un proveedor.
+
+        Args:
+            provider_id: ID del proveedor
+            config: Configuración del scraper del proveedor
+
+        Returns:
+            Sesión HTTP compartida del proveedor
+        """
+        session = self._sessions.get(provider_id)
+        if session and not session.closed:
+            return session
+
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError("ProviderSessionPool cerrado")
+
+            session = self._sessions.get(provider_id)
+            if session and not session.closed:
+                return session
+
+            session = self._create_session(config or ScraperConfig())
+            self._sessions[provider_id] = session
+            logger.info(f"Sesión HTTP creada para {provider_id}")
+            return session
+
+    def _create_session(self, config: ScraperConfig) -> aiohttp.ClientSession:
+        """Crear sesión con conector ajustado a la configuración."""
+        connector = aiohttp.TCPConnector(
+            limit=config.concurrent_requests,
+            limit_per_host=config.concurrent_requests,
+            ttl_dns_cache=config.dns_cache_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=config.keepalive_timeout,
+            enable_cleanup_closed=True,
+        )
+        timeout = aiohttp.ClientTimeout(total=config.request_timeout)
+
+        # Configure proxy if enabled
+        if config.use_proxy and config.proxy_url:
+            proxy = config.proxy_url
+        else:
+            proxy = None
+
+        return aiohttp.ClientSession(
+            connector=connector, timeout=timeout, proxy=proxy
+        )
+
+    async def close(self) -> None:
+        """Cerrar todas las sesiones del pool."""
+        async with self._lock:
+            self._closed = True
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+
+        await asyncio.gather(
+            *(s.close() for s in sessions if not s.closed),
+            return_exceptions=True,
+        )
+
+        # Dar tiempo a que se cierren las conexiones SSL subyacentes
+        if sessions:
+            await asyncio.sleep(0.25)
+
+    @property
+    def active_providers(self) -> int:
+        """Número de proveedores con sesión abierta."""
+        return sum(1 for s in self._sessions.values() if not s.closed)
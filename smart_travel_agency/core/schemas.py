@@ -3,6 +3,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from decimal import Decimal
+from enum import Enum
 from typing import Dict, List, Optional, Tuple, Union, Any
 from uuid import UUID, uuid4
 
@@ -253,6 +254,52 @@ class OptimizationResult:
     metadata: Dict[str, str] = field(default_factory=dict)
 
 
+class MarginStrategy(str, Enum):
+    """Estrategia de margen del calculador de presupuestos."""
+
+    FIXED = "fixed"
+    VARIABLE = "variable"
+    DYNAMIC = "dynamic"
+
+
+@dataclass
+class TaxConfig:
+    """Configuración de impuestos."""
+
+    rate: Decimal = Decimal("0.21")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte la configuración a diccionario."""
+        return {"rate": str(self.rate)}
+
+
+@dataclass
+class PriceComponent:
+    """Componente de precio de un presupuesto."""
+
+    id: str
+    description: Optional[str]
+    base_cost: Decimal
+    additional_costs: Dict[str, Decimal] = field(default_factory=dict)
+    total_cost: Decimal = Decimal("0")
+    margin: Decimal = Decimal("0")
+    price_before_tax: Decimal = Decimal("0")
+    tax_rate: Decimal = Decimal("0")
+    tax_amount: Decimal = Decimal("0")
+    final_price: Decimal = Decimal("0")
+
+
+@dataclass
+class CalculationResult:
+    """Resultado del cálculo de un presupuesto."""
+
+    success: bool
+    components: List[PriceComponent] = field(default_factory=list)
+    totals: Dict[str, Decimal] = field(default_factory=dict)
+    error: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
 @dataclass
 class CustomerProfile:
     """Perfil de cliente."""
@@ -291,3 +338,200 @@ class Recommendation:
     score: RecommendationScore
     reason: str
     metadata: Dict[str, Union[float, str]] = field(default_factory=dict)
+
+
+@dataclass
+class DataSource:
+    """Fuente de datos de un colector."""
+
+    id: str
+    name: str
+    type: str  # p. ej. "api", "scraper"
+    url: Optional[str] = None
+    config: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class CacheConfig:
+    """Configuración de la caché de un colector."""
+
+    ttl: int = 300  # segundos
+    max_size: int = 1000
+
+
+@dataclass
+class CollectionResult:
+    """Resultado de una recolección."""
+
+    success: bool
+    data: Any = None
+    error: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RateLimitConfig:
+    """Configuración de rate limiting por fuente de datos."""
+
+    calls: int = 60
+    period: float = 60.0  # segundos
+    max_concurrent: Optional[int] = None  # None = sin límite de concurrencia
+
+
+@dataclass
+class BrowserConfig:
+    """Configuración del pool de navegadores automatizados."""
+
+    max_sessions: int = 5  # contextos prestados simultáneamente
+    session_timeout: int = 300  # segundos sin uso antes de recuperar el contexto
+    retry_attempts: int = 3
+    browser_type: str = "chromium"
+    headless: bool = True
+    warm_pages: int = 2  # contextos con página lista por navegador
+    max_context_uses: int = 20  # préstamos antes de descartar un contexto
+    blocked_resources: List[str] = field(
+        default_factory=lambda: ["image", "font", "stylesheet", "media"]
+    )
+    viewport: Dict[str, int] = field(
+        default_factory=lambda: {"width": 1920, "height": 1080}
+    )
+    user_agent: str = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    )
+
+
+@dataclass
+class ProxyConfig:
+    """Configuración de proxies para navegadores."""
+
+    enabled: bool = False
+    rotation_interval: int = 300  # segundos
+    max_consecutive_fails: int = 3
+
+
+@dataclass
+class BrowserSession:
+    """Contexto aislado con su página, prestado por el pool de navegadores."""
+
+    id: str
+    browser: Any
+    context: Any
+    page: Any
+    browser_type: str = "chromium"
+    proxy: Optional[Dict[str, str]] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    last_used: datetime = field(default_factory=datetime.now)
+    uses: int = 0
+
+
+@dataclass
+class AutomationResult:
+    """Resultado de una acción de navegador."""
+
+    success: bool
+    data: Any = None
+    error: Optional[str] = None
+
+
+@dataclass
+class ScrapingConfig:
+    """Configuración del motor de scraping."""
+
+    max_retries: int = 3
+    timeout: int = 30  # segundos
+    concurrent_requests: int = 5
+
+
+@dataclass
+class ExtractorRule:
+    """Regla de extracción de un campo.
+
+    Para HTML `extractor` es una función JS aplicada a cada elemento
+    (p. ej. "el => el.textContent"); para APIs, una expresión JSONPath
+    compilada.
+    """
+
+    name: str
+    selector: str = ""
+    extractor: Any = "el => el.textContent"
+    multiple: bool = False  # True = todos los elementos que coinciden
+
+
+@dataclass
+class DataValidator:
+    """Reglas de validación de datos extraídos."""
+
+    rules: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    schema: Any = None
+
+
+@dataclass
+class ScrapingResult:
+    """Resultado de una operación de scraping."""
+
+    success: bool
+    data: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class StorageConfig:
+    """Configuración de la persistencia SQLite."""
+
+    path: Optional[str] = None  # None = data/travel_agency.db
+    # Base de travel_packages, market_analysis y price_history
+    # (None = data/db/travel_agency.db, o `path` si se indicó)
+    catalog_path: Optional[str] = None
+    pool_size: int = 4  # conexiones (y threads) del pool
+    busy_timeout: float = 5.0  # segundos esperando un lock de escritura
+    cached_statements: int = 256  # statements preparados por conexión
+
+
+@dataclass
+class MemoryConfig:
+    """Configuración del servicio de costos y precios de mercado."""
+
+    storage: StorageConfig = field(default_factory=StorageConfig)
+    cache_size: int = 50_000  # entradas en la LRU en proceso
+    batch_window: float = 0.002  # segundos que se esperan para juntar lecturas
+    max_batch: int = 500  # IDs por consulta (límite de parámetros de SQLite)
+    market_window: int = 30  # observaciones que pesa el precio promedio
+    high_demand_threshold: float = 0.7  # demand_score desde el que hay alta demanda
+
+
+@dataclass
+class StateChange:
+    """Cambio registrado en una sesión."""
+
+    timestamp: datetime
+    description: str
+    previous_budget: Any = None
+    new_budget: Any = None
+    # Versiones del presupuesto antes y después del cambio
+    previous_version: Optional[UUID] = None
+    new_version: Optional[UUID] = None
+
+
+@dataclass
+class StateSnapshot:
+    """Snapshot de una sesión: una versión del presupuesto, no una copia."""
+
+    id: str
+    timestamp: datetime
+    budget: Any
+    version_id: UUID
+    change_count: int = 0  # cambios de la sesión hasta el snapshot
+
+
+@dataclass
+class SessionState:
+    """Estado de una sesión con su presupuesto y cambios."""
+
+    id: str
+    created_at: datetime
+    is_active: bool = True
+    budget: Any = None
+    changes: List[StateChange] = field(default_factory=list)
+    closed_at: Optional[datetime] = None
@@ -17,6 +17,7 @@ import logging
 
 from ..schemas import TravelPackage, Flight, Accommodation, Activity
 from ..providers.manager import ProviderIntegrationManager, SearchCriteria, SearchResult
+from ..providers.dedup import DedupResult, deduplicate_results
 from ..analysis.price_optimizer.optimizer import PriceOptimizer, OptimizationResult
 
 
@@ -28,6 +29,7 @@ class PackageSearchResult:
     optimization_results: List[OptimizationResult]
     provider_results: Dict[str, SearchResult]
     errors: List[str] = None
+    dedup: Optional[DedupResult] = None
 
 
 class PackageService:
@@ -99,19 +101,26 @@ class PackageService:
             # Buscar en proveedores
             provider_results = await self.provider_manager.search_all_providers(criteria)
 
-            # Convertir resultados en paquetes
-            packages = []
+            # Fusionar ofertas repetidas entre proveedores
             errors = []
+            valid_results = []
 
             for provider_id, result in provider_results.items():
                 if result.error:
                     errors.append(f"Error en {provider_id}: {result.error}")
                     continue
+                valid_results.append(result)
+
+            dedup = deduplicate_results(valid_results)
+            merged = SearchResult(
+                provider_id="",  # cada oferta conserva su proveedor
+                flights=dedup.flights,
+                accommodations=dedup.accommodations,
+                activities=dedup.activities
+            )
 
-                # Crear paquetes combinando vuelos, alojamiento y actividades
-                packages.extend(
-                    await self._create_packages_from_results(result, provider_id)
-                )
+            # Crear paquetes combinando vuelos, alojamiento y actividades
+            packages = await self._create_packages_from_results(merged)
 
             # Optimizar precios
             optimization_results = await self.price_optimizer.optimize_prices_batch(packages)
@@ -125,7 +134,8 @@ class PackageService:
                 packages=packages,
                 optimization_results=optimization_results,
                 provider_results=provider_results,
-                errors=errors
+                errors=errors,
+                dedup=dedup
             )
 
         except Exception as e:
@@ -135,13 +145,14 @@ class PackageService:
     async def _create_packages_from_results(
         self,
         result: SearchResult,
-        provider_id: str
+        provider_id: Optional[str] = None
     ) -> List[TravelPackage]:
         """Crea paquetes a partir de los resultados de búsqueda.
         
         Args:
             result: Resultado de búsqueda
-            provider_id: ID del proveedor
+            provider_id: ID del proveedor (None = el de las ofertas de cada
+                paquete, que pueden venir de proveedores distintos)
             
         Returns:
             Lista de paquetes
@@ -172,6 +183,9 @@ class PackageService:
                             activity.date <= package.end_date)
                     ]
 
+                    if provider_id is None:
+                        package.provider_id = self._package_provider(package)
+
                     # Validar y agregar paquete
                     if self.validate_package(package):
                         package.total_price = self.calculate_total_price(package)
@@ -179,6 +193,13 @@ class PackageService:
 
         return packages
 
+    @staticmethod
+    def _package_provider(package: TravelPackage) -> str:
+        """Proveedores de las ofertas del paquete, en orden de componente."""
+        offers = [*package.flights, package.accommodation, *package.activities]
+        providers = dict.fromkeys(offer.provider for offer in offers)
+        return ",".join(providers)
+
     @classmethod
     def calculate_total_price(cls, package: TravelPackage) -> Decimal:
         """Calcula el precio total del paquete.
@@ -11,11 +11,12 @@ Este módulo implementa:
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 import logging
-from uuid import uuid4
+from uuid import UUID, uuid4
 import asyncio
 from prometheus_client import Counter, Histogram
 
-from ..schemas import SessionState, Budget, TravelPackage, StateSnapshot, StateChange
+from ..budget.models import Budget
+from ..schemas import SessionState, TravelPackage, StateSnapshot, StateChange
 from ..metrics import get_metrics_collector
 
 # Métricas
@@ -44,7 +45,7 @@ class SessionStateManager:
     def __init__(self):
         """Inicializar gestor de estado."""
         self.logger = logging.getLogger(__name__)
-        self.metrics = get_metrics_collector()
+        self.metrics = get_metrics_collector("session_state_manager")
 
         # Estado en memoria
         self._active_sessions: Dict[str, SessionState] = {}
@@ -240,15 +241,24 @@ class SessionStateManager:
                 if not snapshot:
                     return False
 
-                # Restaurar estado
+                # Restaurar estado: volver a la versión del snapshot
+                previous_budget = session.budget
+                previous_version = (
+                    self._record_version(session_id, previous_budget)
+                    if previous_budget
+                    else None
+                )
+                snapshot.budget.restore(snapshot.version_id)
                 session.budget = snapshot.budget
 
                 # Registrar cambio
                 change = StateChange(
                     timestamp=datetime.now(),
                     description=f"Restored from snapshot {snapshot_id}",
-                    previous_budget=session.budget,
+                    previous_budget=previous_budget,
                     new_budget=snapshot.budget,
+                    previous_version=previous_version,
+                    new_version=snapshot.version_id,
                 )
 
                 session.changes.append(change)
@@ -263,7 +273,13 @@ class SessionStateManager:
             return False
 
     async def _create_snapshot(self, session_id: str) -> None:
-        """Crear snapshot de estado actual."""
+        """
+        Crear snapshot de estado actual.
+
+        El snapshot referencia una versión del presupuesto, que guarda solo
+        los items que cambiaron; del historial de cambios (que solo crece)
+        basta con recordar la longitud.
+        """
         try:
             session = await self.get_session(session_id)
 
@@ -274,8 +290,9 @@ class SessionStateManager:
             snapshot = StateSnapshot(
                 id=str(uuid4()),
                 timestamp=datetime.now(),
-                budget=session.budget.copy(),
-                changes=session.changes.copy(),
+                budget=session.budget,
+                version_id=self._record_version(session_id, session.budget),
+                change_count=len(session.changes),
             )
 
             # Mantener límite de snapshots
@@ -288,6 +305,14 @@ class SessionStateManager:
         except Exception as e:
             self.logger.error(f"Error creando snapshot: {e}")
 
+    def _record_version(self, session_id: str, budget: Budget) -> UUID:
+        """Versionar el estado actual del presupuesto sin confirmarlo."""
+        return budget.commit_version(
+            changes={"type": "snapshot", "session_id": session_id},
+            reason="Snapshot de sesión",
+            register=False,
+        ).version_id
+
     async def _validate_stability(
         self, session: SessionState, new_budget: Budget
     ) -> bool:
@@ -296,12 +321,19 @@ class SessionStateManager:
             if not session.budget:
                 return True
 
-            # Calcular diferencias
+            # Comparar contra la última versión (también detecta ediciones
+            # hechas sobre el mismo presupuesto de la sesión)
+            budget = session.budget
+            previous = {
+                item_id: record.amount
+                for item_id, record in budget.state_at(budget.current_version).items()
+            }
             price_changes = []
-            for old_pkg, new_pkg in zip(session.budget.packages, new_budget.packages):
-                if old_pkg.price > 0:
-                    change = abs((new_pkg.price - old_pkg.price) / old_pkg.price)
-                    price_changes.append(change)
+            for item in new_budget.items:
+                old_amount = previous.get(item.item_id)
+                if old_amount:
+                    change = abs((item.amount - old_amount) / old_amount)
+                    price_changes.append(float(change))
 
             if not price_changes:
                 return True
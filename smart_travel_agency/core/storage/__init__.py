@@ -0,0 +1,5 @@
+"""Persistencia del core."""
+
+from .repository import ConnectionPool, TravelRepository, get_repository
+
+__all__ = ["ConnectionPool", "TravelRepository", "get_repository"]
@@ -0,0 +1,708 @@
+"""
+Persistencia SQLite de búsquedas, resultados e historial de precios.
+
+Este módulo implementa:
+1. Pool de conexiones SQLite (modo WAL) usado desde asyncio
+2. Esquema de data/ (searches y search_results en data/travel_agency.db;
+   travel_packages, market_analysis y price_history en
+   data/db/travel_agency.db) con índices por ruta y fecha
+3. Inserciones masivas con executemany en una sola transacción
+4. Consultas por índice, sin recorrer tablas completas
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncio
+import json
+import logging
+import sqlite3
+from prometheus_client import Histogram
+
+from ..schemas import StorageConfig
+
+# Métricas
+STORAGE_LATENCY = Histogram(
+    "storage_operation_seconds",
+    "SQLite repository operation latency",
+    ["operation"],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0],
+)
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "data"
+DEFAULT_DB_PATH = DATA_DIR / "travel_agency.db"
+DEFAULT_CATALOG_PATH = DATA_DIR / "db" / "travel_agency.db"
+
+# Mismas columnas que las bases existentes en data/. Las tablas de
+# catálogo viven en la base adjunta "catalog" (ver ConnectionPool); las
+# consultas usan nombres sin esquema, que SQLite busca en main y luego en
+# las bases adjuntas.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    provider TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    departure_date TEXT NOT NULL,
+    return_date TEXT,
+    adults INTEGER DEFAULT 1,
+    children INTEGER DEFAULT 0,
+    infants INTEGER DEFAULT 0,
+    class_type TEXT,
+    search_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS search_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    search_id INTEGER,
+    flight_id TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    departure_date TEXT NOT NULL,
+    return_date TEXT,
+    price REAL NOT NULL,
+    currency TEXT NOT NULL,
+    availability INTEGER,
+    details JSON,
+    raw_data JSON,
+    FOREIGN KEY (search_id) REFERENCES searches(id)
+);
+CREATE INDEX IF NOT EXISTS ix_searches_route
+    ON searches (origin, destination, departure_date);
+CREATE INDEX IF NOT EXISTS ix_search_results_route
+    ON search_results (origin, destination, departure_date);
+CREATE INDEX IF NOT EXISTS ix_search_results_search_id
+    ON search_results (search_id);
+"""
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {schema}travel_packages (
+    id INTEGER NOT NULL,
+    provider_id VARCHAR,
+    origin VARCHAR,
+    destination VARCHAR,
+    departure_date DATETIME,
+    return_date DATETIME,
+    price FLOAT,
+    currency VARCHAR,
+    availability INTEGER,
+    details JSON,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE TABLE IF NOT EXISTS {schema}market_analysis (
+    id INTEGER NOT NULL,
+    origin VARCHAR,
+    destination VARCHAR,
+    avg_price FLOAT,
+    min_price FLOAT,
+    max_price FLOAT,
+    demand_score FLOAT,
+    trend VARCHAR,
+    analysis_date DATETIME,
+    data JSON,
+    PRIMARY KEY (id)
+);
+CREATE TABLE IF NOT EXISTS {schema}price_history (
+    id INTEGER NOT NULL,
+    package_id INTEGER,
+    price FLOAT,
+    currency VARCHAR,
+    timestamp DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(package_id) REFERENCES travel_packages (id)
+);
+CREATE INDEX IF NOT EXISTS {schema}ix_travel_packages_route
+    ON travel_packages (origin, destination, departure_date);
+CREATE INDEX IF NOT EXISTS {schema}ix_market_analysis_route
+    ON market_analysis (origin, destination, analysis_date);
+CREATE INDEX IF NOT EXISTS {schema}ix_price_history_package_time
+    ON price_history (package_id, timestamp);
+"""
+
+# Statements (constantes: sqlite3 los prepara una vez por conexión)
+INSERT_SEARCH = """
+INSERT INTO searches (
+    provider, origin, destination, departure_date, return_date,
+    adults, children, infants, class_type
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_SEARCH_RESULT = """
+INSERT INTO search_results (
+    search_id, flight_id, provider, origin, destination, departure_date,
+    return_date, price, currency, availability, details, raw_data
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SELECT_RESULTS_BY_ROUTE = """
+SELECT * FROM search_results
+WHERE origin = ? AND destination = ? AND departure_date BETWEEN ? AND ?
+ORDER BY departure_date, price
+LIMIT ?
+"""
+
+SELECT_RESULTS_BY_SEARCH = """
+SELECT * FROM search_results WHERE search_id = ? ORDER BY price
+"""
+
+UPSERT_PACKAGE = """
+INSERT INTO travel_packages (
+    id, provider_id, origin, destination, departure_date, return_date,
+    price, currency, availability, details, created_at, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    provider_id = excluded.provider_id,
+    origin = excluded.origin,
+    destination = excluded.destination,
+    departure_date = excluded.departure_date,
+    return_date = excluded.return_date,
+    price = excluded.price,
+    currency = excluded.currency,
+    availability = excluded.availability,
+    details = excluded.details,
+    updated_at = excluded.updated_at
+"""
+
+INSERT_PACKAGE = """
+INSERT INTO travel_packages (
+    provider_id, origin, destination, departure_date, return_date,
+    price, currency, availability, details, created_at, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SELECT_PACKAGES_BY_ROUTE = """
+SELECT * FROM travel_packages
+WHERE origin = ? AND destination = ? AND departure_date BETWEEN ? AND ?
+ORDER BY departure_date, price
+LIMIT ?
+"""
+
+INSERT_PRICE_POINT = """
+INSERT INTO price_history (package_id, price, currency, timestamp)
+VALUES (?, ?, ?, ?)
+"""
+
+SELECT_PRICE_HISTORY = """
+SELECT package_id, price, currency, timestamp FROM price_history
+WHERE package_id = ? AND timestamp BETWEEN ? AND ?
+ORDER BY timestamp
+"""
+
+INSERT_MARKET_ANALYSIS = """
+INSERT INTO market_analysis (
+    origin, destination, avg_price, min_price, max_price,
+    demand_score, trend, analysis_date, data
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SELECT_LATEST_MARKET_ANALYSIS = """
+SELECT * FROM market_analysis
+WHERE origin = ? AND destination = ?
+ORDER BY analysis_date DESC
+LIMIT 1
+"""
+
+# Cotas para rangos abiertos (los valores se guardan en ISO 8601)
+_MIN_TEXT = ""
+_MAX_TEXT = "\uffff"
+
+_JSON_COLUMNS = ("details", "raw_data", "data")
+
+
+def to_db_value(value: Any) -> Any:
+    """Convertir un valor Python al formato guardado."""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    """Fila como diccionario, con columnas JSON decodificadas."""
+    data = dict(row)
+    for column in _JSON_COLUMNS:
+        if isinstance(data.get(column), str):
+            try:
+                data[column] = json.loads(data[column])
+            except ValueError:
+                pass
+    return data
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones SQLite para asyncio.
+
+    Responsabilidades:
+    1. Abrir conexiones en modo WAL (lectores concurrentes con un escritor)
+    2. Adjuntar la base de catálogo como esquema "catalog"
+    3. Ejecutar cada operación en un thread propio del pool
+    4. Serializar escrituras para no competir por el lock de SQLite
+
+    Tras `close()` el pool se vuelve a abrir con la siguiente operación.
+    """
+
+    def __init__(self, config: Optional[StorageConfig] = None):
+        """
+        Inicializar pool.
+
+        Args:
+            config: Configuración de persistencia
+        """
+        self.config = config or StorageConfig()
+        self.path = Path(self.config.path) if self.config.path else DEFAULT_DB_PATH
+        if self.config.catalog_path:
+            self.catalog_path: Optional[Path] = Path(self.config.catalog_path)
+        else:
+            # Con una ruta propia el catálogo queda en la misma base
+            self.catalog_path = None if self.config.path else DEFAULT_CATALOG_PATH
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._connections: Optional[asyncio.Queue] = None
+        self._all: List[sqlite3.Connection] = []
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._init_lock = asyncio.Lock()
+
+    async def initialize(self) -> None:
+        """Abrir conexiones y asegurar el esquema."""
+        async with self._init_lock:
+            if self._connections is not None:
+                return
+
+            loop = asyncio.get_running_loop()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.catalog_path:
+                self.catalog_path.parent.mkdir(parents=True, exist_ok=True)
+            schema = SCHEMA + CATALOG_SCHEMA.format(
+                schema="catalog." if self.catalog_path else ""
+            )
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.pool_size, thread_name_prefix="sqlite"
+            )
+
+            connections = asyncio.Queue()
+            for index in range(self.config.pool_size):
+                conn = await loop.run_in_executor(self._executor, self._connect)
+                if index == 0:
+                    await loop.run_in_executor(
+                        self._executor, conn.executescript, schema
+                    )
+                self._all.append(conn)
+                connections.put_nowait(conn)
+
+            self._write_lock = asyncio.Lock()
+            self._connections = connections
+            logger.info(f"Pool SQLite inicializado: {self.path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.config.busy_timeout,
+            check_same_thread=False,
+            cached_statements=self.config.cached_statements,
+            isolation_level=None,  # transacciones explícitas
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        if self.catalog_path:
+            conn.execute("ATTACH DATABASE ? AS catalog", (str(self.catalog_path),))
+            conn.execute("PRAGMA catalog.journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        write: bool = False,
+        operation: str = "query",
+    ) -> Any:
+        """
+        Ejecutar `func(conn, *args)` con una conexión del pool.
+
+        Args:
+            func: Función bloqueante que recibe la conexión
+            *args: Argumentos adicionales
+            write: Si la operación escribe (se serializa)
+            operation: Nombre para métricas
+
+        Returns:
+            Resultado de func
+        """
+        await self.initialize()
+        conn = await self._connections.get()
+        job: Optional[Future] = None
+        try:
+            with STORAGE_LATENCY.labels(operation=operation).time():
+                if write:
+                    async with self._write_lock:
+                        job = self._executor.submit(
+                            _in_transaction, func, conn, *args
+                        )
+                        return await asyncio.wrap_future(job)
+                job = self._executor.submit(func, conn, *args)
+                return await asyncio.wrap_future(job)
+        finally:
+            self._release(conn, job)
+
+    def _release(self, conn: sqlite3.Connection, job: Optional[Future]) -> None:
+        """
+        Devolver la conexión al pool.
+
+        Si quien la pidió fue cancelado, el thread puede seguir usándola:
+        vuelve a la cola recién cuando termina.
+        """
+        connections = self._connections
+        if job is None or job.done():
+            connections.put_nowait(conn)
+            return
+
+        loop = asyncio.get_running_loop()
+        job.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(connections.put_nowait, conn)
+        )
+
+    async def close(self) -> None:
+        """Cerrar conexiones y threads (se reabren al volver a usarse)."""
+        async with self._init_lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+            self._connections = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+def _in_transaction(
+    func: Callable[..., Any], conn: sqlite3.Connection, *args: Any
+) -> Any:
+    """Ejecutar en una transacción (commit o rollback)."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        result = func(conn, *args)
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+    return result
+
+
+def _fetch_all(
+    conn: sqlite3.Connection, sql: str, params: Sequence[Any]
+) -> List[Dict[str, Any]]:
+    with closing(conn.execute(sql, params)) as cursor:
+        return [row_to_dict(row) for row in cursor.fetchall()]
+
+
+def _date_range(
+    start: Optional[Any], end: Optional[Any]
+) -> Tuple[str, str]:
+    """Rango inclusivo en formato guardado (abierto si falta una cota)."""
+    low = to_db_value(start) if start is not None else _MIN_TEXT
+    high = to_db_value(end) if end is not None else _MAX_TEXT
+    if isinstance(end, date) and not isinstance(end, datetime):
+        high = f"{high}{_MAX_TEXT}"  # incluir toda la fecha final
+    return low, high
+
+
+class TravelRepository:
+    """
+    Repositorio asíncrono sobre el esquema de data/.
+
+    Responsabilidades:
+    1. Guardar búsquedas con sus resultados en una transacción
+    2. Consultar resultados y paquetes por ruta y fecha (índice)
+    3. Persistir puntos de precio y análisis de mercado
+    """
+
+    def __init__(self, config: Optional[StorageConfig] = None):
+        """
+        Inicializar repositorio.
+
+        Args:
+            config: Configuración de persistencia
+        """
+        self.pool = ConnectionPool(config)
+
+    async def close(self) -> None:
+        """Cerrar el pool."""
+        await self.pool.close()
+
+    # Búsquedas
+
+    async def save_search(
+        self,
+        search: Dict[str, Any],
+        results: Iterable[Dict[str, Any]] = (),
+    ) -> int:
+        """
+        Guardar una búsqueda y sus resultados.
+
+        Args:
+            search: Campos de `searches` (provider, origin, destination,
+                departure_date, ...)
+            results: Filas de `search_results` (sin search_id)
+
+        Returns:
+            ID de la búsqueda
+        """
+        search_row = _search_row(search)
+        result_rows = [_result_row(result, search) for result in results]
+
+        def write(conn: sqlite3.Connection) -> int:
+            search_id = conn.execute(INSERT_SEARCH, search_row).lastrowid
+            conn.executemany(
+                INSERT_SEARCH_RESULT, [(search_id, *row) for row in result_rows]
+            )
+            return search_id
+
+        return await self.pool.run(write, write=True, operation="save_search")
+
+    async def add_search_results(
+        self, search_id: Optional[int], results: Iterable[Dict[str, Any]]
+    ) -> int:
+        """
+        Insertar resultados en bloque.
+
+        Returns:
+            Filas insertadas
+        """
+        rows = [(search_id, *_result_row(result)) for result in results]
+
+        def write(conn: sqlite3.Connection) -> int:
+            conn.executemany(INSERT_SEARCH_RESULT, rows)
+            return len(rows)
+
+        return await self.pool.run(write, write=True, operation="add_search_results")
+
+    async def find_results(
+        self,
+        origin: str,
+        destination: str,
+        date_from: Optional[Any] = None,
+        date_to: Optional[Any] = None,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """Resultados de una ruta, por índice (origin, destination, departure_date)."""
+        low, high = _date_range(date_from, date_to)
+        return await self.pool.run(
+            _fetch_all,
+            SELECT_RESULTS_BY_ROUTE,
+            (origin, destination, low, high, limit),
+            operation="find_results",
+        )
+
+    async def get_search_results(self, search_id: int) -> List[Dict[str, Any]]:
+        """Resultados de una búsqueda."""
+        return await self.pool.run(
+            _fetch_all,
+            SELECT_RESULTS_BY_SEARCH,
+            (search_id,),
+            operation="get_search_results",
+        )
+
+    # Paquetes
+
+    async def save_packages(self, packages: Iterable[Dict[str, Any]]) -> List[int]:
+        """
+        Insertar o actualizar paquetes en bloque.
+
+        Los paquetes con `id` se actualizan; el resto se inserta.
+
+        Returns:
+            IDs de los paquetes, en el mismo orden
+        """
+        now = to_db_value(datetime.now())
+        packages = list(packages)
+
+        def write(conn: sqlite3.Connection) -> List[int]:
+            ids: List[Optional[int]] = [p.get("id") for p in packages]
+            updates = [
+                (p["id"], *_package_row(p), now, now)
+                for p in packages
+                if p.get("id") is not None
+            ]
+            conn.executemany(UPSERT_PACKAGE, updates)
+            for index, package in enumerate(packages):
+                if ids[index] is None:
+                    ids[index] = conn.execute(
+                        INSERT_PACKAGE, (*_package_row(package), now, now)
+                    ).lastrowid
+            return ids
+
+        return await self.pool.run(write, write=True, operation="save_packages")
+
+    async def find_packages(
+        self,
+        origin: str,
+        destination: str,
+        date_from: Optional[Any] = None,
+        date_to: Optional[Any] = None,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """Paquetes de una ruta, por índice (origin, destination, departure_date)."""
+        low, high = _date_range(date_from, date_to)
+        return await self.pool.run(
+            _fetch_all,
+            SELECT_PACKAGES_BY_ROUTE,
+            (origin, destination, low, high, limit),
+            operation="find_packages",
+        )
+
+    # Historial de precios
+
+    async def add_price_points(
+        self, points: Iterable[Tuple[int, Any, str, datetime]]
+    ) -> int:
+        """
+        Insertar puntos de precio en bloque.
+
+        Args:
+            points: Tuplas (package_id, precio, moneda, timestamp)
+
+        Returns:
+            Filas insertadas
+        """
+        rows = [tuple(to_db_value(value) for value in point) for point in points]
+
+        def write(conn: sqlite3.Connection) -> int:
+            conn.executemany(INSERT_PRICE_POINT, rows)
+            return len(rows)
+
+        return await self.pool.run(write, write=True, operation="add_price_points")
+
+    async def get_price_history(
+        self,
+        package_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Puntos de precio de un paquete ordenados por tiempo."""
+        low, high = _date_range(start, end)
+        return await self.pool.run(
+            _fetch_all,
+            SELECT_PRICE_HISTORY,
+            (package_id, low, high),
+            operation="get_price_history",
+        )
+
+    # Análisis de mercado
+
+    async def save_market_analysis(self, analysis: Dict[str, Any]) -> int:
+        """Guardar un análisis de mercado."""
+        row = (
+            analysis["origin"],
+            analysis["destination"],
+            *(
+                to_db_value(analysis.get(key))
+                for key in (
+                    "avg_price", "min_price", "max_price", "demand_score", "trend"
+                )
+            ),
+            to_db_value(analysis.get("analysis_date") or datetime.now()),
+            to_db_value(analysis.get("data") or {}),
+        )
+
+        def write(conn: sqlite3.Connection) -> int:
+            return conn.execute(INSERT_MARKET_ANALYSIS, row).lastrowid
+
+        return await self.pool.run(write, write=True, operation="save_market_analysis")
+
+    async def get_latest_market_analysis(
+        self, origin: str, destination: str
+    ) -> Optional[Dict[str, Any]]:
+        """Último análisis de mercado de una ruta."""
+        rows = await self.pool.run(
+            _fetch_all,
+            SELECT_LATEST_MARKET_ANALYSIS,
+            (origin, destination),
+            operation="get_market_analysis",
+        )
+        return rows[0] if rows else None
+
+
+def _search_row(search: Dict[str, Any]) -> Tuple:
+    return (
+        search["provider"],
+        search["origin"],
+        search["destination"],
+        to_db_value(search["departure_date"]),
+        to_db_value(search.get("return_date")),
+        search.get("adults", 1),
+        search.get("children", 0),
+        search.get("infants", 0),
+        search.get("class_type"),
+    )
+
+
+def _result_row(
+    result: Dict[str, Any], search: Optional[Dict[str, Any]] = None
+) -> Tuple:
+    """Fila de search_results; la ruta se toma de la búsqueda si falta."""
+    search = search or {}
+    return (
+        str(result["flight_id"]),
+        result.get("provider") or search["provider"],
+        result.get("origin") or search["origin"],
+        result.get("destination") or search["destination"],
+        to_db_value(result.get("departure_date") or search["departure_date"]),
+        to_db_value(result.get("return_date") or search.get("return_date")),
+        to_db_value(result["price"]),
+        result["currency"],
+        int(result["availability"]) if result.get("availability") is not None else None,
+        to_db_value(result.get("details") or {}),
+        to_db_value(result.get("raw_data") or {}),
+    )
+
+
+def _package_row(package: Dict[str, Any]) -> Tuple:
+    return (
+        package.get("provider_id"),
+        package.get("origin"),
+        package.get("destination"),
+        to_db_value(package.get("departure_date")),
+        to_db_value(package.get("return_date")),
+        to_db_value(package.get("price")),
+        package.get("currency"),
+        (
+            int(package["availability"])
+            if package.get("availability") is not None
+            else None
+        ),
+        to_db_value(package.get("details") or {}),
+    )
+
+
+# Repositorios por ruta de base de datos
+_repositories: Dict[str, TravelRepository] = {}
+
+
+def get_repository(config: Optional[StorageConfig] = None) -> TravelRepository:
+    """
+    Obtener el repositorio compartido de una base de datos.
+
+    Args:
+        config: Configuración (la ruta identifica al repositorio)
+
+    Returns:
+        Repositorio
+    """
+    config = config or StorageConfig()
+    key = str(Path(config.path) if config.path else DEFAULT_DB_PATH)
+    repository = _repositories.get(key)
+    if repository is None:
+        repository = _repositories[key] = TravelRepository(config)
+    return repository
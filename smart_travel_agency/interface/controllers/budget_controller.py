@@ -5,16 +5,23 @@ from decimal import Decimal
 from typing import Dict, List, Optional
 from uuid import UUID
 
+from ..providers.service import ProviderService, get_provider_service
 from ..session import SessionManager
 from ..views.budget_view import BudgetView
 
 class BudgetController:
     """Controlador principal para operaciones de presupuesto."""
     
-    def __init__(self, session_manager: SessionManager):
+    def __init__(self,
+                 session_manager: SessionManager,
+                 provider_service: Optional[ProviderService] = None):
         self.session_manager = session_manager
         self._active_views: Dict[UUID, BudgetView] = {}
         
+        # Los ítems de las vistas abiertas se refrescan con prioridad
+        self.provider_service = provider_service or get_provider_service()
+        session_manager.add_close_listener(self._release_items)
+        
     def create_budget_view(self, session_id: UUID) -> Optional[BudgetView]:
         """Crea una nueva vista de presupuesto para una sesión."""
         if session_state := self.session_manager.get_session(session_id):
@@ -39,6 +46,10 @@ class BudgetController:
                     provider_id=item_data["provider_id"],
                     price=Decimal(str(item_data["price"]))
                 )
+                self.provider_service.watch_items(
+                    str(session_id),
+                    [(item_data["provider_id"], item_data["id"])]
+                )
                 return True
             except (KeyError, ValueError):
                 return False
@@ -68,6 +79,7 @@ class BudgetController:
 
     def close_budget_view(self, session_id: UUID) -> None:
         """Cierra una vista de presupuesto."""
+        self._release_items(session_id)
         if view := self._active_views.pop(session_id, None):
             # Procesar cambios pendientes antes de cerrar
             modified = view.get_modified_items()
@@ -79,3 +91,7 @@ class BudgetController:
                         "price": float(item.current_price),
                         "quantity": item.quantity
                     })
+    
+    def _release_items(self, session_id: UUID) -> None:
+        """Libera los ítems vigilados de una sesión cerrada."""
+        self.provider_service.unwatch_items(str(session_id))
@@ -10,7 +10,7 @@ from .aero_collector import (
     ClaseVuelo,
     Aerolinea
 )
-from .service import ProviderService
+from .service import ProviderService, get_provider_service
 from .search_service import SearchService
 
 __all__ = [
@@ -24,5 +24,6 @@ __all__ = [
     'ClaseVuelo',
     'Aerolinea',
     'ProviderService',
+    'get_provider_service',
     'SearchService'
 ]
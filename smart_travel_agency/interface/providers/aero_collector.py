@@ -5,11 +5,13 @@ Maneja la estructura específica de paquetes aéreos y servicios relacionados.
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum, auto
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import aiohttp
 from bs4 import BeautifulSoup
 from dataclasses import dataclass
 
+from ...core.providers.scrapers.executor import get_parsing_executor
+from ...core.providers.scrapers.parsing import parse_html, parse_price, selector
 from .collector import WebScraperCollector
 
 class EquipajeTipo(Enum):
@@ -54,6 +56,116 @@ class FiltrosBusqueda:
     precio_min: Optional[float] = None
     precio_max: Optional[float] = None
 
+# Selectores precompilados de la página de resultados
+SEL_FLIGHT = selector("div.flight")
+SEL_PRICE = selector(".price span.amount")
+SEL_RETURN_PRICE = selector(".return-price span.amount")
+
+
+def extract_text(soup: BeautifulSoup, css_selector: str) -> str:
+    """Extrae texto de un elemento."""
+    return selector(css_selector).text(soup)
+
+
+def extract_price(element: BeautifulSoup, price_selector) -> float:
+    """
+    Extrae precio directamente del nodo ya parseado.
+    
+    Args:
+        element: Nodo del resultado
+        price_selector: Selector precompilado o CSS
+    """
+    if isinstance(price_selector, str):
+        price_selector = selector(price_selector)
+        
+    price_element = price_selector.one(element)
+    if not price_element:
+        raise ValueError(
+            f"No se encontró precio con selector {price_selector.pattern}"
+        )
+        
+    # Limpia y convierte el texto a número
+    return parse_price(price_element.text.strip())
+
+
+def extract_stops_info(flight_element: BeautifulSoup) -> List[dict]:
+    """Extrae información detallada de escalas."""
+    stops = []
+    for stop in flight_element.select(".stop-info"):
+        stops.append({
+            "aeropuerto": extract_text(stop, ".airport"),
+            "tiempo_espera": extract_text(stop, ".wait-time"),
+            "terminal": extract_text(stop, ".terminal"),
+            "servicios_escala": extract_text(stop, ".stop-services")
+        })
+    return stops
+
+
+def extract_services(soup: BeautifulSoup) -> List[dict]:
+    """Extrae servicios incluidos en el vuelo."""
+    services = []
+    for service in soup.select("div.service"):
+        services.append({
+            "nombre": extract_text(service, ".name"),
+            "descripcion": extract_text(service, ".description"),
+            "incluido": "included" in service.get("class", [])
+        })
+    return services
+
+
+def parse_search_results(html: str,
+                         ida_y_vuelta: bool) -> Tuple[List[dict], List[str]]:
+    """
+    Parsea la página de resultados.
+    
+    Se ejecuta en el executor de parseo, por lo que solo recibe y devuelve
+    datos planos.
+    
+    Args:
+        html: Página de resultados
+        ida_y_vuelta: Si se deben extraer los datos de vuelta
+        
+    Returns:
+        Tupla (vuelos, errores)
+    """
+    soup = parse_html(html)
+    flights = []
+    errors = []
+    
+    for flight in SEL_FLIGHT.all(soup):
+        try:
+            # Extraer datos básicos
+            flight_data = {
+                "id": flight["data-id"],
+                "aerolinea": extract_text(flight, ".airline"),
+                "precio": extract_price(flight, SEL_PRICE),
+                "duracion": extract_text(flight, ".duration"),
+                "disponible": "available" in flight.get("class", []),
+                
+                # Datos adicionales
+                "equipaje": extract_text(flight, ".luggage-info"),
+                "clase": extract_text(flight, ".class-type"),
+                "escalas": extract_stops_info(flight),
+                "servicios": extract_services(flight)
+            }
+            
+            # Agregar datos de vuelta si es ida y vuelta
+            if ida_y_vuelta:
+                flight_data["vuelta"] = {
+                    "fecha": extract_text(flight, ".return-date"),
+                    "duracion": extract_text(flight, ".return-duration"),
+                    "precio": extract_price(flight, SEL_RETURN_PRICE)
+                }
+            
+            flights.append(flight_data)
+            
+        except Exception as e:
+            errors.append(f"Error parseando vuelo: {str(e)}")
+            continue
+    
+    return flights, errors
+
+
 class AeroCollector(WebScraperCollector):
     """Implementación específica para proveedor aéreo."""
     
@@ -123,7 +235,11 @@ class AeroCollector(WebScraperCollector):
             ) as response:
                 if response.status == 200:
                     html = await response.text()
-                    return self._parse_search_results(html, filtros)
+                    flights, errors = await get_parsing_executor().run(
+                        parse_search_results, html, bool(filtros.fecha_vuelta)
+                    )
+                    self.errors.extend(errors)
+                    return flights
                 else:
                     error = f"Error en búsqueda: {response.status}"
                     self.errors.append(error)
@@ -136,77 +252,18 @@ class AeroCollector(WebScraperCollector):
     def _parse_search_results(self, 
                             html: str, 
                             filtros: FiltrosBusqueda) -> List[dict]:
-        """Parsea resultados de búsqueda."""
-        soup = BeautifulSoup(html, 'html.parser')
-        flights = []
-        
-        for flight in soup.select("div.flight"):
-            try:
-                # Extraer datos básicos
-                flight_data = {
-                    "id": flight["data-id"],
-                    "aerolinea": self._extract_text(flight, ".airline"),
-                    "precio": self._extract_price(
-                        str(flight),
-                        ".price span.amount"
-                    ),
-                    "duracion": self._extract_text(flight, ".duration"),
-                    "disponible": "available" in flight.get("class", []),
-                    
-                    # Datos adicionales
-                    "equipaje": self._extract_text(flight, ".luggage-info"),
-                    "clase": self._extract_text(flight, ".class-type"),
-                    "escalas": self._extract_stops_info(flight),
-                    "servicios": self._extract_services(flight)
-                }
-                
-                # Agregar datos de vuelta si es ida y vuelta
-                if filtros.fecha_vuelta:
-                    flight_data["vuelta"] = {
-                        "fecha": self._extract_text(flight, ".return-date"),
-                        "duracion": self._extract_text(flight, ".return-duration"),
-                        "precio": self._extract_price(
-                            str(flight),
-                            ".return-price span.amount"
-                        )
-                    }
-                
-                flights.append(flight_data)
-                
-            except Exception as e:
-                self.errors.append(f"Error parseando vuelo: {str(e)}")
-                continue
-        
+        """Parsea resultados de búsqueda en el hilo actual."""
+        flights, errors = parse_search_results(html, bool(filtros.fecha_vuelta))
+        self.errors.extend(errors)
         return flights
     
-    def _extract_stops_info(self, flight_element: BeautifulSoup) -> List[dict]:
-        """Extrae información detallada de escalas."""
-        stops = []
-        for stop in flight_element.select(".stop-info"):
-            stops.append({
-                "aeropuerto": self._extract_text(stop, ".airport"),
-                "tiempo_espera": self._extract_text(stop, ".wait-time"),
-                "terminal": self._extract_text(stop, ".terminal"),
-                "servicios_escala": self._extract_text(stop, ".stop-services")
-            })
-        return stops
-    
-    def _extract_text(self, soup: BeautifulSoup, selector: str) -> str:
+    def _extract_text(self, soup: BeautifulSoup, css_selector: str) -> str:
         """Extrae texto de un elemento."""
-        element = soup.select_one(selector)
-        return element.text.strip() if element else ""
+        return extract_text(soup, css_selector)
     
-    def _extract_price(self, html: str, selector: str) -> float:
-        """Extrae precio usando BeautifulSoup."""
-        soup = BeautifulSoup(html, 'html.parser')
-        price_element = soup.select_one(selector)
-        if not price_element:
-            raise ValueError(f"No se encontró precio con selector {selector}")
-            
-        # Limpia y convierte el texto a número
-        price_text = price_element.text.strip()
-        price_text = price_text.replace('$', '').replace(',', '')
-        return float(price_text)
+    def _extract_price(self, element: BeautifulSoup, price_selector) -> float:
+        """Extrae precio directamente del nodo ya parseado."""
+        return extract_price(element, price_selector)
     
     def _extract_stops(self, soup: BeautifulSoup) -> List[dict]:
         """Extrae información de escalas."""
@@ -221,14 +278,7 @@ class AeroCollector(WebScraperCollector):
     
     def _extract_services(self, soup: BeautifulSoup) -> List[dict]:
         """Extrae servicios incluidos en el vuelo."""
-        services = []
-        for service in soup.select("div.service"):
-            services.append({
-                "nombre": self._extract_text(service, ".name"),
-                "descripcion": self._extract_text(service, ".description"),
-                "incluido": "included" in service.get("class", [])
-            })
-        return services
+        return extract_services(soup)
     
     async def get_flight_details(self, flight_id: str) -> Optional[dict]:
         """
@@ -250,7 +300,7 @@ class AeroCollector(WebScraperCollector):
             async with self.session.get(url) as response:
                 if response.status == 200:
                     html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
+                    soup = parse_html(html)
                     
                     details = {
                         "origen": self._extract_text(soup, "div.origin"),
@@ -1,11 +1,16 @@
 """
 Colectores base para proveedores.
 """
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from decimal import Decimal
 import asyncio
-from typing import Dict, List, Optional, Any
+import hashlib
+import json
+from typing import AbstractSet, Dict, List, Optional, Any
 import aiohttp
+from prometheus_client import Counter
 from aiohttp.client_exceptions import (
     ClientError,
     ClientConnectorError,
@@ -13,12 +18,85 @@ from aiohttp.client_exceptions import (
     ClientResponseError
 )
 
+from ...core.providers.resilience import (
+    CircuitOpenError,
+    ResilienceConfig,
+    get_resilience,
+    parse_retry_after,
+)
+
+# Métricas
+CONDITIONAL_FETCHES = Counter(
+    "provider_conditional_fetches_total",
+    "Conditional fetch outcomes per provider endpoint",
+    ["provider", "result"],
+)
+
+@dataclass
+class FetchValidators:
+    """Validadores de la última respuesta de un endpoint."""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    # Ítems ya procesados con esta respuesta (None = toda la respuesta)
+    items: Optional[frozenset] = None
+    
+    def covers(self, items: Optional[AbstractSet[str]]) -> bool:
+        """Si los ítems pedidos ya se procesaron con esta respuesta."""
+        if self.items is None:
+            return True
+        return items is not None and items <= self.items
+    
+    def request_headers(self) -> Dict[str, str]:
+        """Cabeceras para un GET condicional."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+@dataclass
+class FetchResult:
+    """
+    Respuesta de un GET condicional.
+    
+    Los validadores no se guardan al recibir la respuesta: quien la
+    procesa llama a `_commit_fetch` una vez parseada y aplicada (para
+    precios, vía `commit_price_update`), para que una falla posterior no
+    deje el cambio marcado como visto.
+    """
+    key: tuple
+    body: Optional[str] = None  # None si no cambió
+    validators: Optional[FetchValidators] = None
+
+@dataclass
+class AvailabilityResult:
+    """Resultado de una verificación de disponibilidad por lotes."""
+    available: Dict[str, bool] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)  # item_id -> error
+    requests: int = 0  # lotes enviados al proveedor
+
+@dataclass
+class PriceDelta:
+    """Cambios de precios respecto de la última actualización."""
+    changed: Dict[str, Decimal] = field(default_factory=dict)
+    removed: List[str] = field(default_factory=list)
+    # Respuestas a confirmar con el delta (ver `commit_price_update`)
+    fetched: List[FetchResult] = field(
+        default_factory=list, compare=False, repr=False
+    )
+    
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.removed)
+
 class ProviderError(Exception):
     """Error base para proveedores."""
     def __init__(self, message: str, provider_id: str, original_error: Optional[Exception] = None):
         self.message = message
         self.provider_id = provider_id
         self.original_error = original_error
+        self.retry_after: Optional[float] = None  # Retry-After del proveedor
         super().__init__(f"{provider_id}: {message}")
 
 class AuthenticationError(ProviderError):
@@ -29,19 +107,34 @@ class ConnectionError(ProviderError):
     """Error de conexión."""
     pass
 
-class ProviderCollector:
+class ProviderCollector(ABC):
     """Colector base para todos los proveedores."""
     
+    PARTIAL_REFRESH = False  # True si puede refrescar ítems sueltos
+    AVAILABILITY_CHUNK_SIZE = 200  # ítems por lote de disponibilidad
+    AVAILABILITY_MAX_IN_FLIGHT = 4  # lotes simultáneos
     MAX_RETRIES = 3
-    RETRY_DELAY = 1  # segundos
+    RETRY_DELAY = 1  # segundos (base del backoff exponencial)
     
     def __init__(self, provider_id: str):
         self.provider_id = provider_id
+        self.resilience = get_resilience(
+            f"collector:{provider_id}",
+            ResilienceConfig(
+                max_attempts=self.MAX_RETRIES,
+                base_delay=self.RETRY_DELAY
+            )
+        )
         self.errors: List[str] = []
         self.last_update: Optional[datetime] = None
         self._session: Optional[aiohttp.ClientSession] = None
         self._last_auth: Optional[datetime] = None
         self._auth_valid = False
+        
+        # Estado de fetch condicional: validadores por (operación, URL) y
+        # últimos precios
+        self._validators: Dict[tuple, FetchValidators] = {}
+        self._known_prices: Dict[str, Decimal] = {}
     
     @property
     def session(self) -> aiohttp.ClientSession:
@@ -52,7 +145,11 @@ class ProviderCollector:
     
     async def _retry_operation(self, operation: str, func: callable, *args, **kwargs) -> Any:
         """
-        Ejecuta una operación con reintentos.
+        Ejecuta una operación con la política de resiliencia del proveedor.
+        
+        Los fallos transitorios se reintentan con backoff exponencial y
+        jitter; si el proveedor está caído (circuito abierto) se falla
+        inmediatamente.
         
         Args:
             operation: Nombre de la operación para logs
@@ -66,22 +163,17 @@ class ProviderCollector:
         Raises:
             ProviderError: Si todos los reintentos fallan
         """
-        last_error = None
-        for attempt in range(self.MAX_RETRIES):
+        async def attempt():
             try:
-                if attempt > 0:
-                    await asyncio.sleep(self.RETRY_DELAY * attempt)
-                    
-                result = await func(*args, **kwargs)
-                return result
+                return await func(*args, **kwargs)
                 
-            except AuthenticationError as e:
+            except AuthenticationError:
                 # No reintentar errores de autenticación
                 self._auth_valid = False
                 raise
                 
             except (ClientConnectorError, ServerDisconnectedError) as e:
-                last_error = ConnectionError(
+                error = ConnectionError(
                     f"Error de conexión en {operation}",
                     self.provider_id,
                     e
@@ -89,30 +181,45 @@ class ProviderCollector:
                 
             except ClientResponseError as e:
                 if e.status in (401, 403):
+                    self._auth_valid = False
                     raise AuthenticationError(
                         "Credenciales inválidas o expiradas",
                         self.provider_id,
                         e
                     )
-                last_error = ProviderError(
+                error = ProviderError(
                     f"Error del servidor en {operation}: {e.status}",
                     self.provider_id,
                     e
                 )
+                if e.headers:
+                    error.retry_after = parse_retry_after(e.headers.get("Retry-After"))
+                
+            except ProviderError as e:
+                error = e
                 
             except Exception as e:
-                last_error = ProviderError(
+                error = ProviderError(
                     f"Error inesperado en {operation}: {str(e)}",
                     self.provider_id,
                     e
                 )
                 
-            self.errors.append(str(last_error))
-            
-        raise last_error or ProviderError(
-            f"Todos los reintentos fallaron para {operation}",
-            self.provider_id
-        )
+            self.errors.append(str(error))
+            raise error
+        
+        try:
+            return await self.resilience.call(
+                attempt,
+                retry_on=(ProviderError,),
+                give_up_on=(AuthenticationError,)
+            )
+        except CircuitOpenError as e:
+            raise ProviderError(
+                f"Proveedor no disponible en {operation}: {str(e)}",
+                self.provider_id,
+                e
+            )
     
     async def _make_request(self,
                           method: str,
@@ -146,6 +253,258 @@ class ProviderCollector:
                 
         return await self._retry_operation(operation, _do_request)
     
+    async def _conditional_get(self,
+                               url: str,
+                               operation: str,
+                               headers: Optional[Dict[str, str]] = None,
+                               items: Optional[AbstractSet[str]] = None,
+                               **kwargs) -> FetchResult:
+        """
+        GET condicional de un endpoint.
+        
+        Envía If-None-Match / If-Modified-Since con los validadores de la
+        respuesta anterior y compara el hash del contenido, de modo que una
+        página sin cambios no llega a parsearse. Los validadores solo se
+        usan si ya se procesaron con ellos todos los ítems pedidos.
+        
+        Args:
+            url: URL del endpoint
+            operation: Nombre de la operación
+            headers: Cabeceras adicionales
+            items: Ítems que se extraerán de la respuesta (None = toda)
+            **kwargs: Argumentos adicionales para la petición
+            
+        Returns:
+            Respuesta a confirmar con `_commit_fetch` tras procesarla
+            
+        Raises:
+            ProviderError: Si la petición falla
+        """
+        key = (operation, url)
+        items = frozenset(items) if items is not None else None
+        previous = self._validators.get(key)
+        if previous and not previous.covers(items):
+            previous = None
+        request_headers = dict(headers or {})
+        if previous:
+            request_headers.update(previous.request_headers())
+        
+        async def _do_request():
+            async with self.session.get(
+                url, headers=request_headers, **kwargs
+            ) as response:
+                if response.status in (401, 403):
+                    raise AuthenticationError(
+                        "Credenciales inválidas o expiradas",
+                        self.provider_id
+                    )
+                if response.status == 304:
+                    return None
+                response.raise_for_status()
+                body = await response.read()
+                return body, response.charset, response.headers
+        
+        result = await self._retry_operation(operation, _do_request)
+        if result is None:
+            self._count_fetch("not_modified")
+            return FetchResult(key)
+        
+        body, charset, response_headers = result
+        digest = hashlib.sha256(body).hexdigest()
+        validators = FetchValidators(
+            etag=response_headers.get("ETag"),
+            last_modified=response_headers.get("Last-Modified"),
+            content_hash=digest,
+            items=items
+        )
+        
+        if previous and previous.content_hash == digest:
+            self._count_fetch("unchanged")
+            return FetchResult(key, validators=validators)
+        
+        self._count_fetch("changed")
+        return FetchResult(
+            key,
+            body.decode(charset or "utf-8", errors="replace"),
+            validators
+        )
+    
+    def _commit_fetch(self, *results: FetchResult) -> None:
+        """Guarda los validadores de respuestas ya procesadas."""
+        for result in results:
+            validators = result.validators
+            if validators is None:
+                continue
+            previous = self._validators.get(result.key)
+            if previous and previous.content_hash == validators.content_hash:
+                # Misma respuesta: se suman los ítems procesados
+                if previous.items is None or validators.items is None:
+                    validators.items = None
+                else:
+                    validators.items = previous.items | validators.items
+            self._validators[result.key] = validators
+    
+    def _count_fetch(self, result: str) -> None:
+        CONDITIONAL_FETCHES.labels(provider=self.provider_id, result=result).inc()
+    
+    async def _request_json(self,
+                            method: str,
+                            url: str,
+                            operation: str,
+                            **kwargs) -> Any:
+        """
+        Petición HTTP que devuelve el cuerpo JSON.
+        
+        Raises:
+            ProviderError: Si la petición falla
+        """
+        async def _do_request():
+            async with self.session.request(method, url, **kwargs) as response:
+                if response.status in (401, 403):
+                    raise AuthenticationError(
+                        "Credenciales inválidas o expiradas",
+                        self.provider_id
+                    )
+                response.raise_for_status()
+                return await response.json()
+        
+        return await self._retry_operation(operation, _do_request)
+    
+    def _diff_prices(self,
+                     prices: Dict[str, Decimal],
+                     complete: bool = True) -> PriceDelta:
+        """
+        Calcula el delta contra los últimos precios conocidos.
+        
+        No modifica los precios conocidos: se actualizan al confirmar el
+        delta con `commit_price_update`.
+        
+        Args:
+            prices: Precios obtenidos
+            complete: Si `prices` es el catálogo completo (los ítems
+                ausentes se consideran eliminados)
+            
+        Returns:
+            Ítems cambiados y eliminados
+        """
+        delta = PriceDelta(changed={
+            item_id: price
+            for item_id, price in prices.items()
+            if self._known_prices.get(item_id) != price
+        })
+        if complete:
+            delta.removed = [
+                item_id for item_id in self._known_prices
+                if item_id not in prices
+            ]
+        return delta
+    
+    def commit_price_update(self, delta: PriceDelta) -> None:
+        """
+        Confirma un delta ya aplicado por quien lo pidió.
+        
+        Recién entonces pasa a ser la base del próximo delta y se guardan
+        los validadores de sus respuestas; si aplicarlo falla, el próximo
+        refresco vuelve a entregar los mismos cambios.
+        
+        Args:
+            delta: Delta devuelto por `fetch_price_updates`
+        """
+        self._known_prices.update(delta.changed)
+        for item_id in delta.removed:
+            self._known_prices.pop(item_id, None)
+        self._commit_fetch(*delta.fetched)
+    
+    async def fetch_prices(self) -> Dict[str, Decimal]:
+        """Obtiene el catálogo completo de precios conocido."""
+        self.commit_price_update(await self.fetch_price_updates())
+        return dict(self._known_prices)
+    
+    @abstractmethod
+    async def fetch_price_updates(self,
+                                  item_ids: Optional[List[str]] = None) -> PriceDelta:
+        """
+        Obtiene solo los precios que cambiaron desde el último delta
+        confirmado con `commit_price_update`.
+        
+        Args:
+            item_ids: Ítems a refrescar; solo lo respetan los colectores
+                con PARTIAL_REFRESH (el resto trae el catálogo completo)
+        """
+    
+    async def check_availability(self, item_ids: List[str]) -> Dict[str, bool]:
+        """
+        Verifica disponibilidad de ítems.
+        
+        Los ítems cuyo lote falló quedan fuera del resultado (ver
+        `check_availability_bulk` para obtener los errores por ítem).
+        
+        Raises:
+            ProviderError: Si fallaron todos los lotes
+        """
+        result = await self.check_availability_bulk(item_ids)
+        if result.errors and not result.available:
+            first_error = next(iter(result.errors.values()))
+            raise ProviderError(
+                f"Error verificando disponibilidad: {first_error}",
+                self.provider_id
+            )
+        return result.available
+    
+    async def check_availability_bulk(
+        self,
+        item_ids: List[str],
+        chunk_size: Optional[int] = None,
+        max_in_flight: Optional[int] = None
+    ) -> AvailabilityResult:
+        """
+        Verifica disponibilidad en lotes concurrentes.
+        
+        El catálogo se valida en ceil(N / chunk_size) lotes, con a lo sumo
+        `max_in_flight` en curso; un lote fallido no invalida al resto.
+        
+        Args:
+            item_ids: Ítems a verificar
+            chunk_size: Ítems por lote (por defecto AVAILABILITY_CHUNK_SIZE)
+            max_in_flight: Lotes simultáneos (por defecto
+                AVAILABILITY_MAX_IN_FLIGHT)
+            
+        Returns:
+            Disponibilidad obtenida y errores por ítem
+        """
+        chunk_size = chunk_size or self.AVAILABILITY_CHUNK_SIZE
+        semaphore = asyncio.Semaphore(max_in_flight or self.AVAILABILITY_MAX_IN_FLIGHT)
+        item_ids = list(dict.fromkeys(item_ids))
+        chunks = [
+            item_ids[i:i + chunk_size]
+            for i in range(0, len(item_ids), chunk_size)
+        ]
+        
+        async def run_chunk(chunk: List[str]) -> Dict[str, bool]:
+            async with semaphore:
+                return await self._check_availability_chunk(chunk)
+        
+        outcomes = await asyncio.gather(
+            *(run_chunk(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+        
+        result = AvailabilityResult(requests=len(chunks))
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            if isinstance(outcome, BaseException):
+                error = str(outcome)
+                self.errors.append(error)
+                result.errors.update((item_id, error) for item_id in chunk)
+            else:
+                result.available.update(outcome)
+        return result
+    
+    @abstractmethod
+    async def _check_availability_chunk(self, item_ids: List[str]) -> Dict[str, bool]:
+        """Verifica disponibilidad de un lote (implementado por cada colector)."""
+    
     async def check_auth(self) -> bool:
         """
         Verifica si las credenciales son válidas.
@@ -183,41 +542,44 @@ class APIProviderCollector(ProviderCollector):
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
     
-    async def fetch_prices(self) -> Dict[str, Decimal]:
-        """Obtiene precios actualizados vía API."""
+    async def fetch_price_updates(self,
+                                  item_ids: Optional[List[str]] = None) -> PriceDelta:
+        """Obtiene vía API los precios que cambiaron (catálogo completo)."""
         try:
-            async with self._make_request(
-                "GET",
+            result = await self._conditional_get(
                 f"{self.base_url}/prices",
                 "fetch_prices"
-            ) as response:
-                data = await response.json()
-                self.last_update = datetime.now()
-                return {
-                    item_id: Decimal(str(price))
-                    for item_id, price in data.items()
-                }
+            )
         except ProviderError as e:
             self.errors.append(str(e))
             raise
+        
+        self.last_update = datetime.now()
+        if result.body is None:
+            return PriceDelta(fetched=[result])
+        
+        data = json.loads(result.body)
+        delta = self._diff_prices({
+            item_id: Decimal(str(price))
+            for item_id, price in data.items()
+        })
+        delta.fetched.append(result)
+        return delta
     
-    async def check_availability(self, item_ids: List[str]) -> Dict[str, bool]:
-        """Verifica disponibilidad vía API."""
-        try:
-            async with self._make_request(
-                "POST",
-                f"{self.base_url}/availability",
-                "check_availability",
-                json={"items": item_ids}
-            ) as response:
-                return await response.json()
-        except ProviderError as e:
-            self.errors.append(str(e))
-            raise
+    async def _check_availability_chunk(self, item_ids: List[str]) -> Dict[str, bool]:
+        """Verifica disponibilidad de un lote vía API (un request)."""
+        return await self._request_json(
+            "POST",
+            f"{self.base_url}/availability",
+            "check_availability",
+            json={"items": item_ids}
+        )
 
 class WebScraperCollector(ProviderCollector):
     """Colector para proveedores sin API (web scraping)."""
     
+    PARTIAL_REFRESH = True  # un request por ítem
+    
     def __init__(self, 
                  provider_id: str, 
                  scraper_config: dict,
@@ -228,6 +590,7 @@ class WebScraperCollector(ProviderCollector):
         self.username = username
         self.password = password
         self._auth_token = None
+        self._known_availability: Dict[str, bool] = {}
     
     async def _authenticate(self):
         """Realiza la autenticación con el proveedor."""
@@ -270,61 +633,99 @@ class WebScraperCollector(ProviderCollector):
             self.errors.append(f"Error en autenticación: {str(e)}")
             raise
     
-    async def fetch_prices(self) -> Dict[str, Decimal]:
-        """Obtiene precios mediante web scraping."""
+    async def fetch_price_updates(self,
+                                  item_ids: Optional[List[str]] = None) -> PriceDelta:
+        """
+        Obtiene mediante web scraping los precios que cambiaron.
+        
+        Cada URL se descarga una vez por refresco y su contenido se usa
+        para todos los ítems que la comparten. Solo se parsean las páginas
+        cuyo contenido cambió, y los validadores se guardan recién cuando
+        el delta se confirma: si el refresco falla, se reintenta completo.
+        
+        Args:
+            item_ids: Ítems a refrescar (None = todos los configurados)
+        """
         try:
+            selectors = self.config["price_selectors"]
+            if item_ids is not None:
+                selectors = {
+                    item_id: selectors[item_id]
+                    for item_id in item_ids if item_id in selectors
+                }
+            
             prices = {}
-            for item_id, config in self.config["price_selectors"].items():
-                async with self._make_request(
-                    "GET",
-                    config["url"],
-                    "fetch_prices"
-                ) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        price = self._extract_price(html, config["selector"])
-                        prices[item_id] = Decimal(str(price))
-                    elif response.status == 401:
-                        # Si perdimos autenticación, reintentar una vez
-                        await self._authenticate()
-                        async with self._make_request(
-                            "GET",
-                            config["url"],
-                            "fetch_prices"
-                        ) as retry_response:
-                            if retry_response.status == 200:
-                                html = await retry_response.text()
-                                price = self._extract_price(html, config["selector"])
-                                prices[item_id] = Decimal(str(price))
+            fetched = []
+            for url, url_items in self._group_by_url(selectors).items():
+                result = await self._fetch_page(url, "fetch_prices", url_items)
+                fetched.append(result)
+                if result.body is None:
+                    continue
+                for item_id in url_items:
+                    price = self._extract_price(
+                        result.body, selectors[item_id]["selector"]
+                    )
+                    prices[item_id] = Decimal(str(price))
             
             self.last_update = datetime.now()
-            return prices
+            delta = self._diff_prices(prices, complete=False)
+            delta.fetched.extend(fetched)
+            return delta
         except ProviderError as e:
             self.errors.append(str(e))
             raise
 
-    async def check_availability(self, item_ids: List[str]) -> Dict[str, bool]:
-        """Verifica disponibilidad mediante web scraping."""
+    async def _check_availability_chunk(self, item_ids: List[str]) -> Dict[str, bool]:
+        """
+        Verifica disponibilidad de un lote mediante web scraping.
+        
+        Sin API de lotes, cada URL es una página (compartida por los ítems
+        que apuntan a ella); las páginas sin cambios reutilizan el último
+        resultado sin parsearse.
+        """
+        configs = self.config["availability_selectors"]
+        selectors = {
+            item_id: configs[item_id] for item_id in item_ids if item_id in configs
+        }
+        
+        found = {}
+        fetched = []
+        for url, url_items in self._group_by_url(selectors).items():
+            result = await self._fetch_page(url, "check_availability", url_items)
+            fetched.append(result)
+            if result.body is None:
+                continue
+            for item_id in url_items:
+                found[item_id] = self._check_availability_element(
+                    result.body, selectors[item_id]["selector"]
+                )
+        
+        self._known_availability.update(found)
+        self._commit_fetch(*fetched)
+        return {
+            item_id: self._known_availability[item_id]
+            for item_id in selectors
+            if item_id in self._known_availability
+        }
+    
+    async def _fetch_page(self,
+                          url: str,
+                          operation: str,
+                          items: List[str]) -> FetchResult:
+        """GET condicional de una página, reautenticando una vez si hace falta."""
         try:
-            availability = {}
-            for item_id in item_ids:
-                if config := self.config["availability_selectors"].get(item_id):
-                    async with self._make_request(
-                        "GET",
-                        config["url"],
-                        "check_availability"
-                    ) as response:
-                        if response.status == 200:
-                            html = await response.text()
-                            available = self._check_availability_element(
-                                html, 
-                                config["selector"]
-                            )
-                            availability[item_id] = available
-            return availability
-        except ProviderError as e:
-            self.errors.append(str(e))
-            raise
+            return await self._conditional_get(url, operation, items=set(items))
+        except AuthenticationError:
+            await self._authenticate()
+            return await self._conditional_get(url, operation, items=set(items))
+    
+    @staticmethod
+    def _group_by_url(selectors: Dict[str, dict]) -> Dict[str, List[str]]:
+        """Ítems agrupados por la URL de la que se extraen."""
+        by_url: Dict[str, List[str]] = {}
+        for item_id, config in selectors.items():
+            by_url.setdefault(config["url"], []).append(item_id)
+        return by_url
     
     def _extract_price(self, html: str, selector: str) -> float:
         """Extrae precio usando selector."""
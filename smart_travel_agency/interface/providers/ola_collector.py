@@ -7,62 +7,70 @@ from decimal import Decimal
 from typing import Dict, List, Optional
 import json
 
-from .collector import ProviderCollector
+from .collector import PriceDelta, ProviderCollector
 
 class OLACollector(ProviderCollector):
     """Implementación específica para OLA."""
     
+    # La verificación es local (sin requests): lotes grandes
+    AVAILABILITY_CHUNK_SIZE = 5000
+    
     def __init__(self, provider_id: str, base_url: str, api_key: str):
         super().__init__(provider_id)
         self.base_url = base_url
         self.api_key = api_key
         self._cached_packages = {}
     
-    async def fetch_prices(self) -> Dict[str, Decimal]:
+    async def fetch_price_updates(self,
+                                  item_ids: Optional[List[str]] = None) -> PriceDelta:
         """
-        Obtiene precios de paquetes OLA.
-        Retorna un diccionario de id_paquete -> precio_total
+        Obtiene los precios de paquetes OLA que cambiaron.
+        Los precios son id_paquete -> precio_total; si el listado no
+        cambió no se vuelve a procesar.
         """
         try:
             # Obtener datos del endpoint
-            async with self.session.get(
+            result = await self._conditional_get(
                 f"{self.base_url}/paquetes",
+                "fetch_prices",
                 headers={"Authorization": f"Bearer {self.api_key}"}
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    prices = {}
+            )
+            self.last_update = datetime.now()
+            if result.body is None:
+                return PriceDelta(fetched=[result])
+            
+            data = json.loads(result.body)
+            prices = {}
+            
+            for package in data["paquetes"]:
+                # Generamos un ID único basado en destino + fecha
+                for fecha in package["fechas"]:
+                    package_id = f"{package['destino']}_{fecha}"
+                    
+                    # Precio total incluyendo impuestos
+                    total_price = Decimal(str(package["precio"])) + \
+                                Decimal(str(package["impuestos"]))
                     
-                    for package in data["paquetes"]:
-                        # Generamos un ID único basado en destino + fecha
-                        for fecha in package["fechas"]:
-                            package_id = f"{package['destino']}_{fecha}"
-                            
-                            # Precio total incluyendo impuestos
-                            total_price = Decimal(str(package["precio"])) + \
-                                        Decimal(str(package["impuestos"]))
-                            
-                            prices[package_id] = total_price
-                            
-                            # Cachear el paquete completo para uso posterior
-                            self._cached_packages[package_id] = {
-                                **package,
-                                "fecha_seleccionada": fecha
-                            }
+                    prices[package_id] = total_price
                     
-                    self.last_update = datetime.now()
-                    return prices
-                else:
-                    error = f"Error {response.status}: {await response.text()}"
-                    self.errors.append(error)
-                    raise ValueError(error)
+                    # Cachear el paquete completo para uso posterior
+                    self._cached_packages[package_id] = {
+                        **package,
+                        "fecha_seleccionada": fecha
+                    }
+            
+            delta = self._diff_prices(prices)
+            for package_id in delta.removed:
+                self._cached_packages.pop(package_id, None)
+            delta.fetched.append(result)
+            return delta
         except Exception as e:
             self.errors.append(str(e))
             raise
     
-    async def check_availability(self, item_ids: List[str]) -> Dict[str, bool]:
+    async def _check_availability_chunk(self, item_ids: List[str]) -> Dict[str, bool]:
         """
-        Verifica disponibilidad de paquetes.
+        Verifica disponibilidad de un lote de paquetes.
         Usa las fechas almacenadas en caché para validar disponibilidad.
         """
         availability = {}
@@ -0,0 +1,336 @@
+"""
+Planificador adaptativo de actualizaciones de proveedores.
+
+Este módulo implementa:
+1. Cola de prioridad de refrescos por ítem (o por catálogo)
+2. Intervalo por ítem según volatilidad observada del precio
+3. Prioridad para ítems referenciados por presupuestos/sesiones abiertas
+4. Ajuste al rate limit del proveedor y jitter para repartir la carga
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import heapq
+import logging
+import random
+from prometheus_client import Counter, Gauge
+
+from ...core.schemas import RateLimitConfig
+
+# Métricas
+SCHEDULED_REFRESHES = Counter(
+    "provider_scheduled_refreshes_total",
+    "Refreshes executed by the adaptive scheduler",
+    ["provider", "result"],
+)
+
+REFRESH_THROTTLE = Gauge(
+    "provider_refresh_throttle",
+    "Factor applied to refresh intervals to respect the provider quota",
+    ["provider"],
+)
+
+# Clave de la cola: (provider_id, item_id); item_id None = catálogo completo
+RefreshKey = Tuple[str, Optional[str]]
+RefreshFunc = Callable[[str, Optional[List[str]]], Awaitable[Any]]
+
+
+@dataclass
+class RefreshPolicy:
+    """Parámetros del planificador."""
+    base_interval: float = 300.0  # ítem estable y sin presupuestos abiertos
+    min_interval: float = 15.0
+    max_interval: float = 3600.0
+    volatility_reference: float = 0.01  # cambio relativo que duplica la frecuencia
+    volatility_smoothing: float = 0.3  # peso de la última observación (EWMA)
+    active_factor: float = 4.0  # ítems en presupuestos abiertos: N veces más seguido
+    quota_share: float = 0.5  # fracción del rate limit usada en refrescos
+    jitter: float = 0.1  # ± fracción aleatoria del intervalo
+    coalesce_window: float = 1.0  # ítems que vencen juntos se agrupan
+
+
+@dataclass
+class ItemStats:
+    """Estadísticas de precio de un ítem."""
+    price: Optional[Decimal] = None
+    volatility: float = 0.0  # EWMA del cambio relativo por refresco
+
+    def observe(self, price: Optional[Decimal], smoothing: float) -> None:
+        """Registrar el precio de un refresco (None = sin cambios)."""
+        change = 0.0
+        if price is not None:
+            if self.price:
+                change = float(abs(price - self.price) / self.price)
+            self.price = price
+        self.volatility += smoothing * (change - self.volatility)
+
+
+class RefreshScheduler:
+    """
+    Planificador de refrescos con cola de prioridad.
+
+    Responsabilidades:
+    1. Refrescar primero lo que más probablemente cambió
+    2. Repartir la cuota del proveedor priorizando ítems activos
+    3. Evitar que todos los proveedores despierten a la vez
+    """
+
+    def __init__(self,
+                 refresh: RefreshFunc,
+                 policy: Optional[RefreshPolicy] = None,
+                 is_active: Optional[Callable[[str, str], bool]] = None,
+                 rng: Callable[[float, float], float] = random.uniform):
+        """
+        Inicializar planificador.
+
+        Args:
+            refresh: Corrutina (provider_id, item_ids) que refresca y
+                devuelve un PriceDelta; item_ids None = catálogo completo
+            policy: Parámetros
+            is_active: Indica si un presupuesto/sesión abierta usa el ítem
+            rng: Generador para jitter
+        """
+        self.logger = logging.getLogger(__name__)
+        self.policy = policy or RefreshPolicy()
+        self._refresh = refresh
+        self._is_active = is_active or (lambda provider_id, item_id: False)
+        self._rng = rng
+
+        self._heap: List[Tuple[float, int, str, Optional[str]]] = []
+        self._due: Dict[RefreshKey, float] = {}
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+
+        self._partial: Dict[str, bool] = {}
+        self._quotas: Dict[str, RateLimitConfig] = {}
+        self._throttle: Dict[str, float] = {}
+        self._stats: Dict[str, Dict[str, ItemStats]] = {}
+        self._in_flight: Set[str] = set()
+
+        self._task: Optional[asyncio.Task] = None
+        self._background: Set[asyncio.Task] = set()
+
+    def add_provider(self,
+                     provider_id: str,
+                     partial: bool = False,
+                     rate_limit: Optional[RateLimitConfig] = None) -> None:
+        """
+        Registrar un proveedor.
+
+        Args:
+            provider_id: ID del proveedor
+            partial: Si el colector puede refrescar ítems sueltos (un
+                request por ítem); si no, cada refresco trae el catálogo
+            rate_limit: Cuota de requests del proveedor
+        """
+        self._partial[provider_id] = partial
+        self._quotas[provider_id] = rate_limit or RateLimitConfig()
+        self._stats.setdefault(provider_id, {})
+        # Primer refresco repartido en el intervalo mínimo
+        self._push((provider_id, None), self._rng(0.0, self.policy.min_interval))
+
+    def interval(self, provider_id: str, item_id: str) -> float:
+        """Intervalo de refresco de un ítem, ya ajustado a la cuota."""
+        throttle = self._throttle.get(provider_id, 1.0)
+        return self._raw_interval(provider_id, item_id) * throttle
+
+    def reschedule(self, provider_id: str, item_ids: Iterable[str]) -> None:
+        """
+        Adelantar ítems cuyo intervalo se acortó (p. ej. al abrirse un
+        presupuesto que los usa).
+        """
+        self._update_throttle(provider_id)
+        if provider_id in self._in_flight:
+            return
+
+        now = self._now()
+        for item_id in item_ids:
+            key = (provider_id, item_id if self._partial.get(provider_id) else None)
+            if key not in self._due:
+                continue
+            due = now + self.interval(provider_id, item_id)
+            if due < self._due[key]:
+                self._push(key, due - now)
+
+    def start(self) -> None:
+        """Iniciar el loop de refrescos."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Detener el loop y los refrescos en curso."""
+        tasks = [t for t in [self._task, *self._background] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        """Despachar refrescos a medida que vencen."""
+        while True:
+            if not self._heap:
+                await self._wait(None)
+                continue
+
+            due, _, provider_id, item_id = self._heap[0]
+            if self._due.get((provider_id, item_id)) != due:
+                heapq.heappop(self._heap)  # entrada reemplazada
+                continue
+
+            delay = due - self._now()
+            if delay > 0:
+                await self._wait(delay)
+                continue
+
+            self._spawn(self._execute(provider_id, self._take_batch(provider_id)))
+
+    async def _wait(self, timeout: Optional[float]) -> None:
+        """Dormir hasta el próximo vencimiento o hasta un cambio de la cola."""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _take_batch(self, provider_id: str) -> Optional[List[str]]:
+        """Sacar de la cola los ítems del proveedor que vencen juntos."""
+        self._in_flight.add(provider_id)
+        if not self._partial.get(provider_id):
+            self._due.pop((provider_id, None), None)
+            return None
+
+        horizon = self._now() + self.policy.coalesce_window
+        batch: List[Optional[str]] = []
+        others = []
+        while self._heap and self._heap[0][0] <= horizon:
+            entry = heapq.heappop(self._heap)
+            due, _, pid, item_id = entry
+            if self._due.get((pid, item_id)) != due:
+                continue
+            if pid == provider_id:
+                del self._due[(pid, item_id)]
+                batch.append(item_id)
+            else:
+                others.append(entry)
+        for entry in others:
+            heapq.heappush(self._heap, entry)
+
+        # Clave de catálogo (primer refresco): refrescar todo
+        if None in batch:
+            return None
+        return batch
+
+    async def _execute(self, provider_id: str, item_ids: Optional[List[str]]) -> None:
+        """Refrescar un lote y reprogramar sus ítems."""
+        delta = None
+        try:
+            delta = await self._refresh(provider_id, item_ids)
+            SCHEDULED_REFRESHES.labels(provider=provider_id, result="ok").inc()
+        except Exception as e:
+            SCHEDULED_REFRESHES.labels(provider=provider_id, result="error").inc()
+            self.logger.error(f"Error refrescando {provider_id}: {str(e)}")
+        finally:
+            self._in_flight.discard(provider_id)
+
+        refreshed = self._observe(provider_id, item_ids, delta)
+        self._update_throttle(provider_id)
+
+        if not self._partial.get(provider_id):
+            self._push((provider_id, None), self._catalog_interval(provider_id))
+            return
+
+        if not refreshed:
+            self._push((provider_id, None), self.policy.base_interval)
+        for item_id in refreshed:
+            if (provider_id, item_id) not in self._due:
+                self._push((provider_id, item_id), self.interval(provider_id, item_id))
+
+    def _observe(self,
+                 provider_id: str,
+                 item_ids: Optional[List[str]],
+                 delta: Any) -> List[str]:
+        """Actualizar la volatilidad de los ítems refrescados."""
+        stats = self._stats[provider_id]
+        changed = dict(getattr(delta, "changed", {}) or {})
+        for item_id in getattr(delta, "removed", []) or []:
+            stats.pop(item_id, None)
+
+        refreshed = list(stats) if item_ids is None else list(item_ids)
+        refreshed.extend(item_id for item_id in changed if item_id not in stats)
+
+        smoothing = self.policy.volatility_smoothing
+        for item_id in refreshed:
+            item = stats.get(item_id)
+            if item is None:
+                # Ítem nuevo: el primer precio no cuenta como cambio
+                stats[item_id] = ItemStats(price=changed.get(item_id))
+                continue
+            if delta is not None:
+                item.observe(changed.get(item_id), smoothing)
+        return [item_id for item_id in dict.fromkeys(refreshed) if item_id in stats]
+
+    def _raw_interval(self, provider_id: str, item_id: str) -> float:
+        """Intervalo por volatilidad y actividad, sin ajuste de cuota."""
+        policy = self.policy
+        item = self._stats.get(provider_id, {}).get(item_id)
+        volatility = item.volatility if item else 0.0
+
+        interval = policy.base_interval / (
+            1.0 + volatility / policy.volatility_reference
+        )
+        if self._is_active(provider_id, item_id):
+            interval /= policy.active_factor
+        return min(max(interval, policy.min_interval), policy.max_interval)
+
+    def _catalog_interval(self, provider_id: str) -> float:
+        """Un catálogo se refresca al ritmo de su ítem más urgente."""
+        stats = self._stats.get(provider_id)
+        if not stats:
+            return self.policy.base_interval
+        return min(self.interval(provider_id, item_id) for item_id in stats)
+
+    def _update_throttle(self, provider_id: str) -> None:
+        """
+        Estirar los intervalos si la demanda supera la cuota.
+
+        El factor es común a todos los ítems del proveedor, así que los
+        ítems activos conservan su ventaja dentro de la misma cuota.
+        """
+        quota = self._quotas[provider_id]
+        capacity = quota.calls / quota.period * self.policy.quota_share
+        raw = [
+            self._raw_interval(provider_id, item_id)
+            for item_id in self._stats[provider_id]
+        ]
+
+        if not raw:
+            demand = 0.0
+        elif self._partial.get(provider_id):
+            demand = sum(1.0 / interval for interval in raw)
+        else:
+            demand = 1.0 / min(raw)
+
+        throttle = max(1.0, demand / capacity) if capacity > 0 else 1.0
+        self._throttle[provider_id] = throttle
+        REFRESH_THROTTLE.labels(provider=provider_id).set(throttle)
+
+    def _push(self, key: RefreshKey, interval: float) -> None:
+        """Programar una clave con jitter."""
+        jitter = self.policy.jitter
+        if jitter:
+            interval *= self._rng(1.0 - jitter, 1.0 + jitter)
+
+        due = self._now() + interval
+        self._due[key] = due
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, key[0], key[1]))
+        self._wakeup.set()
+
+    def _spawn(self, coro: Awaitable[Any]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
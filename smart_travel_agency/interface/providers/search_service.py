@@ -2,9 +2,13 @@
 Servicio unificado de búsqueda de vuelos.
 """
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 import asyncio
+import inspect
+import logging
+from prometheus_client import Counter
 
+from ...core.storage import TravelRepository, get_repository
 from .service import ProviderService
 from .aero_collector import (
     AeroCollector,
@@ -14,17 +18,42 @@ from .aero_collector import (
     Aerolinea
 )
 
+# Métricas
+PROVIDER_SEARCHES = Counter(
+    "flight_search_provider_results_total",
+    "Flight search outcomes per provider",
+    ["provider", "result"],
+)
+
+# Callback por proveedor: (provider_id, resultado)
+ResultCallback = Callable[[str, dict], Any]
+
+# Moneda de los vuelos que no la informan
+DEFAULT_CURRENCY = "USD"
+
 class SearchService:
     """Servicio que unifica búsquedas entre proveedores."""
     
-    def __init__(self, provider_service: ProviderService):
+    def __init__(self,
+                 provider_service: ProviderService,
+                 provider_timeout: float = 15.0,
+                 deadline: float = 30.0,
+                 repository: Optional[TravelRepository] = None):
         """
         Inicializa el servicio de búsqueda.
         
         Args:
             provider_service: Servicio de proveedores configurado
+            provider_timeout: Tiempo máximo por proveedor (segundos)
+            deadline: Tiempo máximo de la búsqueda completa (segundos)
+            repository: Donde se guardan los resultados (por defecto el
+                repositorio compartido)
         """
         self._provider_service = provider_service
+        self.provider_timeout = provider_timeout
+        self.deadline = deadline
+        self.repository = repository or get_repository()
+        self.logger = logging.getLogger(__name__)
         
     async def search_flights(self,
                            origen: str,
@@ -38,10 +67,18 @@ class SearchService:
                            max_escalas: Optional[int] = None,
                            aerolinea: Optional[Aerolinea] = None,
                            precio_min: Optional[float] = None,
-                           precio_max: Optional[float] = None) -> Dict[str, List[dict]]:
+                           precio_max: Optional[float] = None,
+                           on_result: Optional[ResultCallback] = None,
+                           timeout: Optional[float] = None,
+                           deadline: Optional[float] = None) -> Dict[str, dict]:
         """
         Busca vuelos en todos los proveedores configurados.
         
+        Los proveedores se consultan en paralelo; cada uno tiene su propio
+        timeout y los que no respondan antes del deadline se cancelan. Los
+        resultados combinados se guardan en el repositorio, de modo que
+        sobreviven a un reinicio.
+        
         Args:
             origen: Código de aeropuerto origen
             destino: Código de aeropuerto destino
@@ -55,12 +92,126 @@ class SearchService:
             aerolinea: Aerolínea específica
             precio_min: Precio mínimo
             precio_max: Precio máximo
+            on_result: Callback (o corrutina) invocado con cada proveedor
+                apenas responde, para mostrar resultados parciales
+            timeout: Timeout por proveedor (por defecto provider_timeout)
+            deadline: Deadline global (por defecto deadline)
             
         Returns:
             Diccionario con resultados por proveedor
         """
         results = {}
-        search_tasks = []
+        async for provider_id, result in self.stream_flights(
+            origen,
+            destino,
+            fecha_ida,
+            fecha_vuelta=fecha_vuelta,
+            noches=noches,
+            pasajeros=pasajeros,
+            equipaje=equipaje,
+            clase=clase,
+            max_escalas=max_escalas,
+            aerolinea=aerolinea,
+            precio_min=precio_min,
+            precio_max=precio_max,
+            timeout=timeout,
+            deadline=deadline
+        ):
+            results[provider_id] = result
+            if on_result:
+                try:
+                    outcome = on_result(provider_id, result)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+                except Exception as e:
+                    self.logger.error(f"Error en callback de búsqueda: {str(e)}")
+        
+        await self._save_results(
+            results,
+            {
+                "origin": origen,
+                "destination": destino,
+                "departure_date": fecha_ida,
+                "return_date": fecha_vuelta,
+                "adults": pasajeros,
+                "class_type": clase.value if clase else None,
+            }
+        )
+        return results
+    
+    async def _save_results(self,
+                            results: Dict[str, dict],
+                            search: Dict[str, Any]) -> None:
+        """
+        Guarda una búsqueda por proveedor con sus vuelos.
+        
+        Un fallo al guardar no hace fallar la búsqueda.
+        """
+        for provider_id, result in results.items():
+            if result.get("error"):
+                continue
+            rows = [
+                self._result_row(vuelo) for vuelo in result.get("vuelos") or []
+            ]
+            rows = [row for row in rows if row is not None]
+            if not rows:
+                continue
+            try:
+                await self.repository.save_search(
+                    {**search, "provider": provider_id}, rows
+                )
+            except Exception as e:
+                self.logger.error(
+                    f"Error guardando resultados de {provider_id}: {str(e)}"
+                )
+    
+    @staticmethod
+    def _result_row(vuelo: Any) -> Optional[Dict[str, Any]]:
+        """Fila de search_results de un vuelo (None si no tiene ID o precio)."""
+        if not isinstance(vuelo, dict):
+            return None
+        flight_id = vuelo.get("flight_id") or vuelo.get("id")
+        price = vuelo.get("price", vuelo.get("precio"))
+        if flight_id is None or price is None:
+            return None
+        return {
+            "flight_id": flight_id,
+            "price": price,
+            "currency": (
+                vuelo.get("currency") or vuelo.get("moneda") or DEFAULT_CURRENCY
+            ),
+            "availability": vuelo.get("availability", vuelo.get("disponible")),
+            "details": vuelo,
+        }
+    
+    async def stream_flights(self,
+                             origen: str,
+                             destino: str,
+                             fecha_ida: str,
+                             fecha_vuelta: Optional[str] = None,
+                             noches: Optional[int] = None,
+                             pasajeros: int = 1,
+                             equipaje: Optional[EquipajeTipo] = None,
+                             clase: Optional[ClaseVuelo] = None,
+                             max_escalas: Optional[int] = None,
+                             aerolinea: Optional[Aerolinea] = None,
+                             precio_min: Optional[float] = None,
+                             precio_max: Optional[float] = None,
+                             timeout: Optional[float] = None,
+                             deadline: Optional[float] = None
+                             ) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Busca vuelos entregando cada proveedor a medida que responde.
+        
+        Mismos argumentos que `search_flights`. Los proveedores que no
+        terminan antes del deadline se cancelan y se entregan al final
+        con error de tiempo agotado.
+        
+        Yields:
+            Tuplas (provider_id, resultado)
+        """
+        timeout = timeout if timeout is not None else self.provider_timeout
+        deadline = deadline if deadline is not None else self.deadline
         
         # Preparar filtros para búsqueda en Aero
         aero_filtros = FiltrosBusqueda(
@@ -78,14 +229,15 @@ class SearchService:
             precio_max=precio_max
         )
         
-        # Buscar en cada proveedor configurado
+        # Lanzar la búsqueda en cada proveedor configurado
+        tasks: Dict[asyncio.Task, str] = {}
         for provider_id, collector in self._provider_service._collectors.items():
             if isinstance(collector, AeroCollector):
                 # Usar filtros avanzados para Aero
-                task = self._search_aero(collector, aero_filtros)
+                search = self._search_aero(collector, aero_filtros)
             else:
                 # Búsqueda básica para otros proveedores
-                task = self._search_basic(
+                search = self._search_basic(
                     collector,
                     origen,
                     destino,
@@ -93,19 +245,61 @@ class SearchService:
                     fecha_vuelta,
                     pasajeros
                 )
-            search_tasks.append((provider_id, task))
+            task = asyncio.ensure_future(asyncio.wait_for(search, timeout))
+            tasks[task] = provider_id
         
-        # Ejecutar búsquedas en paralelo
-        for provider_id, task in search_tasks:
-            try:
-                results[provider_id] = await task
-            except Exception as e:
-                results[provider_id] = {
-                    "error": str(e),
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline
+        pending = set(tasks)
+        try:
+            # Entregar resultados a medida que se completan
+            while pending:
+                remaining = end - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=remaining,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield tasks[task], self._task_result(tasks[task], task, timeout)
+            
+            # Cancelar los rezagados al vencer el deadline
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task in pending:
+                PROVIDER_SEARCHES.labels(provider=tasks[task], result="deadline").inc()
+                yield tasks[task], {
+                    "error": f"Búsqueda cancelada por deadline ({deadline}s)",
                     "vuelos": []
                 }
+            pending = set()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _task_result(self,
+                     provider_id: str,
+                     task: asyncio.Task,
+                     timeout: float) -> dict:
+        """Resultado de la búsqueda de un proveedor."""
+        error = task.exception()
+        if error is None:
+            result = task.result()
+            PROVIDER_SEARCHES.labels(
+                provider=provider_id,
+                result="error" if result.get("error") else "ok"
+            ).inc()
+            return result
         
-        return results
+        if isinstance(error, asyncio.TimeoutError):
+            PROVIDER_SEARCHES.labels(provider=provider_id, result="timeout").inc()
+            return {"error": f"Tiempo de espera agotado ({timeout}s)", "vuelos": []}
+        
+        PROVIDER_SEARCHES.labels(provider=provider_id, result="error").inc()
+        return {"error": str(error), "vuelos": []}
     
     async def _search_aero(self,
                           collector: AeroCollector,
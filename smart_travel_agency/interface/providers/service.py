@@ -2,14 +2,29 @@
 Servicio de integración con proveedores en tiempo real.
 """
 import asyncio
+import inspect
+import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Dict, List, Optional, Type
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Type
 import os
 from pathlib import Path
 
+from ...core.budget.manager import get_budget_manager
+from ...core.memory import get_memory_manager
+from ...core.schemas import RateLimitConfig
+from ..reconstruction.models import PriceHistory
 from ..security.credentials import CredentialManager
-from .collector import ProviderCollector, APIProviderCollector, WebScraperCollector
+from .collector import (
+    PriceDelta,
+    ProviderCollector,
+    APIProviderCollector,
+    WebScraperCollector
+)
+from .scheduler import RefreshPolicy, RefreshScheduler
+
+# Callback de cambios de precios: (provider_id, delta)
+PriceListener = Callable[[str, PriceDelta], Any]
 
 class ProviderService:
     """Servicio central para integración con proveedores."""
@@ -26,7 +41,15 @@ class ProviderService:
         """
         self._collectors: Dict[str, ProviderCollector] = {}
         self._cache: Dict[str, Dict[str, dict]] = {}
-        self._update_tasks = {}
+        self._scheduler: Optional[RefreshScheduler] = None
+        self._rate_limits: Dict[str, RateLimitConfig] = {}
+        
+        # Ítems referenciados por presupuestos/sesiones abiertas
+        self._watchers: Dict[str, Set[Tuple[str, str]]] = {}
+        self._active_refs: Dict[Tuple[str, str], int] = {}
+        self._price_history: Dict[str, Dict[str, PriceHistory]] = {}
+        self._price_listeners: List[PriceListener] = []
+        self.logger = logging.getLogger(__name__)
         
         # Inicializar gestor de credenciales
         self._cred_manager = CredentialManager(encryption_key)
@@ -49,13 +72,7 @@ class ProviderService:
             raise ValueError(f"Credenciales no válidas para {provider_id}")
         
         collector = APIProviderCollector(provider_id, base_url, api_key)
-        self._collectors[provider_id] = collector
-        self._cache[provider_id] = {
-            "prices": {},
-            "availability": {},
-            "last_update": None,
-            "errors": []
-        }
+        self._add_collector(provider_id, collector)
     
     async def register_web_provider(self,
                             provider_id: str,
@@ -79,6 +96,10 @@ class ProviderService:
             await collector.close()
             raise ValueError(f"No se pudo autenticar con el proveedor {provider_id}")
         
+        self._add_collector(provider_id, collector)
+    
+    def _add_collector(self, provider_id: str, collector: ProviderCollector) -> None:
+        """Registra un colector y lo suma al planificador si está activo."""
         self._collectors[provider_id] = collector
         self._cache[provider_id] = {
             "prices": {},
@@ -86,52 +107,192 @@ class ProviderService:
             "last_update": None,
             "errors": []
         }
+        if self._scheduler:
+            self._schedule_provider(provider_id)
     
     async def start_real_time_updates(self,
-                                    update_interval: int = 300) -> None:
+                                    update_interval: int = 300,
+                                    policy: Optional[RefreshPolicy] = None) -> None:
         """
-        Inicia actualizaciones periódicas de datos.
+        Inicia actualizaciones adaptativas de datos.
+        
+        Cada ítem se refresca según la volatilidad observada de su precio
+        y según si lo usa un presupuesto abierto, dentro de la cuota del
+        proveedor (ver RefreshScheduler).
         
         Args:
-            update_interval: Intervalo en segundos entre actualizaciones
+            update_interval: Intervalo base en segundos (ítems estables)
+            policy: Parámetros completos del planificador
         """
+        if self._scheduler:
+            return
+        
+        self._scheduler = RefreshScheduler(
+            self._scheduled_refresh,
+            policy or RefreshPolicy(base_interval=update_interval),
+            is_active=self.is_item_watched
+        )
         for provider_id in self._collectors:
-            if provider_id not in self._update_tasks:
-                task = asyncio.create_task(
-                    self._update_loop(provider_id, update_interval)
+            self._schedule_provider(provider_id)
+        self._scheduler.start()
+    
+    async def stop_real_time_updates(self) -> None:
+        """Detiene las actualizaciones periódicas."""
+        if self._scheduler:
+            await self._scheduler.stop()
+            self._scheduler = None
+    
+    def _schedule_provider(self, provider_id: str) -> None:
+        """Agrega un proveedor al planificador."""
+        self._scheduler.add_provider(
+            provider_id,
+            partial=getattr(self._collectors[provider_id], "PARTIAL_REFRESH", False),
+            rate_limit=self._rate_limits.get(provider_id)
+        )
+    
+    def set_rate_limit(self, provider_id: str, config: RateLimitConfig) -> None:
+        """
+        Define la cuota de requests de un proveedor.
+        
+        Debe llamarse antes de iniciar las actualizaciones.
+        """
+        self._rate_limits[provider_id] = config
+    
+    def watch_items(self, owner_id: str, items: Iterable[Tuple[str, str]]) -> None:
+        """
+        Marca ítems como usados por un presupuesto o sesión abierta.
+        
+        Args:
+            owner_id: ID del presupuesto/sesión
+            items: Pares (provider_id, item_id)
+        """
+        new_items = set(items) - self._watchers.get(owner_id, set())
+        self._watchers.setdefault(owner_id, set()).update(new_items)
+        
+        by_provider: Dict[str, List[str]] = {}
+        for key in new_items:
+            self._active_refs[key] = self._active_refs.get(key, 0) + 1
+            by_provider.setdefault(key[0], []).append(key[1])
+        
+        if self._scheduler:
+            for provider_id, item_ids in by_provider.items():
+                if provider_id in self._collectors:
+                    self._scheduler.reschedule(provider_id, item_ids)
+    
+    def unwatch_items(self, owner_id: str) -> None:
+        """Libera los ítems de un presupuesto o sesión cerrada."""
+        for key in self._watchers.pop(owner_id, set()):
+            self._active_refs[key] -= 1
+            if not self._active_refs[key]:
+                del self._active_refs[key]
+    
+    def is_item_watched(self, provider_id: str, item_id: str) -> bool:
+        """Verifica si un presupuesto o sesión abierta usa el ítem."""
+        return (provider_id, item_id) in self._active_refs
+    
+    async def _scheduled_refresh(self,
+                                 provider_id: str,
+                                 item_ids: Optional[List[str]]) -> PriceDelta:
+        """Refresco disparado por el planificador."""
+        cache = self._cache[provider_id]
+        try:
+            collector = self._collectors[provider_id]
+            
+            # Verificar autenticación antes de actualizar
+            if not await collector.check_auth():
+                raise ValueError(f"Credenciales expiradas para {provider_id}")
+            
+            cache["errors"] = []
+            return await self._refresh(provider_id, item_ids)
+            
+        except Exception as e:
+            cache["errors"].append(str(e))
+            raise
+    
+    async def _refresh(self,
+                       provider_id: str,
+                       item_ids: Optional[List[str]] = None) -> PriceDelta:
+        """
+        Actualiza un proveedor aplicando solo los cambios.
+        
+        Las páginas sin cambios se descartan antes de parsearse (fetch
+        condicional) y el caché, el historial de precios y los listeners
+        reciben únicamente el delta, de modo que el costo de actualizar
+        escala con lo que cambió. El delta se confirma al colector recién
+        aplicado: si algo falla antes, el próximo refresco lo repite.
+        
+        Args:
+            provider_id: ID del proveedor
+            item_ids: Ítems a refrescar (None = todos)
+        
+        Returns:
+            Cambios aplicados
+        """
+        collector = self._collectors[provider_id]
+        cache = self._cache[provider_id]
+        
+        delta = await collector.fetch_price_updates(item_ids)
+        if delta:
+            # Verifica disponibilidad solo de ítems con precio nuevo
+            availability = {}
+            if delta.changed:
+                result = await collector.check_availability_bulk(list(delta.changed))
+                availability = result.available
+                cache["errors"].extend(set(result.errors.values()))
+            
+            cache["prices"].update(delta.changed)
+            cache["availability"].update(availability)
+            for item_id in delta.removed:
+                cache["prices"].pop(item_id, None)
+                cache["availability"].pop(item_id, None)
+            
+            self._record_history(provider_id, delta)
+            await self._notify_listeners(provider_id, delta)
+        
+        collector.commit_price_update(delta)
+        cache["last_update"] = datetime.now()
+        return delta
+    
+    def _record_history(self, provider_id: str, delta: PriceDelta) -> None:
+        """Agrega los precios cambiados al historial."""
+        history = self._price_history.setdefault(provider_id, {})
+        now = datetime.now()
+        for item_id, price in delta.changed.items():
+            if item_id not in history:
+                history[item_id] = PriceHistory(
+                    item_id=item_id, provider_id=provider_id
                 )
-                self._update_tasks[provider_id] = task
+            history[item_id].add_price(price, now)
     
-    async def _update_loop(self,
-                          provider_id: str,
-                          interval: int) -> None:
-        """Loop de actualización para un proveedor."""
-        while True:
+    async def _notify_listeners(self, provider_id: str, delta: PriceDelta) -> None:
+        """Entrega el delta a los listeners (detectores de cambios, etc.)."""
+        for listener in self._price_listeners:
             try:
-                collector = self._collectors[provider_id]
-                cache = self._cache[provider_id]
-                
-                # Verificar autenticación antes de actualizar
-                if not await collector.check_auth():
-                    raise ValueError(f"Credenciales expiradas para {provider_id}")
-                
-                # Actualiza precios
-                prices = await collector.fetch_prices()
-                cache["prices"].update(prices)
-                
-                # Verifica disponibilidad de ítems con precio
-                availability = await collector.check_availability(
-                    list(prices.keys())
-                )
-                cache["availability"].update(availability)
-                
-                cache["last_update"] = datetime.now()
-                cache["errors"] = []
-                
+                result = listener(provider_id, delta)
+                if inspect.isawaitable(result):
+                    await result
             except Exception as e:
-                cache["errors"].append(str(e))
-            
-            await asyncio.sleep(interval)
+                self.logger.error(f"Error en listener de precios: {str(e)}")
+    
+    def add_price_listener(self, listener: PriceListener) -> None:
+        """
+        Suscribe un callback a los cambios de precios.
+        
+        Args:
+            listener: Función (o corrutina) que recibe (provider_id, delta)
+        """
+        self._price_listeners.append(listener)
+    
+    def remove_price_listener(self, listener: PriceListener) -> None:
+        """Quita un callback suscripto con add_price_listener."""
+        if listener in self._price_listeners:
+            self._price_listeners.remove(listener)
+    
+    def get_price_history(self,
+                          provider_id: str,
+                          item_id: str) -> Optional[PriceHistory]:
+        """Obtiene el historial de precios observado de un ítem."""
+        return self._price_history.get(provider_id, {}).get(item_id)
     
     def get_current_price(self,
                          provider_id: str,
@@ -174,17 +335,9 @@ class ProviderService:
     
     async def force_update(self, provider_id: str) -> bool:
         """Fuerza una actualización inmediata de un proveedor."""
-        if collector := self._collectors.get(provider_id):
+        if provider_id in self._collectors:
             try:
-                prices = await collector.fetch_prices()
-                availability = await collector.check_availability(
-                    list(prices.keys())
-                )
-                
-                cache = self._cache[provider_id]
-                cache["prices"].update(prices)
-                cache["availability"].update(availability)
-                cache["last_update"] = datetime.now()
+                await self._refresh(provider_id)
                 return True
                 
             except Exception as e:
@@ -192,3 +345,23 @@ class ProviderService:
                     cache["errors"].append(str(e))
                 return False
         return False
+
+
+# Instancia global
+_provider_service: Optional[ProviderService] = None
+
+
+def get_provider_service() -> ProviderService:
+    """
+    Obtener la instancia compartida del servicio.
+
+    Al crearla se suscribe el servicio de memoria, que actualiza los
+    precios de mercado con cada delta de los proveedores, y el gestor de
+    presupuestos pasa a marcar los ítems de sus presupuestos abiertos.
+    """
+    global _provider_service
+    if _provider_service is None:
+        _provider_service = ProviderService()
+        get_memory_manager().subscribe(_provider_service)
+        get_budget_manager().item_watcher = _provider_service
+    return _provider_service
@@ -2,37 +2,285 @@
 Modelos para el sistema de reconstrucción de presupuestos.
 Permite recrear presupuestos previos con datos actualizados.
 """
+from array import array
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+)
 from uuid import UUID
+import math
+
+if TYPE_CHECKING:
+    from ...core.storage.repository import TravelRepository
+
+# Timestamps como enteros (microsegundos desde la época, UTC)
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Agregaciones disponibles al reducir resolución
+_AGGREGATES: Dict[str, Callable[[Sequence[float]], float]] = {
+    "last": lambda values: values[-1],
+    "first": lambda values: values[0],
+    "min": min,
+    "max": max,
+    # Redondeo para no arrastrar ruido de punto flotante a los Decimal
+    "mean": lambda values: round(math.fsum(values) / len(values), 8),
+}
 
-@dataclass
 class PriceHistory:
-    """Historial de precios de un ítem."""
-    item_id: str
-    provider_id: str
-    price_points: List[Dict[str, Decimal]] = field(default_factory=list)
+    """
+    Historial de precios de un ítem.
+    
+    Serie temporal compacta: columnas paralelas de timestamps (int64) y
+    precios (float64) ordenadas por tiempo, con búsquedas por bisección.
+    Ocupa 16 bytes por punto y las consultas puntuales son O(log n).
+    """
+    
+    __slots__ = (
+        "item_id", "provider_id", "_timestamps", "_prices", "_aware",
+        "_saved", "_late",
+    )
+    
+    def __init__(self,
+                 item_id: str,
+                 provider_id: str,
+                 price_points: Optional[Iterable[Dict[str, Any]]] = None):
+        self.item_id = item_id
+        self.provider_id = provider_id
+        self._timestamps = array("q")
+        self._prices = array("d")
+        self._aware: Optional[bool] = None
+        # Puntos persistidos: prefijo [0, _saved) de las columnas, salvo
+        # los de _late (llegados fuera de orden dentro de ese prefijo, o
+        # cuya escritura falló)
+        self._saved = 0
+        self._late: List[Tuple[int, float]] = []
+        for point in price_points or ():
+            self.add_price(point["price"], point["timestamp"])
+    
+    def __len__(self) -> int:
+        return len(self._timestamps)
+    
+    def __repr__(self) -> str:
+        return (
+            f"PriceHistory(item_id={self.item_id!r}, "
+            f"provider_id={self.provider_id!r}, points={len(self)})"
+        )
+    
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los puntos."""
+        return (
+            self._timestamps.itemsize * len(self._timestamps) +
+            self._prices.itemsize * len(self._prices)
+        )
+    
+    @property
+    def price_points(self) -> List[Dict[str, Any]]:
+        """Puntos como lista de diccionarios (compatibilidad)."""
+        return [
+            {"price": price, "timestamp": timestamp}
+            for timestamp, price in self.range()
+        ]
+    
+    def _to_key(self, timestamp: datetime) -> int:
+        if self._aware is None:
+            self._aware = timestamp.tzinfo is not None
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        return (timestamp - _EPOCH) // _MICROSECOND
+    
+    def _from_key(self, key: int) -> datetime:
+        timestamp = _EPOCH + timedelta(microseconds=key)
+        return timestamp.replace(tzinfo=timezone.utc) if self._aware else timestamp
+    
+    @staticmethod
+    def _to_price(value: float) -> Decimal:
+        # repr de un float es el decimal más corto que lo representa
+        return Decimal(repr(value))
     
     def add_price(self, price: Decimal, timestamp: datetime) -> None:
         """Agrega un punto de precio al historial."""
-        self.price_points.append({
-            "price": price,
-            "timestamp": timestamp
-        })
+        key = self._to_key(timestamp)
+        value = float(price)
+        
+        if not self._timestamps or key >= self._timestamps[-1]:
+            self._timestamps.append(key)
+            self._prices.append(value)
+        else:
+            # Punto fuera de orden (raro): insertar manteniendo el orden
+            index = bisect_right(self._timestamps, key)
+            self._timestamps.insert(index, key)
+            self._prices.insert(index, value)
+            if index < self._saved:
+                self._saved += 1
+                self._late.append((key, value))
     
     def get_price_at(self, target_time: datetime) -> Optional[Decimal]:
         """Obtiene el precio más cercano a una fecha específica."""
-        if not self.price_points:
+        if not self._timestamps:
             return None
+        
+        key = self._to_key(target_time)
+        index = bisect_left(self._timestamps, key)
+        if index == len(self._timestamps):
+            index -= 1
+        elif index > 0 and (
+            key - self._timestamps[index - 1] <= self._timestamps[index] - key
+        ):
+            index -= 1
+        return self._to_price(self._prices[index])
+    
+    def get_prices_at(self,
+                      target_times: Sequence[datetime]) -> List[Optional[Decimal]]:
+        """
+        Precio más cercano para varias fechas en una sola pasada.
+        
+        Las fechas se ordenan y se recorren junto con la serie (merge),
+        en O(n + m) en lugar de una búsqueda por fecha.
+        
+        Args:
+            target_times: Fechas en cualquier orden
+            
+        Returns:
+            Precios en el mismo orden que las fechas
+        """
+        results: List[Optional[Decimal]] = [None] * len(target_times)
+        count = len(self._timestamps)
+        if not count:
+            return results
+        
+        keys = [self._to_key(target) for target in target_times]
+        index = 0
+        for position in sorted(range(len(keys)), key=keys.__getitem__):
+            key = keys[position]
+            while index < count and self._timestamps[index] < key:
+                index += 1
             
-        # Encuentra el precio más cercano a la fecha objetivo
-        closest = min(
-            self.price_points,
-            key=lambda x: abs((x["timestamp"] - target_time).total_seconds())
+            nearest = min(index, count - 1)
+            if 0 < index < count and (
+                key - self._timestamps[index - 1] <= self._timestamps[index] - key
+            ):
+                nearest = index - 1
+            results[position] = self._to_price(self._prices[nearest])
+        return results
+    
+    def get_price_as_of(self, target_time: datetime) -> Optional[Decimal]:
+        """Obtiene el precio vigente en una fecha (último punto anterior)."""
+        index = bisect_right(self._timestamps, self._to_key(target_time)) - 1
+        if index < 0:
+            return None
+        return self._to_price(self._prices[index])
+    
+    def range(self,
+              start: Optional[datetime] = None,
+              end: Optional[datetime] = None) -> List[Tuple[datetime, Decimal]]:
+        """
+        Puntos en un intervalo cerrado.
+        
+        Args:
+            start: Inicio (None = desde el primero)
+            end: Fin (None = hasta el último)
+        """
+        low, high = self._bounds(start, end)
+        return [
+            (self._from_key(self._timestamps[i]), self._to_price(self._prices[i]))
+            for i in range(low, high)
+        ]
+    
+    def downsample(self,
+                   bucket: timedelta,
+                   how: str = "last",
+                   start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> "PriceHistory":
+        """
+        Reduce la resolución agrupando puntos en intervalos fijos.
+        
+        Args:
+            bucket: Tamaño de cada intervalo
+            how: Agregación (last, first, min, max, mean)
+            start: Inicio del rango
+            end: Fin del rango
+            
+        Returns:
+            Nuevo historial con un punto por intervalo (al inicio del mismo)
+        """
+        aggregate = _AGGREGATES[how]
+        width = bucket // _MICROSECOND
+        if width <= 0:
+            raise ValueError("El intervalo debe ser positivo")
+        
+        result = PriceHistory(self.item_id, self.provider_id)
+        result._aware = self._aware
+        low, high = self._bounds(start, end)
+        
+        index = low
+        while index < high:
+            bucket_start = self._timestamps[index] - self._timestamps[index] % width
+            stop = bisect_left(self._timestamps, bucket_start + width, index, high)
+            result._timestamps.append(bucket_start)
+            result._prices.append(aggregate(self._prices[index:stop]))
+            index = stop
+        return result
+    
+    def _bounds(self,
+                start: Optional[datetime],
+                end: Optional[datetime]) -> Tuple[int, int]:
+        low = bisect_left(self._timestamps, self._to_key(start)) if start else 0
+        high = (
+            bisect_right(self._timestamps, self._to_key(end)) if end
+            else len(self._timestamps)
         )
-        return closest["price"]
+        return low, max(low, high)
+    
+    async def save(self,
+                   repository: "TravelRepository",
+                   package_id: int,
+                   currency: str = "USD") -> int:
+        """
+        Persiste en la tabla price_history los puntos nuevos.
+        
+        Args:
+            repository: Repositorio SQLite
+            package_id: Paquete (travel_packages.id) al que pertenece el ítem
+            currency: Moneda de los precios
+            
+        Returns:
+            Puntos escritos
+        """
+        count = len(self._timestamps)
+        pending = [
+            (self._timestamps[i], self._prices[i]) for i in range(self._saved, count)
+        ] + self._late
+        self._saved, self._late = count, []
+        try:
+            return await repository.add_price_points(
+                (package_id, value, currency, self._from_key(key))
+                for key, value in pending
+            )
+        except BaseException:
+            # Siguen en las columnas; se reintentan en el próximo save
+            self._late = pending + self._late
+            raise
+    
+    @classmethod
+    async def load(cls,
+                   repository: "TravelRepository",
+                   package_id: int,
+                   item_id: str,
+                   provider_id: str,
+                   start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> "PriceHistory":
+        """Carga un historial desde la tabla price_history."""
+        history = cls(item_id, provider_id)
+        rows = await repository.get_price_history(package_id, start, end)
+        for row in rows:
+            history.add_price(row["price"], datetime.fromisoformat(row["timestamp"]))
+        history._saved = len(history)
+        return history
 
 @dataclass
 class BudgetSnapshot:
@@ -3,7 +3,7 @@ Servicio para la reconstrucción de presupuestos.
 """
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Sequence
 from uuid import UUID
 
 from ..views.budget_view import BudgetView
@@ -96,6 +96,92 @@ class ReconstructionService:
             return None
             
         target_time = target_time or datetime.now()
+        prices = {
+            item_id: recon_data.get_item_price(item_id, target_time)
+            for item_id in recon_data.original_snapshot.items
+        }
+        return self._build_snapshot(recon_data, target_time, prices)
+    
+    def reconstruct_budgets(
+        self,
+        budget_ids: Iterable[UUID],
+        target_time: Optional[datetime] = None
+    ) -> Dict[UUID, BudgetSnapshot]:
+        """
+        Reconstruye varios presupuestos en un mismo momento.
+        
+        Args:
+            budget_ids: IDs de los presupuestos
+            target_time: Momento de la reconstrucción (por defecto ahora)
+            
+        Returns:
+            Captura por presupuesto (se omiten los desconocidos)
+        """
+        target_time = target_time or datetime.now()
+        return {
+            budget_id: snapshots[0]
+            for budget_id, snapshots in self.reconstruct_budgets_over(
+                budget_ids, [target_time]
+            ).items()
+        }
+    
+    def reconstruct_budgets_over(
+        self,
+        budget_ids: Iterable[UUID],
+        timestamps: Sequence[datetime]
+    ) -> Dict[UUID, List[BudgetSnapshot]]:
+        """
+        Reconstruye varios presupuestos en varios momentos.
+        
+        Se reúnen todas las consultas (ítem, momento) y cada historial se
+        resuelve en una sola pasada ordenada, en lugar de una búsqueda
+        por ítem, presupuesto y momento.
+        
+        Args:
+            budget_ids: IDs de los presupuestos
+            timestamps: Momentos de la reconstrucción
+            
+        Returns:
+            Capturas por presupuesto, en el orden de `timestamps`
+        """
+        recon_items = [
+            (budget_id, recon_data)
+            for budget_id in budget_ids
+            if (recon_data := self._reconstructions.get(budget_id))
+        ]
+        
+        # Historiales únicos (pueden compartirse entre presupuestos)
+        histories: Dict[int, PriceHistory] = {}
+        for _, recon_data in recon_items:
+            for item_id in recon_data.original_snapshot.items:
+                if history := recon_data.price_histories.get(item_id):
+                    histories[id(history)] = history
+        
+        # Una pasada por historial para todos los momentos
+        resolved: Dict[int, List[Optional[Decimal]]] = {
+            key: history.get_prices_at(timestamps)
+            for key, history in histories.items()
+        }
+        
+        results: Dict[UUID, List[BudgetSnapshot]] = {}
+        for budget_id, recon_data in recon_items:
+            snapshots = []
+            for position, target_time in enumerate(timestamps):
+                prices = {}
+                for item_id in recon_data.original_snapshot.items:
+                    history = recon_data.price_histories.get(item_id)
+                    prices[item_id] = (
+                        resolved[id(history)][position] if history else None
+                    )
+                snapshots.append(self._build_snapshot(recon_data, target_time, prices))
+            results[budget_id] = snapshots
+        return results
+    
+    def _build_snapshot(self,
+                        recon_data: ReconstructionData,
+                        target_time: datetime,
+                        prices: Dict[str, Optional[Decimal]]) -> BudgetSnapshot:
+        """Crea la captura reconstruida con los precios resueltos."""
         original = recon_data.original_snapshot
         
         # Crea nueva captura con precios actualizados
@@ -109,16 +195,14 @@ class ReconstructionService:
         )
         
         for item_id, item in original.items.items():
-            new_price = recon_data.get_item_price(item_id, target_time)
+            new_price = prices.get(item_id)
             if new_price is None:
                 new_price = item["price"]  # Usa precio original si no hay historial
-                
-            new_snapshot.add_item(
-                item_id=item_id,
-                provider_id=item["provider_id"],
-                price=new_price,
-                quantity=item["quantity"],
-                **{k: v for k, v in item.items() if k not in ["provider_id", "price", "quantity"]}
-            )
+            
+            new_snapshot.items[item_id] = {
+                **item,
+                "price": new_price
+            }
         
+        new_snapshot.update_total()
         return new_snapshot
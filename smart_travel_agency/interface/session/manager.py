@@ -5,7 +5,7 @@ Este módulo implementa la lógica para manejar sesiones de vendedor,
 garantizando la estabilidad y consistencia durante la elaboración de presupuestos.
 """
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 from uuid import UUID
 
 from .models import SessionState, VendorSession
@@ -22,6 +22,16 @@ class SessionManager:
         """
         self._sessions: Dict[UUID, SessionState] = {}
         self._timeout = timedelta(minutes=session_timeout)
+        self._close_listeners: List[Callable[[UUID], None]] = []
+    
+    def add_close_listener(self, listener: Callable[[UUID], None]) -> None:
+        """
+        Suscribe un callback al cierre (explícito o por expiración) de sesiones.
+        
+        Args:
+            listener: Función que recibe el ID de la sesión cerrada
+        """
+        self._close_listeners.append(listener)
     
     def create_session(self, vendor_id: str, vendor_name: str) -> SessionState:
         """
@@ -54,7 +64,7 @@ class SessionManager:
             return None
             
         if datetime.now() - state.session.last_activity > self._timeout:
-            state.session.close()
+            self.close_session(session_id)
             return None
             
         return state
@@ -67,7 +77,11 @@ class SessionManager:
             session_id: ID de la sesión a cerrar
         """
         if state := self._sessions.get(session_id):
+            was_active = state.session.is_active
             state.session.close()
+            if was_active:
+                for listener in self._close_listeners:
+                    listener(session_id)
     
     def cleanup_expired(self) -> None:
         """Limpia las sesiones expiradas."""
@@ -13,15 +13,15 @@ from uuid import UUID, uuid4
 class VendorSession:
     """Representa una sesión activa de vendedor."""
     
+    # Datos del vendedor
+    vendor_id: str
+    vendor_name: str
+    
     id: UUID = field(default_factory=uuid4)
     start_time: datetime = field(default_factory=datetime.now)
     last_activity: datetime = field(default_factory=datetime.now)
     is_active: bool = True
     
-    # Datos del vendedor
-    vendor_id: str
-    vendor_name: str
-    
     # Estado actual del presupuesto
     current_budget_id: Optional[UUID] = None
     modified_items: Dict[str, dict] = field(default_factory=dict)
@@ -0,0 +1,178 @@
+"""
+Tests para los totales incrementales del presupuesto.
+
+Verifica:
+1. Totales consistentes bajo altas, bajas y ediciones
+2. Subtotales por tipo y por moneda
+3. Costo y margen
+4. Copias y serialización sin duplicar aportes
+"""
+
+from copy import copy, deepcopy
+from decimal import Decimal
+import pickle
+import random
+
+from smart_travel_agency.core.budget.models import Budget, BudgetItem
+
+
+def item(amount, quantity=1, kind="flight", currency="USD", cost=None):
+    metadata = {"type": kind}
+    if cost is not None:
+        metadata["cost"] = cost
+    return BudgetItem(
+        description=kind,
+        amount=Decimal(amount),
+        quantity=quantity,
+        currency=currency,
+        metadata=metadata,
+    )
+
+
+def nonzero(subtotals):
+    return {key: value for key, value in subtotals.items() if value}
+
+
+def recomputed(budget):
+    by_type, by_currency = {}, {}
+    for i in budget.items:
+        kind = i.metadata.get("type", "other")
+        by_type[kind] = by_type.get(kind, 0) + i.total_amount
+        by_currency[i.currency] = by_currency.get(i.currency, 0) + i.total_amount
+    return (
+        sum((i.total_amount for i in budget.items), Decimal(0)),
+        sum((i.total_cost for i in budget.items), Decimal(0)),
+        nonzero(by_type),
+        nonzero(by_currency),
+    )
+
+
+def current(budget):
+    totals = budget.totals
+    return (
+        totals.total,
+        totals.cost,
+        nonzero(totals.by_type),
+        nonzero(totals.by_currency),
+    )
+
+
+def test_totals_and_subtotals():
+    budget = Budget(
+        items=[
+            item("500.00", kind="flight", cost="420"),
+            item("100.00", quantity=3, kind="accommodation", currency="EUR", cost="80"),
+        ]
+    )
+
+    assert budget.total_amount == Decimal("800.00")
+    assert budget.totals.cost == Decimal("660")
+    assert budget.totals.margin == Decimal("140.00")
+    assert budget.totals.by_type == {
+        "flight": Decimal("500.00"),
+        "accommodation": Decimal("300.00"),
+    }
+    assert budget.totals.by_currency == {
+        "USD": Decimal("500.00"),
+        "EUR": Decimal("300.00"),
+    }
+    assert budget.to_dict()["subtotals_by_currency"] == {"USD": 500.0, "EUR": 300.0}
+
+
+def test_edits_update_totals():
+    budget = Budget(items=[item("100.00"), item("50.00", kind="activity")])
+
+    budget.items[0].amount *= Decimal("1.1")
+    budget.items[1].quantity = 4
+    budget.items.append(item("20.00", kind="insurance"))
+    removed = budget.items.pop(0)
+    removed.amount = Decimal("9999")  # fuera del presupuesto: no cuenta
+
+    assert budget.total_amount == Decimal("220.00")
+    assert budget.totals.by_type["flight"] == 0
+
+    budget.items = [item("1.00")]
+    assert budget.total_amount == Decimal("1.00")
+    budget.items[0].metadata = {"type": "transfer", "cost": "0.5"}
+    assert budget.totals.by_type["transfer"] == Decimal("1.00")
+    assert budget.totals.cost == Decimal("0.5")
+
+
+def test_random_edits_match_full_recomputation():
+    rng = random.Random(3)
+    budget = Budget(items=[item(str(rng.randint(1, 500))) for _ in range(50)])
+
+    for _ in range(500):
+        action = rng.random()
+        if action < 0.4 and budget.items:
+            target = rng.choice(budget.items)
+            target.amount = Decimal(rng.randint(1, 500)) / 4
+        elif action < 0.55 and budget.items:
+            rng.choice(budget.items).quantity = rng.randint(1, 5)
+        elif action < 0.7:
+            budget.items.insert(
+                rng.randint(0, len(budget.items)),
+                item(
+                    str(rng.randint(1, 500)),
+                    kind=rng.choice(["flight", "hotel"]),
+                    currency=rng.choice(["USD", "ARS"]),
+                ),
+            )
+        elif action < 0.8 and budget.items:
+            del budget.items[rng.randrange(len(budget.items))]
+        elif action < 0.9 and len(budget.items) > 2:
+            budget.items[0:2] = [item("7.25", kind="tour")]
+        else:
+            budget.items.extend([item("3.00"), item("4.00", currency="EUR")])
+
+        assert current(budget) == recomputed(budget)
+
+
+def test_restore_rebuilds_totals():
+    budget = Budget(items=[item("100.00"), item("200.00")])
+    base = budget.current_version
+    budget.items[0].amount = Decimal("150.00")
+    budget.commit_version({"type": "edit"}, "Edición")
+
+    budget.restore(base)
+
+    assert budget.total_amount == Decimal("300.00")
+    budget.items[1].amount = Decimal("10.00")
+    assert budget.total_amount == Decimal("110.00")
+
+
+def test_metadata_edits_update_totals():
+    budget = Budget(items=[item("100.00", cost="80"), item("50.00", kind="activity")])
+
+    budget.items[0].metadata["cost"] = "90"
+    budget.items[1].metadata.update(type="tour", cost="40")
+    assert budget.totals.cost == Decimal("130")
+    assert nonzero(budget.totals.by_type) == {
+        "flight": Decimal("100.00"),
+        "tour": Decimal("50.00"),
+    }
+    assert budget.totals.costs_known
+
+    del budget.items[0].metadata["cost"]
+    assert not budget.totals.costs_known
+    assert current(budget) == recomputed(budget)
+
+
+def test_copies_rebuild_totals_from_items():
+    budget = Budget(items=[item("10.00", cost="8"), item("5.00")])
+
+    for clone in (deepcopy(budget), pickle.loads(pickle.dumps(budget))):
+        assert clone.total_amount == Decimal("15.00")
+        clone.items[0].amount = Decimal("20.00")
+        clone.items[1].metadata["cost"] = "4"
+        clone.items.append(item("1.00"))
+        assert current(clone) == recomputed(clone)
+        assert clone.totals.cost == Decimal("13.00")
+
+    assert budget.total_amount == Decimal("15.00")
+    assert budget.totals.cost == Decimal("13.00")
+    assert not budget.totals.costs_known
+
+    shallow = copy(budget)
+    budget.items[0].amount = Decimal("11.00")
+    assert shallow.total_amount == budget.total_amount == Decimal("16.00")
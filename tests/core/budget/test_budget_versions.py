@@ -0,0 +1,108 @@
+"""
+Tests para el versionado con estructura compartida.
+
+Verifica:
+1. Las versiones guardan solo las diferencias
+2. Checkpoints periódicos
+3. Diff, restauración y deshacer
+4. Registros de solo lectura que se pueden copiar y serializar
+"""
+
+from copy import deepcopy
+from decimal import Decimal
+import pickle
+
+import pytest
+
+from smart_travel_agency.core.budget.models import Budget, BudgetItem
+
+
+@pytest.fixture
+def budget() -> Budget:
+    """Presupuesto con varios items."""
+    return Budget(
+        items=[
+            BudgetItem(description=f"Item {n}", amount=Decimal("100.00"))
+            for n in range(50)
+        ]
+    )
+
+
+def test_initial_version_is_checkpoint(budget):
+    version = budget.versions[0]
+
+    assert version.checkpoint is not None
+    assert len(version.checkpoint) == 50
+    assert all(item.version_id == version.version_id for item in budget.items)
+
+
+def test_versions_store_only_changes(budget):
+    first = budget.versions[0]
+    budget.items[3].amount = Decimal("120.00")
+    removed = budget.items.pop()
+
+    version = budget.commit_version({"type": "edit"}, "Ajuste")
+
+    assert version.parent_id == first.version_id
+    assert version.checkpoint is None
+    assert list(version.changed) == [budget.items[3].item_id]
+    assert version.removed == (removed.item_id,)
+
+    # Los registros que no cambiaron son los mismos objetos
+    state = budget.state_at(version.version_id)
+    item_id = budget.items[0].item_id
+    assert state[item_id] is first.checkpoint[item_id]
+
+
+def test_checkpoint_interval_bounds_reconstruction(budget):
+    budget.checkpoint_interval = 4
+    for n in range(9):
+        budget.items[0].amount = Decimal(n)
+        budget.commit_version({"type": "edit"}, f"Edición {n}")
+
+    checkpoints = [v.depth for v in budget.versions if v.checkpoint is not None]
+    assert checkpoints == [0, 4, 8]
+    assert budget.state_at(budget.current_version)[budget.items[0].item_id].amount == 8
+
+
+def test_diff_restore_and_undo(budget):
+    base = budget.current_version
+    budget.items[0].amount = Decimal("90.00")
+    budget.items.append(BudgetItem(description="Seguro", amount=Decimal("30.00")))
+    edited = budget.commit_version({"type": "edit"}, "Edición").version_id
+
+    diff = budget.diff(base, edited)
+    assert [r.description for r in diff["added"]] == ["Seguro"]
+    assert diff["removed"] == []
+    assert [(a.amount, b.amount) for a, b in diff["modified"]] == [
+        (Decimal("100.00"), Decimal("90.00"))
+    ]
+
+    assert budget.undo().version_id == base
+    assert budget.current_version == base
+    assert len(budget.items) == 50
+    assert budget.total_amount == Decimal("5000.00")
+
+    budget.restore(edited)
+    assert budget.total_amount == Decimal("5020.00")
+    assert all(item.version_id == edited for item in budget.items)
+
+    # Las ediciones restauradas no alteran los registros de la versión
+    budget.items[0].amount = Decimal("1.00")
+    assert budget.state_at(edited)[budget.items[0].item_id].amount == Decimal("90.00")
+
+
+def test_records_are_read_only_and_picklable(budget):
+    budget.items[0].metadata["type"] = "hotel"
+    version = budget.commit_version({"type": "edit"}, "Metadata")
+    record = version.changed[budget.items[0].item_id]
+
+    with pytest.raises(TypeError):
+        record.metadata["type"] = "flight"
+
+    restored = pickle.loads(pickle.dumps(version))
+    copied = deepcopy(version)
+    assert restored.changed == version.changed
+    assert copied.changed[record.item_id].metadata == {"type": "hotel"}
+    with pytest.raises(TypeError):
+        copied.changed[record.item_id].metadata["type"] = "flight"
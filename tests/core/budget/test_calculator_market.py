@@ -0,0 +1,72 @@
+"""
+Tests del calculador con datos de mercado del servicio de memoria.
+
+Verifica:
+1. Cálculo completo con margen dinámico (Decimal de punta a punta)
+2. Deltas de proveedores aplicados por la suscripción del servicio
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from smart_travel_agency.core.budget.calculator import BudgetCalculator
+from smart_travel_agency.core.memory import configure_memory_manager
+from smart_travel_agency.core.schemas import (
+    MarginStrategy,
+    MemoryConfig,
+    StorageConfig,
+)
+from smart_travel_agency.interface.providers.collector import PriceDelta
+from smart_travel_agency.interface.providers.service import ProviderService
+
+
+def make_config(tmp_path, name="memory.db"):
+    return MemoryConfig(storage=StorageConfig(path=str(tmp_path / name)))
+
+
+@pytest.fixture
+async def memory(tmp_path):
+    manager = configure_memory_manager(make_config(tmp_path))
+    yield manager
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_dynamic_budget_uses_provider_market_data(memory):
+    service = ProviderService()
+    memory.subscribe(service)
+    await memory.set_package_costs({"pkg-1": {"base_cost": Decimal("800")}})
+    await memory.update_market_data(
+        {"pkg-1": {"avg_margin": 0.3, "demand_score": 0.9}}
+    )
+
+    await service._notify_listeners(
+        "prov", PriceDelta(changed={"pkg-1": Decimal("1500")})
+    )
+    result = await BudgetCalculator().calculate_budget(
+        [SimpleNamespace(id="pkg-1", description="Paquete")], MarginStrategy.DYNAMIC
+    )
+
+    assert await memory.get_market_prices(["pkg-1"]) == {"pkg-1": Decimal("1500.00")}
+    assert result.success, result.error
+    component = result.components[0]
+    assert component.margin == Decimal("0.36")
+    assert component.price_before_tax == Decimal("1250.00")
+    assert result.totals["final_total"] == Decimal("1512.50")
+
+
+@pytest.mark.asyncio
+async def test_subscriptions_follow_the_shared_instance(tmp_path, memory):
+    service = ProviderService()
+    memory.subscribe(service)
+    memory.subscribe(service)
+
+    replacement = configure_memory_manager(make_config(tmp_path, "other.db"))
+    try:
+        assert service._price_listeners == [replacement.on_price_update]
+    finally:
+        await replacement.close()
+
+    assert service._price_listeners == []
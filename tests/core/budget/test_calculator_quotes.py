@@ -0,0 +1,75 @@
+"""
+Tests para la cotización en lote del calculador.
+
+Verifica:
+1. Cotización exacta con costos y márgenes del servicio de memoria
+2. Paquetes sin costos informados (no KeyError)
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from smart_travel_agency.core.budget.calculator import BudgetCalculator
+from smart_travel_agency.core.memory import configure_memory_manager
+from smart_travel_agency.core.schemas import (
+    MarginStrategy,
+    MemoryConfig,
+    StorageConfig,
+    TaxConfig,
+)
+
+
+def package(package_id):
+    return SimpleNamespace(id=package_id, description=f"Paquete {package_id}")
+
+
+@pytest.fixture
+async def calculator(tmp_path):
+    memory = configure_memory_manager(
+        MemoryConfig(storage=StorageConfig(path=str(tmp_path / "memory.db")))
+    )
+    await memory.set_package_costs({
+        "pkg-1": {"base_cost": Decimal("800"), "additional_costs": {"tasas": 0}},
+        "pkg-2": {"base_cost": Decimal("1000"), "additional_costs": {"tasas": 200}},
+    })
+    await memory.set_recommended_margins({"pkg-2": 0.25})
+    yield BudgetCalculator()
+    await memory.close()
+
+
+@pytest.mark.asyncio
+async def test_quotes_use_bulk_costs_and_margins(calculator):
+    batch = await calculator.calculate_quotes(
+        [package("pkg-1"), package("pkg-2")],
+        MarginStrategy.VARIABLE,
+        TaxConfig(rate=Decimal("0.1")),
+    )
+
+    assert batch.ids == ["pkg-1", "pkg-2"]
+    assert batch.missing == []
+    assert batch.quote(0)["price_before_tax"] == Decimal("1000.00")
+    assert batch.quote(1) == {
+        "cost": Decimal("1200"),
+        "margin": Decimal("0.25"),
+        "price_before_tax": Decimal("1600.00"),
+        "tax_amount": Decimal("160.00"),
+        "final_price": Decimal("1760.00"),
+    }
+    assert batch.totals["final_total"] == Decimal("2860.00")
+
+
+@pytest.mark.asyncio
+async def test_uncosted_packages_are_reported(calculator):
+    batch = await calculator.calculate_quotes(
+        [package("pkg-1"), package("nope"), package("pkg-2")]
+    )
+
+    assert batch.ids == ["pkg-1", "pkg-2"]
+    assert batch.missing == ["nope"]
+
+    result = await calculator.calculate_budget([package("pkg-1"), package("nope")])
+
+    assert not result.success
+    assert "nope" in result.error
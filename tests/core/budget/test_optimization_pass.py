@@ -0,0 +1,120 @@
+"""
+Tests para el motor de optimización multi-pasada.
+
+Verifica:
+1. Reemplazo de componentes por alternativas más baratas
+2. Beam search con evaluación en lote
+3. Corte por umbral de mejora y por presupuesto de tiempo
+"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from smart_travel_agency.core.budget.manager import BudgetManager
+
+
+def component(kind, component_id, price, **extra):
+    return {"tipo": kind, "id": component_id, "precio": price, **extra}
+
+
+@pytest.fixture
+def package():
+    """Paquete con vuelo, hotel y actividad con alternativas."""
+    return {
+        "precio": 2000,
+        "componentes": [
+            component("vuelo", "AR1132", 800, nombre="Aerolíneas"),
+            component("hotel", "H1", 1000),
+            component("actividad", "A1", 150),
+            component("seguro", "S1", 50),
+        ],
+        "alternativas": {
+            "AR1132": [
+                component("vuelo", "LA800", 700),
+                component("vuelo", "G3", 650, disponible=False),
+            ],
+            "H1": [component("hotel", "H2", 900), component("hotel", "H3", 960)],
+            "A1": [component("actividad", "A2", 140)],
+        },
+    }
+
+
+@pytest.fixture
+def manager():
+    manager = BudgetManager()
+    manager.optimization_threshold = Decimal("0.1")
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_pass_swaps_best_components(manager, package):
+    optimized = await manager._optimization_pass(package, 1)
+
+    ids = [c["id"] for c in optimized["componentes"]]
+    assert ids == ["LA800", "H2", "A1", "S1"]
+    assert optimized["precio"] == Decimal("1800")
+    # Los componentes reemplazados quedan como alternativas
+    assert {c["id"] for c in optimized["alternativas"]["LA800"]} == {"G3", "AR1132"}
+    assert package["componentes"][0]["id"] == "AR1132"
+
+
+@pytest.mark.asyncio
+async def test_optimize_budget_runs_passes_until_threshold(manager, package):
+    manager.max_swaps_per_pass = 1
+    budget_id = await manager.create_budget("c", "v", package)
+
+    success, results = await manager.optimize_budget(budget_id, max_passes=5)
+
+    assert success
+    assert [r.optimized_price for r in results] == [
+        Decimal("1900"),
+        Decimal("1800"),
+        Decimal("1790"),
+        Decimal("1790"),
+    ]
+    changes = [change for result in results for change in result.changes_applied]
+    assert "Cambio de vuelo: Aerolíneas (800) -> LA800 (700)" in changes
+    budget = await manager.get_budget(budget_id)
+    assert budget.current_price == Decimal("1790")
+
+
+@pytest.mark.asyncio
+async def test_batch_evaluator_drives_beam(manager, package):
+    calls = []
+
+    async def bundle_evaluator(base, candidates):
+        calls.append(len(candidates))
+        prices = await manager._evaluate_candidates(base, candidates)
+        # Descuento si vuelo y hotel son del mismo proveedor
+        return [
+            (
+                price - 300
+                if swaps.get(0, {}).get("id") == "LA800"
+                and swaps.get(1, {}).get("id") == "H3"
+                else price
+            )
+            for swaps, price in zip(candidates, prices)
+        ]
+
+    manager.candidate_evaluator = bundle_evaluator
+    optimized = await manager._optimization_pass(package, 1)
+
+    assert [c["id"] for c in optimized["componentes"][:2]] == ["LA800", "H3"]
+    assert optimized["precio"] == Decimal("1560")
+    # Un lote por componente con alternativas
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_slow_alternative_source_respects_time_budget(manager, package):
+    async def slow_source(components):
+        await asyncio.sleep(5)
+        return [[] for _ in components]
+
+    manager.alternative_source = slow_source
+    manager.pass_time_budget = 0.05
+
+    optimized = await asyncio.wait_for(manager._optimization_pass(package, 1), 1)
+    assert optimized["precio"] == package["precio"]
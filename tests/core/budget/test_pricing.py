@@ -0,0 +1,82 @@
+"""
+Tests para el cálculo de precios en lote.
+
+Verifica:
+1. Resultados idénticos al cálculo Decimal elemento a elemento
+2. Redondeo bancario en empates
+3. Respaldo Decimal fuera de rango
+4. Rendimiento para catálogos grandes
+"""
+
+import random
+import time
+from decimal import Decimal
+
+import pytest
+
+from smart_travel_agency.core.budget.pricing import _price_decimal, price_batch
+
+
+def reference(costs, margins, rate):
+    return _price_decimal([str(n) for n in range(len(costs))], costs, margins, rate, 2)
+
+
+def test_matches_decimal_reference():
+    rng = random.Random(11)
+    costs = [Decimal(rng.randint(0, 10_000_000)) / 100 for _ in range(2000)]
+    margins = [Decimal(rng.randint(100_000, 400_000)) / 1_000_000 for _ in range(2000)]
+    ids = [str(n) for n in range(2000)]
+
+    batch = price_batch(ids, costs, margins, Decimal("0.21"))
+    expected = reference(costs, margins, Decimal("0.21"))
+
+    assert batch.vectorized
+    assert batch.price_before_tax == expected.price_before_tax
+    assert batch.tax_amount == expected.tax_amount
+    assert batch.final_price == expected.final_price
+    assert batch.totals == expected.totals
+
+
+def test_ties_round_half_even():
+    # Empates: 0.125 -> 0.12 y 0.135 -> 0.14 (al par)
+    batch = price_batch(
+        ["a", "b", "c"],
+        [Decimal("0.125"), Decimal("0.135"), Decimal("100.25")],
+        [Decimal("0"), Decimal("0"), Decimal("0.5")],
+        Decimal("0"),
+    )
+
+    assert batch.price_before_tax == [
+        Decimal("0.12"),
+        Decimal("0.14"),
+        Decimal("200.50"),
+    ]
+    assert batch.quote(2)["final_price"] == Decimal("200.50")
+
+
+def test_falls_back_to_decimal_when_not_representable():
+    batch = price_batch(
+        ["a"], [Decimal("10.123456")], [Decimal("0.2")], Decimal("0.21")
+    )
+
+    assert not batch.vectorized
+    assert batch.price_before_tax == [Decimal("12.65")]
+
+
+def test_margin_must_be_below_one():
+    with pytest.raises(ValueError):
+        price_batch(["a"], [Decimal("10")], [Decimal("1")], Decimal("0.21"))
+
+
+def test_thousand_package_catalog_is_fast():
+    rng = random.Random(5)
+    costs = [Decimal(rng.randint(10_000, 500_000)) / 100 for _ in range(1000)]
+    margins = [Decimal("0.20")] * 1000
+    ids = [str(n) for n in range(1000)]
+
+    start = time.perf_counter()
+    batch = price_batch(ids, costs, margins, Decimal("0.21"))
+    elapsed = time.perf_counter() - start
+
+    assert len(batch) == 1000
+    assert elapsed < 0.1
@@ -0,0 +1,123 @@
+"""
+Tests para la evaluación what-if de estrategias de reconstrucción.
+
+Verifica:
+1. Las estrategias no modifican el presupuesto original
+2. Puntuación y ranking de resultados
+3. Compatibilidad con la reconstrucción directa
+"""
+
+import pytest
+from decimal import Decimal
+
+from smart_travel_agency.core.budget.models import Budget, BudgetItem
+from smart_travel_agency.core.budget.reconstruction import (
+    BudgetDraft,
+    ReconstructionStrategy,
+    get_reconstruction_manager,
+)
+
+
+@pytest.fixture
+def budget() -> Budget:
+    """Presupuesto con vuelo, hotel y actividad."""
+    return Budget(
+        items=[
+            BudgetItem(description="Vuelo EZE-MIA", amount=Decimal("800.00")),
+            BudgetItem(description="Hotel Miami", amount=Decimal("150.00"), quantity=4),
+            BudgetItem(description="Tour Everglades", amount=Decimal("90.00")),
+        ],
+        metadata={"margin": Decimal("0.20")},
+    )
+
+
+def test_draft_is_copy_on_write(budget):
+    draft = BudgetDraft(budget)
+    draft.items[0].amount *= Decimal("2")
+    draft.metadata["margin"] = Decimal("0.10")
+
+    assert draft.items[0].amount == Decimal("1600.00")
+    assert draft.total_amount == budget.total_amount + Decimal("800.00")
+    assert budget.items[0].amount == Decimal("800.00")
+    assert budget.metadata["margin"] == Decimal("0.20")
+    assert list(draft.changed_items()) == [str(budget.items[0].item_id)]
+
+
+@pytest.mark.asyncio
+async def test_evaluate_strategies_ranks_without_mutating(budget):
+    manager = get_reconstruction_manager()
+    original = [item.amount for item in budget.items]
+
+    results = await manager.evaluate_strategies(
+        str(budget.budget_id), {"price_adjustment": 0.3}
+    )
+
+    assert [item.amount for item in budget.items] == original
+    assert budget.metadata == {"margin": Decimal("0.20")}
+    assert {r.strategy for r in results} == {
+        ReconstructionStrategy.PRESERVE_MARGIN,
+        ReconstructionStrategy.PRESERVE_PRICE,
+        ReconstructionStrategy.ADJUST_PROPORTIONALLY,
+        ReconstructionStrategy.BEST_ALTERNATIVE,
+    }
+    assert [r.rank for r in results] == [1, 2, 3, 4]
+    assert [r.score for r in results] == sorted(
+        (r.score for r in results), reverse=True
+    )
+
+    by_strategy = {r.strategy: r for r in results}
+    preserve_price = by_strategy[ReconstructionStrategy.PRESERVE_PRICE]
+    assert preserve_price.price_delta == 0
+    assert preserve_price.stability == 1.0
+    assert preserve_price.margin == Decimal("0.20") * Decimal("0.7")
+
+    proportional = by_strategy[ReconstructionStrategy.ADJUST_PROPORTIONALLY]
+    assert proportional.price_delta_percentage == pytest.approx(0.3)
+    assert proportional.to_dict()["changed_items"]
+
+
+@pytest.mark.asyncio
+async def test_reconstruct_budget_still_applies_in_place(budget):
+    manager = get_reconstruction_manager()
+
+    reconstructed = await manager.reconstruct_budget(
+        str(budget.budget_id),
+        {"price_adjustment": 0.1},
+        ReconstructionStrategy.ADJUST_PROPORTIONALLY,
+    )
+
+    assert reconstructed is budget
+    assert budget.items[0].amount == Decimal("880.00")
+
+
+@pytest.mark.asyncio
+async def test_margin_score_uses_item_costs():
+    budget = Budget(
+        items=[
+            BudgetItem(
+                description="Vuelo EZE-MIA",
+                amount=Decimal("800.00"),
+                metadata={"cost": Decimal("720.00")},
+            ),
+            BudgetItem(
+                description="Hotel Miami",
+                amount=Decimal("150.00"),
+                quantity=4,
+                metadata={"margin": Decimal("0.30")},
+            ),
+            # Sin datos: margen por defecto del gestor (0.15)
+            BudgetItem(description="Tour Everglades", amount=Decimal("90.00")),
+        ],
+    )
+    cost = Decimal("720.00") + 4 * Decimal("105.00") + Decimal("76.50")
+
+    results = await get_reconstruction_manager().evaluate_strategies(
+        str(budget.budget_id), {"price_adjustment": 0.3}
+    )
+
+    by_strategy = {r.strategy: r for r in results}
+    best = by_strategy[ReconstructionStrategy.BEST_ALTERNATIVE]
+    assert best.margin == 1 - cost / Decimal("1590.00")
+    proportional = by_strategy[ReconstructionStrategy.ADJUST_PROPORTIONALLY]
+    assert proportional.margin == 1 - cost / (Decimal("1490.00") * Decimal("1.3"))
+    assert proportional.scores["margin"] == 1.0
@@ -0,0 +1,163 @@
+"""
+Tests para el registro de presupuestos.
+
+Verifica:
+1. Vistas previas con referencias débiles
+2. Registro al confirmar versiones
+3. Expiración por inactividad
+4. Índices por vendedor, cliente y estado
+5. Ítems de proveedor vigilados mientras el presupuesto está abierto
+"""
+
+import gc
+from decimal import Decimal
+
+import pytest
+
+from smart_travel_agency.core.budget.manager import BudgetManager, get_budget_manager
+from smart_travel_agency.core.budget.models import Budget, BudgetItem
+from smart_travel_agency.core.budget.registry import BudgetRegistry
+from smart_travel_agency.interface.providers.service import ProviderService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Record:
+    def __init__(self, vendor_id, customer_id, status="active"):
+        self.vendor_id = vendor_id
+        self.customer_id = customer_id
+        self.status = status
+
+
+def test_preview_is_weak_and_commit_is_strong():
+    manager = get_budget_manager()
+    budget = Budget(items=[BudgetItem(description="Hotel", amount=Decimal("10"))])
+    budget_id = str(budget.budget_id)
+
+    assert budget_id in manager.registry
+    del budget
+    gc.collect()
+    assert budget_id not in manager.registry
+
+    committed = Budget(items=[BudgetItem(description="Hotel", amount=Decimal("10"))])
+    committed.commit_version({"type": "edit"}, "Confirmación")
+    committed_id = str(committed.budget_id)
+    del committed
+    gc.collect()
+    assert manager.registry.get(committed_id) is not None
+    manager.registry.unregister(committed_id)
+
+
+def test_ttl_evicts_only_inactive_budgets():
+    clock = FakeClock()
+    registry = BudgetRegistry(ttl=60, clock=clock)
+    registry.register("a", Record("v1", "c1"))
+    registry.register("b", Record("v1", "c2"))
+
+    clock.now = 40
+    assert registry.get("a") is not None
+    clock.now = 90
+
+    assert registry.evict_expired() == ["b"]
+    assert "b" not in registry
+    assert registry.find(vendor_id="v1") == [registry.get("a")]
+
+
+def test_secondary_indexes():
+    registry = BudgetRegistry(ttl=None)
+    budgets = {
+        "a": Record("v1", "c1"),
+        "b": Record("v1", "c2", status="closed"),
+        "c": Record("v2", "c1"),
+    }
+    for budget_id, budget in budgets.items():
+        registry.register(budget_id, budget)
+
+    assert {id(b) for b in registry.find(vendor_id="v1")} == {
+        id(budgets["a"]),
+        id(budgets["b"]),
+    }
+    assert registry.find(vendor_id="v1", status="active") == [budgets["a"]]
+    assert registry.find(customer_id="c1", status="closed") == []
+    assert len(registry.find()) == 3
+
+    budgets["a"].status = "closed"
+    registry.reindex("a")
+    assert registry.find(vendor_id="v1", status="active") == []
+    assert {id(b) for b in registry.find(status="closed")} == {
+        id(budgets["a"]),
+        id(budgets["b"]),
+    }
+
+
+@pytest.mark.asyncio
+async def test_manager_lists_by_index():
+    manager = get_budget_manager()
+    budget_id = await manager.create_budget("cliente-x", "vendedor-x", {"precio": 100})
+
+    assert [b.id for b in await manager.list_budgets(vendor_id="vendedor-x")] == [
+        budget_id
+    ]
+    assert await manager.set_status(budget_id, "archived")
+    assert await manager.list_budgets(vendor_id="vendedor-x", status="active") == []
+    manager.registry.unregister(budget_id)
+
+
+@pytest.mark.asyncio
+async def test_manager_watches_items_of_open_budgets():
+    clock = FakeClock()
+    manager = BudgetManager()
+    manager.registry = BudgetRegistry(
+        ttl=10, clock=clock, on_release=manager._unwatch_items
+    )
+    manager.item_watcher = ProviderService()
+    package = {
+        "precio": 100,
+        "componentes": [
+            {"tipo": "hotel", "id": "H1", "precio": 100, "provider_id": "prov"},
+            {"tipo": "seguro", "id": "S1", "precio": 0},
+        ],
+    }
+
+    budget_id = await manager.create_budget("c", "v", package)
+    assert manager.item_watcher.is_item_watched("prov", "H1")
+
+    assert await manager.set_status(budget_id, "closed")
+    assert not manager.item_watcher.is_item_watched("prov", "H1")
+    assert await manager.set_status(budget_id, "active")
+    assert manager.item_watcher.is_item_watched("prov", "H1")
+
+    clock.now = 11
+    assert manager.registry.evict_expired() == [budget_id]
+    assert not manager.item_watcher.is_item_watched("prov", "H1")
+
+
+@pytest.mark.asyncio
+async def test_manager_watches_items_of_registered_model_budget():
+    manager = BudgetManager()
+    manager.registry = BudgetRegistry(ttl=None, on_release=manager._unwatch_items)
+    manager.item_watcher = ProviderService()
+    budget = Budget(
+        items=[
+            BudgetItem(
+                description="Hotel",
+                amount=Decimal("100"),
+                metadata={"provider_id": "prov", "id": "H1"},
+            ),
+            BudgetItem(description="Seguro", amount=Decimal("10")),
+        ]
+    )
+    manager.register_budget(budget)
+    budget_id = str(budget.budget_id)
+
+    assert await manager.set_status(budget_id, "active")
+    assert manager.item_watcher.is_item_watched("prov", "H1")
+
+    assert await manager.set_status(budget_id, "closed")
+    assert not manager.item_watcher.is_item_watched("prov", "H1")
@@ -0,0 +1,180 @@
+"""
+Tests para el solver de selección de componentes.
+
+Verifica:
+1. Óptimo igual al de la búsqueda exhaustiva
+2. Restricciones de precio, margen, requeridos y vendedores
+3. Rendimiento en tamaños típicos
+"""
+
+import itertools
+import random
+from decimal import Decimal
+
+import pytest
+
+from smart_travel_agency.core.budget.solver import (
+    BALANCE_PRICE_QUALITY,
+    MAXIMIZE_COMPETITIVENESS,
+    MAXIMIZE_MARGIN,
+    BudgetSolver,
+    ComponentOption,
+    SolverConstraints,
+    build_constraints,
+)
+
+
+def option(component, option_id, vendor, cost, price):
+    return ComponentOption(option_id, component, vendor, Decimal(cost), Decimal(price))
+
+
+def random_options(rng, components, per_component):
+    options = []
+    for component in components:
+        for n in range(per_component):
+            cost = Decimal(rng.randint(50, 1000))
+            price = cost * Decimal(rng.randint(100, 140)) / 100
+            options.append(
+                option(
+                    component, f"{component}{n}", f"v{rng.randint(1, 4)}", cost, price
+                )
+            )
+    return options
+
+
+def brute_force(solver, options, goal, constraints):
+    by_component = {}
+    for opt in options:
+        if opt.vendor not in constraints.excluded_vendors:
+            by_component.setdefault(opt.component, []).append(opt)
+
+    best = None
+    choices = [
+        values + ([None] if component in constraints.optional_components else [])
+        for component, values in by_component.items()
+    ]
+    for combo in itertools.product(*choices):
+        chosen = [c for c in combo if c]
+        price = sum((c.price for c in chosen), Decimal(0))
+        cost = sum((c.cost for c in chosen), Decimal(0))
+        if constraints.max_price is not None and price > constraints.max_price:
+            continue
+        margin = (price - cost) / price if price else Decimal(0)
+        if constraints.min_margin is not None and margin < constraints.min_margin:
+            continue
+        if constraints.max_margin is not None and margin > constraints.max_margin:
+            continue
+        value = sum(
+            (
+                solver._value(c, goal) + constraints.preferred_vendors.get(c.vendor, 0)
+                for c in chosen
+            ),
+            Decimal(0),
+        )
+        if best is None or value > best:
+            best = value
+    return best
+
+
+@pytest.mark.parametrize(
+    "goal", [MAXIMIZE_MARGIN, MAXIMIZE_COMPETITIVENESS, BALANCE_PRICE_QUALITY]
+)
+def test_matches_exhaustive_search(goal):
+    rng = random.Random(42)
+    solver = BudgetSolver()
+    for _ in range(20):
+        options = random_options(rng, ["vuelo", "hotel", "actividad", "traslado"], 4)
+        constraints = SolverConstraints(
+            max_price=Decimal(rng.randint(1500, 3000)),
+            min_margin=Decimal("0.15"),
+            max_margin=Decimal("0.27"),
+            optional_components={"actividad", "traslado"},
+            excluded_vendors={"v4"},
+            preferred_vendors={"v1": Decimal("20")},
+        )
+        expected = brute_force(solver, options, goal, constraints)
+        result = solver.solve(options, goal, constraints)
+
+        if expected is None:
+            assert result is None
+        else:
+            assert result.optimal
+            assert result.objective == expected
+            assert result.total_price <= constraints.max_price
+            assert Decimal("0.15") <= result.margin <= Decimal("0.27")
+            assert {"vuelo", "hotel"} <= set(result.selection)
+            assert all(o.vendor != "v4" for o in result.selection.values())
+
+
+def test_required_component_without_options_is_infeasible():
+    options = [option("vuelo", "f1", "v1", "100", "120")]
+    constraints = SolverConstraints(required_components={"vuelo", "hotel"})
+
+    assert BudgetSolver().solve(options, MAXIMIZE_MARGIN, constraints) is None
+
+
+@pytest.mark.parametrize("goal", [MAXIMIZE_COMPETITIVENESS, BALANCE_PRICE_QUALITY])
+def test_offered_components_are_required_by_default(goal):
+    options = [
+        option("vuelo", "f1", "v1", "100", "120"),
+        option("hotel", "h1", "v1", "200", "230"),
+        option("actividad", "a1", "v2", "50", "55"),
+    ]
+
+    result = BudgetSolver().solve(options, goal)
+    assert set(result.selection) == {"vuelo", "hotel", "actividad"}
+
+    constraints = SolverConstraints(optional_components={"actividad"})
+    result = BudgetSolver().solve(options, goal, constraints)
+    assert set(result.selection) == {"vuelo", "hotel"}
+
+
+def test_build_constraints_maps_optimization_constraints():
+    class Constraint:
+        def __init__(self, type, value):
+            self.type = type
+            self.value = value
+
+    constraints = build_constraints(
+        [
+            Constraint("max_price", 1000),
+            Constraint("MIN_MARGIN", 0.1),
+            Constraint("OPTIONAL_COMPONENTS", ["seguro"]),
+            Constraint("PREFERRED_VENDORS", {"v1": 2}),
+        ]
+    )
+
+    assert constraints.max_price == Decimal("1000")
+    assert constraints.min_margin == Decimal("0.1")
+    assert constraints.optional_components == {"seguro"}
+    assert constraints.preferred_vendors == {"v1": Decimal("2")}
+
+
+def test_vendor_preference_breaks_ties():
+    options = [
+        option("hotel", "h1", "v1", "100", "130"),
+        option("hotel", "h2", "v2", "100", "130"),
+    ]
+    constraints = SolverConstraints(
+        required_components={"hotel"}, preferred_vendors={"v2": Decimal("1")}
+    )
+
+    result = BudgetSolver().solve(options, MAXIMIZE_MARGIN, constraints)
+    assert result.selection["hotel"].option_id == "h2"
+
+
+def test_typical_size_is_fast():
+    rng = random.Random(7)
+    options = random_options(
+        rng, ["vuelo", "hotel", "actividad", "traslado", "seguro", "auto"], 20
+    )
+    constraints = SolverConstraints(
+        max_price=Decimal("3500"),
+        min_margin=Decimal("0.2"),
+        optional_components={"actividad", "traslado", "seguro", "auto"},
+    )
+
+    result = BudgetSolver().solve(options, BALANCE_PRICE_QUALITY, constraints)
+
+    assert result is not None and result.optimal
+    assert result.elapsed < 0.5
@@ -0,0 +1,115 @@
+"""Tests para la caché de tokens de autenticación."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from smart_travel_agency.core.cache.token_cache import AuthToken, TokenCache
+
+
+class FakeLogin:
+    """Login simulado que cuenta invocaciones."""
+
+    def __init__(self, ttl: float = 600.0, delay: float = 0.01, fail: bool = False):
+        self.calls = 0
+        self.ttl = ttl
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self) -> AuthToken:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("login failed")
+        return AuthToken(
+            token=f"token-{self.calls}",
+            expires_at=datetime.now() + timedelta(seconds=self.ttl),
+            cookies={"session": str(self.calls)},
+        )
+
+
+@pytest.mark.asyncio
+async def test_single_flight_login():
+    """Requests concurrentes comparten un único login."""
+    cache = TokenCache()
+    login = FakeLogin()
+
+    tokens = await asyncio.gather(
+        *(cache.get_token("ola", "user", login) for _ in range(10))
+    )
+
+    assert login.calls == 1
+    assert {t.token for t in tokens} == {"token-1"}
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_cached_token_skips_login():
+    """Un token vigente no vuelve a hacer login."""
+    cache = TokenCache()
+    login = FakeLogin()
+
+    await cache.get_token("ola", "user", login)
+    await cache.get_token("ola", "user", login)
+
+    assert login.calls == 1
+    assert cache.peek("ola", "user").token == "token-1"
+    assert cache.peek("ola", "other") is None
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_proactive_refresh_before_expiry():
+    """El token se refresca en segundo plano antes de vencer."""
+    cache = TokenCache(refresh_margin=timedelta(seconds=0.15))
+    login = FakeLogin(ttl=0.2)
+
+    await cache.get_token("ola", "user", login)
+    await asyncio.sleep(0.15)
+
+    # El refresco ya ocurrió: el request no paga el login
+    token = await asyncio.wait_for(cache.get_token("ola", "user", login), 0.005)
+    assert token.token != "token-1"
+    assert login.calls >= 2
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_login_error_reaches_all_waiters():
+    """Un login fallido se propaga y no queda cacheado."""
+    cache = TokenCache()
+    login = FakeLogin(fail=True)
+
+    results = await asyncio.gather(
+        *(cache.get_token("ola", "user", login) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert login.calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.peek("ola", "user") is None
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_forces_new_login():
+    """invalidate() descarta el token (por ejemplo tras un 401)."""
+    cache = TokenCache()
+    login = FakeLogin()
+
+    await cache.get_token("ola", "user", login)
+    cache.invalidate("ola", "user")
+    token = await cache.get_token("ola", "user", login)
+
+    assert login.calls == 2
+    assert token.token == "token-2"
+    await cache.close()
+
+
+def test_token_without_expiry_never_refreshes():
+    """Tokens sin vencimiento (API keys) no entran en ventana de refresco."""
+    token = AuthToken(token="key")
+
+    assert token.is_valid()
+    assert not token.needs_refresh(timedelta(hours=1))
@@ -0,0 +1,34 @@
+"""Tests para el colector base."""
+
+from smart_travel_agency.core.collectors.base_collector import BaseCollector
+from smart_travel_agency.core.schemas import (
+    CollectionResult,
+    DataSource,
+    RateLimitConfig,
+)
+
+
+class StaticCollector(BaseCollector):
+    async def collect(self, params):
+        return CollectionResult(success=True, data=params)
+
+
+def test_sources_of_same_type_keep_their_own_limits():
+    """Cada fuente usa su propio limitador y configuración."""
+    slow = StaticCollector(
+        DataSource(id="prov-lento", name="Lento", type="api"),
+        rate_limit_config=RateLimitConfig(calls=5, period=60),
+    )
+    fast = StaticCollector(
+        DataSource(id="prov-rapido", name="Rápido", type="api"),
+        rate_limit_config=RateLimitConfig(calls=100, period=60),
+    )
+    shared = StaticCollector(
+        DataSource(id="prov-lento", name="Lento", type="api"),
+        rate_limit_config=RateLimitConfig(calls=100, period=60),
+    )
+
+    assert slow.rate_limiter is not fast.rate_limiter
+    assert fast.rate_limiter.config.calls == 100
+    assert slow.rate_limiter.config.calls == 5
+    assert shared.rate_limiter is slow.rate_limiter
@@ -0,0 +1,241 @@
+"""Tests para el pool de navegadores del BrowserManager."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from smart_travel_agency.core.schemas import BrowserConfig, ProxyConfig
+from smart_travel_agency.core.collectors.browser_automation import browser_manager
+from smart_travel_agency.core.collectors.browser_automation.browser_manager import (
+    BrowserManager,
+)
+
+
+class FakePage:
+    def __init__(self):
+        self.url = "about:blank"
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def goto(self, url):
+        self.url = url
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.route_handler = None
+        self.cookies_cleared = 0
+        self.closed = False
+
+    async def route(self, pattern, handler):
+        self.route_handler = handler
+
+    async def new_page(self):
+        return FakePage()
+
+    async def clear_cookies(self):
+        self.cookies_cleared += 1
+
+    async def clear_permissions(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.contexts = []
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    async def new_context(self, **kwargs):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.launches = []
+        self.stopped = False
+        self.chromium = SimpleNamespace(launch=self._launch)
+
+    async def _launch(self, proxy=None, headless=True):
+        browser = FakeBrowser(proxy)
+        self.launches.append(browser)
+        return browser
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def playwright(monkeypatch):
+    """Playwright falso (sin lanzar Chromium)."""
+    fake = FakePlaywright()
+    monkeypatch.setattr(browser_manager, "async_playwright", lambda: fake)
+    return fake
+
+
+def make_manager(**kwargs):
+    kwargs.setdefault("warm_pages", 1)
+    return BrowserManager(BrowserConfig(**kwargs))
+
+
+@pytest.mark.asyncio
+async def test_single_browser_for_many_sessions(playwright):
+    """Los préstamos comparten un navegador y tienen IDs únicos."""
+    manager = make_manager(max_sessions=10)
+
+    sessions = [await manager.get_session() for _ in range(5)]
+
+    assert len(playwright.launches) == 1
+    assert len({s.id for s in sessions}) == 5
+    assert len({id(s.context) for s in sessions}) == 5
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_released_context_is_recycled(playwright):
+    """Un contexto devuelto se limpia y se vuelve a prestar caliente."""
+    manager = make_manager()
+    manager._schedule_warm = lambda proxy: None
+
+    async with manager.lease() as session:
+        context = session.context
+        await session.page.goto("https://example.com")
+
+    assert context.cookies_cleared == 1
+    assert manager.active_sessions == {}
+
+    async with manager.lease() as session:
+        assert session.context is context
+        assert session.page.url == "about:blank"
+        assert session.uses == 2
+
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_pages_prewarmed_in_background(playwright):
+    """Tras un préstamo el pool repone contextos listos."""
+    manager = make_manager(warm_pages=2)
+
+    await manager.get_session()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert len(manager._idle["direct"]) == 2
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_capacity_waits_instead_of_evicting(playwright):
+    """Con el pool lleno se espera una devolución; nadie pierde su sesión."""
+    manager = make_manager(max_sessions=1)
+    first = await manager.get_session()
+
+    waiter = asyncio.create_task(manager.get_session())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    assert first.id in manager.active_sessions
+
+    await manager.release_session(first.id)
+    second = await asyncio.wait_for(waiter, 1)
+    assert second.id != first.id
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_blocked_resources_aborted(playwright):
+    """Imágenes, fuentes y CSS se abortan; el documento pasa."""
+    manager = make_manager()
+    session = await manager.get_session()
+    handler = session.context.route_handler
+    calls = []
+
+    def route(resource_type):
+        async def abort():
+            calls.append(("abort", resource_type))
+
+        async def continue_():
+            calls.append(("continue", resource_type))
+
+        return SimpleNamespace(
+            request=SimpleNamespace(resource_type=resource_type),
+            abort=abort,
+            continue_=continue_,
+        )
+
+    for resource_type in ("image", "font", "stylesheet", "document", "xhr"):
+        await handler(route(resource_type))
+
+    assert calls == [
+        ("abort", "image"),
+        ("abort", "font"),
+        ("abort", "stylesheet"),
+        ("continue", "document"),
+        ("continue", "xhr"),
+    ]
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_one_browser_per_proxy(playwright):
+    """Cada proxy tiene su propio navegador de larga vida."""
+    manager = BrowserManager(
+        BrowserConfig(warm_pages=0), ProxyConfig(enabled=True)
+    )
+    await manager._load_proxies()
+
+    sessions = [await manager.get_session() for _ in range(4)]
+
+    assert len(playwright.launches) == 2
+    assert {s.proxy["server"] for s in sessions} == {
+        "proxy1.example.com:8080",
+        "proxy2.example.com:8080",
+    }
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_close_releases_everything(playwright):
+    """Al cerrar se cierran contextos, navegadores y playwright."""
+    manager = make_manager()
+    session = await manager.get_session()
+
+    await manager.close()
+
+    assert session.context.closed
+    assert all(b.closed for b in playwright.launches)
+    assert playwright.stopped
+
+
+@pytest.mark.asyncio
+async def test_unknown_session_does_not_lease_a_context(playwright):
+    """Un ID desconocido falla sin tomar un lugar del pool."""
+    manager = make_manager(max_sessions=1)
+
+    with pytest.raises(KeyError):
+        await manager.get_session("nope")
+    result = await manager.execute_action("nope", "navigate", {"url": "https://x.com"})
+
+    assert not result.success
+    assert manager.active_sessions == {}
+    session = await asyncio.wait_for(manager.get_session(), timeout=1)
+    assert await manager.get_session(session.id) is session
+    await manager.close()
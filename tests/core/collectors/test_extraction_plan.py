@@ -0,0 +1,142 @@
+"""Tests para los planes de extracción compilados."""
+
+import json
+import shutil
+import subprocess
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from smart_travel_agency.core.schemas import AutomationResult, ExtractorRule
+from smart_travel_agency.core.collectors.scraping_engine import scraper_engine
+from smart_travel_agency.core.collectors.scraping_engine.extraction import (
+    ExtractionPlan,
+    compile_plan,
+)
+from smart_travel_agency.core.collectors.scraping_engine.scraper_engine import (
+    HTMLScraper,
+    ScraperEngine,
+)
+
+RULES = [
+    ExtractorRule("title", "h1"),
+    ExtractorRule("price", ".price", "el => parseFloat(el.dataset.amount)"),
+    ExtractorRule("tags", "li.tag", "el => el.textContent.trim()", multiple=True),
+    ExtractorRule("missing", ".nope"),
+]
+
+# DOM mínimo para ejecutar el script generado con node
+FAKE_DOM = """
+const nodes = {
+  "h1": [{ textContent: "Bariloche" }],
+  ".price": [{ dataset: { amount: "1234.5" } }],
+  "li.tag": [{ textContent: " nieve " }, { textContent: "lago" }],
+};
+global.document = {
+  querySelector: (s) => (nodes[s] || [null])[0],
+  querySelectorAll: (s) => nodes[s] || [],
+};
+"""
+
+
+class FakeBrowserManager:
+    """Registra las acciones ejecutadas."""
+
+    def __init__(self, data):
+        self.data = data
+        self.actions = []
+
+    @asynccontextmanager
+    async def lease(self):
+        yield SimpleNamespace(id="s1")
+
+    async def execute_action(self, session_id, action, params):
+        self.actions.append(action)
+        if action == "evaluate":
+            return AutomationResult(success=True, data=self.data)
+        return AutomationResult(success=True)
+
+
+def test_plan_compiled_once_per_rule_set():
+    """El mismo conjunto de reglas reutiliza el plan."""
+    plan = compile_plan(RULES)
+
+    assert compile_plan(list(RULES)) is plan
+    assert compile_plan(RULES[:2]) is not plan
+    assert [a["name"] for a in plan.args] == ["title", "price", "tags", "missing"]
+
+
+def test_invalid_rules_rejected():
+    """Reglas sin selector, duplicadas o no-JS no compilan."""
+    with pytest.raises(ValueError):
+        ExtractionPlan([ExtractorRule("a", "")])
+    with pytest.raises(ValueError):
+        ExtractionPlan([ExtractorRule("a", "p"), ExtractorRule("a", "div")])
+    with pytest.raises(ValueError):
+        ExtractionPlan([ExtractorRule("a", "p", extractor=object())])
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node no disponible")
+def test_script_evaluates_all_rules():
+    """El script generado aplica todas las reglas y reporta faltantes."""
+    plan = compile_plan(RULES)
+    program = (
+        FAKE_DOM
+        + f"console.log(JSON.stringify(({plan.script})({json.dumps(plan.args)})));"
+    )
+
+    output = subprocess.run(
+        ["node", "-e", program], capture_output=True, text=True, check=True
+    ).stdout
+    outcome = ExtractionPlan.parse(json.loads(output))
+
+    assert outcome.data == {
+        "title": "Bariloche",
+        "price": 1234.5,
+        "tags": ["nieve", "lago"],
+    }
+    assert list(outcome.errors) == ["missing"]
+
+
+@pytest.mark.asyncio
+async def test_html_scraper_single_round_trip(monkeypatch):
+    """Todas las reglas se extraen en una sola evaluación."""
+    manager = FakeBrowserManager({"data": {"title": "Bariloche"}, "errors": {}})
+
+    async def get_manager():
+        return manager
+
+    monkeypatch.setattr(scraper_engine, "get_browser_manager", get_manager)
+
+    data = await HTMLScraper().extract_data("https://example.com", RULES)
+
+    assert data == {"title": "Bariloche"}
+    assert manager.actions == ["navigate", "evaluate"]
+
+
+@pytest.mark.asyncio
+async def test_engine_caches_scraper_instances():
+    """El motor crea una sola instancia por scraper registrado."""
+    created = []
+
+    class CountingScraper(HTMLScraper):
+        def __init__(self):
+            super().__init__()
+            created.append(self)
+
+        async def extract_data(self, url, rules):
+            return {"url": url}
+
+    engine = ScraperEngine()
+    engine.register_scraper("counting", CountingScraper)
+
+    for i in range(3):
+        result = await engine.scrape(f"https://example.com/{i}", "counting", [])
+        assert result.success
+
+    assert len(created) == 1
+    assert engine.get_scraper("counting") is created[0]
+
+    engine.register_scraper("counting", CountingScraper)
+    assert engine.get_scraper("counting") is not created[0]
@@ -0,0 +1,144 @@
+"""Tests para el rate limiter asíncrono de colectores."""
+
+import asyncio
+import time
+
+import pytest
+
+from smart_travel_agency.core.schemas import RateLimitConfig
+from smart_travel_agency.core.collectors.rate_limiter import (
+    AsyncRateLimiter,
+    get_rate_limiter,
+)
+
+
+@pytest.mark.asyncio
+async def test_allows_calls_within_window():
+    """Las llamadas dentro del límite no esperan."""
+    limiter = AsyncRateLimiter(RateLimitConfig(calls=5, period=1.0), name="test")
+
+    for _ in range(5):
+        waited = await limiter.acquire()
+        limiter.release()
+        assert waited < 0.05
+
+    assert limiter.in_window == 5
+
+
+@pytest.mark.asyncio
+async def test_throttles_when_window_full():
+    """Se espera al siguiente slot cuando la ventana está llena."""
+    limiter = AsyncRateLimiter(RateLimitConfig(calls=2, period=0.2), name="test")
+
+    start = time.monotonic()
+    for _ in range(3):
+        async with limiter:
+            pass
+    elapsed = time.monotonic() - start
+
+    assert elapsed >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_limits_concurrency():
+    """max_concurrent acota los requests en vuelo."""
+    limiter = AsyncRateLimiter(
+        RateLimitConfig(calls=100, period=1.0, max_concurrent=2), name="test"
+    )
+    in_flight = 0
+    peak = 0
+
+    async def request():
+        nonlocal in_flight, peak
+        async with limiter:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(request() for _ in range(10)))
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_releases_slot():
+    """Cancelar una espera no deja el semáforo tomado."""
+    limiter = AsyncRateLimiter(
+        RateLimitConfig(calls=1, period=10.0, max_concurrent=1), name="test"
+    )
+    await limiter.acquire()
+    limiter.release()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert not limiter._semaphore.locked()
+
+
+@pytest.mark.asyncio
+async def test_try_acquire_never_waits():
+    """try_acquire toma un slot libre o devuelve False sin esperar."""
+    limiter = AsyncRateLimiter(
+        RateLimitConfig(calls=2, period=60.0, max_concurrent=1), name="test"
+    )
+
+    assert await limiter.try_acquire()
+    assert not await limiter.try_acquire()  # concurrencia agotada
+    limiter.release()
+
+    assert await limiter.try_acquire()
+    limiter.release()
+    assert not await limiter.try_acquire()  # ventana llena
+    assert limiter.in_window == 2
+
+
+def test_invalid_config():
+    """Configuraciones no positivas son rechazadas."""
+    with pytest.raises(ValueError):
+        AsyncRateLimiter(RateLimitConfig(calls=0, period=1.0))
+
+
+def test_registry_shares_limiter_per_source():
+    """El registro devuelve el mismo limitador por fuente."""
+    config = RateLimitConfig(calls=10, period=1.0)
+
+    assert get_rate_limiter("shared", config) is get_rate_limiter("shared")
+    assert get_rate_limiter("shared") is not get_rate_limiter("other", config)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_benchmark_event_loop_never_blocked():
+    """Benchmark: con el limitador saturado el loop sigue respondiendo."""
+    limiter = AsyncRateLimiter(RateLimitConfig(calls=10, period=0.5), name="bench")
+    tick = 0.005
+    max_lag = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal max_lag
+        loop = asyncio.get_running_loop()
+        while running:
+            expected = loop.time() + tick
+            await asyncio.sleep(tick)
+            max_lag = max(max_lag, loop.time() - expected)
+
+    async def request():
+        async with limiter:
+            await asyncio.sleep(0)
+
+    monitor = asyncio.create_task(heartbeat())
+    start = time.monotonic()
+    await asyncio.gather(*(request() for _ in range(40)))
+    elapsed = time.monotonic() - start
+    running = False
+    await monitor
+
+    # 40 llamadas a 10 cada 0.5s necesitan ~1.5s de throttling
+    assert elapsed >= 1.4
+    # Con time.sleep el loop quedaría congelado ~0.5s por ventana
+    assert max_lag < 0.1
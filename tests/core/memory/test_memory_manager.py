@@ -0,0 +1,155 @@
+"""
+Tests para el servicio de costos y precios de mercado.
+
+Verifica:
+1. Persistencia exacta de costos y márgenes
+2. Lecturas concurrentes agrupadas en una consulta
+3. Caché LRU (incluidos IDs inexistentes)
+4. Actualización de mercado desde deltas de proveedores
+"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from smart_travel_agency.core.memory import LRUCache, MemoryManager
+from smart_travel_agency.core.schemas import MemoryConfig, StorageConfig
+from smart_travel_agency.interface.providers.collector import PriceDelta
+
+
+def make_config(tmp_path, **kwargs):
+    return MemoryConfig(
+        storage=StorageConfig(path=str(tmp_path / "memory.db"), pool_size=2), **kwargs
+    )
+
+
+@pytest.fixture
+async def memory(tmp_path):
+    manager = MemoryManager(make_config(tmp_path))
+    yield manager
+    await manager.close()
+
+
+def count_queries(manager):
+    """Registrar las operaciones ejecutadas en el pool."""
+    operations = []
+    run = manager.pool.run
+
+    async def counting_run(func, *args, **kwargs):
+        operations.append(kwargs.get("operation"))
+        return await run(func, *args, **kwargs)
+
+    manager.pool.run = counting_run
+    return operations
+
+
+@pytest.mark.asyncio
+async def test_costs_and_margins_are_persisted(tmp_path, memory):
+    await memory.set_package_costs(
+        {
+            "pkg-1": {
+                "base_cost": Decimal("1000.1234"),
+                "additional_costs": {"tasas": Decimal("50.5")},
+            },
+            "pkg-2": {"base_cost": 300, "currency": "USD"},
+        }
+    )
+    await memory.set_recommended_margins({"pkg-1": 0.25})
+
+    reopened = MemoryManager(make_config(tmp_path))
+    try:
+        costs = await reopened.get_package_costs_bulk(["pkg-1", "pkg-2", "nope"])
+        margins = await reopened.get_recommended_margins(["pkg-1", "pkg-2"])
+    finally:
+        await reopened.close()
+
+    assert costs["pkg-1"]["base_cost"] == Decimal("1000.1234")
+    assert costs["pkg-1"]["additional_costs"] == {"tasas": Decimal("50.5")}
+    assert costs["pkg-2"]["currency"] == "USD"
+    assert "nope" not in costs
+    assert margins == {"pkg-1": 0.25}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_share_one_query(memory):
+    await memory.set_package_costs({f"pkg-{n}": {"base_cost": n} for n in range(1200)})
+    memory._cache.clear()
+    operations = count_queries(memory)
+
+    singles = await asyncio.gather(
+        *(memory.get_package_costs(f"pkg-{n}") for n in range(200)),
+        memory.get_package_costs_bulk([f"pkg-{n}" for n in range(100, 1200)]),
+    )
+
+    assert operations == ["memory_cost"]
+    assert singles[7]["base_cost"] == Decimal("7")
+    assert len(singles[-1]) == 1100
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_repeated_and_missing_ids(memory):
+    await memory.set_recommended_margins({"pkg-1": 0.3})
+    operations = count_queries(memory)
+
+    assert await memory.get_recommended_margin("pkg-1") == 0.3
+    assert await memory.get_recommended_margin("missing") is None
+    assert await memory.get_recommended_margins(["pkg-1", "missing"]) == {"pkg-1": 0.3}
+
+    # pkg-1 quedó en la LRU al escribir; "missing" se consultó una vez
+    assert operations == ["memory_margin"]
+
+
+@pytest.mark.asyncio
+async def test_price_updates_refresh_market_data(memory):
+    await memory.update_market_data(
+        {"hotel-1": {"avg_margin": 0.2, "demand_score": 0.9, "availability": 1.0}}
+    )
+    await memory.on_price_update(
+        "prov", PriceDelta(changed={"hotel-1": Decimal("100")})
+    )
+    await memory.on_price_update(
+        "prov", PriceDelta(changed={"hotel-1": Decimal("120")})
+    )
+    await memory.on_price_update("prov", PriceDelta(removed=["hotel-2"]))
+
+    data = await memory.get_market_data(["hotel-1"])
+    prices = await memory.get_market_prices(["hotel-1", "hotel-2"])
+    trends = await memory.get_market_trends(["hotel-1"])
+    availability = await memory.get_packages_availability(["hotel-1", "hotel-2"])
+
+    assert data["hotel-1"]["avg_price"] == Decimal("110")
+    assert data["hotel-1"]["min_market_price"] == Decimal("100")
+    assert data["hotel-1"]["max_market_price"] == Decimal("120")
+    assert data["hotel-1"]["high_demand"] is True
+    assert data["hotel-1"]["avg_margin"] == 0.2
+    assert prices == {"hotel-1": Decimal("110")}
+    assert trends["hotel-1"]["price_trend"] == pytest.approx(10 / 110)
+    assert availability == {"hotel-1": 1.0, "hotel-2": 0.0}
+
+
+@pytest.mark.asyncio
+async def test_market_average_uses_window(tmp_path):
+    memory = MemoryManager(make_config(tmp_path, market_window=2))
+    try:
+        for price in ("100", "200", "200", "200"):
+            await memory.record_market_prices({"vuelo-1": Decimal(price)})
+        data = await memory.get_market_data(["vuelo-1"])
+    finally:
+        await memory.close()
+
+    # 100 -> 150 -> 175 -> 187.5: las observaciones viejas pierden peso
+    assert data["vuelo-1"]["avg_price"] == Decimal("187.5")
+    assert data["vuelo-1"]["samples"] == 4
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
@@ -0,0 +1,116 @@
+"""Tests para la deduplicación de ofertas entre proveedores."""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+from smart_travel_agency.core.providers.dedup import (
+    OfferIndex,
+    deduplicate_results,
+    flight_fingerprint,
+    normalize_flight_number,
+)
+from smart_travel_agency.core.providers.manager import SearchResult
+from smart_travel_agency.core.schemas import Accommodation, Flight
+
+DEPARTURE = datetime(2026, 12, 1, 10, 30)
+
+
+def flight(
+    provider,
+    price,
+    number="AR1132",
+    airline="Aerolíneas Argentinas",
+    departure=DEPARTURE,
+    currency="USD",
+):
+    return Flight(
+        flight_id=uuid4(),
+        provider=provider,
+        origin="EZE",
+        destination="MAD",
+        departure_time=departure,
+        arrival_time=departure + timedelta(hours=12),
+        flight_number=number,
+        airline=airline,
+        price=Decimal(price),
+        currency=currency,
+    )
+
+
+def hotel(provider, per_night, name="Hotel Prado", nights=3):
+    check_in = datetime(2026, 12, 2, 14)
+    return Accommodation(
+        accommodation_id=uuid4(),
+        provider=provider,
+        hotel_id=f"{provider}-{name}",
+        name=name,
+        room_type="Doble",
+        price_per_night=Decimal(per_night),
+        currency="USD",
+        nights=nights,
+        check_in=check_in,
+        check_out=check_in + timedelta(days=nights),
+    )
+
+
+def test_flight_number_normalization():
+    assert normalize_flight_number("AR 1132") == "1132"
+    assert normalize_flight_number("ar-01132") == "1132"
+    assert normalize_flight_number("G3 7650") == "7650"
+    assert normalize_flight_number("2201") == "2201"
+
+
+def test_same_flight_from_two_providers_has_same_fingerprint():
+    ola = flight("ola", "900", number="AR 1132", airline="AEROLINEAS ARGENTINAS")
+    aero = flight(
+        "aero",
+        "850",
+        number="1132",
+        departure=DEPARTURE.replace(tzinfo=timezone.utc, second=40),
+    )
+
+    assert flight_fingerprint(ola) == flight_fingerprint(aero)
+    assert flight_fingerprint(ola) != flight_fingerprint(
+        flight("ola", "900", number="AR1133")
+    )
+
+
+def test_index_keeps_cheapest_and_records_alternatives():
+    index = OfferIndex("flight", flight_fingerprint)
+    expensive, cheap = flight("ola", "900"), flight("aero", "850")
+    other_currency = flight("ola", "10", currency="ARS")
+
+    index.extend([expensive, cheap, other_currency])
+
+    [merged] = index.merged()
+    assert merged.best is cheap
+    assert merged.alternatives == [expensive, other_currency]
+    assert merged.providers == ["aero", "ola", "ola"]
+
+
+def test_deduplicate_results_shrinks_candidate_set():
+    ola = SearchResult(
+        provider_id="ola",
+        flights=[
+            flight("ola", "900"),
+            flight("ola", "700", number="IB6844", airline="Iberia"),
+        ],
+        accommodations=[hotel("ola", "120")],
+    )
+    aero = SearchResult(
+        provider_id="aero",
+        flights=[flight("aero", "850")],
+        accommodations=[hotel("aero", "110"), hotel("aero", "90", name="Hotel Sol")],
+    )
+
+    dedup = deduplicate_results([ola, aero])
+
+    assert len(dedup.flights) == 2
+    assert len(dedup.accommodations) == 2
+    assert dedup.removed == 2
+    assert {f.provider for f in dedup.flights} == {"aero", "ola"}
+    assert min(
+        a.price_per_night for a in dedup.accommodations if a.name == "Hotel Prado"
+    ) == Decimal("110")
+    assert len(dedup.merged) == 2
@@ -0,0 +1,158 @@
+"""Tests para los requests de cobertura (hedging)."""
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from smart_travel_agency.core.schemas import RateLimitConfig
+from smart_travel_agency.core.collectors.rate_limiter import AsyncRateLimiter
+from smart_travel_agency.core.providers.hedging import (
+    Hedger,
+    HedgingConfig,
+    LatencyTracker,
+)
+
+
+def warmed_hedger(p95: float, samples: int = 40) -> Hedger:
+    """Hedger con historial cuyo p95 es `p95`."""
+    hedger = Hedger("test", HedgingConfig(min_samples=20, min_delay=0.001))
+    for i in range(samples):
+        hedger.tracker.observe(p95 if i >= samples * 0.9 else p95 / 10)
+    return hedger
+
+
+class Backend:
+    """Proveedor simulado con latencias programadas."""
+
+    def __init__(self, *latencies, fail_first=False):
+        self.latencies = list(latencies)
+        self.fail_first = fail_first
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        call = self.calls
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latencies[min(call, len(self.latencies) - 1)])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail_first and call == 0:
+            raise ConnectionError("boom")
+        return f"response-{call}"
+
+
+def test_latency_percentiles():
+    """Percentiles sobre la ventana deslizante."""
+    tracker = LatencyTracker("test", window=100, recompute_every=1)
+    for ms in range(1, 201):
+        tracker.observe(ms / 1000)
+
+    assert tracker.count == 100
+    assert tracker.percentile(0.95) == pytest.approx(0.195)
+    assert tracker.percentile(0.5) == pytest.approx(0.150)
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_history():
+    """Sin historial suficiente no se duplica nada."""
+    hedger = Hedger("test")
+    backend = Backend(0.05)
+
+    assert await hedger.run(backend) == "response-0"
+    assert backend.calls == 1
+    assert hedger.tracker.count == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged():
+    """Pasado el p95 se lanza un duplicado y gana el más rápido."""
+    hedger = warmed_hedger(0.02)
+    backend = Backend(1.0, 0.01)
+
+    start = time.monotonic()
+    result = await hedger.run(backend)
+    elapsed = time.monotonic() - start
+
+    assert result == "response-1"
+    assert elapsed < 0.5
+    await asyncio.sleep(0)
+    assert backend.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_request_not_hedged():
+    """Las respuestas antes del p95 no generan duplicados."""
+    hedger = warmed_hedger(0.2)
+    backend = Backend(0.01)
+
+    assert await hedger.run(backend) == "response-0"
+    assert backend.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_respects_rate_limit_budget():
+    """Sin cupo en el rate limiter no hay duplicado."""
+    hedger = warmed_hedger(0.01)
+    limiter = AsyncRateLimiter(RateLimitConfig(calls=1, period=60.0), name="test")
+    await limiter.acquire()  # el original ocupó el único slot
+    backend = Backend(0.1, 0.01)
+
+    assert await hedger.run(backend, limiter=limiter) == "response-0"
+    assert backend.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_slot_released():
+    """El slot de concurrencia del duplicado se libera al terminar."""
+    hedger = warmed_hedger(0.01)
+    limiter = AsyncRateLimiter(
+        RateLimitConfig(calls=10, period=60.0, max_concurrent=1), name="test"
+    )
+    backend = Backend(0.5, 0.01)
+
+    assert await hedger.run(backend, limiter=limiter) == "response-1"
+    assert not limiter._semaphore.locked()
+
+
+@pytest.mark.asyncio
+async def test_hedge_covers_failed_primary():
+    """Si el original falla después de cubrir, vale el duplicado."""
+    hedger = warmed_hedger(0.01)
+    backend = Backend(0.05, 0.1, fail_first=True)
+
+    assert await hedger.run(backend) == "response-1"
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_benchmark_tail_latency():
+    """Micro-benchmark: p99 con latencias de cola larga."""
+    rng = random.Random(7)
+
+    async def provider():
+        # 97% rápido, 3% muy lento
+        await asyncio.sleep(0.5 if rng.random() < 0.03 else rng.uniform(0.005, 0.02))
+        return "ok"
+
+    async def measure(hedger, requests=300):
+        latencies = []
+
+        async def one():
+            start = time.monotonic()
+            await hedger.run(provider)
+            latencies.append(time.monotonic() - start)
+
+        await asyncio.gather(*(one() for _ in range(requests)))
+        latencies.sort()
+        return latencies[int(len(latencies) * 0.99)]
+
+    plain = await measure(Hedger("plain", HedgingConfig(enabled=False)))
+    hedged_policy = Hedger("hedged")
+    await measure(hedged_policy, requests=200)  # historial
+    hedged = await measure(hedged_policy)
+
+    assert hedged < plain / 2
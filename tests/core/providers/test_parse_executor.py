@@ -0,0 +1,181 @@
+"""Tests para el executor de parseo de scrapers."""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from smart_travel_agency.core.providers.scrapers.executor import (
+    ParsingExecutor,
+    configure_parsing_executor,
+    get_parsing_executor,
+)
+from smart_travel_agency.core.providers.scrapers.ola_scraper import extract_flight_data
+from smart_travel_agency.interface.providers.aero_collector import (
+    parse_search_results,
+)
+
+FLIGHT_ROW = """
+<div class="flight available" data-id="FL{i}">
+  <div class="airline">Aerolínea {i}</div>
+  <div class="price"><span class="amount">{price:,}.50</span></div>
+  <div class="duration">3h</div>
+  <div class="stop-info"><span class="airport">GRU</span></div>
+  <div class="service included"><span class="name">Meal</span></div>
+  <div class="return-price"><span class="amount">{price:,}</span></div>
+</div>
+"""
+
+
+def saved_results_page(rows: int) -> str:
+    """Página de resultados de Aero con `rows` vuelos."""
+    body = "".join(FLIGHT_ROW.format(i=i, price=1000 + i) for i in range(rows))
+    return f"<html><body>{body}</body></html>"
+
+
+def flight_page(count: int) -> str:
+    """Página de Ola con el JSON de vuelos embebido."""
+    data = {
+        "flights": [
+            {"price": {"amount": 100 + i, "currency": "USD"}, "segments": []}
+            for i in range(count)
+        ]
+    }
+    return (
+        "<html><body><script id='flight-data' type='application/json'>"
+        f"{json.dumps(data)}</script></body></html>"
+    )
+
+
+def slow_identity(payload, delay):
+    """Trabajo de parseo simulado."""
+    time.sleep(delay)
+    return payload
+
+
+def test_invalid_kind():
+    """Solo se aceptan pools de procesos o hilos."""
+    with pytest.raises(ValueError):
+        ParsingExecutor(kind="fiber")
+
+
+@pytest.mark.asyncio
+async def test_small_payloads_parsed_inline():
+    """Los payloads chicos no pagan el costo del pool."""
+    executor = ParsingExecutor(kind="thread", inline_threshold=1024)
+
+    result = await executor.run(extract_flight_data, flight_page(2))
+
+    assert [f["price"]["amount"] for f in result["flights"]] == [100, 101]
+    assert executor._executor is None
+
+
+@pytest.mark.asyncio
+async def test_process_pool_parses_large_page():
+    """Una página grande se parsea en otro proceso con el mismo resultado."""
+    executor = ParsingExecutor(max_workers=2, kind="process", inline_threshold=0)
+    html = saved_results_page(50)
+
+    try:
+        flights, errors = await executor.run(parse_search_results, html, True)
+    finally:
+        executor.shutdown()
+
+    assert (flights, errors) == parse_search_results(html, True)
+    assert len(flights) == 50
+
+
+@pytest.mark.asyncio
+async def test_backpressure_limits_pending_jobs():
+    """Con el pool saturado los productores esperan sin bloquear el loop."""
+    executor = ParsingExecutor(
+        max_workers=1, kind="thread", max_pending=2, inline_threshold=0
+    )
+    peak = 0
+
+    async def submit(i):
+        nonlocal peak
+        task = asyncio.create_task(executor.run(slow_identity, f"page-{i}", 0.02))
+        await asyncio.sleep(0)
+        peak = max(peak, executor.pending)
+        return await task
+
+    try:
+        results = await asyncio.gather(*(submit(i) for i in range(6)))
+    finally:
+        executor.shutdown()
+
+    assert results == [f"page-{i}" for i in range(6)]
+    assert peak <= 2
+    assert executor.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_thread_pool_runs_off_loop():
+    """El trabajo corre en un hilo del pool, no en el del loop."""
+    executor = ParsingExecutor(max_workers=1, kind="thread", inline_threshold=0)
+
+    try:
+        name = await executor.run(lambda _: threading.current_thread().name, "x")
+    finally:
+        executor.shutdown()
+
+    assert name.startswith("parser")
+
+
+def test_configure_replaces_shared_executor():
+    """La configuración global reemplaza la instancia compartida."""
+    executor = configure_parsing_executor(max_workers=3, kind="thread")
+    try:
+        assert get_parsing_executor() is executor
+        assert executor.max_workers == 3
+        assert executor.max_pending == 6
+    finally:
+        configure_parsing_executor()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_benchmark_loop_lag_while_parsing():
+    """Micro-benchmark: latencia del loop mientras se parsean 8 páginas."""
+    html = saved_results_page(400)
+    executor = ParsingExecutor(max_workers=4, kind="process", inline_threshold=0)
+    # Calentar el pool (importar módulos en los procesos hijos)
+    await executor.run(parse_search_results, saved_results_page(1), False)
+
+    async def measure_lag(work):
+        lags = []
+        done = asyncio.Event()
+
+        async def heartbeat():
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append(time.perf_counter() - start - 0.005)
+
+        beat = asyncio.create_task(heartbeat())
+        await asyncio.sleep(0.01)
+        await work()
+        done.set()
+        await beat
+        return max(lags)
+
+    async def inline():
+        for _ in range(8):
+            parse_search_results(html, True)
+            await asyncio.sleep(0)
+
+    async def offloaded():
+        await asyncio.gather(
+            *(executor.run(parse_search_results, html, True) for _ in range(8))
+        )
+
+    try:
+        inline_lag = await measure_lag(inline)
+        offloaded_lag = await measure_lag(offloaded)
+    finally:
+        executor.shutdown()
+
+    assert offloaded_lag < inline_lag
@@ -0,0 +1,138 @@
+"""Tests para la capa de parseo HTML de scrapers."""
+
+import time
+
+import pytest
+from bs4 import BeautifulSoup
+
+from smart_travel_agency.core.providers.scrapers.parsing import (
+    get_parser,
+    parse_html,
+    parse_price,
+    selector,
+)
+from smart_travel_agency.interface.providers.aero_collector import (
+    AeroCollector,
+    FiltrosBusqueda,
+)
+
+FLIGHT_ROW = """
+<div class="flight available" data-id="FL{i}">
+  <div class="airline">Aerolíneas <b>Argentinas</b></div>
+  <div class="price">
+    <span class="currency">$</span><span class="amount">{price:,}.50</span>
+  </div>
+  <div class="duration">{hours}h 15m</div>
+  <div class="luggage-info">23kg</div>
+  <div class="class-type">Economy</div>
+  <div class="stop-info">
+    <span class="airport">GRU</span><span class="wait-time">1h</span>
+    <span class="terminal">T2</span><span class="stop-services">Wifi</span>
+  </div>
+  <div class="service included">
+    <span class="name">Meal</span><span class="description">Hot meal</span>
+  </div>
+  <div class="return-date">2025-03-{day:02d}</div>
+  <div class="return-duration">3h</div>
+  <div class="return-price"><span class="amount">{ret:,}</span></div>
+</div>
+"""
+
+
+def saved_results_page(rows: int) -> str:
+    """Página de resultados guardada con `rows` vuelos."""
+    body = "".join(
+        FLIGHT_ROW.format(
+            i=i, price=10000 + i * 37, hours=2 + i % 9, day=1 + i % 28, ret=9000 + i
+        )
+        for i in range(rows)
+    )
+    return f"<html><head><title>Resultados</title></head><body>{body}</body></html>"
+
+
+@pytest.fixture
+def collector():
+    """Colector Aero sin sesión."""
+    return AeroCollector("aero", "user", "pass")
+
+
+@pytest.fixture
+def filtros():
+    """Filtros ida y vuelta."""
+    return FiltrosBusqueda(
+        origen="EZE", destino="MIA", fecha_ida="2025-03-01", fecha_vuelta="2025-03-10"
+    )
+
+
+def test_default_parser_is_lxml():
+    """lxml es el backend por defecto y hay fallback si falta."""
+    assert get_parser() == "lxml"
+    assert get_parser("no-such-parser") == "lxml"
+
+
+def test_selector_compiled_once():
+    """El mismo patrón devuelve el mismo selector compilado."""
+    assert selector(".price span.amount") is selector(".price span.amount")
+
+
+def test_selector_helpers():
+    """Los selectores operan directamente sobre nodos parseados."""
+    soup = parse_html('<div><a class="x" href="/y"> Hola <b>mundo</b> </a></div>')
+
+    assert selector("a.x").text(soup) == "Hola mundo"
+    assert selector("a.x").attr(soup, "href") == "/y"
+    assert selector(".missing").text(soup, default="-") == "-"
+    assert len(selector("a, b").all(soup)) == 2
+
+
+def test_parse_price():
+    """Normalización de precios."""
+    assert parse_price("$ 12,345.50") == 12345.5
+    with pytest.raises(ValueError):
+        parse_price("consultar")
+
+
+def test_parse_search_results(collector, filtros):
+    """El colector extrae los vuelos sin re-parsear cada fila."""
+    flights = collector._parse_search_results(saved_results_page(3), filtros)
+
+    assert len(flights) == 3
+    assert flights[0]["id"] == "FL0"
+    assert flights[0]["aerolinea"] == "Aerolíneas Argentinas"
+    assert flights[0]["precio"] == 10000.5
+    assert flights[0]["vuelta"]["precio"] == 9000.0
+    assert flights[0]["escalas"][0]["aeropuerto"] == "GRU"
+    assert flights[0]["servicios"][0]["incluido"] is True
+    assert collector.errors == []
+
+
+def legacy_extract_price(element, price_selector):
+    """Camino anterior: re-serializa y re-parsea la fila por cada precio."""
+    soup = BeautifulSoup(str(element), "html.parser")
+    text = soup.select_one(price_selector.pattern).text.strip()
+    return float(text.replace("$", "").replace(",", ""))
+
+
+@pytest.mark.slow
+def test_benchmark_saved_page_with_hundreds_of_rows(collector, filtros, monkeypatch):
+    """Micro-benchmark: página guardada con 500 vuelos."""
+    from smart_travel_agency.interface.providers import aero_collector
+
+    html = saved_results_page(500)
+
+    start = time.perf_counter()
+    flights = collector._parse_search_results(html, filtros)
+    fast = time.perf_counter() - start
+
+    monkeypatch.setattr(aero_collector, "extract_price", legacy_extract_price)
+    monkeypatch.setattr(
+        aero_collector,
+        "parse_html",
+        lambda markup: BeautifulSoup(markup, "html.parser"),
+    )
+    start = time.perf_counter()
+    legacy_flights = collector._parse_search_results(html, filtros)
+    legacy = time.perf_counter() - start
+
+    assert flights == legacy_flights
+    assert fast < legacy
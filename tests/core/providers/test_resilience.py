@@ -0,0 +1,301 @@
+"""Tests para la política de resiliencia de proveedores."""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+from smart_travel_agency.core.providers import resilience
+from smart_travel_agency.core.providers.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    ProviderResilience,
+    ResilienceConfig,
+    RetryBudget,
+    backoff_delay,
+    parse_retry_after,
+)
+from smart_travel_agency.core.providers.scrapers.base import BaseScraper
+from smart_travel_agency.core.providers.scrapers.config import ScraperConfig
+
+
+class FakeClock:
+    """Reloj manual."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Flaky:
+    """Corrutina que falla `failures` veces antes de responder."""
+
+    def __init__(self, failures, error=ConnectionError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("boom")
+        return "ok"
+
+
+class RetryAfterError(Exception):
+    """Error con Retry-After del proveedor."""
+
+    def __init__(self, retry_after):
+        super().__init__("429")
+        self.retry_after = retry_after
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Registrar esperas sin dormir."""
+    waits = []
+
+    async def fake_sleep(delay):
+        waits.append(delay)
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", fake_sleep)
+    return waits
+
+
+def test_breaker_state_machine():
+    """Cerrado -> abierto -> semiabierto -> cerrado/abierto."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "p", ResilienceConfig(failure_threshold=2, recovery_timeout=10), clock
+    )
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.allow_request()
+    assert breaker.retry_after == 10
+
+    clock.now = 10
+    assert breaker.allow_request()
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert not breaker.allow_request()  # una sola sonda
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+
+    clock.now = 20
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.failures == 0
+
+
+def test_backoff_is_exponential_and_capped():
+    """El jitter se toma sobre una ventana exponencial acotada."""
+    upper = lambda low, high: high
+
+    assert [backoff_delay(n, 0.5, 3.0, upper) for n in range(4)] == [0.5, 1.0, 2.0, 3.0]
+    assert 0 <= backoff_delay(2, 0.5, 3.0) <= 2.0
+
+
+def test_parse_retry_after():
+    """Retry-After en segundos o como fecha HTTP."""
+    later = datetime.now(timezone.utc) + timedelta(seconds=120)
+
+    assert parse_retry_after("7") == 7.0
+    assert 100 < parse_retry_after(format_datetime(later, usegmt=True)) <= 120
+    assert parse_retry_after("pronto") is None
+    assert parse_retry_after(None) is None
+
+
+def test_retry_budget_is_fraction_of_traffic():
+    """Los reintentos no superan la fracción configurada del tráfico."""
+    clock = FakeClock()
+    budget = RetryBudget(
+        ResilienceConfig(retry_budget_ratio=0.1, min_retries_per_window=1), clock
+    )
+
+    for _ in range(30):
+        budget.record_request()
+    spent = sum(budget.try_spend() for _ in range(10))
+    assert spent == 3
+
+    clock.now = 61
+    budget.record_request()
+    assert budget.try_spend()
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_retried_with_backoff(sleeps):
+    """Los fallos transitorios se reintentan con backoff."""
+    policy = ProviderResilience(
+        "p", ResilienceConfig(max_attempts=3, base_delay=0.5, max_delay=5)
+    )
+    func = Flaky(2)
+
+    assert await policy.call(func, retry_on=(ConnectionError,)) == "ok"
+    assert func.calls == 3
+    assert len(sleeps) == 2
+    assert sleeps[0] <= 0.5 and sleeps[1] <= 1.0
+    assert policy.breaker.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_give_up_errors_not_retried(sleeps):
+    """Errores definitivos (p. ej. auth) se propagan sin reintentar."""
+    policy = ProviderResilience("p")
+    func = Flaky(5, error=PermissionError)
+
+    with pytest.raises(PermissionError):
+        await policy.call(func, retry_on=(Exception,), give_up_on=(PermissionError,))
+    assert func.calls == 1
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honoured(sleeps):
+    """Se espera lo que pide el proveedor en lugar del backoff."""
+    policy = ProviderResilience("p", ResilienceConfig(max_retry_after=10))
+    calls = 0
+
+    async def func():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RetryAfterError(4)
+        return "ok"
+
+    assert await policy.call(func) == "ok"
+    assert sleeps == [4]
+
+
+@pytest.mark.asyncio
+async def test_long_retry_after_opens_circuit(sleeps):
+    """Una pausa larga pedida por el proveedor abre el circuito."""
+    clock = FakeClock()
+    policy = ProviderResilience(
+        "p", ResilienceConfig(max_retry_after=10, recovery_timeout=5), clock
+    )
+
+    async def func():
+        raise RetryAfterError(60)
+
+    with pytest.raises(RetryAfterError):
+        await policy.call(func)
+    assert sleeps == []
+
+    with pytest.raises(CircuitOpenError) as info:
+        await policy.call(func)
+    assert info.value.retry_after == 60
+
+
+@pytest.mark.asyncio
+async def test_dead_provider_fails_fast(sleeps):
+    """Con el circuito abierto no se envía tráfico ni se espera."""
+    clock = FakeClock()
+    policy = ProviderResilience(
+        "p",
+        ResilienceConfig(failure_threshold=3, max_attempts=3, recovery_timeout=30),
+        clock,
+    )
+    func = Flaky(100)
+
+    with pytest.raises(ConnectionError):
+        await policy.call(func, retry_on=(ConnectionError,))
+    assert policy.breaker.state is CircuitState.OPEN
+    calls = func.calls
+
+    for _ in range(5):
+        with pytest.raises(CircuitOpenError):
+            await policy.call(func, retry_on=(ConnectionError,))
+    assert func.calls == calls
+    assert len(sleeps) == 2
+
+    # Tras el timeout se deja pasar una sonda
+    clock.now = 30
+    func.failures = 0
+    assert await policy.call(func, retry_on=(ConnectionError,)) == "ok"
+    assert policy.breaker.state is CircuitState.CLOSED
+
+
+class FakeResponse:
+    """Respuesta HTTP mínima."""
+
+    def __init__(self, body):
+        self.status = 200
+        self.headers = {}
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def text(self):
+        return self.body
+
+
+class FakeSession:
+    """Sesión que registra las URLs pedidas."""
+
+    closed = False
+
+    def __init__(self):
+        self.urls = []
+        self.cookie_jar = SimpleNamespace(filter_cookies=lambda url: {})
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        return FakeResponse(f"<p>{url}</p>")
+
+
+class LoginScraper(BaseScraper):
+    """Scraper cuyo login pasa por `_fetch` como los reales."""
+
+    async def authenticate(self):
+        await self._fetch("GET", "/login", auth_required=False)
+        self._auth_token = "token"
+
+    async def search_flights(self, *args, **kwargs):
+        return []
+
+    async def search_accommodations(self, *args, **kwargs):
+        return []
+
+    async def search_activities(self, *args, **kwargs):
+        return []
+
+
+@pytest.mark.asyncio
+async def test_expired_token_does_not_wedge_half_open_circuit():
+    """El login de la sonda semiabierta no deja el circuito colgado."""
+    clock = FakeClock()
+    scraper = LoginScraper(
+        "http://prov-half-open", "user", "pass", ScraperConfig(hedge_requests=False)
+    )
+    scraper.resilience = ProviderResilience(
+        "half-open", ResilienceConfig(recovery_timeout=30), clock
+    )
+    scraper.session = FakeSession()
+    scraper.resilience.breaker.open()
+    clock.now = 30
+
+    # Sin token en caché: la sonda necesita volver a autenticarse
+    body = await scraper._fetch("GET", "/flights")
+
+    assert body == "<p>http://prov-half-open/flights</p>"
+    assert scraper.session.urls == [
+        "http://prov-half-open/login",
+        "http://prov-half-open/flights",
+    ]
+    assert scraper.resilience.breaker.state is CircuitState.CLOSED
+    await scraper.token_cache.close()
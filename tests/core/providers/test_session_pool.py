@@ -0,0 +1,35 @@
+"""Tests para el pool de sesiones HTTP por proveedor."""
+
+import pytest
+
+from smart_travel_agency.core.providers.session_pool import ProviderSessionPool
+from smart_travel_agency.core.providers.scrapers.config import ScraperConfig
+
+
+@pytest.mark.asyncio
+async def test_session_reused_per_provider():
+    """Cada proveedor reutiliza su sesión y no comparte con otros."""
+    pool = ProviderSessionPool()
+    config = ScraperConfig(concurrent_requests=4)
+
+    ola = await pool.get_session("ola", config)
+    assert await pool.get_session("ola", config) is ola
+    assert await pool.get_session("aero", config) is not ola
+    assert ola.connector.limit == 4
+    assert pool.active_providers == 2
+
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_close_shuts_down_all_sessions():
+    """close() cierra todas las sesiones y rechaza nuevas."""
+    pool = ProviderSessionPool()
+    sessions = [await pool.get_session(p) for p in ("ola", "aero")]
+
+    await pool.close()
+
+    assert all(s.closed for s in sessions)
+    assert pool.active_providers == 0
+    with pytest.raises(RuntimeError):
+        await pool.get_session("ola")
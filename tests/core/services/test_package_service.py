@@ -0,0 +1,28 @@
+"""Tests para el servicio de paquetes."""
+
+from types import SimpleNamespace
+
+from smart_travel_agency.core.services.package_service import PackageService
+
+
+def offer(provider):
+    return SimpleNamespace(provider=provider)
+
+
+def test_package_provider_comes_from_its_own_offers():
+    package = SimpleNamespace(
+        flights=[offer("aero")],
+        accommodation=offer("ola"),
+        activities=[offer("ola"), offer("tours")],
+    )
+
+    assert PackageService._package_provider(package) == "aero,ola,tours"
+    assert package.accommodation.provider == "ola"
+
+
+def test_single_provider_package_keeps_its_provider():
+    package = SimpleNamespace(
+        flights=[offer("ola")], accommodation=offer("ola"), activities=[]
+    )
+
+    assert PackageService._package_provider(package) == "ola"
@@ -0,0 +1,74 @@
+"""
+Tests para los snapshots de sesión sobre versiones del presupuesto.
+
+Verifica:
+1. Los snapshots guardan solo los items que cambiaron
+2. Restaurar un snapshot vuelve a su versión
+3. Validación de estabilidad contra la última versión
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from smart_travel_agency.core.budget.models import Budget, BudgetItem
+from smart_travel_agency.core.session.state_manager import SessionStateManager
+
+
+@pytest.fixture
+def budget() -> Budget:
+    """Presupuesto con varios items."""
+    return Budget(
+        items=[
+            BudgetItem(description=f"Item {n}", amount=Decimal("100.00"))
+            for n in range(50)
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_snapshots_share_unchanged_items(budget):
+    manager = SessionStateManager()
+    session = await manager.create_session(budget)
+
+    budget.items[0].amount = Decimal("110.00")
+    assert await manager.update_session(session.id, budget, "Ajuste de precio")
+
+    initial, edited = await manager.get_snapshots(session.id)
+    assert initial.budget is edited.budget is budget
+    assert (initial.change_count, edited.change_count) == (0, 1)
+    version = next(v for v in budget.versions if v.version_id == edited.version_id)
+    assert list(version.changed) == [budget.items[0].item_id]
+    assert version.checkpoint is None
+
+
+@pytest.mark.asyncio
+async def test_restore_snapshot_returns_to_its_version(budget):
+    manager = SessionStateManager()
+    session = await manager.create_session(budget)
+    [initial] = await manager.get_snapshots(session.id)
+
+    budget.items[0].amount = Decimal("110.00")
+    await manager.update_session(session.id, budget, "Ajuste de precio")
+
+    assert await manager.restore_snapshot(session.id, initial.id)
+
+    item_id = budget.items[0].item_id
+    assert session.budget.items[0].amount == Decimal("100.00")
+    assert session.budget.current_version == initial.version_id
+    change = session.changes[-1]
+    assert change.new_version == initial.version_id
+    previous = budget.state_at(change.previous_version)
+    assert previous[item_id].amount == Decimal("110.00")
+
+
+@pytest.mark.asyncio
+async def test_unstable_in_place_edit_is_rejected(budget):
+    manager = SessionStateManager()
+    session = await manager.create_session(budget)
+
+    budget.items[0].amount = Decimal("150.00")
+
+    assert not await manager.update_session(session.id, budget, "Aumento")
+    assert session.changes == []
+    assert len(await manager.get_snapshots(session.id)) == 1
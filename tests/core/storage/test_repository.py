@@ -0,0 +1,248 @@
+"""Tests para el repositorio SQLite."""
+
+import asyncio
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from smart_travel_agency.core.schemas import StorageConfig
+from smart_travel_agency.core.storage.repository import (
+    DEFAULT_CATALOG_PATH,
+    DEFAULT_DB_PATH,
+    ConnectionPool,
+    TravelRepository,
+)
+
+SEARCH = {
+    "provider": "aero",
+    "origin": "EZE",
+    "destination": "MAD",
+    "departure_date": date(2026, 12, 1),
+    "return_date": date(2026, 12, 15),
+    "adults": 2,
+}
+
+
+@pytest.fixture
+async def repository(tmp_path):
+    repo = TravelRepository(
+        StorageConfig(path=str(tmp_path / "travel.db"), pool_size=2)
+    )
+    yield repo
+    await repo.close()
+
+
+def results(count, day=date(2026, 12, 1)):
+    return [
+        {
+            "flight_id": f"AR{n}",
+            "price": Decimal("500") + n,
+            "currency": "USD",
+            "availability": True,
+            "departure_date": day,
+            "details": {"stops": n % 2},
+        }
+        for n in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_save_search_with_bulk_results(repository):
+    search_id = await repository.save_search(SEARCH, results(250))
+
+    rows = await repository.get_search_results(search_id)
+
+    assert len(rows) == 250
+    assert rows[0]["price"] == 500.0
+    assert rows[0]["details"] == {"stops": 0}
+    assert rows[0]["origin"] == "EZE"
+
+
+@pytest.mark.asyncio
+async def test_find_results_by_route_and_dates(repository):
+    await repository.save_search(SEARCH, results(3))
+    await repository.save_search(
+        {**SEARCH, "departure_date": date(2026, 12, 20)},
+        results(2, day=date(2026, 12, 20)),
+    )
+
+    december_first = await repository.find_results(
+        "EZE", "MAD", date(2026, 12, 1), date(2026, 12, 1)
+    )
+    everything = await repository.find_results("EZE", "MAD")
+
+    assert len(december_first) == 3
+    assert len(everything) == 5
+    assert await repository.find_results("EZE", "BCN") == []
+
+
+@pytest.mark.asyncio
+async def test_route_query_uses_index(repository):
+    await repository.save_search(SEARCH, results(1))
+
+    def plan(conn):
+        return [
+            row[3]
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM search_results "
+                "WHERE origin = ? AND destination = ? "
+                "AND departure_date BETWEEN ? AND ?",
+                ("EZE", "MAD", "", "z"),
+            )
+        ]
+
+    details = " ".join(await repository.pool.run(plan))
+    assert "ix_search_results_route" in details
+
+
+@pytest.mark.asyncio
+async def test_data_survives_restart(tmp_path):
+    config = StorageConfig(path=str(tmp_path / "travel.db"))
+    repo = TravelRepository(config)
+    [package_id] = await repo.save_packages(
+        [
+            {
+                "provider_id": "ola",
+                "origin": "EZE",
+                "destination": "MAD",
+                "departure_date": datetime(2026, 12, 1),
+                "price": Decimal("1200"),
+                "currency": "USD",
+            }
+        ]
+    )
+    start = datetime(2026, 1, 1)
+    await repo.add_price_points(
+        [
+            (package_id, Decimal("1200") - n, "USD", start + timedelta(hours=n))
+            for n in range(10)
+        ]
+    )
+    await repo.close()
+
+    reopened = TravelRepository(config)
+    history = await reopened.get_price_history(
+        package_id, start + timedelta(hours=2), start + timedelta(hours=4)
+    )
+    packages = await reopened.find_packages("EZE", "MAD")
+    await reopened.close()
+
+    assert [point["price"] for point in history] == [1198.0, 1197.0, 1196.0]
+    assert packages[0]["id"] == package_id
+
+
+@pytest.mark.asyncio
+async def test_upsert_packages_and_market_analysis(repository):
+    package = {
+        "origin": "EZE",
+        "destination": "MAD",
+        "departure_date": date(2026, 12, 1),
+    }
+    [package_id] = await repository.save_packages([{**package, "price": 10}])
+    await repository.save_packages([{**package, "id": package_id, "price": 12}])
+    await repository.save_market_analysis(
+        {
+            "origin": "EZE",
+            "destination": "MAD",
+            "avg_price": 11,
+            "trend": "up",
+            "analysis_date": datetime(2026, 1, 1),
+            "data": {"samples": 2},
+        }
+    )
+
+    [package] = await repository.find_packages("EZE", "MAD")
+    analysis = await repository.get_latest_market_analysis("EZE", "MAD")
+
+    assert package["price"] == 12
+    assert analysis["trend"] == "up"
+    assert analysis["data"] == {"samples": 2}
+
+
+def tables(path):
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+
+
+def test_default_paths_match_existing_databases():
+    pool = ConnectionPool()
+
+    assert pool.path == DEFAULT_DB_PATH
+    assert pool.catalog_path == DEFAULT_CATALOG_PATH
+    assert "travel_packages" in tables(DEFAULT_CATALOG_PATH)
+
+
+@pytest.mark.asyncio
+async def test_catalog_tables_live_in_the_catalog_database(tmp_path):
+    config = StorageConfig(
+        path=str(tmp_path / "travel.db"),
+        catalog_path=str(tmp_path / "db" / "catalog.db"),
+    )
+    repo = TravelRepository(config)
+    await repo.save_search(SEARCH, results(2))
+    [package_id] = await repo.save_packages(
+        [
+            {
+                "provider_id": "ola",
+                "origin": "EZE",
+                "destination": "MAD",
+                "price": Decimal("1200"),
+                "currency": "USD",
+            }
+        ]
+    )
+    await repo.add_price_points(
+        [(package_id, Decimal("1200"), "USD", datetime(2026, 1, 1))]
+    )
+    await repo.close()
+
+    main = tables(tmp_path / "travel.db")
+    catalog = tables(tmp_path / "db" / "catalog.db")
+    assert {"searches", "search_results"} <= main
+    assert not {"travel_packages", "market_analysis", "price_history"} & main
+    assert {"travel_packages", "market_analysis", "price_history"} <= catalog
+    assert "ix_price_history_package_time" in catalog
+
+
+@pytest.mark.asyncio
+async def test_pool_reopens_after_close(repository):
+    await repository.save_search(SEARCH, results(1))
+    await repository.close()
+
+    [row] = await repository.find_results("EZE", "MAD")
+    assert row["flight_id"] == "AR0"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_share_a_busy_connection(tmp_path):
+    pool = ConnectionPool(StorageConfig(path=str(tmp_path / "travel.db"), pool_size=2))
+    started = threading.Event()
+    release = threading.Event()
+    busy = []
+
+    def slow(conn):
+        busy.append(conn)
+        started.set()
+        release.wait(5)
+        busy.remove(conn)
+
+    def in_use(conn):
+        return conn in busy
+
+    first = asyncio.create_task(pool.run(slow))
+    await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    # La conexión del thread que sigue corriendo no se presta
+    assert await asyncio.gather(pool.run(in_use), pool.run(in_use)) == [
+        False,
+        False,
+    ]
+
+    release.set()
+    await pool.close()
@@ -0,0 +1,53 @@
+"""
+Tests para el controlador de presupuestos.
+
+Verifica:
+1. Ítems de proveedor vigilados mientras la sesión está abierta
+2. Liberación al cerrar la vista, la sesión o por expiración
+"""
+
+from datetime import datetime, timedelta
+
+from smart_travel_agency.interface.controllers.budget_controller import (
+    BudgetController,
+)
+from smart_travel_agency.interface.providers.service import ProviderService
+from smart_travel_agency.interface.session import SessionManager
+
+
+def open_view(controller, sessions):
+    state = sessions.create_session("v1", "Vendedor")
+    session_id = state.session.id
+    controller.create_budget_view(session_id)
+    assert controller.add_budget_item(session_id, {
+        "id": "H1", "description": "Hotel", "provider_id": "prov", "price": 100
+    })
+    return state
+
+
+def test_items_are_watched_while_the_session_is_open():
+    sessions = SessionManager()
+    service = ProviderService()
+    controller = BudgetController(sessions, service)
+
+    state = open_view(controller, sessions)
+    assert service.is_item_watched("prov", "H1")
+
+    controller.close_budget_view(state.session.id)
+    assert not service.is_item_watched("prov", "H1")
+
+    state = open_view(controller, sessions)
+    sessions.close_session(state.session.id)
+    assert not service.is_item_watched("prov", "H1")
+
+
+def test_expired_sessions_release_their_items():
+    sessions = SessionManager(session_timeout=1)
+    service = ProviderService()
+    controller = BudgetController(sessions, service)
+
+    state = open_view(controller, sessions)
+    state.session.last_activity = datetime.now() - timedelta(minutes=2)
+    sessions.cleanup_expired()
+
+    assert not service.is_item_watched("prov", "H1")
@@ -0,0 +1,96 @@
+"""Tests para la verificación de disponibilidad por lotes."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from smart_travel_agency.interface.providers.collector import (
+    APIProviderCollector,
+    PriceDelta,
+    ProviderCollector,
+    ProviderError,
+)
+from smart_travel_agency.interface.providers.ola_collector import OLACollector
+
+
+class ChunkedCollector(APIProviderCollector):
+    """Colector API con lotes simulados."""
+
+    def __init__(self, fail_on=()):
+        super().__init__("bulk", "http://prov", "key")
+        self.fail_on = set(fail_on)
+        self.chunks = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def _check_availability_chunk(self, item_ids):
+        self.chunks.append(list(item_ids))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.fail_on & set(item_ids):
+                raise ProviderError("lote rechazado", self.provider_id)
+            return {item_id: True for item_id in item_ids}
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_catalog_checked_in_bounded_chunks():
+    collector = ChunkedCollector()
+    items = [f"i{n}" for n in range(1050)]
+
+    result = await collector.check_availability_bulk(
+        items, chunk_size=100, max_in_flight=3
+    )
+
+    assert result.requests == 11
+    assert len(collector.chunks) == 11
+    assert max(len(chunk) for chunk in collector.chunks) == 100
+    assert collector.peak == 3
+    assert len(result.available) == 1050
+    assert not result.errors
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_reported_separately():
+    collector = ChunkedCollector(fail_on={"i150"})
+    items = [f"i{n}" for n in range(300)]
+
+    result = await collector.check_availability_bulk(items, chunk_size=100)
+
+    assert len(result.available) == 200
+    assert set(result.errors) == {f"i{n}" for n in range(100, 200)}
+    assert "lote rechazado" in result.errors["i150"]
+    assert "i150" not in await collector.check_availability(items)
+
+
+@pytest.mark.asyncio
+async def test_check_availability_raises_when_every_chunk_fails():
+    collector = ChunkedCollector(fail_on={"a"})
+
+    with pytest.raises(ProviderError):
+        await collector.check_availability(["a"])
+
+
+@pytest.mark.asyncio
+async def test_ola_checks_locally_in_bulk():
+    collector = OLACollector("ola", "http://ola", "key")
+    fecha = (datetime.now() + timedelta(days=30)).strftime("%d-%m-%Y")
+    collector._cached_packages["x"] = {"fechas": [fecha], "fecha_seleccionada": fecha}
+
+    result = await collector.check_availability_bulk(["x", "y"])
+
+    assert result.available == {"x": True, "y": False}
+    assert result.requests == 1
+
+
+def test_collector_without_chunk_check_cannot_be_created():
+    class PricesOnly(ProviderCollector):
+        async def fetch_price_updates(self, item_ids=None):
+            return PriceDelta()
+
+    with pytest.raises(TypeError):
+        PricesOnly("p")
@@ -0,0 +1,330 @@
+"""Tests para el fetch condicional y la actualización por deltas."""
+
+from decimal import Decimal
+import json
+
+import pytest
+
+from smart_travel_agency.interface.providers.collector import (
+    APIProviderCollector,
+    AvailabilityResult,
+    PriceDelta,
+    ProviderCollector,
+    WebScraperCollector,
+)
+from smart_travel_agency.interface.providers.service import ProviderService
+
+
+class FakeResponse:
+    """Respuesta HTTP mínima."""
+
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self._body = body
+        self.headers = headers or {}
+        self.charset = "utf-8"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise AssertionError(f"status {self.status}")
+
+
+class FakeSession:
+    """Sesión que devuelve respuestas predefinidas por URL."""
+
+    closed = False
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((url, dict(headers or {})))
+        page = self.pages[url]
+        if (
+            headers
+            and page.get("etag")
+            and headers.get("If-None-Match") == page["etag"]
+        ):
+            return FakeResponse(304)
+        return FakeResponse(
+            200, page["body"], {"ETag": page["etag"]} if page.get("etag") else {}
+        )
+
+
+async def refresh(collector, item_ids=None):
+    """Refresco completo: pedir el delta y confirmarlo."""
+    delta = await collector.fetch_price_updates(item_ids)
+    collector.commit_price_update(delta)
+    return delta
+
+
+def api_collector(prices, etag=None):
+    collector = APIProviderCollector("api", "http://prov", "key")
+    session = FakeSession(
+        {"http://prov/prices": {"body": json.dumps(prices).encode(), "etag": etag}}
+    )
+    collector._session = session
+    return collector, session
+
+
+@pytest.mark.asyncio
+async def test_not_modified_skips_parsing():
+    collector, session = api_collector({"a": 10}, etag='"v1"')
+
+    first = await refresh(collector)
+    second = await refresh(collector)
+
+    assert first.changed == {"a": Decimal("10")}
+    assert not second
+    assert session.requests[1][1]["If-None-Match"] == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_same_content_without_etag_is_unchanged():
+    collector, _ = api_collector({"a": 10, "b": 20})
+
+    await refresh(collector)
+    assert not await refresh(collector)
+    assert await collector.fetch_prices() == {"a": Decimal("10"), "b": Decimal("20")}
+
+
+@pytest.mark.asyncio
+async def test_delta_contains_only_changes_and_removals():
+    collector, session = api_collector({"a": 10, "b": 20, "c": 30})
+    await refresh(collector)
+
+    session.pages["http://prov/prices"]["body"] = json.dumps(
+        {"a": 10, "b": 25}
+    ).encode()
+    delta = await refresh(collector)
+
+    assert delta.changed == {"b": Decimal("25")}
+    assert delta.removed == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_scraper_parses_only_changed_pages():
+    config = {
+        "price_selectors": {
+            "x": {"url": "http://prov/x", "selector": ".p"},
+            "y": {"url": "http://prov/y", "selector": ".p"},
+        }
+    }
+    collector = WebScraperCollector("web", config, "user", "pass")
+    collector._session = FakeSession(
+        {"http://prov/x": {"body": b"100"}, "http://prov/y": {"body": b"200"}}
+    )
+    parsed = []
+
+    def extract(html, selector):
+        parsed.append(html)
+        return float(html)
+
+    collector._extract_price = extract
+
+    await refresh(collector)
+    collector._session.pages["http://prov/y"]["body"] = b"250"
+    delta = await refresh(collector)
+
+    assert delta.changed == {"y": Decimal("250")}
+    assert parsed == ["100", "200", "250"]
+
+
+def shared_page_scraper(body=b"10|20", etag='"v1"'):
+    config = {
+        "price_selectors": {
+            "a": {"url": "http://prov/list", "selector": 0},
+            "b": {"url": "http://prov/list", "selector": 1},
+        }
+    }
+    collector = WebScraperCollector("web", config, "user", "pass")
+    collector._session = FakeSession({"http://prov/list": {"body": body, "etag": etag}})
+    collector._extract_price = lambda html, selector: float(html.split("|")[selector])
+    return collector
+
+
+@pytest.mark.asyncio
+async def test_scraper_fetches_shared_page_once_for_all_items():
+    collector = shared_page_scraper()
+
+    first = await refresh(collector)
+    second = await refresh(collector)
+
+    assert first.changed == {"a": Decimal("10"), "b": Decimal("20")}
+    assert not second
+    assert len(collector._session.requests) == 2
+    assert collector._session.requests[1][1]["If-None-Match"] == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_partial_refresh_does_not_hide_other_items_on_page():
+    collector = shared_page_scraper()
+
+    await refresh(collector, ["a"])
+    delta = await refresh(collector, ["b"])
+
+    assert delta.changed == {"b": Decimal("20")}
+    # "b" no se había procesado con esa respuesta: GET sin validadores
+    assert "If-None-Match" not in collector._session.requests[1][1]
+    assert not await refresh(collector)
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_is_retried_entirely():
+    config = {
+        "price_selectors": {
+            "x": {"url": "http://prov/x", "selector": ".p"},
+            "y": {"url": "http://prov/y", "selector": ".p"},
+        }
+    }
+    collector = WebScraperCollector("web", config, "user", "pass")
+    collector._session = FakeSession(
+        {
+            "http://prov/x": {"body": b"100", "etag": '"x1"'},
+            "http://prov/y": {"body": b"broken", "etag": '"y1"'},
+        }
+    )
+    collector._extract_price = lambda html, selector: float(html)
+
+    with pytest.raises(ValueError):
+        await refresh(collector)
+    collector._session.pages["http://prov/y"] = {"body": b"200", "etag": '"y2"'}
+    delta = await refresh(collector)
+
+    assert delta.changed == {"x": Decimal("100"), "y": Decimal("200")}
+
+
+@pytest.mark.asyncio
+async def test_scraper_availability_shares_page_and_survives_failure():
+    config = {
+        "availability_selectors": {
+            "a": {"url": "http://prov/list", "selector": 0},
+            "b": {"url": "http://prov/list", "selector": 1},
+        }
+    }
+    collector = WebScraperCollector("web", config, "user", "pass")
+    collector._session = FakeSession(
+        {"http://prov/list": {"body": b"1|0", "etag": '"v1"'}}
+    )
+    calls = []
+
+    def check(html, selector):
+        calls.append(selector)
+        if html == "fail":
+            raise ValueError("página inválida")
+        return html.split("|")[selector] == "1"
+
+    collector._check_availability_element = check
+
+    collector._session.pages["http://prov/list"] = {"body": b"fail", "etag": '"v0"'}
+    failed = await collector.check_availability_bulk(["a", "b"])
+    collector._session.pages["http://prov/list"] = {"body": b"1|0", "etag": '"v1"'}
+    first = await collector.check_availability_bulk(["a", "b"])
+    second = await collector.check_availability_bulk(["a", "b"])
+
+    assert set(failed.errors) == {"a", "b"}
+    assert first.available == {"a": True, "b": False}
+    assert second.available == first.available
+    assert len(collector._session.requests) == 3
+    assert calls == [0, 0, 1]
+
+
+def test_base_collector_requires_price_updates():
+    class Incomplete(ProviderCollector):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("p")
+
+
+class FakeCollector:
+    """Colector que entrega deltas predefinidos."""
+
+    def __init__(self, deltas):
+        self.deltas = list(deltas)
+        self.availability_checks = []
+
+    async def fetch_price_updates(self, item_ids=None):
+        return self.deltas.pop(0)
+
+    def commit_price_update(self, delta):
+        pass
+
+    async def check_availability_bulk(self, item_ids):
+        self.availability_checks.append(item_ids)
+        return AvailabilityResult(available={item_id: True for item_id in item_ids})
+
+
+@pytest.mark.asyncio
+async def test_service_pushes_only_deltas():
+    service = ProviderService()
+    collector = FakeCollector(
+        [
+            PriceDelta(changed={"a": Decimal("1"), "b": Decimal("2")}),
+            PriceDelta(),
+            PriceDelta(changed={"b": Decimal("3")}, removed=["a"]),
+        ]
+    )
+    service._collectors["p"] = collector
+    service._cache["p"] = {
+        "prices": {},
+        "availability": {},
+        "last_update": None,
+        "errors": [],
+    }
+    seen = []
+    service.add_price_listener(lambda provider_id, delta: seen.append(delta))
+
+    for _ in range(3):
+        assert await service.force_update("p")
+
+    assert service._cache["p"]["prices"] == {"b": Decimal("3")}
+    assert "a" not in service._cache["p"]["availability"]
+    assert collector.availability_checks == [["a", "b"], ["b"]]
+    assert len(seen) == 2
+    history = service.get_price_history("p", "b")
+    assert [point["price"] for point in history.price_points] == [
+        Decimal("2"),
+        Decimal("3"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_delta_is_redelivered_when_applying_it_fails():
+    service = ProviderService()
+    collector, _ = api_collector({"a": 10}, etag='"v1"')
+    service._collectors["api"] = collector
+    service._cache["api"] = {
+        "prices": {},
+        "availability": {},
+        "last_update": None,
+        "errors": [],
+    }
+    checks = []
+
+    async def check_availability_bulk(item_ids):
+        checks.append(item_ids)
+        if len(checks) == 1:
+            raise RuntimeError("servicio caído")
+        return AvailabilityResult(available={item_id: True for item_id in item_ids})
+
+    collector.check_availability_bulk = check_availability_bulk
+
+    with pytest.raises(RuntimeError):
+        await service._refresh("api")
+    delta = await service._refresh("api")
+
+    assert delta.changed == {"a": Decimal("10")}
+    assert service._cache["api"]["prices"] == {"a": Decimal("10")}
+    assert not await service._refresh("api")
+    assert checks == [["a"], ["a"]]
@@ -0,0 +1,119 @@
+"""Tests para el planificador adaptativo de refrescos."""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from smart_travel_agency.core.schemas import RateLimitConfig
+from smart_travel_agency.interface.providers.collector import PriceDelta
+from smart_travel_agency.interface.providers.scheduler import (
+    RefreshPolicy,
+    RefreshScheduler,
+)
+
+
+def no_jitter(low, high):
+    return (low + high) / 2 if low else 0.0
+
+
+async def noop_refresh(provider_id, item_ids):
+    return PriceDelta()
+
+
+def make_scheduler(active=(), **policy):
+    policy.setdefault("jitter", 0.0)
+    return RefreshScheduler(
+        noop_refresh,
+        RefreshPolicy(**policy),
+        is_active=lambda provider_id, item_id: item_id in active,
+        rng=no_jitter,
+    )
+
+
+@pytest.mark.asyncio
+async def test_volatile_items_refresh_more_often():
+    scheduler = make_scheduler(base_interval=300, min_interval=1)
+    scheduler.add_provider("p", partial=True, rate_limit=RateLimitConfig(calls=600))
+    scheduler._observe(
+        "p", None, PriceDelta(changed={"calm": Decimal("100"), "hot": Decimal("100")})
+    )
+
+    for price in ("110", "95", "120"):
+        scheduler._observe(
+            "p", ["calm", "hot"], PriceDelta(changed={"hot": Decimal(price)})
+        )
+
+    assert scheduler.interval("p", "hot") < scheduler.interval("p", "calm") / 5
+    assert scheduler.interval("p", "calm") == 300
+
+
+@pytest.mark.asyncio
+async def test_quota_keeps_active_items_ahead():
+    items = {f"i{n}": Decimal("10") for n in range(100)}
+    scheduler = make_scheduler(
+        active={"i0"}, base_interval=60, min_interval=1, quota_share=1.0
+    )
+    # 100 ítems cada 60 s exceden 1 request/s: se estira todo por igual
+    scheduler.add_provider(
+        "p", partial=True, rate_limit=RateLimitConfig(calls=60, period=60)
+    )
+    scheduler._observe("p", None, PriceDelta(changed=items))
+    scheduler._update_throttle("p")
+
+    demand = sum(1 / scheduler.interval("p", item_id) for item_id in items)
+    assert demand == pytest.approx(1.0)
+    assert scheduler.interval("p", "i0") == pytest.approx(
+        scheduler.interval("p", "i1") / 4
+    )
+
+
+@pytest.mark.asyncio
+async def test_catalog_provider_follows_most_urgent_item():
+    scheduler = make_scheduler(active={"b"}, base_interval=300, min_interval=1)
+    scheduler.add_provider("p", partial=False, rate_limit=RateLimitConfig(calls=600))
+    scheduler._observe(
+        "p", None, PriceDelta(changed={"a": Decimal("1"), "b": Decimal("1")})
+    )
+
+    assert scheduler._catalog_interval("p") == 75
+
+
+@pytest.mark.asyncio
+async def test_runs_batches_and_reschedules():
+    calls = []
+
+    async def refresh(provider_id, item_ids):
+        calls.append(item_ids)
+        return (
+            PriceDelta(changed={"a": Decimal("1"), "b": Decimal("2")})
+            if item_ids is None
+            else PriceDelta()
+        )
+
+    scheduler = RefreshScheduler(
+        refresh,
+        RefreshPolicy(
+            base_interval=0.05, min_interval=0.01, jitter=0.1, coalesce_window=0.02
+        ),
+    )
+    scheduler.add_provider("p", partial=True, rate_limit=RateLimitConfig(calls=10_000))
+    scheduler.start()
+    await asyncio.sleep(0.2)
+    await scheduler.stop()
+
+    assert calls[0] is None
+    assert len(calls) > 2
+    assert all(
+        sorted(batch) == ["a", "b"] or batch in (["a"], ["b"]) for batch in calls[1:]
+    )
+
+
+@pytest.mark.asyncio
+async def test_jitter_spreads_providers():
+    scheduler = RefreshScheduler(noop_refresh, RefreshPolicy(min_interval=10))
+    for n in range(20):
+        scheduler.add_provider(f"p{n}")
+
+    dues = sorted(scheduler._due.values())
+    assert dues[-1] - dues[0] > 5
@@ -0,0 +1,159 @@
+"""Tests para la búsqueda de vuelos concurrente entre proveedores."""
+
+import asyncio
+import time
+
+import pytest
+
+from smart_travel_agency.core.schemas import StorageConfig
+from smart_travel_agency.core.storage import TravelRepository
+from smart_travel_agency.interface.providers import search_service
+from smart_travel_agency.interface.providers.search_service import SearchService
+
+
+class SlowCollector:
+    """Proveedor que responde tras una demora."""
+
+    def __init__(self, delay, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.cancelled = False
+
+    async def search_flights(self, origin, destination, date):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise RuntimeError("proveedor caído")
+        return [{"origin": origin, "delay": self.delay}]
+
+
+class FakeProviderService:
+    def __init__(self, collectors):
+        self._collectors = collectors
+
+
+@pytest.fixture(autouse=True)
+async def repository(tmp_path, monkeypatch):
+    """Repositorio temporal en lugar del compartido de data/."""
+    repo = TravelRepository(StorageConfig(path=str(tmp_path / "travel.db")))
+    monkeypatch.setattr(search_service, "get_repository", lambda: repo)
+    yield repo
+    await repo.close()
+
+
+def make_service(collectors, **kwargs):
+    return SearchService(FakeProviderService(collectors), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_providers_are_queried_concurrently():
+    service = make_service({f"p{n}": SlowCollector(0.1) for n in range(5)})
+
+    start = time.monotonic()
+    results = await service.search_flights("EZE", "MAD", "2026-12-01")
+
+    assert time.monotonic() - start < 0.3
+    assert all(result["error"] is None for result in results.values())
+    assert len(results) == 5
+
+
+@pytest.mark.asyncio
+async def test_results_stream_in_completion_order():
+    service = make_service(
+        {
+            "slow": SlowCollector(0.15),
+            "fast": SlowCollector(0.01),
+            "broken": SlowCollector(0.05, fail=True),
+        }
+    )
+    seen = []
+
+    results = await service.search_flights(
+        "EZE",
+        "MAD",
+        "2026-12-01",
+        on_result=lambda provider_id, _: seen.append(provider_id),
+    )
+
+    assert seen == ["fast", "broken", "slow"]
+    assert results["broken"]["error"] == "proveedor caído"
+
+
+@pytest.mark.asyncio
+async def test_per_provider_timeout():
+    service = make_service({"ok": SlowCollector(0.01), "hung": SlowCollector(5)})
+
+    results = await service.search_flights("EZE", "MAD", "2026-12-01", timeout=0.05)
+
+    assert results["ok"]["error"] is None
+    assert "Tiempo de espera" in results["hung"]["error"]
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_stragglers():
+    hung = SlowCollector(5)
+    service = make_service({"ok": SlowCollector(0.01), "hung": hung})
+
+    start = time.monotonic()
+    results = await service.search_flights(
+        "EZE", "MAD", "2026-12-01", timeout=10, deadline=0.1
+    )
+
+    assert time.monotonic() - start < 0.5
+    assert "deadline" in results["hung"]["error"]
+    assert hung.cancelled
+
+
+@pytest.mark.asyncio
+async def test_stream_generator():
+    service = make_service({"a": SlowCollector(0.02), "b": SlowCollector(0.01)})
+
+    order = [
+        provider_id
+        async for provider_id, _ in service.stream_flights("EZE", "MAD", "2026-12-01")
+    ]
+
+    assert order == ["b", "a"]
+
+
+class FlightsCollector:
+    """Proveedor con vuelos del formato de Aero."""
+
+    def __init__(self, flights):
+        self.flights = flights
+
+    async def search_flights(self, origin, destination, date):
+        return self.flights
+
+
+@pytest.mark.asyncio
+async def test_merged_results_survive_restart(tmp_path, repository):
+    service = make_service(
+        {
+            "aero": FlightsCollector(
+                [
+                    {"id": "AR1132", "precio": 950.5, "disponible": True},
+                    {"aerolinea": "sin id"},
+                ]
+            ),
+            "broken": SlowCollector(0.01, fail=True),
+        }
+    )
+
+    await service.search_flights("EZE", "MAD", "2026-12-01", pasajeros=2)
+    await repository.close()
+
+    restarted = TravelRepository(StorageConfig(path=str(tmp_path / "travel.db")))
+    try:
+        [row] = await restarted.find_results("EZE", "MAD")
+    finally:
+        await restarted.close()
+    assert row["flight_id"] == "AR1132"
+    assert row["provider"] == "aero"
+    assert row["price"] == 950.5
+    assert row["currency"] == "USD"
+    assert row["availability"] == 1
+    assert row["details"]["precio"] == 950.5
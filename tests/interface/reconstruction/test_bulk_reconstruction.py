@@ -0,0 +1,74 @@
+"""Tests para la reconstrucción masiva de presupuestos."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from smart_travel_agency.interface.reconstruction.models import (
+    BudgetSnapshot,
+    PriceHistory,
+    ReconstructionData,
+)
+from smart_travel_agency.interface.reconstruction.service import ReconstructionService
+
+START = datetime(2026, 1, 1)
+
+
+def history(item_id, prices):
+    result = PriceHistory(item_id, "prov")
+    for hour, price in enumerate(prices):
+        result.add_price(Decimal(price), START + timedelta(hours=hour))
+    return result
+
+
+def store(service, histories, extra_items=()):
+    snapshot = BudgetSnapshot(budget_id=uuid4(), timestamp=START)
+    for item_id in [*histories, *extra_items]:
+        snapshot.add_item(item_id, "prov", Decimal("50"), quantity=2)
+    recon = ReconstructionData(original_snapshot=snapshot)
+    for item_id, prices in histories.items():
+        recon.add_price_history(history(item_id, prices))
+    service._reconstructions[snapshot.budget_id] = recon
+    return snapshot.budget_id
+
+
+def test_get_prices_at_matches_single_lookups():
+    series = history("a", ["10", "11", "12", "13"])
+    times = [
+        START + timedelta(hours=5),
+        START - timedelta(hours=1),
+        START + timedelta(minutes=90),
+        START + timedelta(minutes=100),
+        START + timedelta(minutes=30),
+    ]
+
+    assert series.get_prices_at(times) == [series.get_price_at(t) for t in times]
+    assert PriceHistory("x", "p").get_prices_at(times) == [None] * len(times)
+
+
+def test_reconstruct_budgets_matches_single_reconstruction():
+    service = ReconstructionService()
+    first = store(service, {"a": ["10", "20"], "b": ["5", "6"]})
+    second = store(service, {"c": ["7", "8"]}, extra_items=["sin-historial"])
+    target = START + timedelta(hours=1)
+
+    snapshots = service.reconstruct_budgets([first, second, uuid4()], target)
+
+    assert set(snapshots) == {first, second}
+    for budget_id, snapshot in snapshots.items():
+        single = service.reconstruct_budget(budget_id, target)
+        assert snapshot.items == single.items
+        assert snapshot.total == single.total
+    assert snapshots[first].total == Decimal("52")
+    assert snapshots[second].items["sin-historial"]["price"] == Decimal("50")
+
+
+def test_reconstruct_budgets_over_timestamps():
+    service = ReconstructionService()
+    budget_id = store(service, {"a": ["10", "20", "30"]})
+    timestamps = [START + timedelta(hours=2), START]
+
+    snapshots = service.reconstruct_budgets_over([budget_id], timestamps)[budget_id]
+
+    assert [s.timestamp for s in snapshots] == timestamps
+    assert [s.total for s in snapshots] == [Decimal("60"), Decimal("20")]
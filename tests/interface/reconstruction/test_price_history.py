@@ -0,0 +1,143 @@
+"""Tests para la serie temporal de precios."""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import sys
+import tracemalloc
+
+import pytest
+
+from smart_travel_agency.core.schemas import StorageConfig
+from smart_travel_agency.core.storage.repository import TravelRepository
+from smart_travel_agency.interface.reconstruction.models import PriceHistory
+
+START = datetime(2026, 1, 1)
+
+
+def hourly(count):
+    history = PriceHistory("item", "prov")
+    for n in range(count):
+        history.add_price(Decimal("100.10") + n, START + timedelta(hours=n))
+    return history
+
+
+def test_get_price_at_returns_nearest_point():
+    history = hourly(10)
+
+    assert history.get_price_at(START - timedelta(days=1)) == Decimal("100.10")
+    assert history.get_price_at(START + timedelta(hours=3, minutes=20)) == Decimal(
+        "103.10"
+    )
+    assert history.get_price_at(START + timedelta(hours=3, minutes=40)) == Decimal(
+        "104.10"
+    )
+    assert history.get_price_at(START + timedelta(days=5)) == Decimal("109.10")
+    assert PriceHistory("x", "p").get_price_at(START) is None
+
+
+def test_get_price_as_of_uses_last_known_price():
+    history = hourly(3)
+
+    assert history.get_price_as_of(START - timedelta(seconds=1)) is None
+    assert history.get_price_as_of(START + timedelta(minutes=59)) == Decimal("100.10")
+
+
+def test_out_of_order_points_stay_sorted():
+    history = PriceHistory("item", "prov")
+    history.add_price(Decimal("3"), START + timedelta(hours=3))
+    history.add_price(Decimal("1"), START + timedelta(hours=1))
+    history.add_price(Decimal("2"), START + timedelta(hours=2))
+
+    assert [price for _, price in history.range()] == [
+        Decimal("1"),
+        Decimal("2"),
+        Decimal("3"),
+    ]
+    assert history.price_points[0] == {
+        "price": Decimal("1"),
+        "timestamp": START + timedelta(hours=1),
+    }
+
+
+def test_range_and_downsample():
+    history = hourly(48)
+
+    window = history.range(START + timedelta(hours=10), START + timedelta(hours=12))
+    daily = history.downsample(timedelta(days=1), how="max")
+    daily_mean = history.downsample(timedelta(days=1), how="mean")
+
+    assert [price for _, price in window] == [
+        Decimal("110.10"),
+        Decimal("111.10"),
+        Decimal("112.10"),
+    ]
+    assert [price for _, price in daily.range()] == [
+        Decimal("123.10"),
+        Decimal("147.10"),
+    ]
+    assert daily_mean.range()[0] == (START, Decimal("111.6"))
+
+
+def test_aware_timestamps_round_trip():
+    history = PriceHistory("item", "prov")
+    when = datetime(2026, 1, 1, 12, tzinfo=timezone(timedelta(hours=-3)))
+    history.add_price(Decimal("5"), when)
+
+    [(timestamp, _)] = history.range()
+    assert timestamp == when
+
+
+def test_compact_storage():
+    history = hourly(1000)
+    legacy = [
+        {"price": Decimal("100.10") + n, "timestamp": START + timedelta(hours=n)}
+        for n in range(1000)
+    ]
+    legacy_bytes = sys.getsizeof(legacy) + sum(
+        sys.getsizeof(p) + sys.getsizeof(p["price"]) + sys.getsizeof(p["timestamp"])
+        for p in legacy
+    )
+
+    assert history.nbytes == 16 * 1000
+    assert legacy_bytes / history.nbytes > 10
+
+
+def test_unsaved_points_use_no_extra_memory():
+    history = hourly(1)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for n in range(1, 20_001):
+            history.add_price(Decimal("100.10"), START + timedelta(hours=n))
+        grown = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    # Columnas de 16 bytes por punto más el sobrante de crecimiento
+    assert grown / 20_000 < 24
+
+
+@pytest.mark.asyncio
+async def test_persist_and_load(tmp_path):
+    repository = TravelRepository(
+        StorageConfig(path=str(tmp_path / "travel.db"), pool_size=1)
+    )
+    [package_id] = await repository.save_packages(
+        [{"origin": "EZE", "destination": "MAD"}]
+    )
+    history = hourly(5)
+
+    assert await history.save(repository, package_id) == 5
+    history.add_price(Decimal("1"), START + timedelta(hours=5))
+    assert await history.save(repository, package_id) == 1
+
+    # Punto fuera de orden dentro de lo ya persistido
+    history.add_price(Decimal("7"), START + timedelta(minutes=30))
+    assert await history.save(repository, package_id) == 1
+    assert await history.save(repository, package_id) == 0
+
+    loaded = await PriceHistory.load(repository, package_id, "item", "prov")
+    assert await loaded.save(repository, package_id) == 0
+    await repository.close()
+
+    assert loaded.range() == history.range()